@@ -24,10 +24,32 @@
 #
 # --------------------------------------------------------------------------
 from collections.abc import AsyncIterator
+import asyncio
 import logging
+import weakref
 
 _LOGGER = logging.getLogger(__name__)
 
+
+async def _async_prefetch_pages(fetcher, pages):
+    """Fetch the pages of a Paged copy, in the background, until cancelled."""
+    while True:
+        try:
+            await fetcher._async_advance_page()  # pylint: disable=protected-access
+        except Exception as err:  # pylint: disable=broad-except
+            await pages.put(err)
+            return
+        await pages.put(fetcher._page_state())  # pylint: disable=protected-access
+
+
+def _cancel_prefetch(task):
+    """Cancel the prefetch task of a collected iterator."""
+    try:
+        task.cancel()
+    except RuntimeError:
+        pass  # The event loop is closed
+
+
 class AsyncPagedMixin(AsyncIterator):
     """Bring async to Paging.
 
@@ -37,6 +59,7 @@ class AsyncPagedMixin(AsyncIterator):
     """
     def __init__(self, *args, **kwargs): # pylint: disable=unused-argument
         self._async_get_next = kwargs.get("async_command")
+        self._prefetch_task = None
         if not self._async_get_next:
             _LOGGER.debug("Paging async iterator protocol is not available for %s",
                           self.__class__.__name__)
@@ -53,6 +76,38 @@ class AsyncPagedMixin(AsyncIterator):
         self._deserializer(self, self._response)
         return self.current_page
 
+    async def _async_next_page(self):
+        """Move to the next page, fetched in a background task if "prefetch_pages" is set."""
+        if not self.prefetch_pages:
+            return await self._async_advance_page()
+        if self._prefetched is None:
+            self._prefetched = asyncio.Queue(maxsize=self.prefetch_pages)
+            # The loop only keeps weak references to its tasks: the iterator keeps this one, and
+            # cancels it when collected, instead of leaving it blocked on the full queue
+            self._prefetch_task = asyncio.ensure_future(
+                _async_prefetch_pages(self._copy_for_prefetch(), self._prefetched))
+            weakref.finalize(self, _cancel_prefetch, self._prefetch_task)
+        if isinstance(self._prefetched, Exception):
+            # The background fetch is over, with this error or StopAsyncIteration
+            raise self._prefetched
+        page = await self._prefetched.get()
+        if isinstance(page, Exception):
+            self._prefetched = page
+            raise page
+        self.__dict__.update(page)
+        return self.current_page
+
+    async def aclose(self):
+        """Stop fetching pages in the background, if "prefetch_pages" is set."""
+        task, self._prefetch_task = self._prefetch_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     async def __anext__(self):
         """Iterate through responses."""
         # Storing the list iterator might work out better, but there's no
@@ -62,5 +117,5 @@ class AsyncPagedMixin(AsyncIterator):
             response = self.current_page[self._current_page_iter_index]
             self._current_page_iter_index += 1
             return response
-        await self._async_advance_page()
+        await self._async_next_page()
         return await self.__anext__()
@@ -95,6 +95,13 @@ class ConnectionConfiguration(object):
     :param str connection_cert: Client-side certificates. You can specify a local cert to use as client side
      certificate, as a single file (containing the private key and the certificate) or as a tuple of both files' paths.
     :param int connection_data_block_size: The block size of data sent over the connection. Defaults to 4096 bytes.
+    :param int connection_pool_maxsize: The maximum number of connections kept open per host. Defaults to the
+     transport default (10 for requests, no limit for aiohttp).
+    :param int connection_pool_limit: The maximum number of connections checked out at the same time, across
+     all hosts. Requests wait for a connection to be released once this limit is reached. Defaults to the
+     transport default (no limit for requests, 100 for aiohttp).
+    :param float connection_keep_alive: How long in seconds an idle connection is kept open to be reused.
+     Defaults to the transport default (no timeout for requests, 15 seconds for aiohttp).
 
     Example:
         .. literalinclude:: ../examples/test_example_config.py
@@ -110,3 +117,6 @@ class ConnectionConfiguration(object):
         self.verify = kwargs.pop('connection_verify', True)
         self.cert = kwargs.pop('connection_cert', None)
         self.data_block_size = kwargs.pop('connection_data_block_size', 4096)
+        self.pool_maxsize = kwargs.pop('connection_pool_maxsize', None)
+        self.pool_limit = kwargs.pop('connection_pool_limit', None)
+        self.keep_alive = kwargs.pop('connection_keep_alive', None)
@@ -164,6 +164,17 @@ class TooManyRedirectsError(HttpResponseError):
         message = "Reached maximum redirect attempts."
         super(TooManyRedirectsError, self).__init__(message, *args, **kwargs)
 
+
+class RetryBudgetExceededError(HttpResponseError):
+    """A retry was not sent, because too many requests to this host are already retries.
+
+    :param response: The last response received for the request, if any.
+    """
+
+    def __init__(self, message=None, response=None, **kwargs):
+        message = message or "Retry budget exceeded."
+        super(RetryBudgetExceededError, self).__init__(message=message, response=response, **kwargs)
+
 class ODataV4Format(object):
     """Class to describe OData V4 error format.
 
@@ -24,11 +24,17 @@
 #
 # --------------------------------------------------------------------------
 import sys
+import threading
+import weakref
 try:
     from collections.abc import Iterator
     xrange = range
 except ImportError:
     from collections import Iterator
+try:
+    from queue import Queue, Full
+except ImportError:  # Python 2.7
+    from Queue import Queue, Full  # type: ignore
 
 from typing import Dict, Any, List, Callable, Optional, TYPE_CHECKING  # pylint: disable=unused-import
 
@@ -43,19 +49,51 @@ else:
     class AsyncPagedMixin(object):  # type: ignore
         pass
 
+def _put_page(paged_ref, pages, page):
+    """Queue a prefetched page, unless the iterator is garbage collected while the queue is full."""
+    while paged_ref() is not None:
+        try:
+            pages.put(page, timeout=1)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _prefetch_pages(paged_ref, fetcher, pages):
+    """Fetch the pages of a Paged copy, in the background."""
+    while True:
+        try:
+            fetcher._advance_page()  # pylint: disable=protected-access
+        except Exception as err:  # pylint: disable=broad-except
+            _put_page(paged_ref, pages, err)
+            return
+        if not _put_page(paged_ref, pages, fetcher._page_state()):  # pylint: disable=protected-access
+            return
+
+
 class Paged(AsyncPagedMixin, Iterator):
     """A container for paged REST responses.
 
+    Setting "prefetch_pages" before iterating fetches up to this number of pages in the
+    background, while the current one is consumed. The command must be thread-safe.
+
     :param response: server response object.
     :type response: ~azure.core.pipeline.transport.HttpResponse
     :param callable command: Function to retrieve the next page of items.
     :param Deserializer deserializer: a Deserializer instance to use
+
+    **Keyword arguments:**
+
+    *prefetch_pages (int)* - Number of pages fetched ahead of the one being consumed. Default value is 0.
     """
     _validation = {}  # type: Dict[str, Dict[str, Any]]
     _attribute_map = {}  # type: Dict[str, Dict[str, Any]]
 
     def __init__(self, command, deserializer, **kwargs):
         # type: (Callable[[str], HttpResponse], Deserializer, Any) -> None
+        self.prefetch_pages = kwargs.pop('prefetch_pages', 0)
+        self._prefetched = None  # type: Any
         super(Paged, self).__init__(**kwargs)  # type: ignore
         # Sets next_link, current_page, and _current_page_iter_index.
         self.next_link = ""
@@ -93,6 +131,49 @@ class Paged(AsyncPagedMixin, Iterator):
         self._deserializer(self, self._response)
         return self.current_page
 
+    def _page_state(self):
+        # type: () -> Dict[str, Any]
+        """The attributes set by "_advance_page"."""
+        return {k: v for k, v in self.__dict__.items()
+                if k not in ('prefetch_pages', '_prefetched', '_prefetch_task')}
+
+    def _copy_for_prefetch(self):
+        # type: () -> Paged
+        """A copy of this iterator, to advance in the background."""
+        fetcher = object.__new__(type(self))
+        fetcher.__dict__.update(self._page_state())
+        fetcher.prefetch_pages = 0
+        fetcher._prefetched = None  # pylint: disable=protected-access
+        return fetcher
+
+    def _next_page(self):
+        # type: () -> List[Model]
+        """Move to the next page, fetched in the background if "prefetch_pages" is set.
+
+        :raises: StopIteration if no further page
+        :return: The current page list
+        :rtype: list
+        """
+        if not self.prefetch_pages:
+            return self._advance_page()
+        if self._prefetched is None:
+            self._prefetched = Queue(maxsize=self.prefetch_pages)
+            thread = threading.Thread(
+                target=_prefetch_pages,
+                args=(weakref.ref(self), self._copy_for_prefetch(), self._prefetched),
+                name="Paged-prefetch")
+            thread.daemon = True
+            thread.start()
+        if isinstance(self._prefetched, Exception):
+            # The background fetch is over, with this error or StopIteration
+            raise self._prefetched
+        page = self._prefetched.get()
+        if isinstance(page, Exception):
+            self._prefetched = page
+            raise page
+        self.__dict__.update(page)
+        return self.current_page
+
     def __next__(self):
         """Iterate through responses."""
         # Storing the list iterator might work out better, but there's no
@@ -102,7 +183,7 @@ class Paged(AsyncPagedMixin, Iterator):
             response = self.current_page[self._current_page_iter_index]
             self._current_page_iter_index += 1
             return response
-        self._advance_page()
+        self._next_page()
         return self.__next__()
 
     next = __next__  # Python 2 compatibility.
@@ -71,6 +71,90 @@ class _SansIOHTTPPolicyRunner(HTTPPolicy, Generic[HTTPRequestType, HTTPResponseT
         return response
 
 
+def _is_overridden(policy, hook):
+    # type: (SansIOHTTPPolicy, str) -> bool
+    """Whether a SansIO policy implements a hook, instead of inheriting the no-op of SansIOHTTPPolicy.
+
+    :param policy: A SansIO policy.
+    :type policy: ~azure.core.pipeline.policies.SansIOHTTPPolicy
+    :param str hook: "on_request", "on_response" or "on_exception".
+    :rtype: bool
+    """
+    if hook in getattr(policy, '__dict__', {}):
+        return True
+    implementation = getattr(type(policy), hook)
+    base = getattr(SansIOHTTPPolicy, hook)
+    return getattr(implementation, '__func__', implementation) is not getattr(base, '__func__', base)
+
+
+def _flatten_policies(policies, runner_type, group_runner_type):
+    """Build the list of HTTP policies to chain from the configured policies.
+
+    Consecutive SansIO policies that don't handle exceptions are run by a single
+    group runner, which only calls the hooks they implement. SansIO policies that
+    handle exceptions get their own runner, and no-op policies are dropped.
+
+    :param list policies: List of configured policies.
+    :param runner_type: Runner class for a single SansIO policy.
+    :param group_runner_type: Runner class for a group of SansIO policies.
+    :rtype: list
+    """
+    impl_policies = []  # type: List[Any]
+    group = []  # type: List[SansIOHTTPPolicy]
+
+    def flush_group():
+        if any(_is_overridden(p, hook) for p in group for hook in ('on_request', 'on_response')):
+            impl_policies.append(group_runner_type(group))
+        del group[:]
+
+    for policy in (policies or []):
+        if isinstance(policy, SansIOHTTPPolicy):
+            if _is_overridden(policy, 'on_exception'):
+                flush_group()
+                impl_policies.append(runner_type(policy))
+            else:
+                group.append(policy)
+        elif policy:
+            flush_group()
+            impl_policies.append(policy)
+    flush_group()
+    return impl_policies
+
+
+class _SansIOHTTPPoliciesRunner(HTTPPolicy, Generic[HTTPRequestType, HTTPResponseType]):
+    """Sync implementation of a group of SansIO policies.
+
+    Behaves like a chain of _SansIOHTTPPolicyRunner for policies that don't handle
+    exceptions, without the per-policy call overhead: every on_request is executed in
+    order, the request is sent to the next policy in the chain, then every on_response
+    is executed in reverse order. Hooks inherited from SansIOHTTPPolicy are skipped.
+
+    :param list policies: SansIO policies that don't implement on_exception.
+    """
+
+    def __init__(self, policies):
+        # type: (List[SansIOHTTPPolicy]) -> None
+        super(_SansIOHTTPPoliciesRunner, self).__init__()
+        self._on_request = [p.on_request for p in policies if _is_overridden(p, 'on_request')]
+        self._on_response = [p.on_response for p in reversed(policies) if _is_overridden(p, 'on_response')]
+
+    def send(self, request):
+        # type: (PipelineRequest) -> PipelineResponse
+        """Modifies the request and sends to the next policy in the chain.
+
+        :param request: The PipelineRequest object.
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: The PipelineResponse object.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        """
+        for on_request in self._on_request:
+            on_request(request)
+        response = self.next.send(request)  # type: ignore
+        for on_response in self._on_response:
+            on_response(request, response)
+        return response
+
+
 class _TransportRunner(HTTPPolicy):
     """Transport runner.
 
@@ -104,6 +188,10 @@ class Pipeline(AbstractContextManager, Generic[HTTPRequestType, HTTPResponseType
     This is implemented as a context manager, that will activate the context
     of the HTTP sender. The transport is the last node in the pipeline.
 
+    The chain of policies is built once, at construction time: consecutive SansIO
+    policies are run together, and hooks they don't implement are not called.
+    Policies must be fully configured when the pipeline is created.
+
     :param transport: The Http Transport instance
     :param list policies: List of configured policies.
 
@@ -117,14 +205,10 @@ class Pipeline(AbstractContextManager, Generic[HTTPRequestType, HTTPResponseType
     """
     def __init__(self, transport, policies=None):
         # type: (HttpTransportType, PoliciesType) -> None
-        self._impl_policies = []  # type: List[HTTPPolicy]
         self._transport = transport  # type: ignore
-
-        for policy in (policies or []):
-            if isinstance(policy, SansIOHTTPPolicy):
-                self._impl_policies.append(_SansIOHTTPPolicyRunner(policy))
-            elif policy:
-                self._impl_policies.append(policy)
+        self._impl_policies = _flatten_policies(
+            policies, _SansIOHTTPPolicyRunner, _SansIOHTTPPoliciesRunner
+        )  # type: List[HTTPPolicy]
         for index in range(len(self._impl_policies)-1):
             self._impl_policies[index].next = self._impl_policies[index+1]
         if self._impl_policies:
@@ -147,6 +231,8 @@ class Pipeline(AbstractContextManager, Generic[HTTPRequestType, HTTPResponseType
         :return: The PipelineResponse object
         :rtype: ~azure.core.pipeline.PipelineResponse
         """
+        if getattr(request, "multipart_mixed_info", None):
+            request.prepare_multipart_body()  # type: ignore
         context = PipelineContext(self._transport, **kwargs)
         pipeline_request = PipelineRequest(request, context) # type: PipelineRequest
         first_node = self._impl_policies[0] if self._impl_policies else _TransportRunner(self._transport)
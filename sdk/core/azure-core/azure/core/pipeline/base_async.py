@@ -29,6 +29,7 @@ from typing import Any, Union, List, Generic, TypeVar
 
 from azure.core.pipeline import PipelineRequest, PipelineResponse, PipelineContext
 from azure.core.pipeline.policies import AsyncHTTPPolicy, SansIOHTTPPolicy
+from .base import _is_overridden, _flatten_policies
 
 AsyncHTTPResponseType = TypeVar("AsyncHTTPResponseType")
 HTTPRequestType = TypeVar("HTTPRequestType")
@@ -81,6 +82,37 @@ class _SansIOAsyncHTTPPolicyRunner(AsyncHTTPPolicy[HTTPRequestType, AsyncHTTPRes
         return response
 
 
+class _SansIOAsyncHTTPPoliciesRunner(AsyncHTTPPolicy[HTTPRequestType, AsyncHTTPResponseType]): #pylint: disable=unsubscriptable-object
+    """Async implementation of a group of SansIO policies.
+
+    Behaves like a chain of _SansIOAsyncHTTPPolicyRunner for policies that don't handle
+    exceptions, without the per-policy call overhead. Hooks inherited from
+    SansIOHTTPPolicy are skipped.
+
+    :param list policies: SansIO policies that don't implement on_exception.
+    """
+
+    def __init__(self, policies: List[SansIOHTTPPolicy]) -> None:
+        super(_SansIOAsyncHTTPPoliciesRunner, self).__init__()
+        self._on_request = [p.on_request for p in policies if _is_overridden(p, 'on_request')]
+        self._on_response = [p.on_response for p in reversed(policies) if _is_overridden(p, 'on_response')]
+
+    async def send(self, request: PipelineRequest):
+        """Modifies the request and sends to the next policy in the chain.
+
+        :param request: The PipelineRequest object.
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: The PipelineResponse object.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        """
+        for on_request in self._on_request:
+            on_request(request)
+        response = await self.next.send(request)  # type: ignore
+        for on_response in self._on_response:
+            on_response(request, response)
+        return response
+
+
 class _AsyncTransportRunner(AsyncHTTPPolicy[HTTPRequestType, AsyncHTTPResponseType]): #pylint: disable=unsubscriptable-object
     """Async Transport runner.
 
@@ -113,6 +145,8 @@ class AsyncPipeline(AbstractAsyncContextManager, Generic[HTTPRequestType, AsyncH
     This is implemented as a context manager, that will activate the context
     of the HTTP sender.
 
+    As for the sync Pipeline, the chain of policies is built once at construction time.
+
     :param transport: The async Http Transport instance.
     :param list policies: List of configured policies.
 
@@ -126,14 +160,10 @@ class AsyncPipeline(AbstractAsyncContextManager, Generic[HTTPRequestType, AsyncH
     """
 
     def __init__(self, transport, policies: AsyncPoliciesType = None) -> None:
-        self._impl_policies = []  # type: ImplPoliciesType
         self._transport = transport
-
-        for policy in (policies or []):
-            if isinstance(policy, SansIOHTTPPolicy):
-                self._impl_policies.append(_SansIOAsyncHTTPPolicyRunner(policy))
-            elif policy:
-                self._impl_policies.append(policy)
+        self._impl_policies = _flatten_policies(
+            policies, _SansIOAsyncHTTPPolicyRunner, _SansIOAsyncHTTPPoliciesRunner
+        )  # type: ImplPoliciesType
         for index in range(len(self._impl_policies)-1):
             self._impl_policies[index].next = self._impl_policies[index+1]
         if self._impl_policies:
@@ -161,6 +191,8 @@ class AsyncPipeline(AbstractAsyncContextManager, Generic[HTTPRequestType, AsyncH
         :return: The PipelineResponse object.
         :rtype: ~azure.core.pipeline.PipelineResponse
         """
+        if getattr(request, "multipart_mixed_info", None):
+            request.prepare_multipart_body()  # type: ignore
         context = PipelineContext(self._transport, **kwargs)
         pipeline_request = PipelineRequest(request, context)
         first_node = self._impl_policies[0] if self._impl_policies else _AsyncTransportRunner(self._transport)
@@ -27,6 +27,8 @@
 from .base import HTTPPolicy, SansIOHTTPPolicy
 from .authentication import BearerTokenCredentialPolicy
 from .custom_hook import CustomHookPolicy
+from .hedging import HedgingPolicy
+from .rate_limit import RateLimitPolicy
 from .redirect import RedirectPolicy
 from .retry import RetryPolicy
 from .universal import (
@@ -48,7 +50,9 @@ __all__ = [
     'RetryPolicy',
     'RedirectPolicy',
     'ProxyPolicy',
-    'CustomHookPolicy'
+    'CustomHookPolicy',
+    'HedgingPolicy',
+    'RateLimitPolicy'
 ]
 
 #pylint: disable=unused-import
@@ -58,11 +62,15 @@ try:
     from .authentication_async import AsyncBearerTokenCredentialPolicy
     from .redirect_async import AsyncRedirectPolicy
     from .retry_async import AsyncRetryPolicy
+    from .hedging_async import AsyncHedgingPolicy
+    from .rate_limit_async import AsyncRateLimitPolicy
     __all__.extend([
         'AsyncHTTPPolicy',
         'AsyncBearerTokenCredentialPolicy',
         'AsyncRedirectPolicy',
-        'AsyncRetryPolicy'
+        'AsyncRetryPolicy',
+        'AsyncHedgingPolicy',
+        'AsyncRateLimitPolicy'
     ])
 except (ImportError, SyntaxError):
     pass  # Async not supported
@@ -3,7 +3,10 @@
 # Licensed under the MIT License. See LICENSE.txt in the project root for
 # license information.
 # -------------------------------------------------------------------------
+import logging
+import threading
 import time
+import weakref
 
 from . import HTTPPolicy
 
@@ -19,21 +22,118 @@ if TYPE_CHECKING:
     from azure.core.pipeline import PipelineRequest, PipelineResponse
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
+class _TokenCacheEntry(object):
+    """The token of a credential for some scopes, shared by all the policies using them.
+
+    A token is renewed in the background once it expires in less than REFRESH_WINDOW seconds,
+    and requests keep using it meanwhile. Requests only wait for a token when there is none, or
+    when it expires in less than EXPIRY_WINDOW seconds: then a single one of them requests the
+    token, and the others wait for it.
+    """
+    REFRESH_WINDOW = 300
+    EXPIRY_WINDOW = 30
+    # Delay before renewing the token again after a failure
+    RETRY_DELAY = 30
+
+    def __init__(self, credential, scopes):
+        # type: (TokenCredential, tuple) -> None
+        self.credential = credential
+        self.scopes = scopes
+        self.token = None  # type: Optional[AccessToken]
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._next_refresh = 0.0
+
+    def _is_usable(self, token, now):
+        # type: (Optional[AccessToken], float) -> bool
+        return token is not None and token.expires_on - now > self.EXPIRY_WINDOW
+
+    def _should_refresh(self, token, now):
+        # type: (AccessToken, float) -> bool
+        """Whether to start renewing a usable token in the background."""
+        return token.expires_on - now < self.REFRESH_WINDOW and not self._refreshing and now >= self._next_refresh
+
+    def get_token(self):
+        # type: () -> AccessToken
+        token = self.token
+        now = time.time()
+        if self._is_usable(token, now):
+            if self._should_refresh(token, now):  # type: ignore
+                with self._lock:
+                    start = self._should_refresh(token, now)  # type: ignore
+                    self._refreshing = self._refreshing or start
+                if start:
+                    thread = threading.Thread(target=self._refresh, name="TokenRefresh")
+                    thread.daemon = True
+                    thread.start()
+            return token  # type: ignore
+        with self._lock:
+            if not self._is_usable(self.token, time.time()):
+                self.token = self.credential.get_token(*self.scopes)
+            return self.token  # type: ignore
+
+    def _refresh(self):
+        # type: () -> None
+        try:
+            token = self.credential.get_token(*self.scopes)
+            with self._lock:
+                self.token = token
+        except Exception as err:  # pylint:disable=broad-except
+            _LOGGER.warning("Failed to renew the token in the background, will retry: %r", err)
+            self._next_refresh = time.time() + self.RETRY_DELAY
+        finally:
+            self._refreshing = False
+
+
+# Token cache entries, by credential and scopes
+_token_cache = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+_token_cache_lock = threading.Lock()
+
+
+def _get_token_cache_entry(credential, scopes, entry_type=_TokenCacheEntry):
+    """Return the cache entry shared by the policies using this credential and these scopes.
+
+    Credentials that can't be weakly referenced or hashed get an entry of their own.
+    """
+    with _token_cache_lock:
+        try:
+            entries = _token_cache.setdefault(credential, {})
+        except TypeError:
+            return entry_type(credential, scopes)
+        key = (entry_type, tuple(sorted(scopes)))
+        if key not in entries:
+            # The entry must not keep the credential alive through the cache
+            entries[key] = entry_type(weakref.proxy(credential), scopes)
+        return entries[key]
+
+
 # pylint:disable=too-few-public-methods
 class _BearerTokenCredentialPolicyBase(object):
     """Base class for a Bearer Token Credential Policy.
 
+    The tokens are cached for the whole process: policies using the same credential and scopes
+    share a token, and renew it once, in the background, before it expires.
+
     :param credential: The credential.
     :type credential: ~azure.core.credentials.TokenCredential
     :param str scopes: Lets you specify the type of access needed.
     """
+    _cache_entry_type = _TokenCacheEntry
 
     def __init__(self, credential, *scopes, **kwargs):  # pylint:disable=unused-argument
         # type: (TokenCredential, *str, Mapping[str, Any]) -> None
         super(_BearerTokenCredentialPolicyBase, self).__init__()
         self._scopes = scopes
         self._credential = credential
-        self._token = None  # type: Optional[AccessToken]
+        self._cache_entry = _get_token_cache_entry(credential, scopes, self._cache_entry_type)
+
+    @property
+    def _token(self):
+        # type: () -> Optional[AccessToken]
+        return self._cache_entry.token
 
     @staticmethod
     def _update_headers(headers, token):
@@ -45,11 +145,6 @@ class _BearerTokenCredentialPolicyBase(object):
         """
         headers["Authorization"] = "Bearer {}".format(token)
 
-    @property
-    def _need_new_token(self):
-        # type: () -> bool
-        return not self._token or self._token.expires_on - time.time() < 300
-
 
 class BearerTokenCredentialPolicy(_BearerTokenCredentialPolicyBase, HTTPPolicy):
     """Adds a bearer token Authorization header to requests.
@@ -68,7 +163,6 @@ class BearerTokenCredentialPolicy(_BearerTokenCredentialPolicyBase, HTTPPolicy):
         :return: The pipeline response object
         :rtype: ~azure.core.pipeline.PipelineResponse
         """
-        if self._need_new_token:
-            self._token = self._credential.get_token(*self._scopes)
-        self._update_headers(request.http_request.headers, self._token.token)  # type: ignore
+        token = self._cache_entry.get_token()
+        self._update_headers(request.http_request.headers, token.token)
         return self.next.send(request)
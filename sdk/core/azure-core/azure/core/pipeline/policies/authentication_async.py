@@ -3,11 +3,60 @@
 # Licensed under the MIT License. See LICENSE.txt in the project root for
 # license information.
 # -------------------------------------------------------------------------
-import threading
+import asyncio
+import logging
+import time
 
 from azure.core.pipeline import PipelineRequest, PipelineResponse
 from azure.core.pipeline.policies import AsyncHTTPPolicy
-from azure.core.pipeline.policies.authentication import _BearerTokenCredentialPolicyBase
+from azure.core.pipeline.policies.authentication import _BearerTokenCredentialPolicyBase, _TokenCacheEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _AsyncTokenCacheEntry(_TokenCacheEntry):
+    """The token of an async credential for some scopes, shared by all the policies using them.
+
+    Same as the sync entry, with the background renewal in a task, and requests waiting for a
+    token in flight instead of a lock.
+    """
+
+    def __init__(self, credential, scopes):
+        super().__init__(credential, scopes)
+        self._request = None  # type: asyncio.Future
+        self._request_loop = None  # type: asyncio.AbstractEventLoop
+        # The loop only keeps weak references to its tasks
+        self._refresh_task = None  # type: asyncio.Future
+
+    async def get_token(self):  # type: ignore
+        token = self.token
+        now = time.time()
+        if self._is_usable(token, now):
+            if self._should_refresh(token, now):
+                self._refreshing = True
+                self._refresh_task = asyncio.ensure_future(self._refresh())
+            return token
+        request = self._request
+        loop = asyncio.get_event_loop()
+        if request is None or request.done() or self._request_loop is not loop:
+            request = self._request = asyncio.ensure_future(self._request_token())
+            self._request_loop = loop
+        # Shielded: a cancelled request must not cancel the one the others wait for
+        return await asyncio.shield(request)
+
+    async def _request_token(self):
+        token = await self.credential.get_token(*self.scopes)
+        self.token = token
+        return token
+
+    async def _refresh(self):  # type: ignore
+        try:
+            self.token = await self.credential.get_token(*self.scopes)
+        except Exception as err:  # pylint:disable=broad-except
+            _LOGGER.warning("Failed to renew the token in the background, will retry: %r", err)
+            self._next_refresh = time.time() + self.RETRY_DELAY
+        finally:
+            self._refreshing = False
 
 
 class AsyncBearerTokenCredentialPolicy(_BearerTokenCredentialPolicyBase, AsyncHTTPPolicy):
@@ -18,10 +67,7 @@ class AsyncBearerTokenCredentialPolicy(_BearerTokenCredentialPolicyBase, AsyncHT
     :type credential: ~azure.core.credentials.TokenCredential
     :param str scopes: Lets you specify the type of access needed.
     """
-
-    def __init__(self, credential, *scopes, **kwargs):
-        super().__init__(credential, *scopes, **kwargs)
-        self._lock = threading.Lock()
+    _cache_entry_type = _AsyncTokenCacheEntry
 
     async def send(self, request: PipelineRequest) -> PipelineResponse:
         """Adds a bearer token Authorization header to request and sends request to next policy.
@@ -31,8 +77,6 @@ class AsyncBearerTokenCredentialPolicy(_BearerTokenCredentialPolicyBase, AsyncHT
         :return: The pipeline response object
         :rtype: ~azure.core.pipeline.PipelineResponse
         """
-        with self._lock:
-            if self._need_new_token:
-                self._token = await self._credential.get_token(*self._scopes)  # type: ignore
-        self._update_headers(request.http_request.headers, self._token.token)  # type: ignore
+        token = await self._cache_entry.get_token()
+        self._update_headers(request.http_request.headers, token.token)
         return await self.next.send(request)  # type: ignore
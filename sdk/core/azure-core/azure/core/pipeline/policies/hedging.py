@@ -0,0 +1,218 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE.txt in the project root for
+# license information.
+# -------------------------------------------------------------------------
+"""
+This module is the hedging policy, to reduce the tail latency of idempotent requests.
+"""
+import collections
+import copy
+import logging
+import threading
+import time
+try:
+    from queue import Queue, Empty
+except ImportError:  # Python 2.7
+    from Queue import Queue, Empty  # type: ignore
+
+from azure.core.pipeline import PipelineContext, PipelineRequest
+from .base import HTTPPolicy
+
+try:
+    from typing import TYPE_CHECKING  # pylint:disable=unused-import
+except ImportError:
+    TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    # pylint:disable=unused-import
+    from typing import Any, Deque
+    from azure.core.pipeline import PipelineResponse
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _close_response(response):
+    # type: (PipelineResponse) -> None
+    """Release the connection of a response nobody will read."""
+    close = getattr(response.http_response.internal_response, 'close', None)
+    if close:
+        try:
+            close()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Failed to close hedged response: %r", err)
+
+
+class _HedgingPolicyBase(object):
+    """Base class for the hedging policies.
+
+    Keeps the latencies of the recent attempts, to compute the hedging delay.
+
+    **Keyword arguments:**
+
+    *hedging_percentile (float)* - Percentile of the recent latencies after which a second attempt
+    is sent. Default value is 95.
+
+    *hedging_initial_delay (float)* - Delay in seconds before the second attempt, until enough
+    latencies are known to compute the percentile. Default value is 1.
+
+    *hedging_min_samples (int)* - Number of latencies needed to use the percentile. Default value is 20.
+
+    *hedging_window (int)* - Number of recent latencies the percentile is computed on. Default value is 100.
+
+    *hedging_on_methods (list[str])* - Methods that can be hedged. They must be idempotent.
+    Default value is GET, HEAD and OPTIONS.
+    """
+
+    def __init__(self, **kwargs):
+        # type: (Any) -> None
+        super(_HedgingPolicyBase, self).__init__()
+        self.percentile = kwargs.pop('hedging_percentile', 95)
+        self.initial_delay = kwargs.pop('hedging_initial_delay', 1)
+        self.min_samples = kwargs.pop('hedging_min_samples', 20)
+        self._methods = frozenset(m.upper() for m in kwargs.pop('hedging_on_methods', ['GET', 'HEAD', 'OPTIONS']))
+        self._latencies = collections.deque(maxlen=kwargs.pop('hedging_window', 100))  # type: Deque[float]
+        self._lock = threading.Lock()
+
+    def get_hedging_delay(self):
+        # type: () -> float
+        """Returns the delay in seconds after which a second attempt is sent.
+
+        :return: The configured percentile of the recent latencies, or the initial delay
+         if there are not enough of them.
+        :rtype: float
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            latencies = sorted(self._latencies)
+        index = int(round(self.percentile / 100.0 * (len(latencies) - 1)))
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def record_latency(self, latency):
+        # type: (float) -> None
+        """Record the latency of a successful attempt.
+
+        :param float latency: Duration of the attempt in seconds.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _is_hedgeable(self, request):
+        # type: (PipelineRequest) -> bool
+        if not request.context.options.pop('hedging_enable', True):
+            return False
+        http_request = request.http_request
+        if http_request.method.upper() not in self._methods:
+            return False
+        # A stream can't be sent twice at the same time
+        return not hasattr(http_request.body, 'read')
+
+    @staticmethod
+    def _clone_request(request):
+        # type: (PipelineRequest) -> PipelineRequest
+        """Copy the request, so policies after this one can modify each attempt independently."""
+        http_request = copy.copy(request.http_request)
+        http_request.headers = request.http_request.headers.copy()
+        context = PipelineContext(request.context.transport, **dict(request.context.options))
+        for key, value in request.context.items():
+            context[key] = value
+        return PipelineRequest(http_request, context)
+
+
+class HedgingPolicy(_HedgingPolicyBase, HTTPPolicy):
+    """A hedging policy, to reduce tail latency.
+
+    If the response to an idempotent request takes longer than a percentile of the
+    recent latencies, a second identical request is sent, and the first response
+    to arrive is returned. The other attempt can't be interrupted: its response is
+    closed when it arrives. Requests with a stream body are never hedged.
+
+    Attempts run in threads: the transport must be thread-safe, for instance a
+    RequestsTransport created with session_per_thread=True.
+    Hedging can be disabled per operation with hedging_enable=False.
+
+    **Keyword arguments:**
+
+    *hedging_percentile (float)* - Percentile of the recent latencies after which a second attempt
+    is sent. Default value is 95.
+
+    *hedging_initial_delay (float)* - Delay in seconds before the second attempt, until enough
+    latencies are known to compute the percentile. Default value is 1.
+
+    *hedging_min_samples (int)* - Number of latencies needed to use the percentile. Default value is 20.
+
+    *hedging_window (int)* - Number of recent latencies the percentile is computed on. Default value is 100.
+
+    *hedging_on_methods (list[str])* - Methods that can be hedged. They must be idempotent.
+    Default value is GET, HEAD and OPTIONS.
+    """
+
+    def _send_attempt(self, request, results, state):
+        """Send one attempt and report its result, or close it if the other attempt already won."""
+        start = time.time()
+        try:
+            result = (request, self.next.send(request), None)
+            self.record_latency(time.time() - start)
+        except Exception as err:  # pylint: disable=broad-except
+            result = (request, None, err)
+        with state['lock']:
+            if state['done']:
+                if result[1] is not None:
+                    _close_response(result[1])
+                return
+            results.put(result)
+
+    def send(self, request):
+        """Sends the PipelineRequest object to the next policy, hedging it if it's too slow.
+
+        :param request: The PipelineRequest object
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: Returns the first PipelineResponse to arrive.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        """
+        if not self._is_hedgeable(request):
+            start = time.time()
+            response = self.next.send(request)
+            self.record_latency(time.time() - start)
+            return response
+
+        hedged_request = self._clone_request(request)
+        results = Queue()  # type: Queue
+        state = {'lock': threading.Lock(), 'done': False}
+
+        def start_attempt(attempt):
+            thread = threading.Thread(target=self._send_attempt, args=(attempt, results, state))
+            thread.daemon = True
+            thread.start()
+
+        start_attempt(request)
+        pending = 1
+        try:
+            result = results.get(timeout=self.get_hedging_delay())
+        except Empty:
+            _LOGGER.debug("Request is slower than the hedging delay, sending a second attempt.")
+            start_attempt(hedged_request)
+            pending = 2
+            result = results.get()
+        pending -= 1
+        # An error only wins if there is nothing else to wait for
+        while result[1] is None and pending:
+            result = results.get()
+            pending -= 1
+
+        with state['lock']:
+            state['done'] = True
+        while True:
+            try:
+                _, loser, _ = results.get_nowait()
+            except Empty:
+                break
+            if loser is not None:
+                _close_response(loser)
+
+        _, response, error = result
+        if error:
+            raise error
+        return response
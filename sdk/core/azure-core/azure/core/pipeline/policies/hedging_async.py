@@ -0,0 +1,78 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE.txt in the project root for
+# license information.
+# -------------------------------------------------------------------------
+import asyncio
+import logging
+import time
+
+from azure.core.pipeline import PipelineRequest, PipelineResponse
+from azure.core.pipeline.policies import AsyncHTTPPolicy
+from azure.core.pipeline.policies.hedging import _HedgingPolicyBase, _close_response
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncHedgingPolicy(_HedgingPolicyBase, AsyncHTTPPolicy):
+    """Async flavor of the hedging policy.
+
+    If the response to an idempotent request takes longer than a percentile of the
+    recent latencies, a second identical request is sent, and the first response
+    to arrive is returned. The other attempt is cancelled. Requests with a stream
+    body are never hedged. This policy requires an asyncio event loop.
+    Hedging can be disabled per operation with hedging_enable=False.
+
+    **Keyword arguments:**
+
+    *hedging_percentile (float)* - Percentile of the recent latencies after which a second attempt
+    is sent. Default value is 95.
+
+    *hedging_initial_delay (float)* - Delay in seconds before the second attempt, until enough
+    latencies are known to compute the percentile. Default value is 1.
+
+    *hedging_min_samples (int)* - Number of latencies needed to use the percentile. Default value is 20.
+
+    *hedging_window (int)* - Number of recent latencies the percentile is computed on. Default value is 100.
+
+    *hedging_on_methods (list[str])* - Methods that can be hedged. They must be idempotent.
+    Default value is GET, HEAD and OPTIONS.
+    """
+
+    async def _send_attempt(self, request):
+        start = time.time()
+        response = await self.next.send(request)  # type: ignore
+        self.record_latency(time.time() - start)
+        return response
+
+    async def send(self, request: PipelineRequest) -> PipelineResponse:  # type: ignore
+        """Sends the PipelineRequest object to the next policy, hedging it if it's too slow.
+
+        :param request: The PipelineRequest object
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: Returns the first PipelineResponse to arrive.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        """
+        if not self._is_hedgeable(request):
+            return await self._send_attempt(request)
+
+        hedged_request = self._clone_request(request)
+        pending = {asyncio.ensure_future(self._send_attempt(request))}
+        done, pending = await asyncio.wait(pending, timeout=self.get_hedging_delay())
+        if not done:
+            _LOGGER.debug("Request is slower than the hedging delay, sending a second attempt.")
+            pending.add(asyncio.ensure_future(self._send_attempt(hedged_request)))
+        try:
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                attempt = done.pop()
+                # An error only wins if there is nothing else to wait for
+                if attempt.exception() is None or not (done or pending):
+                    return attempt.result()
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+            for attempt in done:
+                if attempt.exception() is None:
+                    _close_response(attempt.result())
@@ -0,0 +1,222 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE.txt in the project root for
+# license information.
+# -------------------------------------------------------------------------
+"""
+This module is the client-side rate limiter and retry budget policy.
+"""
+import logging
+import threading
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse  # type: ignore
+
+from azure.core.exceptions import RetryBudgetExceededError
+from .base import HTTPPolicy
+from .retry import _parse_retry_after
+
+try:
+    from typing import TYPE_CHECKING  # pylint:disable=unused-import
+except ImportError:
+    TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    # pylint:disable=unused-import
+    from typing import Any, Dict, Optional
+    from azure.core.pipeline import PipelineRequest, PipelineResponse
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _HostState(object):
+    """Token bucket and request counts of one host."""
+
+    def __init__(self, now):
+        # type: (float) -> None
+        self.rate = None  # type: Optional[float]
+        self.tokens = 0.0
+        self.last_refill = now
+        self.last_decrease = 0.0
+        self.blocked_until = 0.0
+        # {second: [first attempts, retries]}
+        self.counts = {}  # type: Dict[int, list]
+
+    def record(self, now, window, retry):
+        # type: (float, int, bool) -> None
+        second = int(now)
+        for old in [s for s in self.counts if s <= second - window]:
+            del self.counts[old]
+        self.counts.setdefault(second, [0, 0])[1 if retry else 0] += 1
+
+    def totals(self):
+        # type: () -> tuple
+        return sum(c[0] for c in self.counts.values()), sum(c[1] for c in self.counts.values())
+
+    def take_token(self, now):
+        # type: (float) -> float
+        """Take a token from the bucket, and return how long to wait for it."""
+        if not self.rate:
+            return 0
+        capacity = max(1.0, self.rate)
+        self.tokens = min(capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        # Tokens can go negative: the next callers queue behind this one
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+
+class _RateLimitPolicyBase(object):
+    """Base class for the rate limit policies.
+
+    Keeps the state of every host, shared by all the requests sent through the pipeline.
+    """
+
+    def __init__(self, **kwargs):
+        # type: (Any) -> None
+        super(_RateLimitPolicyBase, self).__init__()
+        self.min_rate = kwargs.pop('rate_limit_min_rate', 0.5)
+        self.max_rate = kwargs.pop('rate_limit_max_rate', None)
+        self.rate_increase = kwargs.pop('rate_limit_increase', 1.0)
+        self.rate_decrease = kwargs.pop('rate_limit_decrease', 0.5)
+        self.budget_ratio = kwargs.pop('retry_budget_ratio', 0.1)
+        self.budget_min_retries = kwargs.pop('retry_budget_min_retries', 10)
+        self.budget_window = kwargs.pop('retry_budget_window', 10)
+        self._throttle_status_codes = frozenset(kwargs.pop('rate_limit_on_status_codes', [429, 503]))
+        self._hosts = {}  # type: Dict[str, _HostState]
+        self._lock = threading.Lock()
+
+    def get_rate(self, host):
+        # type: (str) -> Optional[float]
+        """Returns the current rate limit of a host.
+
+        :param str host: The host, as in the request URL.
+        :return: The number of requests per second allowed, or None if the host was never throttled.
+        :rtype: float
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.rate if state else None
+
+    def get_retry_after(self, response):
+        # type: (PipelineResponse) -> Optional[float]
+        """Get the value of Retry-After in seconds.
+
+        :param response: The PipelineResponse object
+        :type response: ~azure.core.pipeline.PipelineResponse
+        :return: Value of Retry-After in seconds.
+        :rtype: int
+        """
+        retry_after = response.http_response.headers.get("Retry-After")
+        if retry_after is None:
+            return None
+        return _parse_retry_after(retry_after)
+
+    def _acquire(self, request):
+        # type: (PipelineRequest) -> float
+        """Count the attempt, and return how long to wait before sending it.
+
+        :raises: ~azure.core.exceptions.RetryBudgetExceededError if the attempt is a retry, and
+         the retry budget of the host is exhausted.
+        """
+        # The retry policies send the same PipelineRequest again, so its context tells retries apart
+        attempt = request.context.get('rate_limit_attempts', 0)
+        request.context['rate_limit_attempts'] = attempt + 1
+        host = urlparse(request.http_request.url).netloc
+        now = time.time()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(now)
+            if attempt:
+                requests, retries = state.totals()
+                if retries >= self.budget_min_retries + self.budget_ratio * requests:
+                    raise RetryBudgetExceededError(
+                        "Retry budget of {} exceeded: {} retries for {} requests in the last {} seconds.".format(
+                            host, retries, requests, self.budget_window),
+                        response=request.context.get('rate_limit_response'))
+            state.record(now, self.budget_window, attempt > 0)
+            return max(state.take_token(now), state.blocked_until - now)
+
+    def _update(self, request, response):
+        # type: (PipelineRequest, PipelineResponse) -> None
+        """Adjust the rate of the host: multiplicative decrease when throttled, additive increase otherwise."""
+        host = urlparse(request.http_request.url).netloc
+        now = time.time()
+        throttled = response.http_response.status_code in self._throttle_status_codes
+        if throttled:
+            request.context['rate_limit_response'] = response.http_response
+        retry_after = self.get_retry_after(response) if throttled else None
+        with self._lock:
+            state = self._hosts[host]
+            if not throttled:
+                if state.rate:
+                    # One more request per second, every second
+                    state.rate += self.rate_increase / state.rate
+                    if self.max_rate:
+                        state.rate = min(state.rate, self.max_rate)
+                return
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            # Requests in flight are throttled together: decrease once per second only
+            if now - state.last_decrease < 1:
+                return
+            state.last_decrease = now
+            if state.rate is None:
+                requests, retries = state.totals()
+                state.rate = float(requests + retries) / self.budget_window
+                state.last_refill = now
+            state.rate = max(self.min_rate, state.rate * self.rate_decrease)
+            _LOGGER.debug("Request to %s throttled, rate limit decreased to %.2f requests per second.",
+                          host, state.rate)
+
+
+class RateLimitPolicy(_RateLimitPolicyBase, HTTPPolicy):
+    """A client-side rate limiter and retry budget.
+
+    Once a host throttles requests (429 and 503 by default), requests to this host go through a
+    token bucket. Its rate is halved every time the host throttles, and increases by one request
+    per second, every second, while it doesn't. No request is sent before the delay of a Retry-After
+    header. Retries are capped to a ratio of the requests sent recently to the same host; a retry
+    over the budget raises RetryBudgetExceededError, which retry policies don't retry.
+
+    This policy must be after the retry policy in the pipeline, to see every attempt.
+
+    **Keyword arguments:**
+
+    *rate_limit_on_status_codes (list[int])* - Status codes of throttled responses. Default value is [429, 503].
+
+    *rate_limit_min_rate (float)* - Minimum rate in requests per second. Default value is 0.5.
+
+    *rate_limit_max_rate (float)* - Maximum rate in requests per second. No maximum by default.
+
+    *rate_limit_increase (float)* - Increase of the rate per second without throttling. Default value is 1.
+
+    *rate_limit_decrease (float)* - Factor the rate is multiplied by when throttled. Default value is 0.5.
+
+    *retry_budget_ratio (float)* - Ratio of retries allowed, relative to requests. Default value is 0.1.
+
+    *retry_budget_min_retries (int)* - Retries always allowed in the window. Default value is 10.
+
+    *retry_budget_window (int)* - Period in seconds retries and requests are counted on. Default value is 10.
+    """
+
+    def send(self, request):
+        # type: (PipelineRequest) -> PipelineResponse
+        """Waits for the rate limit of the host, then sends the PipelineRequest object to the next policy.
+
+        :param request: The PipelineRequest object
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: Returns the PipelineResponse.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        :raises: ~azure.core.exceptions.RetryBudgetExceededError if the retry budget is exhausted.
+        """
+        delay = self._acquire(request)
+        if delay > 0:
+            request.context.transport.sleep(delay)
+        response = self.next.send(request)
+        self._update(request, response)
+        return response
@@ -0,0 +1,55 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE.txt in the project root for
+# license information.
+# -------------------------------------------------------------------------
+from azure.core.pipeline import PipelineRequest, PipelineResponse
+from azure.core.pipeline.policies import AsyncHTTPPolicy
+from azure.core.pipeline.policies.rate_limit import _RateLimitPolicyBase
+
+
+class AsyncRateLimitPolicy(_RateLimitPolicyBase, AsyncHTTPPolicy):
+    """Async flavor of the client-side rate limiter and retry budget.
+
+    Once a host throttles requests (429 and 503 by default), requests to this host go through a
+    token bucket. Its rate is halved every time the host throttles, and increases by one request
+    per second, every second, while it doesn't. No request is sent before the delay of a Retry-After
+    header. Retries are capped to a ratio of the requests sent recently to the same host; a retry
+    over the budget raises RetryBudgetExceededError, which retry policies don't retry.
+
+    This policy must be after the retry policy in the pipeline, to see every attempt.
+
+    **Keyword arguments:**
+
+    *rate_limit_on_status_codes (list[int])* - Status codes of throttled responses. Default value is [429, 503].
+
+    *rate_limit_min_rate (float)* - Minimum rate in requests per second. Default value is 0.5.
+
+    *rate_limit_max_rate (float)* - Maximum rate in requests per second. No maximum by default.
+
+    *rate_limit_increase (float)* - Increase of the rate per second without throttling. Default value is 1.
+
+    *rate_limit_decrease (float)* - Factor the rate is multiplied by when throttled. Default value is 0.5.
+
+    *retry_budget_ratio (float)* - Ratio of retries allowed, relative to requests. Default value is 0.1.
+
+    *retry_budget_min_retries (int)* - Retries always allowed in the window. Default value is 10.
+
+    *retry_budget_window (int)* - Period in seconds retries and requests are counted on. Default value is 10.
+    """
+
+    async def send(self, request: PipelineRequest) -> PipelineResponse:  # type: ignore
+        """Waits for the rate limit of the host, then sends the PipelineRequest object to the next policy.
+
+        :param request: The PipelineRequest object
+        :type request: ~azure.core.pipeline.PipelineRequest
+        :return: Returns the PipelineResponse.
+        :rtype: ~azure.core.pipeline.PipelineResponse
+        :raises: ~azure.core.exceptions.RetryBudgetExceededError if the retry budget is exhausted.
+        """
+        delay = self._acquire(request)
+        if delay > 0:
+            await request.context.transport.sleep(delay)
+        response = await self.next.send(request)  # type: ignore
+        self._update(request, response)
+        return response
@@ -31,11 +31,13 @@ from __future__ import absolute_import  # we have a "requests" module that confl
 import logging
 import time
 import email
+from io import SEEK_SET, UnsupportedOperation
 from typing import TYPE_CHECKING, List, Callable, Iterator, Any, Union, Dict, Optional  # pylint: disable=unused-import
 from azure.core.pipeline import PipelineResponse
 from azure.core.exceptions import (
     AzureError,
     ClientAuthenticationError,
+    RetryBudgetExceededError,
     ServiceResponseError,
     ServiceRequestError
 )
@@ -46,6 +48,26 @@ from .base import HTTPPolicy, RequestHistory
 _LOGGER = logging.getLogger(__name__)
 
 
+def _parse_retry_after(retry_after):
+    """Helper to parse Retry-After and get value in seconds.
+
+    :param str retry_after: Retry-After header
+    :rtype: int
+    """
+    try:
+        seconds = int(retry_after)
+    except (TypeError, ValueError):
+        retry_date_tuple = email.utils.parsedate(retry_after)
+        if retry_date_tuple is None:
+            return None
+        retry_date = time.mktime(retry_date_tuple)
+        seconds = retry_date - time.time()
+
+    if seconds < 0:
+        seconds = 0
+    return seconds
+
+
 class RetryPolicy(HTTPPolicy):
     """A retry policy.
 
@@ -147,18 +169,7 @@ class RetryPolicy(HTTPPolicy):
         :param str retry_after: Retry-After header
         :rtype: int
         """
-        try:
-            seconds = int(retry_after)
-        except TypeError:
-            retry_date_tuple = email.utils.parsedate(retry_after)
-            if retry_date_tuple is None:
-                return None
-            retry_date = time.mktime(retry_date_tuple)
-            seconds = retry_date - time.time()
-
-        if seconds < 0:
-            seconds = 0
-        return seconds
+        return _parse_retry_after(retry_after)
 
     def get_retry_after(self, response):
         """Get the value of Retry-After in seconds.
@@ -318,7 +329,49 @@ class RetryPolicy(HTTPPolicy):
                 settings['status'] -= 1
                 settings['history'].append(RequestHistory(response.http_request, http_response=response.http_response))
 
-        return not self.is_exhausted(settings)
+        if self.is_exhausted(settings):
+            return False
+        if response is not None:
+            return self._rewind_body(settings, response.http_request)
+        return True
+
+    @staticmethod
+    def _get_body_position(request):
+        """Get the position of the request body if it is a stream, to rewind it on retry.
+
+        :param request: The HttpRequest object.
+        :type request: ~azure.core.pipeline.transport.HttpRequest
+        :return: The body position, or None if the body is not a stream or is not seekable.
+        :rtype: int
+        """
+        if hasattr(request.body, 'read'):
+            try:
+                return request.body.tell()
+            except (AttributeError, UnsupportedOperation):
+                # if body position cannot be obtained, then retries will not work
+                pass
+        return None
+
+    @staticmethod
+    def _rewind_body(settings, request):
+        """Rewind the request body to its initial position if it is a stream.
+
+        :param dict settings: The retry settings.
+        :param request: The HttpRequest object.
+        :type request: ~azure.core.pipeline.transport.HttpRequest
+        :return: False if the body is a stream that can't be rewound, so the request can't be retried.
+        :rtype: bool
+        """
+        if not request.body or not hasattr(request.body, 'read'):
+            return True
+        if settings.get('body_position') is None:
+            return False
+        try:
+            request.body.seek(settings['body_position'], SEEK_SET)
+        except (AttributeError, UnsupportedOperation):
+            # if body is not seekable, then retry would not work
+            return False
+        return True
 
     def update_context(self, context, retry_settings):
         """Updates retry history in pipeline context.
@@ -344,6 +397,7 @@ class RetryPolicy(HTTPPolicy):
         retry_active = True
         response = None
         retry_settings = self.configure_retries(request.context.options)
+        retry_settings['body_position'] = self._get_body_position(request.http_request)
         while retry_active:
             try:
                 response = self.next.send(request)
@@ -353,9 +407,10 @@ class RetryPolicy(HTTPPolicy):
                         self.sleep(retry_settings, request.context.transport, response=response)
                         continue
                 break
-            except ClientAuthenticationError:  # pylint:disable=try-except-raise
+            except (ClientAuthenticationError, RetryBudgetExceededError):  # pylint:disable=try-except-raise
                 # the authentication policy failed such that the client's request can't
-                # succeed--we'll never have a response to it, so propagate the exception
+                # succeed--we'll never have a response to it, so propagate the exception.
+                # A rate limit policy refusing a retry must not be retried either.
                 raise
             except AzureError as err:
                 if self._is_method_retryable(retry_settings, request.http_request):
@@ -30,7 +30,7 @@ from __future__ import absolute_import  # we have a "requests" module that confl
 import logging
 from typing import TYPE_CHECKING, List, Callable, Iterator, Any, Union, Dict, Optional  # pylint: disable=unused-import
 
-from azure.core.exceptions import AzureError, ClientAuthenticationError
+from azure.core.exceptions import AzureError, ClientAuthenticationError, RetryBudgetExceededError
 from .base import HTTPPolicy
 from .base_async import AsyncHTTPPolicy
 from .retry import RetryPolicy
@@ -132,6 +132,7 @@ class AsyncRetryPolicy(RetryPolicy, AsyncHTTPPolicy):  # type: ignore
         retry_active = True
         response = None
         retry_settings = self.configure_retries(request.context.options)
+        retry_settings['body_position'] = self._get_body_position(request.http_request)
         while retry_active:
             try:
                 response = await self.next.send(request)
@@ -141,9 +142,10 @@ class AsyncRetryPolicy(RetryPolicy, AsyncHTTPPolicy):  # type: ignore
                         await self.sleep(retry_settings, request.context.transport, response=response)
                         continue
                 break
-            except ClientAuthenticationError:  # pylint:disable=try-except-raise
+            except (ClientAuthenticationError, RetryBudgetExceededError):  # pylint:disable=try-except-raise
                 # the authentication policy failed such that the client's request can't
-                # succeed--we'll never have a response to it, so propagate the exception
+                # succeed--we'll never have a response to it, so propagate the exception.
+                # A rate limit policy refusing a retry must not be retried either.
                 raise
             except AzureError as err:
                 if self._is_method_retryable(retry_settings, request.http_request):
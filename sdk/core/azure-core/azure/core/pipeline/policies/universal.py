@@ -27,6 +27,7 @@
 This module is the requests implementation of Pipeline ABC
 """
 from __future__ import absolute_import  # we have a "requests" module that conflicts with "requests" on Py2.7
+import codecs
 import json
 import logging
 import os
@@ -35,7 +36,7 @@ import xml.etree.ElementTree as ET
 import types
 import re
 from typing import (Mapping, IO, TypeVar, TYPE_CHECKING, Type, cast, List, Callable, Iterator, # pylint: disable=unused-import
-                    Any, Union, Dict, Optional)
+                    Any, Union, Dict, Optional, Iterable)
 
 from azure.core import __version__  as azcore_version
 from azure.core.exceptions import (
@@ -263,8 +264,135 @@ class NetworkTraceLoggingPolicy(SansIOHTTPPolicy):
                 _LOGGER.debug("Failed to log response: %s", repr(err))
 
 
+class IncrementalJSONList(object):
+    """Decode the items of a JSON list response one at a time, from chunks of bytes.
+
+    The response is either a JSON array, or an object with the array as one of its members
+    ("value" in list operations). Iterating yields the items of the array as they are decoded,
+    so only the current item and the chunk being read are in memory. The other members of the
+    object (like "nextLink") are available in "properties" once they have been read: members
+    after the array are read when the iteration ends.
+
+    :param chunks: An iterable of bytes, like the stream download generator of a response.
+    :param str list_key: The member of the object holding the array. Defaults to "value".
+    """
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _NUMBER = re.compile(r'[0-9.eE+-]*')
+    _COMPACT_SIZE = 64 * 1024
+
+    def __init__(self, chunks, list_key='value'):
+        # type: (Iterable[bytes], str) -> None
+        self.properties = {}  # type: Dict[str, Any]
+        self.list_key = list_key
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+        self._started = False
+
+    def __iter__(self):
+        # type: () -> Iterator[Any]
+        if self._started:
+            raise ValueError("The items of the list can only be iterated once.")
+        self._started = True
+        return self._items()
+
+    def _read(self):
+        # type: () -> bool
+        """Decode the next chunk into the buffer. Returns False at the end of the stream."""
+        if self._eof:
+            return False
+        if self._pos > self._COMPACT_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            return False
+        self._buffer += self._text_decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        # type: () -> str
+        """Skip whitespaces and return the next character, without consuming it."""
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                raise DecodeError("JSON is invalid: unexpected end of data")
+
+    def _expect(self, characters):
+        # type: (str) -> str
+        character = self._peek()
+        if character not in characters:
+            raise DecodeError("JSON is invalid: expected '{}' at '{}'".format(
+                "' or '".join(characters), self._buffer[self._pos:self._pos + 20]))
+        self._pos += 1
+        return character
+
+    def _decode_value(self):
+        # type: () -> Any
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except ValueError as err:
+                if self._read():
+                    continue
+                raise DecodeError(message="JSON is invalid: {}".format(err), error=err)
+            # A number at the end of the buffer may continue in the next chunk, even when it
+            # was only decoded up to a '.', 'e' or sign the rest of the number is missing after
+            if isinstance(value, (int, float)) and \
+                    self._NUMBER.match(self._buffer, end).end() == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _array_items(self):
+        # type: () -> Iterator[Any]
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            if self._expect(',]') == ']':
+                return
+
+    def _items(self):
+        # type: () -> Iterator[Any]
+        if self._expect('{[') == '[':
+            for item in self._array_items():
+                yield item
+            return
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key == self.list_key and self._peek() == '[':
+                self._pos += 1
+                for item in self._array_items():
+                    yield item
+            else:
+                self.properties[key] = self._decode_value()
+            if self._expect(',}') == '}':
+                return
+
+
 class ContentDecodePolicy(SansIOHTTPPolicy):
     """Policy for decoding unstreamed response content.
+
+    **Keyword arguments:**
+
+    *incremental_json (bool)* - Decode JSON responses lazily, with an IncrementalJSONList.
+    Can also be set per operation. Default value is False. With synchronous transports, the
+    response is then read as it is iterated: the connection is released once all the items
+    have been read.
     """
     JSON_MIMETYPES = [
         'application/json',
@@ -272,6 +400,62 @@ class ContentDecodePolicy(SansIOHTTPPolicy):
     ]
     # Name used in context
     CONTEXT_NAME = "deserialized_data"
+    # Size of the chunks of bytes decoded by an IncrementalJSONList
+    JSON_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, **kwargs):
+        # type: (Any) -> None
+        self.incremental_json = kwargs.pop('incremental_json', False)
+
+    def on_request(self, request):
+        # type: (PipelineRequest) -> None
+        """Have the JSON responses decoded incrementally sent as streams by synchronous transports,
+        so that the first items are decoded before the whole body is downloaded.
+
+        :param request: The PipelineRequest object.
+        :type request: ~azure.core.pipeline.PipelineRequest
+        """
+        from azure.core.pipeline import transport as transports  # pylint: disable=cyclic-import
+
+        options = request.context.options
+        if not options.pop("incremental_json", self.incremental_json) or options.get("stream", True):
+            return
+        # The requests based asynchronous transports are also HttpTransport subclasses.
+        # AsyncHttpTransport isn't defined on Python 2, where no transport is asynchronous.
+        transport = request.context.transport
+        if isinstance(transport, transports.HttpTransport) and \
+                not isinstance(transport, getattr(transports, "AsyncHttpTransport", ())):
+            options["stream"] = True
+            request.context["incremental_json"] = "stream"
+        else:
+            # The chunks of asynchronous transports can't be read from the iteration of the items
+            request.context["incremental_json"] = "body"
+
+    @classmethod
+    def _is_json(cls, response):
+        # type: (Type[ContentDecodePolicyType], Any) -> bool
+        content_type = response.content_type
+        if isinstance(content_type, (list, tuple)):
+            content_type = content_type[0] if content_type else None
+        return bool(content_type) and content_type.split(";")[0].strip().lower() in cls.JSON_MIMETYPES
+
+    @classmethod
+    def deserialize_json_items(cls, data, list_key='value'):
+        # type: (Type[ContentDecodePolicyType], Union[bytes, Iterable[bytes]], str) -> IncrementalJSONList
+        """Decode the items of a JSON list response one at a time.
+
+        To have the first items before the whole body is downloaded, pass the stream
+        download generator of a response sent with stream=True.
+
+        :param data: The body, or an iterable of chunks of the body.
+        :type data: bytes or iterable[bytes]
+        :param str list_key: The member of the response object holding the list.
+        :rtype: ~azure.core.pipeline.policies.universal.IncrementalJSONList
+        """
+        if isinstance(data, bytes):
+            body, size = data, cls.JSON_CHUNK_SIZE
+            data = (body[i:i + size] for i in range(0, len(body), size))
+        return IncrementalJSONList(data, list_key=list_key)
 
     @classmethod
     def deserialize_from_text(cls, response, content_type=None):
@@ -378,10 +562,27 @@ class ContentDecodePolicy(SansIOHTTPPolicy):
         :raises UnicodeDecodeError: If bytes is not UTF8
         :raises xml.etree.ElementTree.ParseError: If bytes is not valid XML
         """
+        if response.context.get("incremental_json") == "stream":  # type: ignore
+            http_response = response.http_response  # type: ignore
+            if self._is_json(http_response):
+                # There is no pipeline to resend the request, so the download isn't resumed on connection errors
+                response.context[self.CONTEXT_NAME] = self.deserialize_json_items(  # type: ignore
+                    http_response.stream_download(None))
+            else:
+                response.context[self.CONTEXT_NAME] = self.deserialize_from_http_generics(http_response)  # type: ignore
+            return
+
         # If response was asked as stream, do NOT read anything and quit now
         if response.context.options.get("stream", True): # type: ignore
             return
 
+        if response.context.get("incremental_json") or \
+                response.context.options.get("incremental_json", self.incremental_json):  # type: ignore
+            if self._is_json(response.http_response):  # type: ignore
+                response.context[self.CONTEXT_NAME] = self.deserialize_json_items(  # type: ignore
+                    response.http_response.body())  # type: ignore
+                return
+
         response.context[self.CONTEXT_NAME] = self.deserialize_from_http_generics(response.http_response) # type: ignore
 
 
@@ -24,13 +24,15 @@
 #
 # --------------------------------------------------------------------------
 
-from .base import HttpTransport, HttpRequest, HttpResponse
+from .base import HttpTransport, HttpRequest, HttpResponse, ConnectionPoolMetrics, RewindableBody
 from .requests_basic import RequestsTransport, RequestsTransportResponse
 
 __all__ = [
     'HttpTransport',
     'HttpRequest',
     'HttpResponse',
+    'ConnectionPoolMetrics',
+    'RewindableBody',
     'RequestsTransport',
     'RequestsTransportResponse',
 ]
@@ -28,6 +28,7 @@ from collections.abc import AsyncIterator
 
 import logging
 import asyncio
+import time
 import aiohttp
 
 from azure.core.configuration import ConnectionConfiguration
@@ -38,7 +39,7 @@ from requests.exceptions import (
     ChunkedEncodingError,
     StreamConsumedError)
 
-from .base import HttpRequest
+from .base import HttpRequest, ConnectionPoolMetrics, RewindableBody
 from .base_async import (
     AsyncHttpTransport,
     AsyncHttpResponse,
@@ -49,6 +50,42 @@ CONTENT_CHUNK_SIZE = 10 * 1024
 _LOGGER = logging.getLogger(__name__)
 
 
+class _AioHttpPoolTracker(object):
+    """Collects connection pool counters through aiohttp tracing."""
+    def __init__(self):
+        self.waited = 0
+        self.wait_time = 0.0
+        self.created = 0
+
+    async def _on_queued_start(self, _session, trace_config_ctx, _params):
+        self.waited += 1
+        trace_config_ctx.queued_start = time.time()
+
+    async def _on_queued_end(self, _session, trace_config_ctx, _params):
+        self.wait_time += time.time() - trace_config_ctx.queued_start
+
+    async def _on_create_end(self, _session, _trace_config_ctx, _params):
+        self.created += 1
+
+    def trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        return trace_config
+
+    def metrics(self, connector):
+        checked_out = len(getattr(connector, '_acquired', ()))
+        idle = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        return ConnectionPoolMetrics(
+            checked_out=checked_out,
+            idle=idle,
+            waited=self.waited,
+            wait_time=self.wait_time,
+            created=self.created
+        )
+
+
 class AioHttpTransport(AsyncHttpTransport):
     """AioHttp HTTP sender implementation.
 
@@ -61,6 +98,11 @@ class AioHttpTransport(AsyncHttpTransport):
     **Keyword argument:**
 
     *use_env_settings (bool)* - Uses proxy settings from environment. Defaults to True.
+    *connection_pool_maxsize (int)* - Maximum number of connections per host. Defaults to no limit.
+    *connection_pool_limit (int)* - Maximum number of connections in use at the same time. Defaults to 100.
+    *connection_keep_alive (float)* - Idle time in seconds after which a connection is closed. Defaults to 15.
+
+    Pool settings and the waited/created metrics only apply to the session created by the transport.
 
     Example:
         .. literalinclude:: ../examples/test_example_async.py
@@ -76,6 +118,7 @@ class AioHttpTransport(AsyncHttpTransport):
         self.session = session
         self.connection_config = ConnectionConfiguration(**kwargs)
         self._use_env_settings = kwargs.pop('use_env_settings', True)
+        self._pool_tracker = _AioHttpPoolTracker()
 
     async def __aenter__(self):
         await self.open()
@@ -90,11 +133,31 @@ class AioHttpTransport(AsyncHttpTransport):
         if not self.session and self._session_owner:
             self.session = aiohttp.ClientSession(
                 loop=self._loop,
-                trust_env=self._use_env_settings
+                trust_env=self._use_env_settings,
+                connector=self._build_connector(),
+                trace_configs=[self._pool_tracker.trace_config()]
             )
         if self.session is not None:
             await self.session.__aenter__()
 
+    def _build_connector(self):
+        connector_kwargs = {}
+        if self.connection_config.pool_maxsize is not None:
+            connector_kwargs['limit_per_host'] = self.connection_config.pool_maxsize
+        if self.connection_config.pool_limit is not None:
+            connector_kwargs['limit'] = self.connection_config.pool_limit
+        if self.connection_config.keep_alive is not None:
+            connector_kwargs['keepalive_timeout'] = self.connection_config.keep_alive
+        return aiohttp.TCPConnector(loop=self._loop, **connector_kwargs)
+
+    def get_connection_pool_metrics(self) -> ConnectionPoolMetrics:
+        """Get a snapshot of the connection pool usage of this transport.
+
+        :rtype: ~azure.core.pipeline.transport.ConnectionPoolMetrics
+        """
+        connector = self.session.connector if self.session is not None else None
+        return self._pool_tracker.metrics(connector)
+
     async def close(self):
         """Closes the connection.
         """
@@ -127,6 +190,11 @@ class AioHttpTransport(AsyncHttpTransport):
                 except IndexError:
                     raise ValueError("Invalid formdata formatting: {}".format(data))
             return form_data
+        if isinstance(request.data, RewindableBody):
+            # aiohttp reads file-like objects in the executor, memory can be sent as is
+            buffer = request.data.getbuffer()
+            if buffer is not None:
+                return buffer
         return request.data
 
     async def send(self, request: HttpRequest, **config: Any) -> Optional[AsyncHttpResponse]:
@@ -25,16 +25,22 @@
 # --------------------------------------------------------------------------
 from __future__ import absolute_import
 import abc
+import io
 import json
 import logging
+import mmap
 import os
 import time
+import uuid
+from io import BytesIO
 try:
     binary_type = str
     from urlparse import urlparse # type: ignore
+    from httplib import HTTPResponse as _HTTPResponse # type: ignore
 except ImportError:
     binary_type = bytes # type: ignore
     from urllib.parse import urlparse
+    from http.client import HTTPResponse as _HTTPResponse
 import xml.etree.ElementTree as ET
 
 from typing import (TYPE_CHECKING, Generic, TypeVar, cast, IO, List, Union, Any, Mapping, Dict, # pylint: disable=unused-import
@@ -45,7 +51,7 @@ from typing import (TYPE_CHECKING, Generic, TypeVar, cast, IO, List, Union, Any,
 # If one day we reach the point where "requests" can be skip totally,
 # might provide our own implementation
 from requests.structures import CaseInsensitiveDict
-from azure.core.pipeline import ABC, AbstractContextManager, PipelineRequest, PipelineResponse
+from azure.core.pipeline import ABC, AbstractContextManager, PipelineRequest, PipelineResponse, PipelineContext
 
 
 HTTPResponseType = TypeVar("HTTPResponseType")
@@ -81,6 +87,40 @@ def _urljoin(base_url, stub_url):
     return parsed.geturl()
 
 
+class _BytesIOSocket(object):
+    """Mocking the "makefile" of socket for HTTPResponse.
+
+    This can be used to create a http.client.HTTPResponse object
+    based on bytes and not a real socket.
+    """
+    def __init__(self, bytes_data):
+        self.bytes_data = bytes_data
+
+    def makefile(self, *_, **__):
+        return BytesIO(self.bytes_data)
+
+
+def _to_bytes(data):
+    # type: (Union[str, bytes]) -> bytes
+    if isinstance(data, binary_type):
+        return data
+    return data.encode("utf-8")
+
+
+def _parse_multipart_boundary(content_type):
+    # type: (str) -> Optional[str]
+    """Extract the boundary parameter of a multipart Content-Type header.
+
+    :param str content_type: The Content-Type header value.
+    :rtype: str
+    """
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "boundary":
+            return value.strip().strip('"')
+    return None
+
+
 class HttpTransport(AbstractContextManager, ABC, Generic[HTTPRequestType, HTTPResponseType]): # type: ignore
     """An http sender ABC.
     """
@@ -103,6 +143,178 @@ class HttpTransport(AbstractContextManager, ABC, Generic[HTTPRequestType, HTTPRe
         time.sleep(duration)
 
 
+class ConnectionPoolMetrics(object):
+    """A snapshot of the connection pool usage of a transport.
+
+    Counters are cumulative since the transport was created, gauges reflect
+    the state of the pool when the snapshot was taken.
+
+    :param int checked_out: Connections currently in use by a request.
+    :param int idle: Open connections waiting in the pool to be reused.
+    :param int waited: Number of times a request had to wait for a connection to be released.
+    :param float wait_time: Total time in seconds spent waiting for a connection.
+    :param int created: Number of new connections opened.
+    """
+    def __init__(self, checked_out=0, idle=0, waited=0, wait_time=0.0, created=0):
+        # type: (int, int, int, float, int) -> None
+        self.checked_out = checked_out
+        self.idle = idle
+        self.waited = waited
+        self.wait_time = wait_time
+        self.created = created
+
+    def __repr__(self):
+        return "<ConnectionPoolMetrics checked_out={} idle={} waited={} created={}>".format(
+            self.checked_out, self.idle, self.waited, self.created)
+
+
+class RewindableBody(io.RawIOBase):
+    """A request body of known length, that can be rewound and sent again without copying.
+
+    The body is a window on a bytes-like object (bytes, bytearray, memoryview, mmap),
+    or on a seekable file-like object. Reading from a bytes-like object returns
+    memoryview slices of it, so the data is handed to the socket without being copied.
+    Since the length is known, the Content-Length header can be set without reading
+    the data, and since the body is seekable, the retry policy can rewind it.
+
+    :param data: The bytes-like object or seekable file-like object.
+    :param int offset: Where the body starts in data. Defaults to 0.
+    :param int length: Length of the body. Defaults to the rest of data after offset.
+    :raises ValueError: If data is a file-like object that is not seekable.
+    """
+    _block_size = 64 * 1024
+
+    def __init__(self, data, offset=0, length=None):
+        # type: (Any, int, Optional[int]) -> None
+        super(RewindableBody, self).__init__()
+        self._stream = None  # type: Optional[IO]
+        self._buffer = None  # type: Optional[memoryview]
+        self._closers = []  # type: List[Any]
+        if hasattr(data, 'read') and not isinstance(data, mmap.mmap):
+            if not hasattr(data, 'seek') or not hasattr(data, 'tell'):
+                raise ValueError("A rewindable body must be a bytes-like object or a seekable file-like object.")
+            self._stream = data
+            if length is None:
+                end = data.seek(0, os.SEEK_END)
+                end = data.tell() if end is None else end  # Python 2 file.seek returns None
+                length = max(0, end - offset)
+        else:
+            self._buffer = memoryview(data)
+            if length is None:
+                length = len(self._buffer) - offset
+            self._buffer = self._buffer[offset:offset + length]
+            length = len(self._buffer)
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    @classmethod
+    def from_file(cls, path, offset=0, length=None):
+        # type: (str, int, Optional[int]) -> RewindableBody
+        """Create a body from a slice of a file, memory-mapped instead of read in memory.
+
+        :param str path: Path of the file.
+        :param int offset: Where the body starts in the file. Defaults to 0.
+        :param int length: Length of the body. Defaults to the rest of the file after offset.
+        :rtype: ~azure.core.pipeline.transport.RewindableBody
+        """
+        handle = open(path, 'rb')
+        try:
+            if os.fstat(handle.fileno()).st_size == 0:
+                body = cls(b'')
+                handle.close()
+                return body
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            handle.close()
+            raise
+        body = cls(mapped, offset=offset, length=length)
+        body._closers = [mapped, handle]  # pylint: disable=protected-access
+        return body
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(lambda: self.read(self._block_size), b'')
+
+    def __deepcopy__(self, memo):
+        # The body is never mutated, history can share it.
+        return self
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self._length + offset
+        else:
+            raise ValueError("Invalid whence: {}".format(whence))
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = min(position, self._length)
+        return self._position
+
+    def rewind(self):
+        # type: () -> None
+        """Go back to the beginning of the body."""
+        self.seek(0)
+
+    def read(self, size=-1):
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if self._buffer is not None:
+            chunk = self._buffer[self._position:self._position + size]
+        else:
+            self._stream.seek(self._offset + self._position)  # type: ignore
+            chunk = self._stream.read(size)  # type: ignore
+        self._position += len(chunk)
+        return chunk
+
+    def getbuffer(self):
+        # type: () -> Optional[memoryview]
+        """Return the rest of the body as a memoryview, or None if the body is a file-like object.
+
+        Like read(), this moves the position to the end of the body.
+        """
+        if self._buffer is None:
+            return None
+        return self.read()
+
+    def readinto(self, b):
+        chunk = self.read(len(b))
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+    def close(self):
+        if self._buffer is not None and hasattr(self._buffer, 'release'):
+            self._buffer.release()  # Python 3 only, the mmap can't be closed while exported
+        self._buffer = None
+        mapped, handle = self._closers or (None, None)
+        self._closers = []
+        try:
+            if mapped is not None:
+                mapped.close()
+        except BufferError:
+            # A transport still holds a slice of the body: the map is closed once it's released
+            _LOGGER.debug("Memory-mapped body still in use, leaving it to the garbage collector.")
+        finally:
+            if handle is not None:
+                handle.close()
+            super(RewindableBody, self).close()
+
+
 class HttpRequest(object):
     """Represents a HTTP request.
 
@@ -122,6 +334,7 @@ class HttpRequest(object):
         self.headers = CaseInsensitiveDict(headers)
         self.files = files
         self.data = data
+        self.multipart_mixed_info = None  # type: Optional[Tuple]
 
     def __repr__(self):
         return '<HttpRequest [%s]>' % (self.method)
@@ -186,11 +399,17 @@ class HttpRequest(object):
     def set_streamed_data_body(self, data):
         """Set a streamable data body.
 
+        If data is a RewindableBody, the Content-Length header is set from its length
+        and retries can rewind it.
+
         :param data: The request field data.
+        :type data: bytes, iterable, file-like object or ~azure.core.pipeline.transport.RewindableBody
         """
         if not isinstance(data, binary_type) and \
                 not any(hasattr(data, attr) for attr in ["read", "__iter__", "__aiter__"]):
             raise TypeError("A streamable data source must be an open file-like object or iterable.")
+        if isinstance(data, RewindableBody):
+            self.headers['Content-Length'] = str(len(data))
         self.data = data
         self.files = None
 
@@ -245,6 +464,81 @@ class HttpRequest(object):
         self.data = data
         self.files = None
 
+    def set_multipart_mixed(self, *requests, **kwargs):
+        # type: (HttpRequest, Any) -> None
+        """Set the part of a multipart/mixed.
+
+        Only supported args for now are HttpRequest objects. The body is
+        not built here, but by "prepare_multipart_body", which is called
+        by the pipeline just before sending the request.
+
+        :param requests: The HttpRequest objects to batch in this request.
+
+        **Keyword arguments:**
+
+        *policies (list[SansIOHTTPPolicy])* - SansIO policies to run on each sub-request
+        (on_request) and sub-response (on_response). Defaults to none.
+
+        *boundary (str)* - Customize the boundary. Defaults to a random one.
+        """
+        self.multipart_mixed_info = (
+            requests,
+            kwargs.pop("policies", []),
+            kwargs.pop("boundary", None),
+            [],
+        )
+
+    def serialize(self):
+        # type: () -> bytes
+        """Serialize this request using application/http spec.
+
+        :rtype: bytes
+        """
+        parsed = urlparse(self.url)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        lines = ["{} {} HTTP/1.1".format(self.method, path)]
+        lines.extend("{}: {}".format(key, value) for key, value in self.headers.items())
+        serialized = _to_bytes("\r\n".join(lines) + "\r\n\r\n")
+        if self.data:
+            serialized += _to_bytes(self.data)
+        return serialized
+
+    def prepare_multipart_body(self):
+        # type: () -> None
+        """Will prepare the body of this request according to the multipart information.
+
+        Runs the "on_request" of the policies given to "set_multipart_mixed" on every
+        sub-request, then serializes them as application/http parts.
+        Does nothing if "set_multipart_mixed" was not called.
+        """
+        if not self.multipart_mixed_info:
+            return
+
+        requests, policies, boundary, contexts = self.multipart_mixed_info
+        boundary = boundary or "batch_{}".format(uuid.uuid4())
+        del contexts[:]
+        body = b""
+        for index, request in enumerate(requests):
+            context = PipelineContext(None)
+            contexts.append(context)
+            pipeline_request = PipelineRequest(request, context)
+            for policy in policies:
+                policy.on_request(pipeline_request)
+            body += _to_bytes(
+                "--{}\r\n"
+                "Content-Type: application/http\r\n"
+                "Content-Transfer-Encoding: binary\r\n"
+                "Content-ID: {}\r\n"
+                "\r\n".format(boundary, index)
+            )
+            body += request.serialize() + b"\r\n"
+        body += _to_bytes("--{}--\r\n".format(boundary))
+
+        self.headers["Content-Type"] = "multipart/mixed; boundary={}".format(boundary)
+        self.set_bytes_body(body)
+
 
 class _HttpResponseBase(object):
     """Represent a HTTP response.
@@ -287,6 +581,79 @@ class _HttpResponseBase(object):
         """
         return self.body().decode(encoding or "utf-8")
 
+    def parts(self):
+        # type: () -> List[HttpResponse]
+        """Assuming the content-type is multipart/mixed, will return the parts as a list.
+
+        The body must already be loaded in memory. Every part is matched, in order,
+        to the sub-request given to "set_multipart_mixed", and the "on_response" of the
+        associated policies is executed on it.
+
+        :rtype: list[~azure.core.pipeline.transport.HttpResponse]
+        :raises ValueError: If the content is not multipart/mixed, or if the number of
+         parts doesn't match the number of sub-requests.
+        """
+        content_type = self.headers.get("content-type", "")
+        if not content_type or not content_type.lower().startswith("multipart/mixed"):
+            raise ValueError("You can't get parts if the response is not multipart/mixed")
+        boundary = _parse_multipart_boundary(content_type)
+        if not boundary:
+            raise ValueError("No boundary found in content-type: {}".format(content_type))
+
+        requests, policies, contexts = [], [], []  # type: List[HttpRequest], List, List[PipelineContext]
+        if self.request.multipart_mixed_info:
+            requests, policies, _, contexts = self.request.multipart_mixed_info
+
+        delimiter = _to_bytes("--" + boundary)
+        raw_parts = self.body().split(delimiter)[1:]
+        responses = []
+        for raw_part in raw_parts:
+            if raw_part.startswith(b"--"):
+                break  # Close delimiter, the rest is epilogue
+            _, _, payload = raw_part.partition(b"\r\n\r\n")
+            if payload.endswith(b"\r\n"):
+                payload = payload[:-2]  # This CRLF belongs to the next delimiter
+            index = len(responses)
+            request = requests[index] if index < len(requests) else None
+            responses.append(_deserialize_response(payload, request))
+
+        if requests and len(responses) != len(requests):
+            raise ValueError("Received {} parts for {} batched requests".format(len(responses), len(requests)))
+
+        for index, response in enumerate(responses):
+            if not requests:
+                break
+            context = contexts[index] if index < len(contexts) else PipelineContext(None)
+            pipeline_request = PipelineRequest(requests[index], context)
+            pipeline_response = PipelineResponse(requests[index], response, context)
+            for policy in reversed(policies):
+                policy.on_response(pipeline_request, pipeline_response)
+        return responses
+
+
+class _HttpClientTransportResponse(_HttpResponseBase):
+    """Create a HTTPResponse from an http.client response.
+
+    Body will NOT be read by the constructor. Call "body()" to load the body in memory if necessary.
+
+    :param HttpRequest request: The request.
+    :param httpclient_response: The object returned from an HTTP(S)Connection from http.client
+    """
+    def __init__(self, request, httpclient_response):
+        super(_HttpClientTransportResponse, self).__init__(request, httpclient_response)
+        self.status_code = httpclient_response.status
+        self.headers = CaseInsensitiveDict(httpclient_response.getheaders())
+        self.reason = httpclient_response.reason
+        content_type = self.headers.get("Content-Type")
+        if content_type:
+            self.content_type = content_type.split(";")
+        self._body = None  # type: Optional[bytes]
+
+    def body(self):
+        if self._body is None:
+            self._body = self.internal_response.read()
+        return self._body
+
 
 class HttpResponse(_HttpResponseBase):
     def stream_download(self, pipeline):
@@ -298,6 +665,26 @@ class HttpResponse(_HttpResponseBase):
         """
 
 
+class HttpClientTransportResponse(_HttpClientTransportResponse, HttpResponse):
+    """Create a HTTPResponse from an http.client response.
+
+    Body will NOT be read by the constructor. Call "body()" to load the body in memory if necessary.
+    """
+
+
+def _deserialize_response(http_response_as_bytes, http_request):
+    # type: (bytes, Optional[HttpRequest]) -> HttpClientTransportResponse
+    """Deserialize an application/http payload into an HttpResponse.
+
+    :param bytes http_response_as_bytes: The serialized HTTP response.
+    :param HttpRequest http_request: The request this response is answering.
+    """
+    local_socket = _BytesIOSocket(http_response_as_bytes)
+    response = _HTTPResponse(local_socket, method=http_request.method if http_request else None)
+    response.begin()
+    return HttpClientTransportResponse(http_request, response)
+
+
 class PipelineClientBase(object):
     """Base class for pipeline clients.
 
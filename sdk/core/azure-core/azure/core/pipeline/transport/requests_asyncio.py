@@ -101,7 +101,7 @@ class AsyncioRequestsTransport(RequestsTransport, AsyncHttpTransport):  # type:
             response = await loop.run_in_executor(
                 None,
                 functools.partial(
-                    self.session.request, # type: ignore
+                    self._session_request,
                     request.method,
                     request.url,
                     headers=request.headers,
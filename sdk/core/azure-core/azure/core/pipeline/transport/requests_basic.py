@@ -26,7 +26,9 @@
 from __future__ import absolute_import
 import logging
 from typing import Iterator, Optional, Any, Union, TypeVar
+import threading
 import time
+import weakref
 import urllib3 # type: ignore
 from urllib3.util.retry import Retry # type: ignore
 import requests
@@ -41,6 +43,7 @@ from . import HttpRequest # pylint: disable=unused-import
 from .base import (
     HttpTransport,
     HttpResponse,
+    ConnectionPoolMetrics,
     _HttpResponseBase
 )
 
@@ -81,7 +84,8 @@ class _RequestsTransportResponseBase(_HttpResponseBase):
 class StreamDownloadGenerator(object):
     """Generator for streaming response data.
 
-    :param pipeline: The pipeline object
+    :param pipeline: The pipeline object, used to resume the download on connection errors. Without
+     one, those errors are raised.
     :param request: The request object
     :param response: The response object.
     :param int block_size: Number of bytes to read into memory.
@@ -119,6 +123,10 @@ class StreamDownloadGenerator(object):
                 raise StopIteration()
             except (requests.exceptions.ChunkedEncodingError,
                     requests.exceptions.ConnectionError):
+                if self.pipeline is None:
+                    # Without a pipeline, the request can't be resent to resume the download
+                    self.response.close()
+                    raise
                 retry_total -= 1
                 if retry_total <= 0:
                     retry_active = False
@@ -152,12 +160,182 @@ class RequestsTransportResponse(HttpResponse, _RequestsTransportResponseBase):
         return StreamDownloadGenerator(pipeline, self.request, self.internal_response, self.block_size)
 
 
+def _release_unread_connection(raw):
+    # type: (urllib3.HTTPResponse) -> None
+    """Close the connection of a streamed response collected before it was read or closed, and
+    return it to its pool, so that its slot is released. Does nothing if it was already returned.
+    """
+    try:
+        raw.close()
+        raw.release_conn()
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.debug("Unable to release the connection of a collected response: %s", err)
+
+
+class _ConnectionPoolTracker(object):
+    """Shared state of all the connection pools of a RequestsTransport.
+
+    Keeps the usage counters, and enforces the total connection limit
+    across all hosts.
+
+    :param int limit: Maximum number of checked out connections. None for no limit.
+    :param float keep_alive: Maximum idle time in seconds of a connection before it is closed.
+    """
+    def __init__(self, limit=None, keep_alive=None):
+        # type: (Optional[int], Optional[float]) -> None
+        self.limit = limit
+        self.keep_alive = keep_alive
+        self.checked_out = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.created = 0
+        self._condition = threading.Condition()
+        self._pools = weakref.WeakSet()  # type: weakref.WeakSet
+
+    def register(self, pool):
+        with self._condition:
+            self._pools.add(pool)
+
+    def acquire(self, pool, timeout=None):
+        # type: (urllib3.HTTPConnectionPool, Optional[float]) -> None
+        with self._condition:
+            if self.limit and self.checked_out >= self.limit:
+                self.waited += 1
+                start = time.time()
+                try:
+                    while self.checked_out >= self.limit:
+                        remaining = None if timeout is None else timeout - (time.time() - start)
+                        if remaining is not None and remaining <= 0:
+                            raise urllib3.exceptions.EmptyPoolError(
+                                pool, "Connection pool limit reached and no connection was released.")
+                        self._condition.wait(remaining)
+                finally:
+                    self.wait_time += time.time() - start
+            self.checked_out += 1
+
+    def release(self):
+        # type: () -> None
+        with self._condition:
+            self.checked_out -= 1
+            self._condition.notify()
+
+    def connection_created(self):
+        # type: () -> None
+        with self._condition:
+            self.created += 1
+
+    def metrics(self):
+        # type: () -> ConnectionPoolMetrics
+        with self._condition:
+            idle = sum(pool.idle_connections() for pool in list(self._pools))
+            return ConnectionPoolMetrics(
+                checked_out=self.checked_out,
+                idle=idle,
+                waited=self.waited,
+                wait_time=self.wait_time,
+                created=self.created
+            )
+
+
+class _TrackedConnectionPoolMixin(object):
+    """Connection pool reporting to a _ConnectionPoolTracker.
+
+    The tracker is set by the pool manager right after the pool is created.
+    """
+    tracker = None  # type: Optional[_ConnectionPoolTracker]
+
+    def idle_connections(self):
+        # type: () -> int
+        return sum(1 for conn in list(self.pool.queue) if conn is not None and conn.sock is not None) # type: ignore
+
+    def _get_conn(self, timeout=None):
+        tracker = self.tracker
+        if tracker is None:
+            return super(_TrackedConnectionPoolMixin, self)._get_conn(timeout=timeout)  # type: ignore
+
+        tracker.acquire(self, timeout)
+        try:
+            conn = super(_TrackedConnectionPoolMixin, self)._get_conn(timeout=timeout)  # type: ignore
+        except Exception:
+            tracker.release()
+            raise
+        last_used = getattr(conn, "_azure_last_used", None)
+        if tracker.keep_alive is not None and last_used is not None and \
+                time.time() - last_used > tracker.keep_alive:
+            conn.close()  # Reconnects on next use
+        if getattr(conn, "sock", None) is None:
+            tracker.connection_created()
+        return conn
+
+    def _put_conn(self, conn):
+        if self.tracker is None:
+            return super(_TrackedConnectionPoolMixin, self)._put_conn(conn)  # type: ignore
+        if conn is not None:
+            conn._azure_last_used = time.time()  # pylint: disable=protected-access
+        try:
+            return super(_TrackedConnectionPoolMixin, self)._put_conn(conn)  # type: ignore
+        finally:
+            self.tracker.release()
+
+
+class _TrackedHTTPConnectionPool(_TrackedConnectionPoolMixin, urllib3.HTTPConnectionPool):
+    pass
+
+
+class _TrackedHTTPSConnectionPool(_TrackedConnectionPoolMixin, urllib3.HTTPSConnectionPool):
+    pass
+
+
+class _TrackedPoolManager(urllib3.PoolManager):
+    """Pool manager creating connection pools reporting to a tracker."""
+    def __init__(self, tracker, **kwargs):
+        super(_TrackedPoolManager, self).__init__(**kwargs)
+        self.tracker = tracker
+        self.pool_classes_by_scheme = {
+            'http': _TrackedHTTPConnectionPool,
+            'https': _TrackedHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super(_TrackedPoolManager, self)._new_pool(scheme, host, port, request_context=request_context)
+        if isinstance(pool, _TrackedConnectionPoolMixin):
+            pool.tracker = self.tracker
+            self.tracker.register(pool)
+        return pool
+
+
+class _TrackedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTP adapter whose connection pools report to a tracker.
+
+    :param tracker: The tracker shared by all the pools of this adapter.
+    :type tracker: _ConnectionPoolTracker
+    """
+    def __init__(self, tracker, **kwargs):
+        self._tracker = tracker
+        super(_TrackedHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=requests.adapters.DEFAULT_POOLBLOCK, **pool_kwargs):
+        # pylint: disable=attribute-defined-outside-init
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _TrackedPoolManager(
+            self._tracker,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs
+        )
+
+
 class RequestsTransport(HttpTransport):
     """Implements a basic requests HTTP sender.
 
     Since requests team recommends to use one session per requests, you should
     not consider this class as thread-safe, since it will use one Session
-    per instance.
+    per instance, unless "session_per_thread" is enabled. In that mode, every
+    thread gets its own Session, and all of them share the same connection pool,
+    so one transport (and one client) can be used by a whole thread pool.
 
     In this simple implementation:
     - You provide the configured session if you want to, or a basic session is created.
@@ -167,7 +345,14 @@ class RequestsTransport(HttpTransport):
 
     *session (requests.Session)* - Request session to use instead of the default one.
     *session_owner (bool)* - Decide if the session provided by user is owned by this transport. Default to True.
+    *session_per_thread (bool)* - Use one session per thread, sharing the connection pool. Cannot be used
+    with a session provided by user. Default to False.
     *use_env_settings (bool)* - Uses proxy settings from environment. Defaults to True.
+    *connection_pool_maxsize (int)* - Maximum number of connections kept open per host. Defaults to 10.
+    *connection_pool_limit (int)* - Maximum number of connections in use at the same time. Defaults to no limit.
+    *connection_keep_alive (float)* - Idle time in seconds after which a connection is reopened. Defaults to no limit.
+
+    Pool settings and metrics only apply to the session created by the transport.
 
     Example:
         .. literalinclude:: ../examples/test_example_sync.py
@@ -184,8 +369,23 @@ class RequestsTransport(HttpTransport):
         # type: (Any) -> None
         self.session = kwargs.get('session', None)
         self._session_owner = kwargs.get('session_owner', True)
+        self._session_per_thread = kwargs.pop('session_per_thread', False)
+        if self._session_per_thread and self.session:
+            raise ValueError("session_per_thread cannot be used with a session provided by user.")
+        self._thread_local = threading.local()
+        # The sessions of the threads that exited are dropped with their thread local storage,
+        # their connections are in the pools of the shared adapter
+        self._thread_sessions = weakref.WeakSet()  # type: weakref.WeakSet
+        self._thread_sessions_lock = threading.Lock()
+        self._generation = 0
+        self._streamed_responses = set()  # type: set
+        self._adapter = None  # type: Optional[requests.adapters.HTTPAdapter]
         self.connection_config = ConnectionConfiguration(**kwargs)
         self._use_env_settings = kwargs.pop('use_env_settings', True)
+        self._pool_tracker = _ConnectionPoolTracker(
+            limit=self.connection_config.pool_limit,
+            keep_alive=self.connection_config.keep_alive
+        )
 
     def __enter__(self):
         # type: () -> RequestsTransport
@@ -202,17 +402,78 @@ class RequestsTransport(HttpTransport):
         This is initialization I want to do once only on a session.
         """
         session.trust_env = self._use_env_settings
-        disable_retries = Retry(total=False, redirect=False, raise_on_status=False)
-        adapter = requests.adapters.HTTPAdapter(max_retries=disable_retries)
+        if self._adapter is None:
+            disable_retries = Retry(total=False, redirect=False, raise_on_status=False)
+            adapter_kwargs = {'max_retries': disable_retries}
+            if self.connection_config.pool_maxsize:
+                adapter_kwargs['pool_maxsize'] = self.connection_config.pool_maxsize
+            self._adapter = _TrackedHTTPAdapter(self._pool_tracker, **adapter_kwargs)
         for p in self._protocols:
-            session.mount(p, adapter)
+            session.mount(p, self._adapter)
+
+    def _get_session(self):
+        # type: () -> requests.Session
+        """Get the session to use in the current thread."""
+        if not self._session_per_thread:
+            return self.session
+        session = getattr(self._thread_local, 'session', None)
+        if session is None or self._thread_local.generation != self._generation:
+            # The lock makes the first sessions share the adapter, and orders them with close
+            with self._thread_sessions_lock:
+                session = requests.Session()
+                self._init_session(session)
+                self._thread_sessions.add(session)
+                self._thread_local.session = session
+                self._thread_local.generation = self._generation
+        return session
+
+    def _session_request(self, *args, **kwargs):
+        # type: (Any, Any) -> requests.Response
+        """Send a request with the session of the current thread, which is the worker thread of the
+        asynchronous transports.
+
+        The connection of a streamed response is returned to its pool when the response is read
+        or closed. It is also released if the response is garbage collected before that.
+        """
+        response = self._get_session().request(*args, **kwargs)  # type: ignore
+        if kwargs.get('stream'):
+            raw = response.raw
+            streamed_responses = self._streamed_responses
+
+            def release(ref):
+                streamed_responses.discard(ref)
+                _release_unread_connection(raw)
+
+            streamed_responses.add(weakref.ref(response, release))
+        return response
+
+    def get_connection_pool_metrics(self):
+        # type: () -> ConnectionPoolMetrics
+        """Get a snapshot of the connection pool usage of this transport.
+
+        :rtype: ~azure.core.pipeline.transport.ConnectionPoolMetrics
+        """
+        return self._pool_tracker.metrics()
 
     def open(self):
+        if self._session_per_thread:
+            return  # Sessions are created on first use in each thread
         if not self.session and self._session_owner:
             self.session = requests.Session()
             self._init_session(self.session)
 
     def close(self):
+        if self._session_per_thread:
+            with self._thread_sessions_lock:
+                for session in list(self._thread_sessions):
+                    session.close()
+                if self._adapter is not None:
+                    self._adapter.close()
+                self._thread_sessions = weakref.WeakSet()
+                self._adapter = None
+                # The sessions of the threads are closed, they get new ones on next use
+                self._generation += 1
+            return
         if self._session_owner:
             self.session.close()
             self._session_owner = False
@@ -238,7 +499,7 @@ class RequestsTransport(HttpTransport):
         error = None # type: Optional[Union[ServiceRequestError, ServiceResponseError]]
 
         try:
-            response = self.session.request(  # type: ignore
+            response = self._session_request(
                 request.method,
                 request.url,
                 headers=request.headers,
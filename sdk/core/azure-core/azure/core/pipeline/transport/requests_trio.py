@@ -167,7 +167,7 @@ class TrioRequestsTransport(RequestsTransport, AsyncHttpTransport):  # type: ign
         try:
             response = await trio.run_sync_in_worker_thread(
                 functools.partial(
-                    self.session.request, # type: ignore
+                    self._session_request,
                     request.method,
                     request.url,
                     headers=request.headers,
@@ -26,7 +26,8 @@
 import sys
 
 from .poller import LROPoller, NoPolling, PollingMethod
-__all__ = ['LROPoller', 'NoPolling', 'PollingMethod']
+from .scheduler import PollingScheduler, as_completed
+__all__ = ['LROPoller', 'NoPolling', 'PollingMethod', 'PollingScheduler', 'as_completed']
 
 #pylint: disable=unused-import
 if sys.version_info >= (3, 5, 2):
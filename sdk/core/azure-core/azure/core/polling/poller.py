@@ -62,6 +62,30 @@ class PollingMethod(object):
         # type: () -> Any
         raise NotImplementedError("This method needs to be implemented")
 
+    def poll(self):
+        # type: () -> Optional[float]
+        """Poll the status of the operation once, without waiting.
+
+        Optional: a polling method implementing it can be run by a PollingScheduler,
+        which shares a few threads between many operations instead of calling "run".
+        Like "run", it raises if the operation failed.
+
+        :return: The delay in seconds before the next poll (from Retry-After for instance),
+         or None to use the default interval of the scheduler.
+        :rtype: float
+        """
+        raise NotImplementedError("This method needs to be implemented")
+
+
+def _supports_poll(polling_method):
+    # type: (Any) -> bool
+    """Whether a polling method implements "poll", instead of inheriting the one of PollingMethod."""
+    implementation = getattr(type(polling_method), 'poll', None)
+    if implementation is None:
+        return False
+    base = PollingMethod.poll
+    return getattr(implementation, '__func__', implementation) is not getattr(base, '__func__', base)
+
 class NoPolling(PollingMethod):
     """An empty poller that returns the deserialized initial response.
     """
@@ -112,10 +136,16 @@ class LROPoller(object):
     :type deserialization_callback: callable or msrest.serialization.Model
     :param polling_method: The polling strategy to adopt
     :type polling_method: ~msrest.polling.PollingMethod
+
+    **Keyword arguments:**
+
+    *scheduler (~azure.core.polling.PollingScheduler)* - Poll the operation from the threads of this
+    scheduler, instead of a dedicated thread. Only used if the polling method implements "poll".
     """
 
-    def __init__(self, client, initial_response, deserialization_callback, polling_method):
-        # type: (Any, HttpResponse, DeserializationCallbackType, PollingMethod) -> None
+    def __init__(self, client, initial_response, deserialization_callback, polling_method, **kwargs):
+        # type: (Any, HttpResponse, DeserializationCallbackType, PollingMethod, Any) -> None
+        scheduler = kwargs.pop('scheduler', None)
         self._client = client
         self._response = initial_response
         self._callbacks = []  # type: List[Callable]
@@ -136,11 +166,15 @@ class LROPoller(object):
         self._exception = None
         if not self._polling_method.finished():
             self._done = threading.Event()
-            self._thread = threading.Thread(
-                target=self._start,
-                name="LROPoller({})".format(uuid.uuid4()))
-            self._thread.daemon = True
-            self._thread.start()
+            if scheduler is not None and _supports_poll(self._polling_method):
+                # Exposes "join" and "is_alive", like the thread
+                self._thread = scheduler._schedule(self)  # pylint: disable=protected-access
+            else:
+                self._thread = threading.Thread(
+                    target=self._start,
+                    name="LROPoller({})".format(uuid.uuid4()))
+                self._thread.daemon = True
+                self._thread.start()
 
     def _start(self):
         """Start the long running operation.
@@ -157,6 +191,27 @@ class LROPoller(object):
         finally:
             self._done.set()
 
+        self._run_callbacks()
+
+    def _poll(self, default_delay):
+        # type: (float) -> Optional[float]
+        """Poll the long running operation once, from a PollingScheduler.
+        On completion, runs any callbacks.
+
+        :param float default_delay: The delay to use if the polling method doesn't give one.
+        :return: The delay in seconds before the next poll, or None if the operation is done.
+        """
+        try:
+            delay = self._polling_method.poll()
+            if not self._polling_method.finished():
+                return default_delay if delay is None else delay
+        except Exception as err: #pylint: disable=broad-except
+            self._exception = err
+        self._done.set()
+        self._run_callbacks()
+        return None
+
+    def _run_callbacks(self):
         callbacks, self._callbacks = self._callbacks, []
         while callbacks:
             for call in callbacks:
@@ -0,0 +1,236 @@
+# --------------------------------------------------------------------------
+#
+# Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# The MIT License (MIT)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the ""Software""), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+# --------------------------------------------------------------------------
+import heapq
+import itertools
+import threading
+import time
+try:
+    from queue import Queue, Empty
+except ImportError:  # Python 2.7
+    from Queue import Queue, Empty  # type: ignore
+
+from typing import Any, Iterable, Iterator, List, Optional, TYPE_CHECKING  # pylint: disable=unused-import
+
+from azure.core.exceptions import AzureError
+from .poller import LROPoller
+
+if TYPE_CHECKING:
+    from .poller import PollingMethod  # pylint: disable=unused-import
+
+
+class _ScheduledOperation(object):
+    """Stands for the thread of an LROPoller polled by a PollingScheduler."""
+
+    def __init__(self, poller):
+        # type: (LROPoller) -> None
+        self.poller = poller
+        self._finished = threading.Event()
+
+    def join(self, timeout=None):
+        # type: (Optional[float]) -> None
+        self._finished.wait(timeout)
+
+    def is_alive(self):
+        # type: () -> bool
+        return not self._finished.is_set()
+
+    def finish(self):
+        # type: () -> None
+        self._finished.set()
+
+
+class PollingScheduler(object):
+    """Polls many long running operations from a few shared threads.
+
+    An LROPoller polls its operation from a dedicated thread. Pollers created with a scheduler
+    are polled instead by its worker threads, one poll at a time: a thread is busy only while a
+    poll request is in flight. Polls due within the coalescing window are sent together once the
+    last of them is due, so operations started together are polled together, and no poll is sent
+    before its delay (like Retry-After) is over. The polling method must implement "poll";
+    pollers whose polling method doesn't still get a dedicated thread.
+
+    :param int max_workers: The number of threads sending the poll requests. Defaults to 4.
+    :param float polling_interval: Delay in seconds between polls, for polling methods that
+     don't give one. Defaults to 30.
+    :param float coalesce_window: Polls due within this period in seconds are sent together,
+     delaying the earliest ones by this period at most. Defaults to 0.5.
+    """
+
+    def __init__(self, max_workers=4, polling_interval=30, coalesce_window=0.5):
+        # type: (int, float, float) -> None
+        self.max_workers = max_workers
+        self.polling_interval = polling_interval
+        self.coalesce_window = coalesce_window
+        self._heap = []  # type: List[tuple]
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._work = Queue()  # type: Queue
+        self._threads = []  # type: List[threading.Thread]
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, client, initial_response, deserialization_callback, polling_method):
+        # type: (Any, Any, Any, PollingMethod) -> LROPoller
+        """Create an LROPoller polled by this scheduler.
+
+        :param client: A pipeline service client
+        :type client: ~azure.core.pipeline.PipelineClient
+        :param initial_response: The initial call response
+        :type initial_response: ~azure.core.pipeline.HttpResponse
+        :param deserialization_callback: A callback that takes a Response and return a deserialized object.
+        :type deserialization_callback: callable or msrest.serialization.Model
+        :param polling_method: The polling strategy to adopt
+        :type polling_method: ~azure.core.polling.PollingMethod
+        :rtype: ~azure.core.polling.LROPoller
+        """
+        return LROPoller(client, initial_response, deserialization_callback, polling_method, scheduler=self)
+
+    def close(self):
+        # type: () -> None
+        """Stop the threads of the scheduler.
+
+        The operations not done yet fail with an AzureError. They are still running on the service.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            pending, self._heap = self._heap, []
+            self._condition.notify_all()
+        for _ in self._threads:
+            self._work.put(None)
+        for _, _, operation in pending:
+            operation.poller._exception = AzureError(  # pylint: disable=protected-access
+                "The polling scheduler was closed before the operation was done.")
+            operation.finish()
+
+    def _schedule(self, poller, delay=0):
+        # type: (LROPoller, float) -> _ScheduledOperation
+        operation = _ScheduledOperation(poller)
+        self._push(operation, delay)
+        return operation
+
+    def _push(self, operation, delay):
+        # type: (_ScheduledOperation, float) -> None
+        with self._condition:
+            if self._closed:
+                raise ValueError("The polling scheduler is closed.")
+            if not self._threads:
+                self._start_threads()
+            heapq.heappush(self._heap, (time.time() + delay, next(self._counter), operation))
+            self._condition.notify()
+
+    def _start_threads(self):
+        # type: () -> None
+        targets = [self._run_timer] + [self._run_worker] * self.max_workers
+        for index, target in enumerate(targets):
+            thread = threading.Thread(target=target, name="PollingScheduler-{}".format(index))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _batch_due_time(self):
+        # type: () -> Optional[float]
+        """When the next batch is due: the polls due within the window of the earliest one
+        are sent together, once the last of them is due."""
+        if not self._heap:
+            return None
+        window_end = self._heap[0][0] + self.coalesce_window
+        return max(due for due, _, _ in self._heap if due <= window_end)
+
+    def _run_timer(self):
+        # type: () -> None
+        """Hand the polls due over to the workers, waking up once for all the polls of the window.
+
+        A poll is never sent before it is due, it is delayed by the window at most.
+        """
+        while True:
+            with self._condition:
+                while not self._closed:
+                    due = self._batch_due_time()
+                    wait = None if due is None else due - time.time()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                if self._closed:
+                    return
+                # Still holding the lock, so "close" can't queue the stop signals before these
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    self._work.put(heapq.heappop(self._heap)[2])
+
+    def _run_worker(self):
+        # type: () -> None
+        while True:
+            operation = self._work.get()
+            if operation is None:
+                return
+            delay = operation.poller._poll(self.polling_interval)  # pylint: disable=protected-access
+            if delay is None:
+                operation.finish()
+                continue
+            try:
+                self._push(operation, delay)
+            except ValueError:
+                # Closed while polling
+                operation.poller._exception = AzureError(  # pylint: disable=protected-access
+                    "The polling scheduler was closed before the operation was done.")
+                operation.finish()
+
+
+def as_completed(pollers, timeout=None):
+    # type: (Iterable[LROPoller], Optional[float]) -> Iterator[LROPoller]
+    """Iterate over the pollers as their operation completes, successfully or not.
+
+    :param pollers: The pollers of the operations.
+    :type pollers: list[~azure.core.polling.LROPoller]
+    :param float timeout: Maximum time in seconds to wait for all the operations.
+    :raises: ~azure.core.exceptions.AzureError if the operations are not all done after timeout.
+    :rtype: iterator[~azure.core.polling.LROPoller]
+    """
+    pending = list(pollers)
+    deadline = None if timeout is None else time.time() + timeout
+    completed = Queue()  # type: Queue
+    for poller in pending:
+        poller.add_done_callback(lambda _, p=poller: completed.put(p))
+    while pending:
+        remaining = 1.0 if deadline is None else min(1.0, deadline - time.time())
+        if remaining < 0:
+            raise AzureError("The operations are not all done after {} seconds.".format(timeout))
+        try:
+            done = [completed.get(timeout=remaining)]
+        except Empty:
+            # A callback added while the operation completes can be missed
+            done = [p for p in pending if p.done()]
+        for poller in done:
+            if poller in pending:
+                pending.remove(poller)
+                yield poller
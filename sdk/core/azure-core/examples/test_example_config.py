@@ -81,7 +81,10 @@ def example_connection_config():
         connection_timeout=100,
         connection_verify=True,
         connection_cert=None,
-        connection_data_block_size=4096
+        connection_data_block_size=4096,
+        connection_pool_maxsize=10,
+        connection_pool_limit=100,
+        connection_keep_alive=30
     )
 
     # Or parameters can be tweaked later:
@@ -89,4 +92,7 @@ def example_connection_config():
     config.connection.verify = True
     config.connection.cert = None
     config.connection.data_block_size = 4096
+    config.connection.pool_maxsize = 10
+    config.connection.pool_limit = 100
+    config.connection.keep_alive = 30
     # [END connection_configuration]
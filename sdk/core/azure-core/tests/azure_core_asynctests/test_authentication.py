@@ -78,6 +78,7 @@ async def test_bearer_policy_token_caching():
     expired_token = AccessToken("token", time.time())
     get_token_calls = 0
     expected_token = expired_token
+    credential = Mock(get_token=get_token)
     policies = [AsyncBearerTokenCredentialPolicy(credential, "scope"), Mock(send=asyncio.coroutine(lambda _: Mock()))]
     pipeline = AsyncPipeline(transport=Mock(), policies=policies)
 
@@ -86,3 +87,49 @@ async def test_bearer_policy_token_caching():
 
     await pipeline.run(HttpRequest("GET", "https://spam.eggs"))
     assert get_token_calls == 2  # token expired -> policy should call get_token
+
+
+@pytest.mark.asyncio
+async def test_bearer_policy_shared_token():
+    """Concurrent requests of policies sharing a credential wait for a single token request"""
+    get_token_calls = 0
+
+    async def get_token(_):
+        nonlocal get_token_calls
+        get_token_calls += 1
+        await asyncio.sleep(0.1)
+        return AccessToken("token", time.time() + 3600)
+
+    async def send(request):
+        return request.http_request.headers["Authorization"]
+
+    credential = Mock(get_token=get_token)
+    pipelines = [AsyncPipeline(transport=Mock(), policies=[AsyncBearerTokenCredentialPolicy(credential, "scope"),
+                                                           Mock(send=send)])
+                 for _ in range(10)]
+    responses = await asyncio.gather(*[p.run(HttpRequest("GET", "https://spam.eggs")) for p in pipelines])
+    assert get_token_calls == 1
+    assert all(response == "Bearer token" for response in responses)
+
+
+@pytest.mark.asyncio
+async def test_bearer_policy_background_refresh():
+    """A token about to expire is renewed in a task the cache entry keeps"""
+    tokens = [AccessToken("old", time.time() + 60), AccessToken("new", time.time() + 3600)]
+
+    async def get_token(_):
+        return tokens.pop(0)
+
+    async def send(request):
+        return request.http_request.headers["Authorization"]
+
+    policy = AsyncBearerTokenCredentialPolicy(Mock(get_token=get_token), "scope")
+    pipeline = AsyncPipeline(transport=Mock(), policies=[policy, Mock(send=send)])
+    assert await pipeline.run(HttpRequest("GET", "https://spam.eggs")) == "Bearer old"
+
+    # The old token is still used while the new one is requested
+    assert await pipeline.run(HttpRequest("GET", "https://spam.eggs")) == "Bearer old"
+    refresh = policy._cache_entry._refresh_task
+    assert refresh is not None
+    await refresh
+    assert await pipeline.run(HttpRequest("GET", "https://spam.eggs")) == "Bearer new"
@@ -0,0 +1,92 @@
+#--------------------------------------------------------------------------
+#
+# Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# The MIT License (MIT)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the ""Software""), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#--------------------------------------------------------------------------
+import asyncio
+import gc
+
+from azure.core.paging import Paged
+
+from msrest.serialization import Deserializer
+
+import pytest
+
+
+class FakePaged(Paged):
+    _attribute_map = {
+        'next_link': {'key': 'nextLink', 'type': 'str'},
+        'current_page': {'key': 'value', 'type': '[str]'}
+    }
+
+
+@pytest.mark.asyncio
+async def test_prefetch_async_paging():
+    fetched = []
+
+    async def internal_paging(next_link=None):
+        page = int(next_link or 0)
+        fetched.append(page)
+        await asyncio.sleep(0)
+        return {
+            'nextLink': str(page + 1) if page < 4 else None,
+            'value': ['value{}.0'.format(page), 'value{}.1'.format(page)]
+        }
+
+    deserialized = FakePaged(None, Deserializer({}), async_command=internal_paging, prefetch_pages=1)
+    assert await deserialized.__anext__() == 'value0.0'
+    for _ in range(10):
+        await asyncio.sleep(0)
+    # The next page is queued and the one after is fetched, but no further
+    assert fetched == [0, 1, 2]
+
+    result_iterated = [item async for item in deserialized]
+    assert result_iterated == ['value0.1'] + ['value{}.{}'.format(p, i) for p in range(1, 5) for i in range(2)]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_async_paging_abandoned():
+    async def internal_paging(next_link=None):
+        page = int(next_link or 0)
+        await asyncio.sleep(0)
+        return {'nextLink': str(page + 1), 'value': ['value{}'.format(page)]}
+
+    # The prefetch task is kept by the iterator, and cancelled once it is collected
+    deserialized = FakePaged(None, Deserializer({}), async_command=internal_paging, prefetch_pages=1)
+    assert await deserialized.__anext__() == 'value0'
+    task = deserialized._prefetch_task
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert not task.done()
+    del deserialized
+    gc.collect()
+    await asyncio.sleep(0)
+    assert task.cancelled()
+
+    # Or when it is closed
+    deserialized = FakePaged(None, Deserializer({}), async_command=internal_paging, prefetch_pages=1)
+    assert await deserialized.__anext__() == 'value0'
+    task = deserialized._prefetch_task
+    await deserialized.aclose()
+    assert task.cancelled()
+    await deserialized.aclose()
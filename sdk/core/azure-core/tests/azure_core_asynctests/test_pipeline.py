@@ -23,19 +23,29 @@
 # THE SOFTWARE.
 #
 #--------------------------------------------------------------------------
+import asyncio
 import sys
+import threading
+try:
+    from unittest import mock
+except ImportError:
+    import mock
 
-from azure.core.pipeline import AsyncPipeline
-from azure.core.pipeline.policies import SansIOHTTPPolicy, UserAgentPolicy, AsyncRedirectPolicy
+from azure.core.pipeline import AsyncPipeline, PipelineContext, PipelineRequest
+from azure.core.pipeline.policies import SansIOHTTPPolicy, UserAgentPolicy, AsyncRedirectPolicy, AsyncHedgingPolicy
+from azure.core.pipeline.policies import AsyncRetryPolicy, AsyncRateLimitPolicy, ContentDecodePolicy
+from azure.core.exceptions import RetryBudgetExceededError
 from azure.core.pipeline.transport import (
     AsyncHttpTransport,
     HttpRequest,
+    HttpResponse,
     AsyncioRequestsTransport,
     TrioRequestsTransport,
     AioHttpTransport
 )
 
 import aiohttp
+import requests
 import trio
 
 import pytest
@@ -73,6 +83,82 @@ async def test_sans_io_exception():
         await pipeline.run(req)
 
 
+@pytest.mark.asyncio
+async def test_hedging_slow_request():
+    class SlowFirstSender(AsyncHttpTransport):
+        def __init__(self):
+            self.calls = 0
+            self.cancelled = False
+
+        async def send(self, request, **config):
+            self.calls += 1
+            attempt = self.calls
+            if attempt == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    self.cancelled = True
+                    raise
+            response = HttpResponse(request, None)
+            response.status_code = 200
+            response.headers = {"attempt": str(attempt)}
+            return response
+
+        async def open(self):
+            pass
+
+        async def close(self):
+            pass
+
+        async def __aexit__(self, exc_type, exc_value, traceback):
+            pass
+
+    sender = SlowFirstSender()
+    pipeline = AsyncPipeline(sender, [AsyncHedgingPolicy(hedging_initial_delay=0.05)])
+    response = await pipeline.run(HttpRequest("GET", "https://account.blob.core.windows.net/container/blob"))
+    assert response.http_response.headers["attempt"] == "2"
+    await asyncio.sleep(0)
+    assert sender.cancelled
+
+    sender.calls = 2
+    response = await pipeline.run(HttpRequest("DELETE", "https://account.blob.core.windows.net/container/blob"))
+    assert response.http_response.headers["attempt"] == "3"
+    assert sender.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_budget():
+    class ThrottlingSender(AsyncHttpTransport):
+        def __init__(self):
+            self.calls = 0
+
+        async def send(self, request, **config):
+            self.calls += 1
+            response = HttpResponse(request, None)
+            response.status_code = 503
+            response.headers = {}
+            return response
+
+        async def open(self):
+            pass
+
+        async def close(self):
+            pass
+
+        async def __aexit__(self, exc_type, exc_value, traceback):
+            pass
+
+        async def sleep(self, duration):
+            pass
+
+    sender = ThrottlingSender()
+    policy = AsyncRateLimitPolicy(retry_budget_min_retries=1)
+    pipeline = AsyncPipeline(sender, [AsyncRetryPolicy(retry_backoff_factor=0), policy])
+    with pytest.raises(RetryBudgetExceededError):
+        await pipeline.run(HttpRequest("GET", "https://account.blob.core.windows.net/container/blob"))
+    assert sender.calls == 3
+    assert policy.get_rate("account.blob.core.windows.net") == 0.5
+
 @pytest.mark.asyncio
 async def test_basic_aiohttp():
 
@@ -144,4 +230,83 @@ def test_conf_async_trio_requests():
             return await pipeline.run(request)
 
     response = trio.run(do)
-    assert response.http_response.status_code == 200
\ No newline at end of file
+    assert response.http_response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_aiohttp_connection_pool_metrics():
+    from aiohttp import web
+
+    async def handler(request):
+        return web.Response(body=b"ok")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = "http://127.0.0.1:{}/".format(port)
+    try:
+        async with AioHttpTransport(connection_pool_maxsize=2, connection_pool_limit=5) as sender:
+            assert sender.session.connector.limit_per_host == 2
+            assert sender.session.connector.limit == 5
+            for _ in range(3):
+                response = await sender.send(HttpRequest("GET", url))
+                assert response.body() == b"ok"
+
+            metrics = sender.get_connection_pool_metrics()
+            assert metrics.checked_out == 0
+            assert metrics.idle == 1
+            assert metrics.created == 1
+    finally:
+        await runner.cleanup()
+
+
+def test_incremental_json_async_requests_transports():
+    # These transports are HttpTransport subclasses, but their responses can't be read synchronously
+    for transport in (AsyncioRequestsTransport(), TrioRequestsTransport()):
+        request = PipelineRequest(
+            HttpRequest("GET", "https://bing.com"), PipelineContext(transport, stream=False, incremental_json=True))
+        ContentDecodePolicy().on_request(request)
+        assert request.context.options == {"stream": False}
+        assert request.context["incremental_json"] == "body"
+
+
+def _record_session_requests(used):
+
+    def request(session, *args, **kwargs):
+        used.append((session, threading.current_thread()))
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    return mock.patch.object(requests.Session, "request", request)
+
+
+async def _send_in_worker_thread(transport):
+    await transport.send(HttpRequest("GET", "https://bing.com"))
+    return transport._get_session()
+
+
+@pytest.mark.asyncio
+async def test_asyncio_requests_session_per_thread():
+    used = []
+    with _record_session_requests(used):
+        loop_session = await _send_in_worker_thread(AsyncioRequestsTransport(session_per_thread=True))
+
+    # The request is sent with the session of the worker thread, not the one of the event loop
+    [(session, thread)] = used
+    assert thread is not threading.current_thread()
+    assert session is not loop_session
+
+
+@pytest.mark.skipif(not hasattr(trio, "run_sync_in_worker_thread"), reason="trio.run_sync_in_worker_thread removed")
+def test_trio_requests_session_per_thread():
+    used = []
+    with _record_session_requests(used):
+        trio_session = trio.run(_send_in_worker_thread, TrioRequestsTransport(session_per_thread=True))
+
+    [(session, thread)] = used
+    assert thread is not threading.current_thread()
+    assert session is not trio_session
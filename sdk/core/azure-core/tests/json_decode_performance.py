@@ -0,0 +1,96 @@
+# --------------------------------------------------------------------------
+#
+# Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# The MIT License (MIT)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the ""Software""), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# --------------------------------------------------------------------------
+"""Benchmarks of the decoding of large JSON list responses.
+
+Compares json.loads of the whole body, as ContentDecodePolicy does by default,
+with the incremental decoding of the items, in time and peak memory. Run with:
+
+    python tests/json_decode_performance.py
+"""
+import json
+import time
+import tracemalloc
+
+from azure.core.pipeline.policies import ContentDecodePolicy
+
+
+def list_payload(items):
+    return json.dumps({
+        "value": [
+            {
+                "name": "container/folder/blob-{:08d}".format(i),
+                "properties": {
+                    "etag": "0x8D7{:012X}".format(i),
+                    "contentLength": i * 1024,
+                    "contentType": "application/octet-stream",
+                    "accessTier": "Hot",
+                },
+                "metadata": {"owner": "benchmark", "index": str(i)},
+            } for i in range(items)
+        ],
+        "nextLink": "https://account.blob.core.windows.net/container?marker=next",
+    }).encode('utf-8')
+
+
+def full_decode(body):
+    count = 0
+    for _ in json.loads(body.decode('utf-8-sig'))["value"]:
+        count += 1
+    return count
+
+
+def incremental_decode(body):
+    count = 0
+    for _ in ContentDecodePolicy.deserialize_json_items(body):
+        count += 1
+    return count
+
+
+def first_item(body):
+    return next(iter(ContentDecodePolicy.deserialize_json_items(body)))
+
+
+def run_benchmark(name, function, body):
+    tracemalloc.start()
+    start = time.time()
+    function(body)
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<30} {:>8.1f} ms {:>10.1f} MB peak".format(name, elapsed * 1000, peak / 1024.0 / 1024))
+
+
+def main():
+    for items in (10000, 50000):
+        body = list_payload(items)
+        print("{} items, {:.1f} MB body".format(items, len(body) / 1024.0 / 1024))
+        run_benchmark("json.loads", full_decode, body)
+        run_benchmark("incremental", incremental_decode, body)
+        run_benchmark("incremental, first item", first_item, body)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# --------------------------------------------------------------------------
+#
+# Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# The MIT License (MIT)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the ""Software""), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED *AS IS*, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# --------------------------------------------------------------------------
+"""Micro-benchmarks of the Python-side overhead of the pipeline.
+
+Requests are sent to a transport that answers immediately, so the numbers
+are the cost of the policies only. Run with:
+
+    python tests/pipeline_performance.py
+"""
+import timeit
+
+from azure.core.pipeline import Pipeline
+from azure.core.pipeline.base import _SansIOHTTPPolicyRunner
+from azure.core.pipeline.policies import (
+    HeadersPolicy,
+    UserAgentPolicy,
+    ProxyPolicy,
+    ContentDecodePolicy,
+    NetworkTraceLoggingPolicy,
+    RetryPolicy,
+    RedirectPolicy,
+    SansIOHTTPPolicy,
+)
+from azure.core.pipeline.transport import HttpRequest, HttpResponse, HttpTransport
+
+ITERATIONS = 20000
+
+
+class NoOpTransport(HttpTransport):
+    def send(self, request, **kwargs):
+        response = HttpResponse(request, None)
+        response.status_code = 200
+        response.headers = {}
+        return response
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+def default_policies():
+    return [
+        HeadersPolicy({"x-ms-version": "2019-02-02"}),
+        UserAgentPolicy("benchmark"),
+        ProxyPolicy(),
+        ContentDecodePolicy(),
+        RedirectPolicy(),
+        RetryPolicy(),
+        SansIOHTTPPolicy(),
+        NetworkTraceLoggingPolicy(),
+    ]
+
+
+def one_runner_per_policy(policies):
+    # How the pipeline chained SansIO policies before they were grouped
+    return [_SansIOHTTPPolicyRunner(p) if isinstance(p, SansIOHTTPPolicy) else p for p in policies]
+
+
+def run_benchmark(name, pipeline):
+    request = HttpRequest("GET", "https://account.blob.core.windows.net/container/blob")
+    pipeline.run(request, stream=True)  # warm-up
+    elapsed = timeit.timeit(lambda: pipeline.run(request, stream=True), number=ITERATIONS)
+    print("{:<40} {:>8.2f} us/request".format(name, elapsed * 1000000 / ITERATIONS))
+    return elapsed
+
+
+def main():
+    transport = NoOpTransport()
+    run_benchmark("transport only", Pipeline(transport))
+    no_op_policies = [SansIOHTTPPolicy()] * 10
+    run_benchmark("default policies, one runner per policy",
+                  Pipeline(transport, one_runner_per_policy(default_policies())))
+    run_benchmark("default policies, flattened", Pipeline(transport, default_policies()))
+    run_benchmark("10 no-op policies, one runner per policy",
+                  Pipeline(transport, one_runner_per_policy(no_op_policies)))
+    run_benchmark("10 no-op policies, flattened", Pipeline(transport, no_op_policies))
+
+
+if __name__ == '__main__':
+    main()
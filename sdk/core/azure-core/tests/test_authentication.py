@@ -3,6 +3,7 @@
 # Licensed under the MIT License. See LICENSE.txt in the project root for
 # license information.
 # -------------------------------------------------------------------------
+import threading
 import time
 
 from azure.core.credentials import AccessToken
@@ -60,8 +61,7 @@ def test_bearer_policy_token_caching():
     assert credential.get_token.call_count == 1  # token is good for an hour -> policy should return it from cache
 
     expired_token = AccessToken("token", time.time())
-    credential.get_token.reset_mock()
-    credential.get_token.return_value = expired_token
+    credential = Mock(get_token=Mock(return_value=expired_token))
     pipeline = Pipeline(transport=Mock(), policies=[BearerTokenCredentialPolicy(credential, "scope")])
 
     pipeline.run(HttpRequest("GET", "https://spam.eggs"))
@@ -69,3 +69,57 @@ def test_bearer_policy_token_caching():
 
     pipeline.run(HttpRequest("GET", "https://spam.eggs"))
     assert credential.get_token.call_count == 2  # token expired -> policy should call get_token
+
+
+def test_bearer_policy_shared_token():
+    """Policies using the same credential and scopes share a token, requested once for concurrent requests"""
+    calls = []
+
+    def get_token(*scopes):
+        calls.append(scopes)
+        time.sleep(0.1)
+        return AccessToken("token", time.time() + 3600)
+
+    credential = Mock(get_token=get_token)
+    pipelines = [Pipeline(transport=Mock(), policies=[BearerTokenCredentialPolicy(credential, "scope")])
+                 for _ in range(10)]
+    threads = [threading.Thread(target=p.run, args=(HttpRequest("GET", "https://spam.eggs"),)) for p in pipelines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [("scope",)]
+
+    # Other scopes need another token
+    Pipeline(transport=Mock(), policies=[BearerTokenCredentialPolicy(credential, "other")]).run(
+        HttpRequest("GET", "https://spam.eggs"))
+    assert calls == [("scope",), ("other",)]
+
+
+def test_bearer_policy_background_refresh():
+    """A token close to expiry is renewed in the background, while requests keep using it"""
+    tokens = [AccessToken("first", time.time() + 120), AccessToken("second", time.time() + 3600)]
+    renewed = threading.Event()
+
+    def get_token(*_):
+        token = tokens.pop(0)
+        if not tokens:
+            renewed.wait(5)
+        return token
+
+    headers = []
+    credential = Mock(get_token=get_token)
+    policies = [BearerTokenCredentialPolicy(credential, "scope"),
+                Mock(send=lambda request: headers.append(request.http_request.headers["Authorization"]))]
+    pipeline = Pipeline(transport=Mock(), policies=policies)
+
+    pipeline.run(HttpRequest("GET", "https://spam.eggs"))
+    # Renewal in progress: the request doesn't wait for it
+    pipeline.run(HttpRequest("GET", "https://spam.eggs"))
+    renewed.set()
+    for _ in range(100):
+        if policies[0]._token.token == "second":
+            break
+        time.sleep(0.01)
+    pipeline.run(HttpRequest("GET", "https://spam.eggs"))
+    assert headers == ["Bearer first", "Bearer first", "Bearer second"]
@@ -24,6 +24,7 @@
 #
 #--------------------------------------------------------------------------
 
+import time
 import unittest
 
 from azure.core.paging import Paged
@@ -102,3 +103,47 @@ class TestPaging(unittest.TestCase):
         deserialized = FakePaged(internal_paging, _test_deserializer)
         result_iterated = list(deserialized)
         self.assertEqual(len(result_iterated), 0)
+
+    def test_prefetch_paging(self):
+        fetched = []
+
+        def internal_paging(next_link=None, raw=False):
+            page = int(next_link or 0)
+            fetched.append(page)
+            return {
+                'nextLink': str(page + 1) if page < 4 else None,
+                'value': ['value{}.0'.format(page), 'value{}.1'.format(page)]
+            }
+
+        deserialized = FakePaged(internal_paging, _test_deserializer, prefetch_pages=1)
+        assert next(deserialized) == 'value0.0'
+        # The next page is queued and the one after is fetched, but no further
+        for _ in range(100):
+            if len(fetched) == 3:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert fetched == [0, 1, 2]
+
+        result_iterated = list(deserialized)
+        self.assertListEqual(
+            ['value0.1'] + ['value{}.{}'.format(p, i) for p in range(1, 5) for i in range(2)],
+            result_iterated
+        )
+        with self.assertRaises(StopIteration):
+            next(deserialized)
+
+    def test_prefetch_paging_error(self):
+        def internal_paging(next_link=None, raw=False):
+            if not next_link:
+                return {
+                    'nextLink': 'page2',
+                    'value': ['value1.0', 'value1.1']
+                }
+            raise ValueError("Broken")
+
+        deserialized = FakePaged(internal_paging, _test_deserializer, prefetch_pages=2)
+        assert next(deserialized) == 'value1.0'
+        assert next(deserialized) == 'value1.1'
+        with self.assertRaises(ValueError):
+            next(deserialized)
@@ -40,6 +40,8 @@ except ImportError:
     import mock
 import xml.etree.ElementTree as ET
 import sys
+import threading
+import time
 
 import requests
 import pytest
@@ -49,16 +51,22 @@ from azure.core.pipeline import Pipeline
 from azure.core.pipeline.policies import (
     SansIOHTTPPolicy,
     UserAgentPolicy,
-    RedirectPolicy
+    RedirectPolicy,
+    RetryPolicy,
+    HedgingPolicy,
+    RateLimitPolicy
 )
 from azure.core.pipeline.transport.base import PipelineClientBase
 from azure.core.pipeline.transport import (
     HttpRequest,
+    HttpResponse,
     HttpTransport,
-    RequestsTransport
+    RequestsTransport,
+    RewindableBody
 )
 
 from azure.core.configuration import Configuration
+from azure.core.exceptions import RetryBudgetExceededError
 
 
 def test_sans_io_exception():
@@ -91,6 +99,66 @@ def test_sans_io_exception():
     with pytest.raises(NotImplementedError):
         pipeline.run(req)
 
+def test_sans_io_policies_order():
+    calls = []
+
+    class RecordingPolicy(SansIOHTTPPolicy):
+        def __init__(self, name):
+            self.name = name
+
+        def on_request(self, request):
+            calls.append(("request", self.name))
+
+        def on_response(self, request, response):
+            calls.append(("response", self.name))
+
+    class RequestOnlyPolicy(SansIOHTTPPolicy):
+        def on_request(self, request):
+            calls.append(("request", "only"))
+
+    class HandlingPolicy(RecordingPolicy):
+        def on_exception(self, request):
+            return False
+
+    class MockSender(HttpTransport):
+        def send(self, request, **config):
+            calls.append(("send", None))
+            return "response"
+
+        def open(self):
+            pass
+
+        def close(self):
+            pass
+
+        def __exit__(self, exc_type, exc_value, traceback):
+            pass
+
+    policies = [
+        RecordingPolicy("a"),
+        SansIOHTTPPolicy(),
+        RequestOnlyPolicy(),
+        HandlingPolicy("b"),
+        RecordingPolicy("c"),
+    ]
+    pipeline = Pipeline(MockSender(), policies)
+    # The no-op policy is dropped, and "b" handles exceptions so it needs its own runner
+    assert len(pipeline._impl_policies) == 3
+
+    response = pipeline.run(HttpRequest("GET", "/"))
+    assert response.http_response == "response"
+    assert calls == [
+        ("request", "a"),
+        ("request", "only"),
+        ("request", "b"),
+        ("request", "c"),
+        ("send", None),
+        ("response", "c"),
+        ("response", "b"),
+        ("response", "a"),
+    ]
+
+
 class TestRequestsTransport(unittest.TestCase):
 
     def test_basic_requests(self):
@@ -217,6 +285,247 @@ class TestClientRequest(unittest.TestCase):
         self.assertEqual(request.data, data)
 
 
+    def test_request_rewindable_body(self):
+        request = HttpRequest("PUT", "/")
+        data = bytearray(b"0123456789")
+        body = RewindableBody(data, offset=2, length=5)
+        request.set_streamed_data_body(body)
+
+        assert request.headers["Content-Length"] == "5"
+        chunk = body.read(3)
+        assert isinstance(chunk, memoryview)
+        assert chunk.tobytes() == b"234"
+        data[3] = ord("x")  # No copy was made
+        assert chunk.tobytes() == b"2x4"
+        assert body.read().tobytes() == b"56"
+        assert not body.read()
+        body.rewind()
+        assert b"".join(c.tobytes() for c in body) == b"2x456"
+        body.seek(1)
+        assert body.getbuffer().tobytes() == b"x456"
+        assert body.tell() == 5
+
+    def test_request_rewindable_body_stream(self):
+        stream = BytesIO(b"0123456789")
+        body = RewindableBody(stream, offset=4)
+        assert len(body) == 6
+        assert body.read(2) == b"45"
+        body.seek(-1, 2)
+        assert body.read() == b"9"
+        assert body.tell() == 6
+        assert body.getbuffer() is None
+
+    def test_request_rewindable_body_from_file(self):
+        import tempfile
+        import os
+        with tempfile.NamedTemporaryFile(delete=False) as temp:
+            temp.write(b"0123456789")
+        try:
+            body = RewindableBody.from_file(temp.name, offset=7)
+            assert len(body) == 3
+            assert body.read().tobytes() == b"789"
+            body.close()
+        finally:
+            os.remove(temp.name)
+
+    def test_request_rewindable_body_from_file_close_in_use(self):
+        import tempfile
+        import os
+        with tempfile.NamedTemporaryFile(delete=False) as temp:
+            temp.write(b"0123456789")
+        try:
+            body = RewindableBody.from_file(temp.name)
+            handle = body._closers[1]
+            chunk = body.read(4)
+            body.close()  # A slice is still held, like a transport would
+            assert body.closed
+            assert handle.closed
+            assert chunk.tobytes() == b"0123"
+            del chunk
+        finally:
+            os.remove(temp.name)
+
+    def test_retry_rewinds_body(self):
+        class FlakySender(HttpTransport):
+            def __init__(self):
+                self.received = []
+
+            def send(self, request, **config):
+                self.received.append(request.body.read())
+                response = HttpResponse(request, None)
+                response.status_code = 503 if len(self.received) == 1 else 201
+                response.headers = {}
+                return response
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+            def sleep(self, duration):
+                pass
+
+        request = HttpRequest("PUT", "https://account.blob.core.windows.net/container/blob")
+        request.set_streamed_data_body(RewindableBody(b"some data"))
+        sender = FlakySender()
+        response = Pipeline(sender, [RetryPolicy()]).run(request)
+
+        assert response.http_response.status_code == 201
+        assert [chunk.tobytes() for chunk in sender.received] == [b"some data", b"some data"]
+        assert response.context['history'][0].http_request.body is request.body
+
+    def test_hedging_slow_request(self):
+        class SlowFirstSender(HttpTransport):
+            def __init__(self):
+                self.calls = 0
+                self.lock = threading.Lock()
+
+            def send(self, request, **config):
+                with self.lock:
+                    self.calls += 1
+                    attempt = self.calls
+                if attempt == 1:
+                    time.sleep(0.5)
+                response = HttpResponse(request, None)
+                response.status_code = 200
+                response.headers = {"attempt": str(attempt)}
+                return response
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+        sender = SlowFirstSender()
+        pipeline = Pipeline(sender, [HedgingPolicy(hedging_initial_delay=0.05)])
+        response = pipeline.run(HttpRequest("GET", "https://account.blob.core.windows.net/container/blob"))
+        assert response.http_response.headers["attempt"] == "2"
+        assert sender.calls == 2
+
+        # Only idempotent methods are hedged
+        sender.calls = 0
+        response = pipeline.run(HttpRequest("PUT", "https://account.blob.core.windows.net/container/blob"))
+        assert response.http_response.headers["attempt"] == "1"
+        assert sender.calls == 1
+
+        sender.calls = 0
+        request = HttpRequest("GET", "https://account.blob.core.windows.net/container/blob")
+        response = pipeline.run(request, hedging_enable=False)
+        assert response.http_response.headers["attempt"] == "1"
+        assert sender.calls == 1
+
+    def test_hedging_errors(self):
+        class FailingSender(HttpTransport):
+            def __init__(self, delays):
+                self.delays = delays
+
+            def send(self, request, **config):
+                time.sleep(self.delays.pop(0))
+                raise ValueError("Broken")
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+        # The slow attempt fails, the hedged one still fails: the error is raised
+        pipeline = Pipeline(FailingSender([0.2, 0]), [HedgingPolicy(hedging_initial_delay=0.05)])
+        with pytest.raises(ValueError):
+            pipeline.run(HttpRequest("GET", "/"))
+
+    def test_rate_limit(self):
+        class ThrottlingSender(HttpTransport):
+            def __init__(self, statuses):
+                self.statuses = statuses
+                self.slept = []
+
+            def send(self, request, **config):
+                response = HttpResponse(request, None)
+                response.status_code = self.statuses.pop(0)
+                response.headers = {"Retry-After": "2"} if response.status_code == 429 else {}
+                return response
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+            def sleep(self, duration):
+                self.slept.append(duration)
+
+        host = "account.blob.core.windows.net"
+        sender = ThrottlingSender([200] * 9 + [429, 200])
+        policy = RateLimitPolicy(retry_budget_min_retries=2)
+        pipeline = Pipeline(sender, [RetryPolicy(retry_backoff_factor=0), policy])
+        for _ in range(9):
+            pipeline.run(HttpRequest("GET", "https://{}/container/blob".format(host)))
+        assert policy.get_rate(host) is None
+        assert not sender.slept
+
+        # Throttled: the retry policy sleeps for Retry-After, and the rate limiter waits too
+        response = pipeline.run(HttpRequest("GET", "https://{}/container/blob".format(host)))
+        assert response.http_response.status_code == 200
+        # Halved from the 1 request per second measured, then increased by the successful retry
+        assert policy.get_rate(host) == 2.5
+        assert sender.slept[0] == 2
+        assert 0 < sender.slept[1] <= 2
+
+    def test_retry_budget(self):
+        class ThrottlingSender(HttpTransport):
+            def __init__(self):
+                self.calls = 0
+
+            def send(self, request, **config):
+                self.calls += 1
+                response = HttpResponse(request, None)
+                response.status_code = 503
+                response.headers = {}
+                return response
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+            def sleep(self, duration):
+                pass
+
+        sender = ThrottlingSender()
+        policy = RateLimitPolicy(retry_budget_min_retries=1, rate_limit_min_rate=1000)
+        pipeline = Pipeline(sender, [RetryPolicy(retry_backoff_factor=0), policy])
+        with pytest.raises(RetryBudgetExceededError) as err:
+            pipeline.run(HttpRequest("GET", "https://account.blob.core.windows.net/container/blob"))
+        # The first attempt and the two retries allowed by the budget
+        assert sender.calls == 3
+        assert err.value.status_code == 503
+
+    def test_hedging_delay(self):
+        policy = HedgingPolicy(hedging_initial_delay=2, hedging_min_samples=10, hedging_percentile=90)
+        assert policy.get_hedging_delay() == 2
+        for latency in range(1, 11):
+            policy.record_latency(latency / 10.0)
+        assert policy.get_hedging_delay() == 0.9
+
     def test_request_xml(self):
         request = HttpRequest("GET", "/")
         data = ET.Element("root")
@@ -232,6 +541,122 @@ class TestClientRequest(unittest.TestCase):
 
         self.assertIn(request.url, ["a/b/c?g=h&t=y", "a/b/c?t=y&g=h"])
 
+    def test_request_serialize(self):
+        request = HttpRequest("DELETE", "https://account.blob.core.windows.net/container/blob?snapshot=1")
+        request.headers["x-ms-date"] = "Thu, 14 Jun 2018 16:46:54 GMT"
+
+        assert request.serialize() == (
+            b"DELETE /container/blob?snapshot=1 HTTP/1.1\r\n"
+            b"x-ms-date: Thu, 14 Jun 2018 16:46:54 GMT\r\n"
+            b"\r\n"
+        )
+
+    def test_multipart_send(self):
+        class MockResponse(HttpResponse):
+            def __init__(self, request, body, content_type):
+                super(MockResponse, self).__init__(request, None)
+                self._body = body
+                self.status_code = 202
+                self.headers = {"content-type": content_type}
+
+            def body(self):
+                return self._body
+
+        class RecordingPolicy(SansIOHTTPPolicy):
+            def __init__(self):
+                self.responses = []
+
+            def on_request(self, request):
+                request.http_request.headers["x-ms-date"] = "Thu, 14 Jun 2018 16:46:54 GMT"
+
+            def on_response(self, request, response):
+                self.responses.append((request.http_request.url, response.http_response.status_code))
+
+        class BatchSender(HttpTransport):
+            def __init__(self):
+                self.sent = None
+
+            def send(self, request, **config):
+                self.sent = request
+                body = (
+                    b"--batchresponse_66925647\r\n"
+                    b"Content-Type: application/http\r\n"
+                    b"Content-ID: 0\r\n"
+                    b"\r\n"
+                    b"HTTP/1.1 202 Accepted\r\n"
+                    b"x-ms-delete-type-permanent: true\r\n"
+                    b"\r\n"
+                    b"\r\n"
+                    b"--batchresponse_66925647\r\n"
+                    b"Content-Type: application/http\r\n"
+                    b"Content-ID: 1\r\n"
+                    b"\r\n"
+                    b"HTTP/1.1 404 The specified blob does not exist.\r\n"
+                    b"x-ms-error-code: BlobNotFound\r\n"
+                    b"Content-Length: 3\r\n"
+                    b"\r\n"
+                    b"err\r\n"
+                    b"--batchresponse_66925647--\r\n"
+                )
+                return MockResponse(request, body, "multipart/mixed; boundary=batchresponse_66925647")
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                pass
+
+        policy = RecordingPolicy()
+        req0 = HttpRequest("DELETE", "https://account.blob.core.windows.net/container0/blob0")
+        req1 = HttpRequest("DELETE", "https://account.blob.core.windows.net/container1/blob1")
+        request = HttpRequest("POST", "https://account.blob.core.windows.net/?comp=batch")
+        request.set_multipart_mixed(req0, req1, policies=[policy], boundary="batch_357de4f7")
+
+        sender = BatchSender()
+        response = Pipeline(sender).run(request)
+
+        assert sender.sent.headers["Content-Type"] == "multipart/mixed; boundary=batch_357de4f7"
+        assert sender.sent.body == (
+            b"--batch_357de4f7\r\n"
+            b"Content-Type: application/http\r\n"
+            b"Content-Transfer-Encoding: binary\r\n"
+            b"Content-ID: 0\r\n"
+            b"\r\n"
+            b"DELETE /container0/blob0 HTTP/1.1\r\n"
+            b"x-ms-date: Thu, 14 Jun 2018 16:46:54 GMT\r\n"
+            b"\r\n"
+            b"\r\n"
+            b"--batch_357de4f7\r\n"
+            b"Content-Type: application/http\r\n"
+            b"Content-Transfer-Encoding: binary\r\n"
+            b"Content-ID: 1\r\n"
+            b"\r\n"
+            b"DELETE /container1/blob1 HTTP/1.1\r\n"
+            b"x-ms-date: Thu, 14 Jun 2018 16:46:54 GMT\r\n"
+            b"\r\n"
+            b"\r\n"
+            b"--batch_357de4f7--\r\n"
+        )
+
+        parts = response.http_response.parts()
+        assert len(parts) == 2
+        assert parts[0].status_code == 202
+        assert parts[0].headers["x-ms-delete-type-permanent"] == "true"
+        assert parts[0].request is req0
+        assert parts[1].status_code == 404
+        assert parts[1].headers["x-ms-error-code"] == "BlobNotFound"
+        assert parts[1].body() == b"err"
+        assert policy.responses == [(req0.url, 202), (req1.url, 404)]
+
+    def test_multipart_parts_not_multipart(self):
+        response = HttpResponse(HttpRequest("GET", "/"), None)
+        response.headers = {"content-type": "application/json"}
+        with pytest.raises(ValueError):
+            response.parts()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -23,6 +23,7 @@
 # THE SOFTWARE.
 #
 #--------------------------------------------------------------------------
+import threading
 import time
 try:
     from unittest import mock
@@ -31,6 +32,7 @@ except ImportError:
 
 import pytest
 
+from azure.core.exceptions import AzureError
 from azure.core.polling import *
 from msrest.service_client import ServiceClient
 from msrest.serialization import Model
@@ -172,3 +174,105 @@ def test_broken_poller(client):
     with pytest.raises(ValueError) as excinfo:
         poller.result()
     assert "Something bad happened" in str(excinfo.value)
+
+
+class PollingSteps(PollingMethod):
+    """A polling method done after a number of polls, each one asking for a delay.
+    """
+    def __init__(self, polls, delay, error=None):
+        self._polls = polls
+        self._delay = delay
+        self._error = error
+        self.thread_names = set()
+
+    def initialize(self, _, initial_response, deserialization_callback):
+        self._initial_response = initial_response
+
+    def run(self):
+        while not self.finished():
+            self.poll()
+            time.sleep(self._delay)
+
+    def poll(self):
+        self.thread_names.add(threading.current_thread().name)
+        self._polls -= 1
+        if self.finished() and self._error:
+            raise self._error
+        return self._delay
+
+    def status(self):
+        return "succeeded" if self.finished() else "running"
+
+    def finished(self):
+        return self._polls <= 0
+
+    def resource(self):
+        return self._initial_response
+
+def test_polling_scheduler(client):
+    threads = threading.active_count()
+    with PollingScheduler(max_workers=2, coalesce_window=0.01) as scheduler:
+        methods = [PollingSteps(polls=3, delay=0.01) for _ in range(50)]
+        pollers = [scheduler.submit(client, i, None, method) for i, method in enumerate(methods)]
+        # One timer thread and two workers, instead of a thread per operation
+        assert threading.active_count() <= threads + 3
+
+        results = [poller.result() for poller in as_completed(pollers, timeout=10)]
+        assert sorted(results) == list(range(50))
+        assert all(poller.done() for poller in pollers)
+        assert all(name.startswith("PollingScheduler") for method in methods for name in method.thread_names)
+
+def test_polling_scheduler_delay(client):
+    with PollingScheduler(coalesce_window=0.01) as scheduler:
+        slow = scheduler.submit(client, "slow", None, PollingSteps(polls=2, delay=0.5))
+        fast = scheduler.submit(client, "fast", None, PollingSteps(polls=2, delay=0.01))
+        assert [p.result() for p in as_completed([slow, fast])] == ["fast", "slow"]
+
+class PollingTimes(PollingSteps):
+    """Records when it is polled."""
+    def __init__(self, polls, delay):
+        super(PollingTimes, self).__init__(polls, delay)
+        self.times = [time.time()]
+
+    def poll(self):
+        self.times.append(time.time())
+        return super(PollingTimes, self).poll()
+
+def test_polling_scheduler_never_polls_early(client):
+    with PollingScheduler(coalesce_window=0.3) as scheduler:
+        method = PollingTimes(polls=3, delay=0.1)
+        scheduler.submit(client, "retry-after", None, method).result()
+        intervals = [after - before for before, after in zip(method.times[1:], method.times[2:])]
+        assert len(intervals) == 2
+        assert all(interval >= 0.1 for interval in intervals)
+
+        # Polls due within the window are sent together, once the last one is due
+        first = PollingTimes(polls=2, delay=0.1)
+        second = PollingTimes(polls=2, delay=0.2)
+        pollers = [scheduler.submit(client, name, None, m) for name, m in (("first", first), ("second", second))]
+        [p.result() for p in pollers]
+        assert first.times[2] - first.times[1] >= 0.1
+        assert second.times[2] - second.times[1] >= 0.2
+        assert abs(first.times[2] - second.times[2]) < 0.05
+
+def test_polling_scheduler_errors(client):
+    with PollingScheduler(coalesce_window=0.01) as scheduler:
+        method = PollingSteps(polls=2, delay=0.01, error=ValueError("Something bad happened"))
+        poller = scheduler.submit(client, "broken", None, method)
+        done_cb = mock.MagicMock()
+        poller.add_done_callback(done_cb)
+        with pytest.raises(ValueError):
+            poller.result()
+        done_cb.assert_called_once_with(method)
+
+        # Polling methods without "poll" still get their own thread
+        method = PollingTwoSteps()
+        poller = scheduler.submit(client, "Initial response", lambda r: r, method)
+        assert poller.result() == "Initial response"
+
+        pending = scheduler.submit(client, "pending", None, PollingSteps(polls=2, delay=60))
+
+    with pytest.raises(AzureError):
+        pending.result()
+    with pytest.raises(AzureError):
+        list(as_completed([LROPoller(client, "", None, PollingSteps(polls=2, delay=60))], timeout=0.1))
@@ -24,12 +24,27 @@
 #
 # --------------------------------------------------------------------------
 import concurrent.futures
+import gc
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import threading
+import time
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
 import pytest
+import requests
 from requests.adapters import HTTPAdapter
 
-from azure.core.pipeline.transport import HttpRequest
+from azure.core.pipeline.transport import HttpRequest, RewindableBody
 from azure.core.configuration import Configuration
 from azure.core.pipeline.transport import RequestsTransport
+from azure.core.pipeline.transport import requests_basic
 
 
 def test_threading_basic_requests():
@@ -46,3 +61,178 @@ def test_threading_basic_requests():
     with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
         future = executor.submit(thread_body, sender)
         assert future.result()
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def local_server():
+    server = _ThreadingServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield "http://127.0.0.1:{}/".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_pool_metrics(local_server):
+    with RequestsTransport(connection_pool_maxsize=4) as sender:
+        for _ in range(3):
+            response = sender.send(HttpRequest("GET", local_server))
+            assert response.body() == b"ok"
+
+        metrics = sender.get_connection_pool_metrics()
+        assert metrics.checked_out == 0
+        assert metrics.idle == 1
+        assert metrics.created == 1
+        assert metrics.waited == 0
+        assert sender.session.get_adapter(local_server)._pool_maxsize == 4
+
+
+def test_connection_pool_keep_alive(local_server):
+    with RequestsTransport(connection_keep_alive=0) as sender:
+        sender.send(HttpRequest("GET", local_server))
+        sender.send(HttpRequest("GET", local_server))
+        assert sender.get_connection_pool_metrics().created == 2
+
+
+def test_connection_pool_limit(local_server):
+    with RequestsTransport(connection_pool_limit=1) as sender:
+        first = sender.send(HttpRequest("GET", local_server), stream=True)
+        assert sender.get_connection_pool_metrics().checked_out == 1
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(sender.send, HttpRequest("GET", local_server))
+            with pytest.raises(concurrent.futures.TimeoutError):
+                future.result(timeout=0.2)
+            first.internal_response.close()
+            assert future.result(timeout=5).body() == b"ok"
+
+        metrics = sender.get_connection_pool_metrics()
+        assert metrics.checked_out == 0
+        assert metrics.waited == 1
+
+
+def test_connection_pool_limit_collected_response(local_server):
+    with RequestsTransport(connection_pool_limit=1) as sender:
+        first = sender.send(HttpRequest("GET", local_server), stream=True)
+        assert sender.get_connection_pool_metrics().checked_out == 1
+
+        # Neither read nor closed, the connection is released when the response is collected
+        del first
+        gc.collect()
+        assert sender.get_connection_pool_metrics().checked_out == 0
+        assert not sender._streamed_responses
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(sender.send, HttpRequest("GET", local_server))
+            assert future.result(timeout=5).body() == b"ok"
+        assert sender.get_connection_pool_metrics().checked_out == 0
+
+
+def test_session_per_thread(local_server):
+    sender = RequestsTransport(session_per_thread=True)
+    barrier = threading.Barrier(2)
+
+    def thread_body():
+        barrier.wait()
+        response = sender.send(HttpRequest("GET", local_server))
+        assert response.body() == b"ok"
+        return sender._get_session()
+
+    with sender:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            sessions = list(executor.map(lambda _: thread_body(), range(2)))
+
+        assert sender.session is None
+        assert sessions[0] is not sessions[1]
+        # Sessions are per thread, connections are shared
+        assert sessions[0].get_adapter(local_server) is sessions[1].get_adapter(local_server)
+        assert sender.get_connection_pool_metrics().checked_out == 0
+    assert not sender._thread_sessions
+
+
+def test_session_per_thread_first_use():
+    sender = RequestsTransport(session_per_thread=True)
+    barrier = threading.Barrier(8)
+
+    adapter_init = requests_basic._TrackedHTTPAdapter.__init__
+
+    def slow_adapter_init(adapter, *args, **kwargs):
+        time.sleep(0.01)
+        adapter_init(adapter, *args, **kwargs)
+
+    def thread_body():
+        barrier.wait()
+        return sender._get_session()
+
+    with mock.patch.object(requests_basic._TrackedHTTPAdapter, '__init__', slow_adapter_init):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            sessions = list(executor.map(lambda _: thread_body(), range(8)))
+    assert len(set(id(s) for s in sessions)) == 8
+    assert len(set(id(s.get_adapter("https://bing.com")) for s in sessions)) == 1
+
+    session = sender._get_session()
+    sender.close()
+    assert not sender._thread_sessions
+    renewed = sender._get_session()
+    assert renewed is not session
+    assert renewed.get_adapter("https://bing.com") is not session.get_adapter("https://bing.com")
+    assert sender._get_session() is renewed
+
+
+def test_session_per_thread_exited_threads():
+    sender = RequestsTransport(session_per_thread=True)
+    threads = [threading.Thread(target=sender._get_session) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+
+    # The sessions are dropped with the threads, the shared adapter is kept
+    assert not sender._thread_sessions
+    session = sender._get_session()
+    assert list(sender._thread_sessions) == [session]
+    adapter = session.get_adapter("https://bing.com")
+    with mock.patch.object(adapter, 'close') as close:
+        sender.close()
+    assert close.called
+
+
+def test_session_per_thread_with_session():
+    with pytest.raises(ValueError):
+        RequestsTransport(session=requests.Session(), session_per_thread=True)
+
+
+def test_rewindable_body_send(local_server):
+    data = b"x" * 100000 + b"end"
+    request = HttpRequest("PUT", local_server)
+    request.set_streamed_data_body(RewindableBody(memoryview(data), offset=1))
+    with RequestsTransport() as sender:
+        response = sender.send(request)
+    assert response.status_code == 201
+    assert response.body() == data[1:]
@@ -29,6 +29,8 @@ try:
 except ImportError:
     import mock
 
+import json
+
 import requests
 
 import pytest
@@ -36,6 +38,7 @@ import pytest
 from azure.core.exceptions import DecodeError
 from azure.core.configuration import Configuration
 from azure.core.pipeline import (
+    Pipeline,
     PipelineResponse,
     PipelineRequest,
     PipelineContext
@@ -43,6 +46,7 @@ from azure.core.pipeline import (
 from azure.core.pipeline.transport import (
     HttpRequest,
     HttpResponse,
+    HttpTransport,
 )
 from azure.core.pipeline.transport import RequestsTransportResponse
 
@@ -179,3 +183,150 @@ def test_raw_deserializer():
     raw_deserializer.on_response(None, response)
     result = response.context["deserialized_data"]
     assert result["success"] is True
+
+
+def test_incremental_json_deserializer():
+    body = json.dumps({
+        "value": [{"name": u"blob{}".format(i), "size": i * 1000, "tags": [u"é", None, True]} for i in range(500)],
+        "nextLink": "https://example.org/?page=2",
+    }).encode('utf-8')
+
+    # Any chunk boundary, including in the middle of numbers and UTF-8 characters
+    for chunk_size in (1, 7, 4096):
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        items = ContentDecodePolicy.deserialize_json_items(chunks)
+        assert list(items) == json.loads(body.decode('utf-8'))["value"]
+        assert items.properties == {"nextLink": "https://example.org/?page=2"}
+
+    # Members before the list are available as soon as it starts
+    items = ContentDecodePolicy.deserialize_json_items(b'\xef\xbb\xbf{"count": 2, "value": [1, {"a": []}]}')
+    iterator = iter(items)
+    assert next(iterator) == 1
+    assert items.properties == {"count": 2}
+    assert list(iterator) == [{"a": []}]
+    with pytest.raises(ValueError):
+        iter(items)
+
+    assert list(ContentDecodePolicy.deserialize_json_items(b' [ ] ')) == []
+    assert list(ContentDecodePolicy.deserialize_json_items(b'{}')) == []
+    assert list(ContentDecodePolicy.deserialize_json_items(b'[1 , 2]')) == [1, 2]
+    assert list(ContentDecodePolicy.deserialize_json_items(b'{"items": [3]}', list_key="items")) == [3]
+
+    for broken in (b'{"value": [1, 2', b'{"value": [1 2]}', b'"data"', b''):
+        with pytest.raises(DecodeError):
+            list(ContentDecodePolicy.deserialize_json_items(broken))
+
+    # As a policy, per operation or for all of them
+    req_response = requests.Response()
+    req_response.headers["content-type"] = "application/json; charset=utf-8"
+    req_response._content = b'{"value": [1, 2], "nextLink": null}'
+    req_response._content_consumed = True
+    response = PipelineResponse(None, RequestsTransportResponse(None, req_response),
+                                PipelineContext(None, stream=False, incremental_json=True))
+    ContentDecodePolicy().on_response(None, response)
+    result = response.context["deserialized_data"]
+    assert list(result) == [1, 2]
+    assert result.properties == {"nextLink": None}
+
+    response = PipelineResponse(None, RequestsTransportResponse(None, req_response), PipelineContext(None, stream=False))
+    ContentDecodePolicy(incremental_json=True).on_response(None, response)
+    assert list(response.context["deserialized_data"]) == [1, 2]
+
+
+def test_incremental_json_deserializer_split_numbers():
+    body = b'{"value": [1.5, -2, 3e10, 12345, -0.25E-3, 1E+2, [0.5], {"a": -1}]}'
+    expected = json.loads(body.decode('utf-8'))["value"]
+
+    # The numbers are split at '.', 'e', '-' and between digits
+    for i in range(1, len(body)):
+        assert list(ContentDecodePolicy.deserialize_json_items([body[:i], body[i:]])) == expected
+    assert list(ContentDecodePolicy.deserialize_json_items([b'[1.', b'5, 2]'])) == [1.5, 2]
+    assert list(ContentDecodePolicy.deserialize_json_items([b'{"value": [1e', b'3]}'])) == [1e3]
+    assert list(ContentDecodePolicy.deserialize_json_items([b'[1', b'', b'2]'])) == [12]
+
+    with pytest.raises(DecodeError):
+        list(ContentDecodePolicy.deserialize_json_items([b'[1.', b'x]']))
+
+
+def test_incremental_json_policy_streams_response():
+
+    class ChunkedResponse(HttpResponse):
+        def __init__(self, request, chunks, content_type):
+            super(ChunkedResponse, self).__init__(request, None)
+            self.status_code = 200
+            self.content_type = content_type
+            self.chunks = chunks
+            self.read = 0
+
+        def body(self):
+            return b''.join(self.stream_download(None))
+
+        def stream_download(self, pipeline):
+            for chunk in self.chunks:
+                self.read += 1
+                yield chunk
+
+    class ChunkedTransport(HttpTransport):
+        def __init__(self, chunks, content_type):
+            self.chunks = chunks
+            self.content_type = content_type
+            self.options = None
+
+        def __exit__(self, *args):
+            pass
+
+        def open(self):
+            pass
+
+        def close(self):
+            pass
+
+        def send(self, request, **kwargs):
+            self.options = kwargs
+            return ChunkedResponse(request, self.chunks, self.content_type)
+
+    transport = ChunkedTransport([b'{"value": [1, ', b'2, ', b'3]}'], 'application/json; charset=utf-8')
+    pipeline = Pipeline(transport, [ContentDecodePolicy()])
+    response = pipeline.run(HttpRequest('GET', 'https://bing.com'), stream=False, incremental_json=True)
+
+    assert transport.options == {'stream': True}
+    items = iter(response.context["deserialized_data"])
+    assert next(items) == 1
+    assert response.http_response.read == 1
+    assert list(items) == [2, 3]
+
+    # Empty responses without a content type aren't JSON lists
+    transport = ChunkedTransport([], None)
+    pipeline = Pipeline(transport, [ContentDecodePolicy(incremental_json=True)])
+    response = pipeline.run(HttpRequest('DELETE', 'https://bing.com'), stream=False)
+    assert response.context["deserialized_data"] is None
+
+    # Without stream=False, nothing is decoded, nor sent to the transport
+    response = pipeline.run(HttpRequest('GET', 'https://bing.com'), incremental_json=True)
+    assert transport.options == {}
+    assert "deserialized_data" not in response.context
+
+
+def test_incremental_json_stream_connection_error():
+
+    def broken_content(block_size):
+        yield b'{"value": [1, '
+        raise requests.exceptions.ConnectionError("Connection reset")
+
+    req_response = requests.Response()
+    req_response.headers["content-type"] = "application/json"
+    req_response.iter_content = broken_content
+    req_response.raw = mock.Mock()
+    http_response = RequestsTransportResponse(None, req_response)
+    response = PipelineResponse(None, http_response, PipelineContext(None, stream=True))
+    response.context["incremental_json"] = "stream"
+
+    ContentDecodePolicy().on_response(None, response)
+
+    # Raised as is, there is no pipeline to resume the download with
+    items = iter(response.context["deserialized_data"])
+    assert next(items) == 1
+    with pytest.raises(requests.exceptions.ConnectionError):
+        next(items)
+    assert req_response.raw.close.called
+
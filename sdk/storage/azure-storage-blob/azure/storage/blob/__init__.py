@@ -43,6 +43,8 @@ from .models import (
     CopyProperties,
     BlobBlock,
     PageRange,
+    DirectorySyncResult,
+    BulkCopyResult,
     AccessPolicy,
     ContainerPermissions,
     BlobPermissions,
@@ -82,6 +84,8 @@ __all__ = [
     'CopyProperties',
     'BlobBlock',
     'PageRange',
+    'DirectorySyncResult',
+    'BulkCopyResult',
     'AccessPolicy',
     'ContainerPermissions',
     'BlobPermissions',
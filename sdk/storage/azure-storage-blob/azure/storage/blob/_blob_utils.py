@@ -5,19 +5,23 @@
 # --------------------------------------------------------------------------
 # pylint: disable=no-self-use
 
+import os
 import sys
-from io import BytesIO, SEEK_SET, UnsupportedOperation
+import threading
+from io import BytesIO, SEEK_END, SEEK_SET, UnsupportedOperation
 from typing import Optional, Union, Any, TypeVar, TYPE_CHECKING # pylint: disable=unused-import
 
 import six
 from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
 
 from ._shared.utils import (
+    encode_base64,
     process_storage_error,
     validate_and_format_range_headers,
     parse_length_from_content_range,
     return_response_headers)
 from ._shared.models import StorageErrorCode, ModifiedAccessConditions
+from ._shared.shared_access_signature import BlobSharedAccessSignature
 from ._shared.upload_chunking import (
     upload_blob_chunks,
     upload_blob_substream_blocks,
@@ -27,10 +31,13 @@ from ._shared.upload_chunking import (
 from ._shared.download_chunking import (
     process_content,
     process_range_and_offset,
+    process_chunks_in_order,
     ParallelBlobChunkDownloader,
-    SequentialBlobChunkDownloader
+    SequentialBlobChunkDownloader,
+    SparseBlobChunkDownloader,
+    RollingContentMD5
 )
-from ._shared.encryption import _generate_blob_encryption_data, _encrypt_blob
+from ._shared.encryption import _generate_blob_encryption_data, _encrypt_blob, _cache_key_unwrapping
 from ._generated.models import (
     StorageErrorException,
     BlockLookupList,
@@ -39,6 +46,7 @@ from ._generated.models import (
     SequenceNumberAccessConditions
 )
 from .models import BlobProperties, ContainerProperties
+from ._transfer_journal import TransferJournal
 
 if TYPE_CHECKING:
     from datetime import datetime # pylint: disable=unused-import
@@ -61,6 +69,28 @@ def _convert_mod_error(error):
     raise overwrite_error
 
 
+def get_sas_factory(credential, blob_settings):
+    """The factory of the shared access signatures of the clients sharing these settings.
+
+    The clients of a service, or of a container, share the signing state of the account
+    key, and the tokens generated so far if the sas_cache_size setting is set.
+    """
+    if not hasattr(credential, 'account_key') or not credential.account_key:
+        raise ValueError("No account SAS key available.")
+    factory = blob_settings.sas_factory
+    if factory is None or factory.account_name != credential.account_name:
+        factory = BlobSharedAccessSignature(
+            credential.account_name,
+            credential.account_key,
+            cache_size=blob_settings.sas_cache_size,
+            expiry_granularity=blob_settings.sas_expiry_granularity)
+        blob_settings.sas_factory = factory
+    else:
+        # The tokens of a previous key are discarded by the factory
+        factory.account_key = credential.account_key
+    return factory
+
+
 def get_access_conditions(lease):
     # type: (Optional[Union[LeaseClient, str]]) -> Union[LeaseAccessConditions, None]
     try:
@@ -212,6 +242,145 @@ def upload_block_blob(  # pylint: disable=too-many-locals
             raise
 
 
+def _describe_source(stream):
+    """Identify the version of a local file, so that a resumed upload doesn't mix two versions."""
+    try:
+        file_stat = os.fstat(stream.fileno())
+        return [file_stat.st_size, file_stat.st_mtime]
+    except (AttributeError, EnvironmentError, UnsupportedOperation, ValueError):
+        return None
+
+
+def _get_staged_blocks(client, access_conditions, timeout, **kwargs):
+    try:
+        blocks = client.get_block_list(
+            list_type='uncommitted',
+            timeout=timeout,
+            lease_access_conditions=access_conditions,
+            **kwargs)
+    except StorageErrorException as error:
+        if error.response.status_code == 404:
+            return {}
+        raise
+    return {b.name: b.size for b in blocks.uncommitted_blocks or []}
+
+
+def upload_block_blob_resumable(  # pylint: disable=too-many-locals
+        client,
+        name,
+        stream,
+        length,
+        overwrite,
+        headers,
+        blob_headers,
+        access_conditions,
+        mod_conditions,
+        validate_content,
+        timeout,
+        max_connections,
+        blob_settings,
+        checkpoint,
+        **kwargs):
+    """Upload a block blob, recording the staged blocks in a journal.
+
+    If the journal was left by an interrupted upload of the same data to the same version
+    of the blob, the blocks that the service still has uncommitted are not uploaded again.
+    """
+    if length is None:
+        raise ValueError("The length of the data is required for a resumable upload.")
+    try:
+        stream_start = stream.tell()
+    except (AttributeError, UnsupportedOperation):
+        raise ValueError(_ERROR_VALUE_SHOULD_BE_SEEKABLE_STREAM.format('data'))
+
+    block_size = blob_settings.max_block_size
+    overwrite_mod_conditions = None
+    try:
+        if not overwrite:
+            overwrite_mod_conditions = get_modification_conditions(if_none_match='*')
+
+        # Committing the blob discards its uncommitted blocks, so the journal is only
+        # valid for the version of the blob it was started on
+        try:
+            etag = client.blob.get_properties(
+                timeout=timeout,
+                lease_access_conditions=access_conditions,
+                cls=return_response_headers,
+                **kwargs)['etag']
+        except StorageErrorException as error:
+            if error.response.status_code != 404:
+                raise
+            etag = None
+
+        header = {
+            'operation': 'upload',
+            'blob': name,
+            'etag': etag,
+            'source': _describe_source(stream),
+            'offset': stream_start,
+            'length': length,
+            'block_size': block_size,
+        }
+        blocks = [(encode_base64('{0:032d}'.format(offset)), offset) for offset in range(0, length, block_size)]
+        with TransferJournal(checkpoint, header) as journal:
+            if journal.completed:
+                staged = _get_staged_blocks(client.block_blob, access_conditions, timeout, **kwargs)
+                blocks = [(block_id, offset) for block_id, offset in blocks
+                          if block_id not in journal.completed or
+                          staged.get(block_id) != min(block_size, length - offset)]
+
+            stream_lock = threading.Lock()
+
+            def stage_block(block):
+                block_id, offset = block
+                with stream_lock:
+                    stream.seek(stream_start + offset)
+                    data = stream.read(min(block_size, length - offset))
+                if not isinstance(data, six.binary_type):
+                    raise TypeError('Blob data should be of type bytes.')
+                client.block_blob.stage_block(
+                    block_id,
+                    len(data),
+                    data,
+                    timeout=timeout,
+                    lease_access_conditions=access_conditions,
+                    validate_content=validate_content,
+                    data_stream_total=length,
+                    upload_stream_current=offset,
+                    **kwargs)
+                journal.record(block_id)
+
+            if max_connections > 1:
+                import concurrent.futures
+                executor = concurrent.futures.ThreadPoolExecutor(max_connections)
+                list(executor.map(stage_block, blocks))
+            else:
+                for block in blocks:
+                    stage_block(block)
+
+            block_lookup = BlockLookupList(committed=[], uncommitted=[], latest=[])
+            block_lookup.latest = [encode_base64('{0:032d}'.format(offset)) for offset in range(0, length, block_size)]
+            response = client.block_blob.commit_block_list(
+                block_lookup,
+                blob_http_headers=blob_headers,
+                lease_access_conditions=access_conditions,
+                timeout=timeout,
+                modified_access_conditions=mod_conditions or overwrite_mod_conditions,
+                cls=return_response_headers,
+                validate_content=validate_content,
+                headers=headers,
+                **kwargs)
+            journal.delete()
+            return response
+    except StorageErrorException as error:
+        try:
+            process_storage_error(error)
+        except ResourceModifiedError as mod_error:
+            if overwrite_mod_conditions:
+                _convert_mod_error(mod_error)
+            raise
+
+
 def upload_page_blob(
         client,
         stream,
@@ -385,6 +554,71 @@ def upload_append_blob(
         process_storage_error(error)
 
 
+def _write_zeros(stream, start, end, block_size):
+    zeros = b'\x00' * min(block_size, end - start)
+    stream.seek(start, SEEK_SET)
+    while start < end:
+        stream.write(zeros[:end - start])
+        start += len(zeros)
+
+
+def download_page_ranges_to_stream(
+        service,
+        stream,
+        blob_size,
+        page_ranges,
+        clear_ranges,
+        validate_content,
+        access_conditions,
+        mod_conditions,
+        timeout,
+        max_connections,
+        blob_settings,
+        **kwargs):
+    """Download the given page ranges of a page blob at their offset from the position of the stream.
+
+    Without clear ranges, the stream is emptied and sized to the blob before the pages are written,
+    so in a file the pages that are not downloaded are holes. With clear ranges, the stream holds
+    a previous version of the blob and only the page ranges that changed are written, and the
+    cleared ones zeroed.
+    """
+    start = stream.tell()
+    end = start + blob_size
+    if clear_ranges is None:
+        stream.truncate(start)
+    # Extending a file leaves a hole, which reads as zeros
+    stream.truncate(end)
+    stream.seek(0, SEEK_END)
+    if stream.tell() < end:
+        # Streams in memory are not extended by truncate
+        _write_zeros(stream, end - 1, end, 1)
+    for clear_range in clear_ranges or []:
+        _write_zeros(
+            stream,
+            start + clear_range['start'],
+            start + min(clear_range['end'] + 1, blob_size),
+            blob_settings.max_chunk_get_size)
+
+    stream.seek(start, SEEK_SET)
+    downloader = SparseBlobChunkDownloader(
+        blob_service=service,
+        ranges=[(r['start'], min(r['end'], blob_size - 1)) for r in page_ranges if r['start'] < blob_size],
+        chunk_size=blob_settings.max_chunk_get_size,
+        stream=stream,
+        validate_content=validate_content,
+        access_conditions=access_conditions,
+        mod_conditions=mod_conditions,
+        timeout=timeout,
+        cls=deserialize_blob_stream,
+        **kwargs)
+    if max_connections > 1:
+        process_chunks_in_order(downloader.process_chunk, downloader.get_chunk_offsets(), max_connections)
+    else:
+        for chunk in downloader.get_chunk_offsets():
+            downloader.process_chunk(chunk)
+    stream.seek(end, SEEK_SET)
+
+
 def deserialize_metadata(response, _, headers):  # pylint: disable=unused-argument
     raw_metadata = {k: v for k, v in response.headers.items() if k.startswith("x-ms-meta-")}
     return {k[10:]: v for k, v in raw_metadata.items()}
@@ -429,7 +663,7 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
     def __init__(
             self, name, container, service, config, offset, length, validate_content,
             access_conditions, mod_conditions, timeout,
-            require_encryption, key_encryption_key, key_resolver_function, **kwargs
+            require_encryption, key_encryption_key, key_resolver_function, checkpoint=None, **kwargs
     ):
         self.service = service
         self.config = config
@@ -440,8 +674,10 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         self.access_conditions = access_conditions
         self.mod_conditions = mod_conditions
         self.require_encryption = require_encryption
-        self.key_encryption_key = key_encryption_key
-        self.key_resolver_function = key_resolver_function
+        # The chunks are decrypted with the content encryption key unwrapped once for all of them
+        self.key_encryption_key, self.key_resolver_function = _cache_key_unwrapping(
+            key_encryption_key, key_resolver_function)
+        self.checkpoint = checkpoint
         self.request_options = kwargs
         self.location_mode = None
         self._download_complete = False
@@ -482,6 +718,13 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         # TODO: Set to the stored MD5 when the service returns this
         self.properties.content_md5 = None
 
+        # A whole blob is also checked against its stored MD5, hashed as the chunks arrive
+        self._blob_md5 = None
+        if self.validate_content and self.offset is None and self.checkpoint is None \
+                and self.key_encryption_key is None and self.key_resolver_function is None \
+                and self.properties.content_settings.content_md5:
+            self._blob_md5 = RollingContentMD5()
+
     def __len__(self):
         return self.download_size
 
@@ -495,39 +738,44 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
                 self.initial_offset[1],
                 self.require_encryption,
                 self.key_encryption_key,
-                self.key_resolver_function)
+                self.key_resolver_function,
+                self.validate_content)
+        if self._blob_md5 is not None:
+            self._blob_md5.update(0, content)
 
         if content is not None:
             yield content
-        if self._download_complete:
-            return
-
-        end_blob = self.blob_size
-        if self.length is not None:
-            # Use the length unless it is over the end of the blob
-            end_blob = min(self.blob_size, self.length + 1)
-
-        downloader = SequentialBlobChunkDownloader(
-            blob_service=self.service,
-            download_size=self.download_size,
-            chunk_size=self.config.max_chunk_get_size,
-            progress=self.first_get_size,
-            start_range=self.initial_range[1] + 1,  # start where the first download ended
-            end_range=end_blob,
-            stream=None,
-            validate_content=self.validate_content,
-            access_conditions=self.access_conditions,
-            mod_conditions=self.mod_conditions,
-            timeout=self.timeout,
-            require_encryption=self.require_encryption,
-            key_encryption_key=self.key_encryption_key,
-            key_resolver_function=self.key_resolver_function,
-            use_location=self.location_mode,
-            cls=deserialize_blob_stream,
-            **self.request_options)
+        if not self._download_complete:
+            end_blob = self.blob_size
+            if self.length is not None:
+                # Use the length unless it is over the end of the blob
+                end_blob = min(self.blob_size, self.length + 1)
+
+            downloader = SequentialBlobChunkDownloader(
+                blob_service=self.service,
+                download_size=self.download_size,
+                chunk_size=self.config.max_chunk_get_size,
+                progress=self.first_get_size,
+                # start where the first download ended
+                start_range=self.initial_range[1] - self.initial_offset[1] + 1,
+                end_range=end_blob,
+                stream=None,
+                validate_content=self.validate_content,
+                access_conditions=self.access_conditions,
+                mod_conditions=self.mod_conditions,
+                timeout=self.timeout,
+                require_encryption=self.require_encryption,
+                key_encryption_key=self.key_encryption_key,
+                key_resolver_function=self.key_resolver_function,
+                blob_md5=self._blob_md5,
+                use_location=self.location_mode,
+                cls=deserialize_blob_stream,
+                **self.request_options)
 
-        for chunk in downloader.get_chunk_offsets():
-            yield downloader.yield_chunk(chunk)
+            for chunk in downloader.get_chunk_offsets():
+                yield downloader.yield_chunk(chunk)
+        if self._blob_md5 is not None:
+            self._blob_md5.validate(self.properties.content_settings.content_md5)
 
     def _initial_request(self):
         range_header, range_validation = validate_and_format_range_headers(
@@ -544,7 +792,6 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
                 range_get_content_md5=range_validation,
                 lease_access_conditions=self.access_conditions,
                 modified_access_conditions=self.mod_conditions,
-                validate_content=self.validate_content,
                 cls=deserialize_blob_stream,
                 data_stream_total=None,
                 download_stream_current=0,
@@ -575,7 +822,6 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
                         timeout=self.timeout,
                         lease_access_conditions=self.access_conditions,
                         modified_access_conditions=self.mod_conditions,
-                        validate_content=self.validate_content,
                         cls=deserialize_blob_stream,
                         data_stream_total=0,
                         download_stream_current=0,
@@ -634,12 +880,14 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         :param stream:
             The stream to download to. This can be an open file-handle,
             or any writable stream. The stream must be seekable if the download
-            uses more than one parallel connection.
+            uses more than one parallel connection, or is resumable. To resume a
+            download, the stream must hold the data written by the interrupted one,
+            for example a file opened in 'r+b' mode.
         :returns: The properties of the downloaded blob.
         :rtype: ~azure.storage.blob.models.BlobProperties
         """
-        # the stream must be seekable if parallel download is required
-        if max_connections > 1:
+        # the stream must be seekable if parallel or resumable download is required
+        if max_connections > 1 or self.checkpoint is not None:
             error_message = "Target stream handle must be seekable."
             if sys.version_info >= (3,) and not stream.seekable():
                 raise ValueError(error_message)
@@ -658,12 +906,19 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
                 self.initial_offset[1],
                 self.require_encryption,
                 self.key_encryption_key,
-                self.key_resolver_function)
+                self.key_resolver_function,
+                self.validate_content)
         # Write the content to the user stream
         # Clear blob content since output has been written to user stream
         if content is not None:
             stream.write(content)
+        if self._blob_md5 is not None:
+            self._blob_md5.update(0, content)
         if self._download_complete:
+            if self.checkpoint is not None:
+                TransferJournal(self.checkpoint, None).delete()
+            if self._blob_md5 is not None:
+                self._blob_md5.validate(self.properties.content_settings.content_md5)
             return self.properties
 
         end_blob = self.blob_size
@@ -671,13 +926,15 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
             # Use the length unless it is over the end of the blob
             end_blob = min(self.blob_size, self.length + 1)
 
-        downloader_class = ParallelBlobChunkDownloader if max_connections > 1 else SequentialBlobChunkDownloader
+        # Chunks are written at their offset when some of them are skipped
+        downloader_class = ParallelBlobChunkDownloader \
+            if max_connections > 1 or self.checkpoint is not None else SequentialBlobChunkDownloader
         downloader = downloader_class(
             blob_service=self.service,
             download_size=self.download_size,
             chunk_size=self.config.max_chunk_get_size,
             progress=self.first_get_size,
-            start_range=self.initial_range[1] + 1,  # start where the first download ended
+            start_range=self.initial_range[1] - self.initial_offset[1] + 1,  # start where the first download ended
             end_range=end_blob,
             stream=stream,
             validate_content=self.validate_content,
@@ -687,16 +944,43 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
             require_encryption=self.require_encryption,
             key_encryption_key=self.key_encryption_key,
             key_resolver_function=self.key_resolver_function,
+            blob_md5=self._blob_md5,
             use_location=self.location_mode,
             cls=deserialize_blob_stream,
             **self.request_options)
 
+        if self.checkpoint is not None:
+            self._download_chunks_resumable(downloader, max_connections)
+            return self.properties
+
         if max_connections > 1:
-            import concurrent.futures
-            executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-            list(executor.map(downloader.process_chunk, downloader.get_chunk_offsets()))
+            process_chunks_in_order(downloader.process_chunk, downloader.get_chunk_offsets(), max_connections)
         else:
             for chunk in downloader.get_chunk_offsets():
                 downloader.process_chunk(chunk)
-
+        if self._blob_md5 is not None:
+            self._blob_md5.validate(self.properties.content_settings.content_md5)
         return self.properties
+
+    def _download_chunks_resumable(self, downloader, max_connections):
+        # The chunks are locked on the ETag, so the journal is only valid for this version of the blob
+        header = {
+            'operation': 'download',
+            'blob': '{0}/{1}'.format(self.properties.container, self.properties.name),
+            'etag': self.properties.etag,
+            'offset': self.offset,
+            'length': self.length,
+            'chunk_size': self.config.max_chunk_get_size,
+        }
+        with TransferJournal(self.checkpoint, header) as journal:
+            def process_chunk(chunk_start):
+                downloader.process_chunk(chunk_start)
+                journal.record(chunk_start)
+
+            chunks = [c for c in downloader.get_chunk_offsets() if c not in journal.completed]
+            if max_connections > 1:
+                process_chunks_in_order(process_chunk, chunks, max_connections)
+            else:
+                for chunk in chunks:
+                    process_chunk(chunk)
+            journal.delete()
@@ -0,0 +1,204 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import threading
+import time
+
+from azure.core.exceptions import HttpResponseError, ResourceModifiedError, ResourceNotFoundError
+
+from ._shared.utils import process_storage_error, return_response_headers
+from ._generated.models import StorageErrorException, SourceModifiedAccessConditions
+from .models import BlobType, BulkCopyResult
+
+
+class _BlockCopy(object):
+    """The blocks of a blob that are staged from its source, and committed once they are all staged."""
+
+    def __init__(self, blob, block_ids):
+        self.blob = blob
+        self.block_ids = block_ids
+        self.remaining = len(block_ids)
+        self.failed = False
+
+
+class BulkBlobCopy(object):  # pylint: disable=too-many-instance-attributes
+    """Copies the blobs of a container to another one, server-side.
+
+    A large block blob is copied by staging its blocks from ranges of the source in
+    parallel, then committing them. The other blobs are copied by the service in the
+    background: the copies are started, then the status of those still pending is
+    polled by listing the destination blobs with their copy properties, which covers
+    thousands of copies per request.
+
+    At most max_concurrency requests are in flight, and as many are queued: submitting
+    blocks when the queue is full, so that listing a large container doesn't get ahead
+    of the copies.
+    """
+
+    def __init__(
+            self, destination, source, max_concurrency, block_size, block_copy_threshold,
+            polling_interval, progress_callback, timeout, **kwargs):
+        self._destination = destination
+        self._source = source
+        self._max_concurrency = max_concurrency
+        self._block_size = block_size
+        self._block_copy_threshold = block_copy_threshold
+        self._polling_interval = polling_interval
+        self._progress_callback = progress_callback
+        self._timeout = timeout
+        self._request_options = kwargs
+        self._slots = threading.BoundedSemaphore(max_concurrency * 2)
+        self._lock = threading.Lock()
+        self._pending = {}  # type: dict
+        self.result = BulkCopyResult()
+
+    def run(self, name_starts_with):
+        import concurrent.futures
+        started = time.time()
+        executor = concurrent.futures.ThreadPoolExecutor(self._max_concurrency)
+        try:
+            for blob in self._source.list_blobs(
+                    name_starts_with=name_starts_with, include='metadata', timeout=self._timeout):
+                with self._lock:
+                    self.result.blobs_total += 1
+                    self.result.bytes_total += blob.size or 0
+                if blob.blob_type == BlobType.BlockBlob and blob.size > self._block_copy_threshold:
+                    self._copy_blocks(executor, blob)
+                else:
+                    self._submit(executor, self._start_copy, blob)
+        finally:
+            executor.shutdown(wait=True)
+
+        while self._pending:
+            time.sleep(self._polling_interval)
+            self._poll(name_starts_with)
+        self.result.elapsed = time.time() - started
+        return self.result
+
+    def _submit(self, executor, operation, *args):
+        self._slots.acquire()
+        future = executor.submit(operation, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def _completed(self, blob):
+        with self._lock:
+            self.result.copied.append(blob.name)
+            self.result.bytes_copied += blob.size or 0
+            self._report()
+
+    def _failed(self, name, error):
+        with self._lock:
+            self.result.failed[name] = error
+            self._report()
+
+    def _report(self):
+        # Called with the lock held
+        if self._progress_callback is not None:
+            self._progress_callback(self.result)
+
+    def _source_url(self, blob):
+        return self._source.get_blob_client(blob.name).url
+
+    def _start_copy_from_url(self, blob):
+        client = self._destination.get_blob_client(blob.name)
+        try:
+            # The source is locked on the listed version of the blob
+            return client._client.blob.start_copy_from_url(  # pylint: disable=protected-access
+                self._source_url(blob),
+                timeout=self._timeout,
+                source_modified_access_conditions=SourceModifiedAccessConditions(source_if_match=blob.etag),
+                cls=return_response_headers,
+                **self._request_options)
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    def _start_copy(self, blob):
+        try:
+            response = self._start_copy_from_url(blob)
+        except Exception as error:  # pylint: disable=broad-except
+            self._failed(blob.name, error)
+            return
+        if response['copy_status'] == 'success':
+            self._completed(blob)
+        else:
+            with self._lock:
+                self._pending[blob.name] = (blob, response['copy_id'])
+
+    def _copy_blocks(self, executor, blob):
+        offsets = range(0, blob.size, self._block_size)
+        copy = _BlockCopy(blob, ['{0:032d}'.format(offset) for offset in offsets])
+        for block_id, offset in zip(copy.block_ids, offsets):
+            self._submit(executor, self._stage_block, copy, block_id, offset)
+
+    def _stage_block(self, copy, block_id, offset):
+        blob = copy.blob
+        length = min(self._block_size, blob.size - offset)
+        try:
+            if not copy.failed:
+                self._destination.get_blob_client(blob.name).stage_block_from_url(
+                    block_id,
+                    self._source_url(blob),
+                    source_offset=offset,
+                    source_length=length,
+                    timeout=self._timeout,
+                    **self._request_options)
+                with self._lock:
+                    self.result.bytes_copied += length
+        except Exception as error:  # pylint: disable=broad-except
+            with self._lock:
+                failed, copy.failed = copy.failed, True
+            if not failed:
+                self._failed(blob.name, error)
+        with self._lock:
+            copy.remaining -= 1
+            if copy.remaining or copy.failed:
+                return
+        try:
+            # The blocks can't be staged on a condition on the source, like a copy is started: the
+            # source is checked once they are all staged, so the blob doesn't mix two versions
+            source = self._source.get_blob_client(blob.name).get_blob_properties(
+                timeout=self._timeout, **self._request_options)
+            if source.etag != blob.etag:
+                raise ResourceModifiedError(message="The source blob was modified during its copy.")
+            # The blocks don't carry the properties of the source like a copy does
+            self._destination.get_blob_client(blob.name).commit_block_list(
+                copy.block_ids,
+                content_settings=blob.content_settings,
+                metadata=blob.metadata,
+                timeout=self._timeout,
+                **self._request_options)
+        except Exception as error:  # pylint: disable=broad-except
+            self._failed(blob.name, error)
+            return
+        with self._lock:
+            self.result.copied.append(blob.name)
+            self._report()
+
+    def _poll(self, name_starts_with):
+        # One listing gets the status of all the copies in progress
+        unseen = set(self._pending)
+        for listed in self._destination.list_blobs(
+                name_starts_with=name_starts_with, include='copy', timeout=self._timeout):
+            if listed.name not in unseen:
+                continue
+            unseen.remove(listed.name)
+            blob, copy_id = self._pending[listed.name]
+            if listed.copy.id != copy_id:
+                error = HttpResponseError(message="The blob was copied over by another operation.")
+            elif listed.copy.status == 'pending':
+                continue
+            elif listed.copy.status == 'success':
+                del self._pending[listed.name]
+                self._completed(blob)
+                continue
+            else:
+                error = HttpResponseError(message="The copy of the blob ended with status '{}': {}".format(
+                    listed.copy.status, listed.copy.status_description))
+            del self._pending[listed.name]
+            self._failed(blob.name, error)
+        for name in unseen:
+            del self._pending[name]
+            self._failed(name, ResourceNotFoundError(message="The blob was deleted during its copy."))
@@ -0,0 +1,202 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import calendar
+import hashlib
+import os
+import threading
+
+from .models import ContentSettings, DirectorySyncResult
+
+_MD5_READ_SIZE = 4 * 1024 * 1024
+
+
+def _timestamp(value):
+    return calendar.timegm(value.utctimetuple())
+
+
+def _md5(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(_MD5_READ_SIZE), b''):
+            md5.update(chunk)
+    return md5.digest()
+
+
+def _walk(directory):
+    """Yield the relative path, with '/' separators, the size and the mtime of each file in a directory."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                # Removed while walking the tree
+                continue
+            relative = os.path.relpath(path, directory).replace(os.sep, '/')
+            yield relative, file_stat.st_size, file_stat.st_mtime
+
+
+def _local_path(directory, relative):
+    """Map a blob name to a path in the directory, or None if it can't be written there."""
+    parts = relative.split('/')
+    for part in parts:
+        if part in ('', '.', '..') or '\\' in part or ':' in part:
+            return None
+    return os.path.join(directory, *parts)
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError:
+        # Created by another download in the meantime
+        if not os.path.isdir(path):
+            raise
+
+
+class _SyncScheduler(object):
+    """Runs the operations of a sync on a thread pool, and collects their outcome.
+
+    At most max_concurrency operations run at the same time, and as many are queued:
+    submitting blocks when the queue is full, so that listing a large tree doesn't
+    get ahead of the transfers.
+    """
+
+    def __init__(self, max_concurrency):
+        import concurrent.futures
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_concurrency)
+        self._slots = threading.BoundedSemaphore(max_concurrency * 2)
+        self._lock = threading.Lock()
+        self.result = DirectorySyncResult()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._executor.shutdown(wait=True)
+
+    def submit(self, key, outcome, operation, *args):
+        """Schedule an operation. If it returns False, the file was found to be unchanged."""
+        self._slots.acquire()
+        self._executor.submit(self._run, key, outcome, operation, args)
+
+    def _run(self, key, outcome, operation, args):
+        try:
+            changed = operation(*args)
+        except Exception as error:  # pylint: disable=broad-except
+            with self._lock:
+                self.result.failed[key] = error
+        else:
+            with self._lock:
+                if changed is False:
+                    self.result.unchanged += 1
+                else:
+                    getattr(self.result, outcome).append(key)
+        finally:
+            self._slots.release()
+
+    def skip(self):
+        with self._lock:
+            self.result.unchanged += 1
+
+    def fail(self, key, error):
+        with self._lock:
+            self.result.failed[key] = error
+
+
+def sync_directory_to_container(
+        container, directory, prefix, delete_extra, compare_md5, max_concurrency, timeout, **kwargs):
+    local_files = {prefix + relative: (relative, size, mtime) for relative, size, mtime in _walk(directory)}
+
+    def upload(name, relative, blob_md5=None):
+        path = os.path.join(directory, *relative.split('/'))
+        content_md5 = _md5(path) if compare_md5 else None
+        if blob_md5 is not None and content_md5 == blob_md5:
+            return False
+        with open(path, 'rb') as data:
+            container.upload_blob(
+                name,
+                data,
+                overwrite=True,
+                content_settings=ContentSettings(content_md5=content_md5) if content_md5 else None,
+                timeout=timeout,
+                **kwargs)
+        return True
+
+    def delete(name):
+        container.delete_blob(name, timeout=timeout, **kwargs)
+
+    with _SyncScheduler(max_concurrency) as scheduler:
+        for blob in container.list_blobs(name_starts_with=prefix or None, timeout=timeout):
+            local = local_files.pop(blob.name, None)
+            if local is None:
+                if delete_extra:
+                    scheduler.submit(blob.name, 'deleted', delete, blob.name)
+                continue
+            relative, size, mtime = local
+            blob_md5 = blob.content_settings.content_md5
+            if size != blob.size:
+                scheduler.submit(blob.name, 'transferred', upload, blob.name, relative)
+            elif compare_md5 and blob_md5:
+                scheduler.submit(blob.name, 'transferred', upload, blob.name, relative, blob_md5)
+            elif mtime > _timestamp(blob.last_modified):
+                scheduler.submit(blob.name, 'transferred', upload, blob.name, relative)
+            else:
+                scheduler.skip()
+
+        # The files that are not in the container yet
+        for name, (relative, _, _) in local_files.items():
+            scheduler.submit(name, 'transferred', upload, name, relative)
+    return scheduler.result
+
+
+def sync_container_to_directory(
+        container, directory, prefix, delete_extra, compare_md5, max_concurrency, timeout, **kwargs):
+    local_files = {relative: (size, mtime) for relative, size, mtime in _walk(directory)}
+
+    def download(blob, path, local_md5=False):
+        if local_md5 and _md5(path) == blob.content_settings.content_md5:
+            return False
+        _makedirs(os.path.dirname(path))
+        with open(path, 'wb') as stream:
+            # Lock on the listed version of the blob, which gives the local mtime
+            downloader = container.get_blob_client(blob.name).download_blob(
+                if_match=blob.etag, timeout=timeout, **kwargs)
+            downloader.download_to_stream(stream)
+        last_modified = _timestamp(blob.last_modified)
+        os.utime(path, (last_modified, last_modified))
+        return True
+
+    def delete(path):
+        os.remove(path)
+
+    with _SyncScheduler(max_concurrency) as scheduler:
+        for blob in container.list_blobs(name_starts_with=prefix or None, timeout=timeout):
+            relative = blob.name[len(prefix):]
+            if blob.name.endswith('/'):
+                # A folder placeholder
+                continue
+            path = _local_path(directory, relative)
+            if path is None:
+                scheduler.fail(blob.name, ValueError("The blob name is not a valid local path."))
+                continue
+            local = local_files.pop(relative, None)
+            if local is None or local[0] != blob.size:
+                scheduler.submit(blob.name, 'transferred', download, blob, path)
+            elif compare_md5 and blob.content_settings.content_md5:
+                scheduler.submit(blob.name, 'transferred', download, blob, path, True)
+            elif _timestamp(blob.last_modified) > local[1]:
+                scheduler.submit(blob.name, 'transferred', download, blob, path)
+            else:
+                scheduler.skip()
+
+        if delete_extra:
+            # The files that are not in the container anymore
+            for relative in local_files:
+                path = os.path.join(directory, *relative.split('/'))
+                scheduler.submit(path, 'deleted', delete, path)
+    return scheduler.result
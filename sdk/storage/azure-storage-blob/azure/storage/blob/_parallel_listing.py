@@ -0,0 +1,182 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import collections
+import threading
+try:
+    from queue import Queue, Full
+except ImportError:  # Python 2.7
+    from Queue import Queue, Full  # type: ignore
+
+from ._shared.utils import process_storage_error
+from ._generated.models import StorageErrorException
+from .models import BlobProperties
+
+# The number of listed blobs that a shard can get ahead of the consumer
+_SHARD_BUFFER_SIZE = 5000
+_END = object()
+
+
+class _Shard(object):
+    """The blobs under a prefix. A shard with a depth lists its sub-prefixes as shards of their own."""
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.entries = Queue(_SHARD_BUFFER_SIZE)
+        self.started = False
+
+
+class PartitionedBlobListing(object):  # pylint: disable=too-many-instance-attributes
+    """Lists the blobs of a container by prefix shards, in parallel.
+
+    The shards are the "directories" found by a hierarchy listing down to partition_depth
+    levels, below which each shard is listed flat. Each shard is listed by its own thread:
+    at most max_concurrency requests are in flight, and as many shards are listed ahead of
+    the consumer, each buffering a bounded number of blobs.
+
+    In order, the shards are consumed one after the other as they appear in the listing,
+    which yields the blobs sorted by name. Otherwise, the blobs are yielded as they arrive.
+    """
+
+    def __init__(
+            self, container_operations, container, prefix, include, delimiter,
+            partition_depth, max_concurrency, ordered, results_per_page, timeout, **kwargs):
+        self._operations = container_operations
+        self._container = container
+        self._request_options = dict(
+            include=include, maxresults=results_per_page, timeout=timeout, **kwargs)
+        self._delimiter = delimiter
+        self._ordered = ordered
+        self._root = _Shard(prefix, partition_depth)
+        self._fetch_slots = threading.Semaphore(max_concurrency)
+        self._max_open = 2 * max_concurrency
+        self._lock = threading.Lock()
+        self._open = 0
+        self._discovered = 1
+        self._waiting = collections.deque()  # type: collections.deque
+        # When unordered, all the shards share one buffer
+        self._output = None if ordered else Queue(_SHARD_BUFFER_SIZE)
+        self._closed = False
+
+    def __iter__(self):
+        try:
+            if self._ordered:
+                for blob in self._iter_shard(self._root):
+                    yield blob
+            else:
+                for blob in self._iter_unordered():
+                    yield blob
+        finally:
+            self._closed = True
+
+    def _start(self, shard):
+        # Called with the lock held
+        if not shard.started:
+            shard.started = True
+            self._open += 1
+            thread = threading.Thread(target=self._list_shard, args=(shard,))
+            thread.daemon = True
+            thread.start()
+
+    def _add_shard(self, shard):
+        with self._lock:
+            self._discovered += 1
+            if self._open < self._max_open:
+                self._start(shard)
+            else:
+                self._waiting.append(shard)
+
+    def _shard_done(self):
+        with self._lock:
+            self._open -= 1
+            while self._waiting and self._open < self._max_open:
+                self._start(self._waiting.popleft())
+
+    def _put(self, queue, entry):
+        # Give up if the consumer stopped iterating
+        while not self._closed:
+            try:
+                queue.put(entry, timeout=1)
+                return
+            except Full:
+                pass
+
+    def _list_page(self, shard, marker):
+        try:
+            with self._fetch_slots:
+                if shard.depth > 0:
+                    response = self._operations.list_blob_hierarchy_segment(
+                        delimiter=self._delimiter, prefix=shard.name, marker=marker, **self._request_options)
+                else:
+                    response = self._operations.list_blob_flat_segment(
+                        prefix=shard.name, marker=marker, **self._request_options)
+        except StorageErrorException as error:
+            process_storage_error(error)
+        return response
+
+    def _list_shard(self, shard):
+        queue = shard.entries if self._ordered else self._output
+        try:
+            marker = None
+            while not self._closed:
+                response = self._list_page(shard, marker)
+                entries = []
+                for item in response.segment.blob_items or []:
+                    blob = BlobProperties._from_generated(item)  # pylint: disable=protected-access
+                    blob.container = self._container
+                    entries.append(blob)
+                for prefix in getattr(response.segment, 'blob_prefixes', None) or []:
+                    child = _Shard(prefix.name, shard.depth - 1)
+                    self._add_shard(child)
+                    if self._ordered:
+                        entries.append(child)
+                if self._ordered:
+                    # The sub-prefixes are placed among the blobs, so their blobs keep the name order
+                    entries.sort(key=lambda e: e.name)
+                for entry in entries:
+                    self._put(queue, entry)
+                marker = response.next_marker
+                if not marker:
+                    break
+            self._put(queue, _END if self._ordered else shard)
+        except Exception as error:  # pylint: disable=broad-except
+            self._put(queue, error)
+
+    def _iter_shard(self, shard):
+        with self._lock:
+            # A shard can be waiting for a slot when its turn comes
+            self._start(shard)
+        while True:
+            entry = shard.entries.get()
+            if entry is _END:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+            if isinstance(entry, _Shard):
+                for blob in self._iter_shard(entry):
+                    yield blob
+            else:
+                yield entry
+        self._shard_done()
+
+    def _iter_unordered(self):
+        with self._lock:
+            self._start(self._root)
+        completed = 0
+        while True:
+            entry = self._output.get()
+            if isinstance(entry, Exception):
+                raise entry
+            if isinstance(entry, _Shard):
+                self._shard_done()
+                completed += 1
+                # The sub-prefixes of a shard are counted before it completes
+                with self._lock:
+                    if completed == self._discovered:
+                        return
+            else:
+                yield entry
@@ -3,13 +3,16 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
+import bisect
+import collections
+import hashlib
 import threading
 
-from azure.core.exceptions import HttpResponseError
+from azure.core.exceptions import AzureError, HttpResponseError
 
 from .models import ModifiedAccessConditions
-from .utils import validate_and_format_range_headers, process_storage_error
-from .encryption import _decrypt_blob
+from .utils import encode_base64, validate_and_format_range_headers, process_storage_error
+from .encryption import _decrypt_blob_content
 
 
 def process_range_and_offset(start_range, end_range, length, key_encryption_key, key_resolver_function):
@@ -27,22 +30,60 @@ def process_range_and_offset(start_range, end_range, length, key_encryption_key,
                 start_offset += 16
                 start_range -= 16
 
-        if length is not None:
+        if end_range is not None:
             # Align the end of the range along a 16 byte block
-            end_offset = 15 - (end_range % 16)
-            end_range += end_offset
+            aligned_end = 15 - (end_range % 16)
+            end_range += aligned_end
+
+            # Without a length, the extra bytes are part of the download, and
+            # the range may go past the end of the blob so they can't be trimmed
+            if length is not None:
+                end_offset = aligned_end
 
     return (start_range, end_range), (start_offset, end_offset)
 
 
-def process_content(blob, start_offset, end_offset, require_encryption, key_encryption_key, key_resolver_function):
+def validate_content_md5(expected_md5, md5, response=None):
+    computed_md5 = encode_base64(md5.digest())
+    if expected_md5 != computed_md5:
+        raise AzureError(
+            'MD5 mismatch. Expected value is \'{0}\', computed value is \'{1}\'.'.format(
+                expected_md5, computed_md5),
+            response=response
+        )
+
+
+def read_content(blob, validate_content):
+    """Read the chunks of a download response, and check their MD5 if asked to.
+
+    The chunks are hashed as they are received from the socket, instead of the
+    content validation policy loading the whole body first and hashing it after.
+    """
+    md5, expected_md5 = None, None
+    if validate_content:
+        expected_md5 = blob.response.headers.get('content-md5')
+        md5 = hashlib.md5() if expected_md5 else None
+    chunks = []
+    for chunk in blob:
+        if md5 is not None:
+            md5.update(chunk)
+        chunks.append(chunk)
+    if md5 is not None:
+        validate_content_md5(expected_md5, md5, blob.response)
+    return b"".join(chunks)
+
+
+def process_content(blob, start_offset, end_offset, require_encryption, key_encryption_key, key_resolver_function,
+                    validate_content=False):
+    content = read_content(blob, validate_content)
     if key_encryption_key is not None or key_resolver_function is not None:
         try:
-            return _decrypt_blob(
+            return _decrypt_blob_content(
                 require_encryption,
                 key_encryption_key,
                 key_resolver_function,
-                blob,
+                content,
+                blob.response.headers,
                 start_offset,
                 end_offset)
         except Exception as error:
@@ -50,8 +91,61 @@ def process_content(blob, start_offset, end_offset, require_encryption, key_encr
                 message="Decryption failed.",
                 response=blob.response,
                 error=error)
-    else:
-        return b"".join(list(blob))
+    return content
+
+
+def process_chunks_in_order(process, offsets, max_connections):
+    """Call process on each chunk offset, in a pool of max_connections threads.
+
+    Unlike executor.map, the offsets are submitted as the oldest chunk completes, so
+    that no more than 2 * max_connections chunks are downloaded ahead of the first one
+    not done, even when a single chunk is slow. The first error stops the submissions,
+    and is raised once the running chunks are done.
+    """
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_connections) as executor:
+        submitted = collections.deque()  # type: collections.deque
+        try:
+            for offset in offsets:
+                if len(submitted) >= max_connections * 2:
+                    submitted.popleft().result()
+                submitted.append(executor.submit(process, offset))
+        finally:
+            concurrent.futures.wait(submitted)
+        for future in submitted:
+            future.result()
+
+
+class RollingContentMD5(object):
+    """The MD5 of a whole blob, computed as its chunks are downloaded.
+
+    The chunks are hashed in order. A chunk that completes before the ones ahead of it is
+    held until they are hashed. process_chunks_in_order bounds those to the chunks of its
+    window, 2 * max_connections at most.
+    """
+
+    def __init__(self):
+        self._md5 = hashlib.md5()
+        self._position = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def update(self, offset, data):
+        with self._lock:
+            if offset != self._position:
+                self._pending[offset] = data
+                return
+            while data is not None:
+                self._md5.update(data)
+                self._position += len(data)
+                data = self._pending.pop(self._position, None)
+
+    def validate(self, expected_md5):
+        """Check the MD5 of the blob, once all its chunks are hashed.
+
+        :param bytearray expected_md5: The MD5 stored with the blob.
+        """
+        validate_content_md5(encode_base64(bytes(expected_md5)), self._md5)
 
 
 class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attributes
@@ -85,6 +179,9 @@ class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attribu
         self.validate_content = validate_content
         self.access_conditions = access_conditions
         self.mod_conditions = mod_conditions
+
+        # the rolling MD5 of the blob, when the whole blob is downloaded
+        self.blob_md5 = kwargs.pop('blob_md5', None)
         self.request_options = kwargs
 
     def _calculate_range(self, chunk_start):
@@ -107,10 +204,15 @@ class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attribu
         if length > 0:
             self._write_to_stream(chunk_data, chunk_start)
             self._update_progress(length)
+            if self.blob_md5 is not None:
+                self.blob_md5.update(chunk_start, chunk_data)
 
     def yield_chunk(self, chunk_start):
         chunk_start, chunk_end = self._calculate_range(chunk_start)
-        return self._download_chunk(chunk_start, chunk_end)
+        chunk_data = self._download_chunk(chunk_start, chunk_end)
+        if self.blob_md5 is not None:
+            self.blob_md5.update(chunk_start, chunk_data)
+        return chunk_data
 
     # should be provided by the subclass
     def _update_progress(self, length):
@@ -121,16 +223,17 @@ class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attribu
         pass
 
     def _download_chunk(self, chunk_start, chunk_end):
+        # The end of the chunk is exclusive, the end of the range is not
         download_range, offset = process_range_and_offset(
             chunk_start,
-            chunk_end,
+            chunk_end - 1,
             chunk_end,
             self.key_encryption_key,
             self.key_resolver_function,
         )
         range_header, range_validation = validate_and_format_range_headers(
             download_range[0],
-            download_range[1] - 1,
+            download_range[1],
             check_content_md5=self.validate_content)
 
         try:
@@ -140,7 +243,6 @@ class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attribu
                 range_get_content_md5=range_validation,
                 lease_access_conditions=self.access_conditions,
                 modified_access_conditions=self.mod_conditions,
-                validate_content=self.validate_content,
                 data_stream_total=self.download_size,
                 download_stream_current=self.progress_total,
                 **self.request_options)
@@ -153,7 +255,8 @@ class _BlobChunkDownloader(object):  # pylint: disable=too-many-instance-attribu
             offset[1],
             self.require_encryption,
             self.key_encryption_key,
-            self.key_resolver_function)
+            self.key_resolver_function,
+            self.validate_content)
 
         # This makes sure that if_match is set so that we can validate
         # that subsequent downloads are to an unmodified blob
@@ -193,6 +296,36 @@ class ParallelBlobChunkDownloader(_BlobChunkDownloader):
             self.stream.write(chunk_data)
 
 
+class SparseBlobChunkDownloader(ParallelBlobChunkDownloader):
+    """Downloads the given ranges of a blob only, and writes each chunk at its offset in the stream.
+
+    The ranges are sorted, with an inclusive end, and split into chunks. The rest of the stream is
+    not written, so in a file the ranges that were skipped are left as holes.
+    """
+
+    def __init__(
+            self, blob_service, ranges, chunk_size, stream, validate_content, access_conditions,
+            mod_conditions, timeout, **kwargs):
+        self.ranges = ranges
+        self.range_starts = [start for start, _ in ranges]
+        super(SparseBlobChunkDownloader, self).__init__(
+            blob_service, sum(end - start + 1 for start, end in ranges), chunk_size, 0, 0,
+            ranges[-1][1] + 1 if ranges else 0, stream, validate_content, access_conditions, mod_conditions,
+            timeout, False, None, None, **kwargs)
+
+    def _calculate_range(self, chunk_start):
+        # A chunk doesn't go past the end of its range
+        _, range_end = self.ranges[bisect.bisect_right(self.range_starts, chunk_start) - 1]
+        return chunk_start, min(chunk_start + self.chunk_size, range_end + 1)
+
+    def get_chunk_offsets(self):
+        for start, end in self.ranges:
+            index = start
+            while index <= end:
+                yield index
+                index += self.chunk_size
+
+
 class SequentialBlobChunkDownloader(_BlobChunkDownloader):
 
     def _update_progress(self, length):
@@ -0,0 +1,156 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import asyncio
+import collections
+import hashlib
+
+from azure.core.exceptions import HttpResponseError
+
+from .utils import validate_and_format_range_headers, process_storage_error
+from .encryption import _decrypt_blob_content
+from .download_chunking import process_range_and_offset, validate_content_md5
+
+
+def return_response_and_stream(response, deserialized, response_headers):  # pylint: disable=unused-argument
+    return response, deserialized
+
+
+async def read_content(response, stream, validate_content):
+    """Read the body of a download response from its stream, and check its MD5 if asked to.
+
+    The chunks are hashed as they are received, instead of once the whole body is loaded.
+    """
+    md5, expected_md5 = None, None
+    if validate_content:
+        expected_md5 = response.headers.get('content-md5')
+        md5 = hashlib.md5() if expected_md5 else None
+    chunks = []
+    async for chunk in stream:
+        if md5 is not None:
+            md5.update(chunk)
+        chunks.append(chunk)
+    if md5 is not None:
+        validate_content_md5(expected_md5, md5, response)
+    return b"".join(chunks)
+
+
+def process_content(response, content, start_offset, end_offset, require_encryption, key_encryption_key,
+                    key_resolver_function):
+    """Decrypt the content of a download response if the client is set up for encryption."""
+    if key_encryption_key is None and key_resolver_function is None:
+        return content
+    try:
+        return _decrypt_blob_content(
+            require_encryption,
+            key_encryption_key,
+            key_resolver_function,
+            content,
+            response.headers,
+            start_offset,
+            end_offset)
+    except Exception as error:
+        raise HttpResponseError(
+            message="Decryption failed.",
+            response=response,
+            error=error)
+
+
+class AsyncBlobChunkDownloader(object):  # pylint: disable=too-many-instance-attributes
+    """Downloads a range of a blob by chunks, and writes them to a stream in order.
+
+    At most max_connections chunks are downloaded at the same time. The next chunk is only
+    requested once the oldest one is written: a slow chunk holds back the window instead of
+    letting the completed chunks pile up in memory, and the stream doesn't need to be seekable.
+
+    With client-side encryption, each chunk is requested from the 16 byte block before it,
+    which holds its IV, and is decrypted on its own.
+    """
+
+    def __init__(
+            self, blob_service, download_size, chunk_size, progress, start_range, end_range, stream,
+            max_connections, validate_content, access_conditions, mod_conditions, timeout,
+            require_encryption=False, key_encryption_key=None, key_resolver_function=None, blob_md5=None,
+            **kwargs):
+        self.blob_service = blob_service
+        self.chunk_size = chunk_size
+        self.download_size = download_size
+        self.start_index = start_range
+        self.blob_end = end_range
+        self.stream = stream
+        self.max_connections = max_connections
+        self.progress_total = progress
+        self.timeout = timeout
+        self.validate_content = validate_content
+        self.access_conditions = access_conditions
+        self.mod_conditions = mod_conditions
+        self.require_encryption = require_encryption
+        self.key_encryption_key = key_encryption_key
+        self.key_resolver_function = key_resolver_function
+        self.blob_md5 = blob_md5
+        self.request_options = kwargs
+
+    def get_chunk_offsets(self):
+        index = self.start_index
+        while index < self.blob_end:
+            yield index
+            index += self.chunk_size
+
+    async def _download_chunk(self, chunk_start):
+        chunk_end = min(chunk_start + self.chunk_size, self.blob_end)
+        download_range, offset = process_range_and_offset(
+            chunk_start,
+            chunk_end - 1,
+            chunk_end,
+            self.key_encryption_key,
+            self.key_resolver_function)
+        range_header, range_validation = validate_and_format_range_headers(
+            download_range[0],
+            download_range[1],
+            check_content_md5=self.validate_content)
+        try:
+            response, stream = await self.blob_service.download(
+                timeout=self.timeout,
+                range=range_header,
+                range_get_content_md5=range_validation,
+                lease_access_conditions=self.access_conditions,
+                modified_access_conditions=self.mod_conditions,
+                cls=return_response_and_stream,
+                data_stream_total=self.download_size,
+                download_stream_current=self.progress_total,
+                **self.request_options)
+        except HttpResponseError as error:
+            process_storage_error(error)
+        content = await read_content(response, stream, self.validate_content)
+        return process_content(
+            response,
+            content,
+            offset[0],
+            offset[1],
+            self.require_encryption,
+            self.key_encryption_key,
+            self.key_resolver_function)
+
+    async def download(self):
+        pending = collections.deque()  # type: collections.deque
+        try:
+            for chunk_start in self.get_chunk_offsets():
+                if len(pending) >= self.max_connections:
+                    await self._write(*pending.popleft())
+                pending.append((chunk_start, asyncio.ensure_future(self._download_chunk(chunk_start))))
+            while pending:
+                await self._write(*pending.popleft())
+        finally:
+            for _, download in pending:
+                download.cancel()
+
+    async def _write(self, chunk_start, download):
+        chunk_data = await download
+        self.stream.write(chunk_data)
+        self.progress_total += len(chunk_data)
+        if self.blob_md5 is not None:
+            self.blob_md5.update(chunk_start, chunk_data)
+
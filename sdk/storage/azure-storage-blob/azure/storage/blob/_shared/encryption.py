@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------
 
 import os
+import threading
 from os import urandom
 from json import (
     dumps,
@@ -259,6 +260,53 @@ def _validate_and_unwrap_cek(encryption_data, key_encryption_key=None, key_resol
     return content_encryption_key
 
 
+class _CachedKeyEncryptionKey(object):
+    '''
+    Wraps a key-encryption-key to unwrap each content encryption key only once.
+    The chunks of a download are decrypted with the same key, which would otherwise be
+    unwrapped, possibly by a remote key vault, for each of them.
+    '''
+
+    def __init__(self, key_encryption_key):
+        self._key_encryption_key = key_encryption_key
+        self._unwrapped_keys = {}
+        self._lock = threading.Lock()
+
+    def get_kid(self):
+        return self._key_encryption_key.get_kid()
+
+    def unwrap_key(self, key, algorithm):
+        with self._lock:
+            if (key, algorithm) not in self._unwrapped_keys:
+                self._unwrapped_keys[(key, algorithm)] = self._key_encryption_key.unwrap_key(key, algorithm)
+            return self._unwrapped_keys[(key, algorithm)]
+
+
+def _cache_key_unwrapping(key_encryption_key, key_resolver):
+    '''
+    Returns a key-encryption-key and a key resolver that unwrap each content encryption key
+    only once, for the duration of a download.
+    '''
+    def cached(kek):
+        # Let the validation reject an incomplete key-encryption-key
+        if callable(getattr(kek, 'get_kid', None)) and callable(getattr(kek, 'unwrap_key', None)):
+            return _CachedKeyEncryptionKey(kek)
+        return kek
+
+    resolved_keys = {}
+    lock = threading.Lock()
+
+    def resolve(kid):
+        with lock:
+            if kid not in resolved_keys:
+                resolved_keys[kid] = cached(key_resolver(kid))
+            return resolved_keys[kid]
+
+    if key_encryption_key is not None:
+        key_encryption_key = cached(key_encryption_key)
+    return key_encryption_key, resolve if key_resolver is not None else None
+
+
 def _encrypt_blob(blob, key_encryption_key):
     '''
     Encrypts the given blob using AES256 in CBC mode with 128 bit padding.
@@ -349,11 +397,28 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     if response is None:
         raise ValueError("Response cannot be None.")
     content = b"".join(list(response))
+    return _decrypt_blob_content(
+        require_encryption, key_encryption_key, key_resolver, content, response.response.headers,
+        start_offset, end_offset)
+
+
+def _decrypt_blob_content(require_encryption, key_encryption_key, key_resolver,
+                          content, headers, start_offset, end_offset):
+    '''
+    Decrypts the content of a blob range, given the headers of the response it was downloaded by.
+
+    :param bytes content:
+        The encrypted content, from a 16 byte block boundary.
+    :param dict headers:
+        The response headers, which give the encryption metadata and the range of the content.
+    :return: The decrypted content, without the offsets.
+    :rtype: bytes
+    '''
     if not content:
         return content
 
     try:
-        encryption_data = _dict_to_encryption_data(loads(response.response.headers['x-ms-meta-encryptiondata']))
+        encryption_data = _dict_to_encryption_data(loads(headers['x-ms-meta-encryptiondata']))
     except:  # pylint: disable=bare-except
         if require_encryption:
             raise ValueError(_ERROR_DATA_NOT_ENCRYPTED)
@@ -363,12 +428,12 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     if encryption_data.encryption_agent.encryption_algorithm != _EncryptionAlgorithm.AES_CBC_256:
         raise ValueError(_ERROR_UNSUPPORTED_ENCRYPTION_ALGORITHM)
 
-    blob_type = response.response.headers['x-ms-blob-type']
+    blob_type = headers['x-ms-blob-type']
 
     iv = None
     unpad = False
-    if 'content-range' in response.response.headers:
-        content_range = response.response.headers['content-range']
+    if 'content-range' in headers:
+        content_range = headers['content-range']
         # Format: 'bytes x-y/size'
 
         # Ignore the word 'bytes'
@@ -5,13 +5,20 @@
 # --------------------------------------------------------------------------
 # pylint: disable=no-self-use
 
-from io import (BytesIO, IOBase, SEEK_CUR, SEEK_END, SEEK_SET, UnsupportedOperation)
+import errno
+import logging
+import mmap
+import os
+import stat
+from io import (BytesIO, IOBase, TextIOBase, SEEK_CUR, SEEK_END, SEEK_SET, UnsupportedOperation)
 from threading import Lock
 
 from math import ceil
 
 import six
 
+from azure.core.pipeline.transport import RewindableBody
+
 from .models import ModifiedAccessConditions
 from .utils import (
     encode_base64,
@@ -24,6 +31,70 @@ from .encryption import _get_blob_encryptor_and_padder
 _LARGE_BLOB_UPLOAD_MAX_READ_BUFFER_SIZE = 4 * 1024 * 1024
 _ERROR_VALUE_SHOULD_BE_SEEKABLE_STREAM = '{0} should be a seekable file-like/io.IOBase type stream object.'
 
+_LOGGER = logging.getLogger(__name__)
+
+
+def _mmap_file(stream):
+    """Map the file of the stream in memory, or return None if the stream is not a regular file."""
+    if isinstance(stream, TextIOBase):
+        return None
+    try:
+        fileno = stream.fileno()
+        file_stat = os.fstat(fileno)
+        if not stat.S_ISREG(file_stat.st_mode) or not file_stat.st_size:
+            return None
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, EnvironmentError, UnsupportedOperation, ValueError):
+        return None
+
+
+def _close_mmap(mapped):
+    try:
+        mapped.close()
+    except BufferError:
+        # A transport still holds a slice of a block: the map is closed once it's released
+        _LOGGER.debug("Memory-mapped upload source still in use, leaving it to the garbage collector.")
+
+
+def _get_data_extents(stream, start, length):
+    """Find the ranges of a file that hold data, skipping its holes.
+
+    The ranges are relative to start, with an exclusive end. Returns None if the stream is
+    not a regular file or if the platform can't seek to data and holes.
+    """
+    if not hasattr(os, 'SEEK_DATA') or isinstance(stream, TextIOBase):
+        return None
+    try:
+        fileno = stream.fileno()
+        if not stat.S_ISREG(os.fstat(fileno).st_mode):
+            return None
+        extents = []
+        end = start + length
+        position = start
+        while position < end:
+            try:
+                data_start = os.lseek(fileno, position, os.SEEK_DATA)
+            except OSError as error:
+                if error.errno == errno.ENXIO:
+                    # No data after the position
+                    break
+                raise
+            if data_start >= end:
+                break
+            data_end = min(os.lseek(fileno, data_start, os.SEEK_HOLE), end)
+            extents.append((data_start - start, data_end - start))
+            position = data_end
+        return extents
+    except (AttributeError, EnvironmentError, UnsupportedOperation, ValueError):
+        return None
+    finally:
+        # The file offset was moved under the stream: seeking to the end drops its read buffer
+        try:
+            stream.seek(0, SEEK_END)
+            stream.seek(start, SEEK_SET)
+        except (AttributeError, EnvironmentError, UnsupportedOperation, ValueError):
+            pass
+
 
 def upload_blob_chunks(blob_service, blob_size, block_size, stream, max_connections, validate_content,  # pylint: disable=too-many-locals
                        access_conditions, uploader_class, append_conditions=None, modified_access_conditions=None,
@@ -121,12 +192,19 @@ def upload_blob_substream_blocks(blob_service, blob_size, block_size, stream, ma
     else:
         uploader.modified_access_conditions = modified_access_conditions
 
-    if max_connections > 1:
-        import concurrent.futures
-        executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-        range_ids = list(executor.map(uploader.process_substream_block, uploader.get_substream_blocks()))
-    else:
-        range_ids = [uploader.process_substream_block(result) for result in uploader.get_substream_blocks()]
+    # Files are memory-mapped, so blocks are sent from the page cache without copies or locks
+    mapped = _mmap_file(stream)
+    blocks = uploader.get_mmap_blocks(mapped) if mapped is not None else uploader.get_substream_blocks()
+    try:
+        if max_connections > 1:
+            import concurrent.futures
+            executor = concurrent.futures.ThreadPoolExecutor(max_connections)
+            range_ids = list(executor.map(uploader.process_substream_block, blocks))
+        else:
+            range_ids = [uploader.process_substream_block(result) for result in blocks]
+    finally:
+        if mapped is not None:
+            _close_mmap(mapped)
 
     return range_ids
 
@@ -230,6 +308,19 @@ class _BlobChunkUploader(object):  # pylint: disable=too-many-instance-attribute
                    _SubStream(self.stream, i * self.chunk_size, last_block_size if i == blocks - 1 else self.chunk_size,
                               lock))
 
+    def get_mmap_blocks(self, mapped):
+        assert self.chunk_size is not None
+        start = self.stream.tell()
+        blob_length = len(mapped) - start
+        if self.blob_size is not None:
+            blob_length = min(self.blob_size, blob_length)
+
+        blocks = int(ceil(blob_length / (self.chunk_size * 1.0)))
+        for i in range(blocks):
+            offset = i * self.chunk_size
+            yield ('BlockId{}'.format("%05d" % i),
+                   RewindableBody(mapped, offset=start + offset, length=min(self.chunk_size, blob_length - offset)))
+
     def process_substream_block(self, block_data):
         return self._upload_substream_block_with_progress(block_data[0], block_data[1])
 
@@ -281,13 +372,45 @@ class BlockBlobChunkUploader(_BlobChunkUploader):
 
 class PageBlobChunkUploader(_BlobChunkUploader):  # pylint: disable=abstract-method
 
+    _page_size = 512
+
+    def get_chunk_streams(self):
+        # The pages of an encrypted blob depend on the ones before them, so they are all read
+        start = self.stream.tell()
+        extents = _get_data_extents(self.stream, start, self.blob_size) if self.encryptor is None else None
+        if extents is None:
+            for chunk in super(PageBlobChunkUploader, self).get_chunk_streams():
+                yield chunk
+            return
+
+        # Only the pages of a sparse file that hold data are read, the holes are left empty in the blob
+        for extent_start, extent_end in self._align_extents(extents):
+            for index in range(extent_start, extent_end, self.chunk_size):
+                self.stream.seek(start + index, SEEK_SET)
+                data = self.stream.read(min(self.chunk_size, extent_end - index))
+                if not isinstance(data, six.binary_type):
+                    raise TypeError('Blob data should be of type bytes.')
+                if not data:
+                    # The file is shorter than the blob
+                    return
+                yield index, data
+        self.stream.seek(start + self.blob_size, SEEK_SET)
+
+    def _align_extents(self, extents):
+        # Widen the ranges to whole pages, merging the ones that then share a page
+        aligned = []
+        for extent_start, extent_end in extents:
+            extent_start -= extent_start % self._page_size
+            extent_end = min(self.blob_size, extent_end + (-extent_end % self._page_size))
+            if aligned and extent_start <= aligned[-1][1]:
+                aligned[-1] = (aligned[-1][0], max(aligned[-1][1], extent_end))
+            else:
+                aligned.append((extent_start, extent_end))
+        return aligned
+
     def _is_chunk_empty(self, chunk_data):
-        # read until non-zero byte is encountered
-        # if reached the end without returning, then chunk_data is all 0's
-        for each_byte in chunk_data:
-            if each_byte not in [0, b'\x00']:
-                return False
-        return True
+        # Counting the zeros doesn't copy the chunk, unlike stripping them
+        return chunk_data.count(b'\x00') == len(chunk_data)
 
     def _upload_chunk(self, chunk_offset, chunk_data):
         # avoid uploading the empty pages
@@ -540,7 +663,5 @@ class IterStreamer(object):
         except StopIteration:
             pass
 
-        if count > size:
-            self.leftover = data[size:]
-
+        self.leftover = data[size:]
         return data[:size]
@@ -0,0 +1,140 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import asyncio
+
+import six
+
+from azure.core.pipeline.transport import RewindableBody
+
+from .utils import encode_base64
+from .encryption import _get_blob_encryptor_and_padder
+
+
+class BufferPool(object):
+    """A bounded pool of reusable chunk buffers.
+
+    Buffers are allocated on demand, up to the size of the pool. Once they are all in use,
+    acquire() waits until one is released: reading the source can't get ahead of the uploads.
+
+    :param int size: The number of buffers.
+    :param int buffer_size: The size of each buffer in bytes.
+    """
+
+    def __init__(self, size, buffer_size):
+        self.buffer_size = buffer_size
+        self._free = []
+        self._available = asyncio.Semaphore(size)
+
+    async def acquire(self):
+        await self._available.acquire()
+        if self._free:
+            return self._free.pop()
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        self._free.append(buffer)
+        self._available.release()
+
+
+def _read_into(stream, buffer, size):
+    """Fill the start of the buffer from the stream, and return the number of bytes read."""
+    view = memoryview(buffer)
+    read = 0
+    readinto = getattr(stream, 'readinto', None)
+    while read < size:
+        if readinto is not None:
+            count = readinto(view[read:size])
+        else:
+            data = stream.read(size - read)
+            if not isinstance(data, six.binary_type):
+                raise TypeError('Blob data should be of type bytes.')
+            count = len(data)
+            view[read:read + count] = data
+        if not count:
+            break
+        read += count
+    return read
+
+
+async def upload_blob_chunks(  # pylint: disable=too-many-locals
+        blob_service, blob_size, block_size, stream, max_connections, validate_content, access_conditions,
+        timeout=None, content_encryption_key=None, initialization_vector=None, **kwargs):
+    """Stage the stream as blocks, with at most max_connections uploads at the same time.
+
+    The blocks are read in max_connections + 1 reusable buffers, the extra one so that the
+    next block is ready when an upload completes. An upload failure cancels the others.
+
+    With a content encryption key, each block is encrypted as it is read, continuing the
+    AES-CBC chain of the previous one, and the padding is added to the last block.
+
+    :returns: The list of block IDs, in order.
+    :rtype: list[str]
+    """
+    pool = BufferPool(max_connections + 1, block_size)
+    connections = asyncio.Semaphore(max_connections)
+    state = {'progress': 0}
+
+    encryptor, padder = _get_blob_encryptor_and_padder(content_encryption_key, initialization_vector, True)
+
+    async def upload_chunk(block_id, buffer, data, length):
+        try:
+            async with connections:
+                body = RewindableBody(data, length=length)
+                try:
+                    await blob_service.stage_block(
+                        block_id,
+                        length,
+                        body,
+                        timeout=timeout,
+                        lease_access_conditions=access_conditions,
+                        validate_content=validate_content,
+                        data_stream_total=blob_size,
+                        upload_stream_current=state['progress'],
+                        **kwargs)
+                finally:
+                    body.close()
+                state['progress'] += length
+        finally:
+            pool.release(buffer)
+
+    block_ids = []
+    uploads = []
+    offset = 0
+    read = 0
+    last = False
+    try:
+        while not last:
+            buffer = await pool.acquire()
+            for upload in uploads:
+                # Fail fast
+                if upload.done() and upload.exception():
+                    raise upload.exception()
+            read_size = block_size if blob_size is None else min(block_size, blob_size - read)
+            length = _read_into(stream, buffer, read_size)
+            read += length
+            last = length < read_size or (blob_size is not None and read >= blob_size)
+            data = buffer
+            if encryptor is not None:
+                # The block is encrypted to a copy, which can be longer once padded. The buffer
+                # is still released after the upload, which keeps the reads behind the uploads.
+                data = encryptor.update(padder.update(memoryview(buffer)[:length]))
+                if last:
+                    data += encryptor.update(padder.finalize()) + encryptor.finalize()
+                length = len(data)
+            if not length:
+                pool.release(buffer)
+                break
+            block_id = encode_base64('{0:032d}'.format(offset))
+            block_ids.append(block_id)
+            uploads.append(asyncio.ensure_future(upload_chunk(block_id, buffer, data, length)))
+            offset += length
+        if uploads:
+            await asyncio.gather(*uploads)
+    finally:
+        for upload in uploads:
+            upload.cancel()
+    return block_ids
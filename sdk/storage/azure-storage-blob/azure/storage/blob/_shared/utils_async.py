@@ -0,0 +1,95 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+from typing import (  # pylint: disable=unused-import
+    Any, Tuple, TYPE_CHECKING
+)
+import logging
+
+from azure.core import Configuration
+from azure.core.pipeline import AsyncPipeline
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.core.pipeline.policies import (
+    AsyncRedirectPolicy,
+    AsyncBearerTokenCredentialPolicy,
+    ContentDecodePolicy)
+
+from .constants import STORAGE_OAUTH_SCOPE, DEFAULT_SOCKET_TIMEOUT
+from .authentication import SharedKeyCredentialPolicy
+from .policies import (
+    StorageContentValidation,
+    StorageRequestHook,
+    StorageHosts,
+    QueueMessagePolicy)
+from .policies_async import AsyncStorageResponseHook, AsyncStorageRetryPolicy
+from .utils import StorageAccountHostsMixin, create_configuration
+
+if TYPE_CHECKING:
+    from azure.core.pipeline.transport import AsyncHttpTransport
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncStorageAccountHostsMixin(StorageAccountHostsMixin):
+    """Same as the sync mixin, with an async pipeline.
+
+    All the requests of a client go through one transport, so they share its aiohttp session
+    and its connection pool. Pass the same transport to several clients to share it between them.
+    """
+
+    def _create_pipeline(self, credential, **kwargs):  # pylint: disable=no-self-use
+        # type: (Any, **Any) -> Tuple[Configuration, AsyncPipeline]
+        return create_async_pipeline(credential, **kwargs)
+
+    async def __aenter__(self):
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        await self._client.__aexit__(*args)
+
+    async def close(self):
+        """Close the transport of the client and its aiohttp session.
+
+        A transport shared between clients must only be closed once they are all done.
+        """
+        await self._client.__aexit__()
+
+
+def create_async_pipeline(credential, **kwargs):
+    # type: (Any, **Any) -> Tuple[Configuration, AsyncPipeline]
+    credential_policy = None
+    if hasattr(credential, 'get_token'):
+        credential_policy = AsyncBearerTokenCredentialPolicy(credential, STORAGE_OAUTH_SCOPE)
+    elif isinstance(credential, SharedKeyCredentialPolicy):
+        credential_policy = credential
+    elif credential is not None:
+        raise TypeError("Unsupported credential: {}".format(credential))
+
+    config = kwargs.get('_configuration') or create_configuration(**kwargs)
+    if kwargs.get('_pipeline'):
+        return config, kwargs['_pipeline']
+    transport = kwargs.get('transport')  # type: AsyncHttpTransport
+    if 'connection_timeout' not in kwargs:
+        kwargs['connection_timeout'] = DEFAULT_SOCKET_TIMEOUT
+    if not transport:
+        transport = AioHttpTransport(**kwargs)
+    policies = [
+        QueueMessagePolicy(),
+        config.headers_policy,
+        config.user_agent_policy,
+        StorageContentValidation(),
+        StorageRequestHook(**kwargs),
+        credential_policy,
+        ContentDecodePolicy(),
+        AsyncRedirectPolicy(**kwargs),
+        StorageHosts(**kwargs),
+        AsyncStorageRetryPolicy(config.retry_policy),
+        config.logging_policy,
+        AsyncStorageResponseHook(**kwargs),
+    ]
+    return config, AsyncPipeline(transport, policies=policies)
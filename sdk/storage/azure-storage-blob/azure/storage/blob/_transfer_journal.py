@@ -0,0 +1,83 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import json
+import os
+import threading
+
+
+class TransferJournal(object):
+    """An on-disk record of the completed pieces of a transfer, to resume it after a failure.
+
+    The first line of the journal describes the transfer, and each following line is a
+    completed piece (a block ID or a chunk offset). A journal that describes another transfer,
+    or another state of the blob, is discarded when it is opened.
+
+    :param str path: The path of the journal file.
+    :param dict header: The description of the transfer, including the ETag it is valid for.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.completed = set()  # type: set
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as journal:
+                lines = journal.read().splitlines()
+        except (IOError, OSError):
+            return
+        try:
+            if not lines or json.loads(lines[0]) != self.header:
+                return
+        except ValueError:
+            return
+        for line in lines[1:]:
+            try:
+                self.completed.add(json.loads(line))
+            except ValueError:
+                # The last record of an interrupted transfer may be truncated
+                break
+
+    def open(self):
+        """Load the pieces completed by a previous run of the same transfer, and start recording."""
+        self._load()
+        # Rewrite the journal, which drops the records of another transfer
+        self._file = open(self.path, 'w')
+        self._file.write(json.dumps(self.header) + '\n')
+        for piece in self.completed:
+            self._file.write(json.dumps(piece) + '\n')
+        self._file.flush()
+
+    def record(self, piece):
+        """Record a completed piece, before the next one is started."""
+        with self._lock:
+            self._file.write(json.dumps(piece) + '\n')
+            self._file.flush()
+            self.completed.add(piece)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def delete(self):
+        """Remove the journal, once the transfer is complete."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,261 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import six
+from azure.core.exceptions import ResourceModifiedError
+
+from .._shared.utils import (
+    process_storage_error,
+    validate_and_format_range_headers,
+    parse_length_from_content_range,
+    return_response_headers)
+from .._shared.models import ModifiedAccessConditions
+from .._shared.encryption import _generate_blob_encryption_data, _encrypt_blob, _cache_key_unwrapping
+from .._shared.upload_chunking_async import upload_blob_chunks
+from .._shared.download_chunking import process_range_and_offset, RollingContentMD5
+from .._shared.download_chunking_async import AsyncBlobChunkDownloader, read_content, process_content
+from .._generated.models import StorageErrorException, BlockLookupList
+from .._blob_utils import (
+    _convert_mod_error,
+    deserialize_blob_properties,
+    get_modification_conditions)
+
+
+def _return_response_stream_and_properties(response, obj, headers):
+    return response, obj, deserialize_blob_properties(response, obj, headers)
+
+
+async def upload_block_blob(  # pylint: disable=too-many-locals
+        client,
+        stream,
+        length,
+        overwrite,
+        headers,
+        blob_headers,
+        access_conditions,
+        mod_conditions,
+        validate_content,
+        timeout,
+        max_connections,
+        blob_settings,
+        key_encryption_key,
+        **kwargs):
+    try:
+        overwrite_mod_conditions = None
+        if not overwrite:
+            overwrite_mod_conditions = get_modification_conditions(if_none_match='*')
+        adjusted_count = length
+        if (key_encryption_key is not None) and (adjusted_count is not None):
+            adjusted_count += (16 - (length % 16))
+
+        # Do single put if the size is smaller than config.max_single_put_size
+        if adjusted_count is not None and adjusted_count < blob_settings.max_single_put_size:
+            data = stream.read(length)
+            if not isinstance(data, six.binary_type):
+                raise TypeError('Blob data should be of type bytes.')
+            if key_encryption_key:
+                encryption_data, data = _encrypt_blob(data, key_encryption_key)
+                headers['x-ms-meta-encryptiondata'] = encryption_data
+            return await client.upload(
+                data,
+                content_length=adjusted_count,
+                timeout=timeout,
+                blob_http_headers=blob_headers,
+                lease_access_conditions=access_conditions,
+                modified_access_conditions=mod_conditions or overwrite_mod_conditions,
+                headers=headers,
+                cls=return_response_headers,
+                validate_content=validate_content,
+                data_stream_total=adjusted_count,
+                upload_stream_current=0,
+                **kwargs)
+
+        cek, iv = None, None
+        if key_encryption_key:
+            cek, iv, encryption_data = _generate_blob_encryption_data(key_encryption_key)
+            headers['x-ms-meta-encryptiondata'] = encryption_data
+        block_ids = await upload_blob_chunks(
+            blob_service=client,
+            blob_size=length,
+            block_size=blob_settings.max_block_size,
+            stream=stream,
+            max_connections=max_connections,
+            validate_content=validate_content,
+            access_conditions=access_conditions,
+            timeout=timeout,
+            content_encryption_key=cek,
+            initialization_vector=iv,
+            **kwargs)
+
+        block_lookup = BlockLookupList(committed=[], uncommitted=[], latest=[])
+        block_lookup.latest = block_ids
+        return await client.commit_block_list(
+            block_lookup,
+            blob_http_headers=blob_headers,
+            lease_access_conditions=access_conditions,
+            timeout=timeout,
+            modified_access_conditions=mod_conditions or overwrite_mod_conditions,
+            cls=return_response_headers,
+            validate_content=validate_content,
+            headers=headers,
+            **kwargs)
+    except StorageErrorException as error:
+        try:
+            process_storage_error(error)
+        except ResourceModifiedError as mod_error:
+            if overwrite_mod_conditions:
+                _convert_mod_error(mod_error)
+            raise
+
+
+async def download_blob_to_stream(  # pylint: disable=too-many-locals
+        service,
+        stream,
+        offset,
+        length,
+        validate_content,
+        access_conditions,
+        mod_conditions,
+        timeout,
+        max_connections,
+        blob_settings,
+        require_encryption,
+        key_encryption_key,
+        key_resolver_function,
+        **kwargs):
+    # The chunks are decrypted with the content encryption key unwrapped once for all of them
+    key_encryption_key, key_resolver_function = _cache_key_unwrapping(key_encryption_key, key_resolver_function)
+
+    # The service only provides transactional MD5s for chunks under 4MB.
+    # If validate_content is on, get only max_chunk_get_size for the first
+    # chunk so a transactional MD5 can be retrieved.
+    first_get_size = blob_settings.max_single_get_size if not validate_content \
+        else blob_settings.max_chunk_get_size
+    initial_request_start = offset if offset is not None else 0
+    if length is not None and length - offset < first_get_size:
+        initial_request_end = length
+    else:
+        initial_request_end = initial_request_start + first_get_size - 1
+
+    # With encryption, the range is extended to 16 byte blocks, and the IV before them
+    initial_range, initial_offset = process_range_and_offset(
+        initial_request_start,
+        initial_request_end,
+        length,
+        key_encryption_key,
+        key_resolver_function)
+    range_header, range_validation = validate_and_format_range_headers(
+        initial_range[0],
+        initial_range[1],
+        start_range_required=False,
+        end_range_required=False,
+        check_content_md5=validate_content)
+    try:
+        response, body, properties = await service.download(
+            timeout=timeout,
+            range=range_header,
+            range_get_content_md5=range_validation,
+            lease_access_conditions=access_conditions,
+            modified_access_conditions=mod_conditions,
+            cls=_return_response_stream_and_properties,
+            data_stream_total=None,
+            download_stream_current=0,
+            **kwargs)
+
+        # Parse the total blob size and adjust the download size if ranges
+        # were specified
+        blob_size = parse_length_from_content_range(properties.content_range)
+        if length is not None:
+            # Use the length unless it is over the end of the blob
+            download_size = min(blob_size, length - offset + 1)
+        elif offset is not None:
+            download_size = blob_size - offset
+        else:
+            download_size = blob_size
+
+    except StorageErrorException as error:
+        if offset is None and error.response.status_code == 416:
+            # Get range will fail on an empty blob. If the user did not
+            # request a range, do a regular get request in order to get
+            # any properties.
+            try:
+                response, body, properties = await service.download(
+                    timeout=timeout,
+                    lease_access_conditions=access_conditions,
+                    modified_access_conditions=mod_conditions,
+                    cls=_return_response_stream_and_properties,
+                    data_stream_total=0,
+                    download_stream_current=0,
+                    **kwargs)
+            except StorageErrorException as error:
+                process_storage_error(error)
+            # Set the download size to empty
+            download_size = 0
+            blob_size = 0
+        else:
+            process_storage_error(error)
+
+    content = await read_content(response, body, validate_content)
+
+    # A whole blob is also checked against its stored MD5, hashed as the chunks are written
+    blob_md5 = None
+    if validate_content and offset is None and key_encryption_key is None and key_resolver_function is None \
+            and properties.content_settings.content_md5:
+        blob_md5 = RollingContentMD5()
+        blob_md5.update(0, content)
+    if download_size:
+        stream.write(process_content(
+            response,
+            content,
+            initial_offset[0],
+            initial_offset[1],
+            require_encryption,
+            key_encryption_key,
+            key_resolver_function))
+
+    # If the blob is small, the download is complete at this point.
+    # If blob size is large, download the rest of the blob in chunks.
+    if properties.size != download_size:
+        # Lock on the etag. This can be overriden by the user by specifying '*'
+        if not mod_conditions:
+            mod_conditions = ModifiedAccessConditions()
+        if not mod_conditions.if_match:
+            mod_conditions.if_match = properties.etag
+
+        end_blob = blob_size
+        if length is not None:
+            # Use the length unless it is over the end of the blob
+            end_blob = min(blob_size, length + 1)
+        downloader = AsyncBlobChunkDownloader(
+            blob_service=service,
+            download_size=download_size,
+            chunk_size=blob_settings.max_chunk_get_size,
+            progress=len(content),
+            start_range=initial_range[1] - initial_offset[1] + 1,  # start where the first download ended
+            end_range=end_blob,
+            stream=stream,
+            max_connections=max_connections,
+            validate_content=validate_content,
+            access_conditions=access_conditions,
+            mod_conditions=mod_conditions,
+            timeout=timeout,
+            require_encryption=require_encryption,
+            key_encryption_key=key_encryption_key,
+            key_resolver_function=key_resolver_function,
+            blob_md5=blob_md5,
+            use_location=response.location_mode,
+            **kwargs)
+        await downloader.download()
+    if blob_md5 is not None:
+        blob_md5.validate(properties.content_settings.content_md5)
+
+    # Set the content length to the download size instead of the size of the last range,
+    # and the content range to the user requested range
+    properties.size = download_size
+    properties.content_range = 'bytes {0}-{1}/{2}'.format(offset, length, blob_size)
+    # The content MD5 is the MD5 for the first range instead of the stored MD5
+    properties.content_md5 = None
+    return properties
@@ -0,0 +1,373 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+from io import BytesIO
+from typing import (  # pylint: disable=unused-import
+    Union, Optional, Any, IO, Iterable, AnyStr, Dict,
+    TYPE_CHECKING
+)
+try:
+    from urllib.parse import urlparse, quote, unquote
+except ImportError:
+    from urlparse import urlparse # type: ignore
+    from urllib2 import quote, unquote # type: ignore
+
+import six
+
+from .._shared.upload_chunking import IterStreamer
+from .._shared.utils import (
+    add_metadata_headers,
+    get_length,
+    parse_connection_str,
+    parse_query)
+from .._shared.utils_async import AsyncStorageAccountHostsMixin
+from .._generated.aio import AzureBlobStorage
+from .._generated.models import BlobHTTPHeaders
+from .._blob_utils import get_access_conditions, get_modification_conditions
+from ._blob_utils_async import upload_block_blob, download_blob_to_stream
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from ..lease import LeaseClient
+    from ..models import (  # pylint: disable=unused-import
+        ContainerProperties,
+        BlobProperties,
+        ContentSettings,
+    )
+
+
+class BlobClient(AsyncStorageAccountHostsMixin):
+    """An asynchronous client to transfer the content of a blob.
+
+    Blocks and ranges are transferred concurrently by coroutines rather than threads, all
+    the requests going through the aiohttp session of the client's transport. Uploads read
+    the data in a bounded pool of reusable buffers, so a fast source waits for the uploads
+    instead of filling the memory, and downloads keep a bounded window of ranges in flight.
+
+    Only block blobs are supported. With client-side encryption, the blocks are encrypted as
+    they are read and the ranges decrypted as they are downloaded, so encrypted blobs are
+    transferred in parallel and with the same bounded memory.
+
+    :param str blob_url: The full URI to the blob. This can also be a URL to the storage account
+        or container, in which case the blob and/or container must also be specified.
+    :param container: The container for the blob. If specified, this value will override
+        a container value specified in the blob URL.
+    :type container: str or ~azure.storage.blob.models.ContainerProperties
+    :param blob: The blob with which to interact. If specified, this value will override
+        a blob value specified in the blob URL.
+    :type blob: str or ~azure.storage.blob.models.BlobProperties
+    :param str snapshot:
+        The optional blob snapshot on which to operate.
+    :param credential:
+        The credentials with which to authenticate. This is optional if the
+        account URL already has a SAS token. The value can be a SAS token string, and account
+        shared access key, or an instance of an async TokenCredentials class from azure.identity.
+        If the URL already has a SAS token, specifying an explicit credential will take priority.
+
+    **Keyword arguments:**
+
+    *transport (~azure.core.pipeline.transport.AsyncHttpTransport)* - The async transport,
+    an AioHttpTransport by default. Clients given the same transport share its session and connection pool.
+    """
+    def __init__(
+            self, blob_url,  # type: str
+            container=None,  # type: Optional[Union[str, ContainerProperties]]
+            blob=None,  # type: Optional[Union[str, BlobProperties]]
+            snapshot=None,  # type: Optional[Union[str, Dict[str, Any]]]
+            credential=None,  # type: Optional[Any]
+            **kwargs  # type: Any
+        ):
+        # type: (...) -> None
+        try:
+            if not blob_url.lower().startswith('http'):
+                blob_url = "https://" + blob_url
+        except AttributeError:
+            raise ValueError("Blob URL must be a string.")
+        parsed_url = urlparse(blob_url.rstrip('/'))
+        if not parsed_url.path and not (container and blob):
+            raise ValueError("Please specify a container and blob name.")
+        if not parsed_url.netloc:
+            raise ValueError("Invalid URL: {}".format(blob_url))
+
+        path_container = ""
+        path_blob = ""
+        path_snapshot = None
+        if parsed_url.path:
+            path_container, _, path_blob = parsed_url.path.lstrip('/').partition('/')
+        path_snapshot, sas_token = parse_query(parsed_url.query)
+
+        try:
+            self.container_name = container.name # type: ignore
+        except AttributeError:
+            self.container_name = container or unquote(path_container) # type: ignore
+        try:
+            self.snapshot = snapshot.snapshot # type: ignore
+        except AttributeError:
+            try:
+                self.snapshot = snapshot['snapshot'] # type: ignore
+            except TypeError:
+                self.snapshot = snapshot or path_snapshot
+        try:
+            self.blob_name = blob.name # type: ignore
+            if not snapshot:
+                self.snapshot = blob.snapshot # type: ignore
+        except AttributeError:
+            self.blob_name = blob or unquote(path_blob)
+        self._query_str, credential = self._format_query_string(sas_token, credential, self.snapshot)
+        super(BlobClient, self).__init__(parsed_url, 'blob', credential, **kwargs)
+        self._client = AzureBlobStorage(self.url, pipeline=self._pipeline)
+
+    def _format_url(self, hostname):
+        container_name = self.container_name
+        if isinstance(container_name, six.text_type):
+            container_name = container_name.encode('UTF-8')
+        return "{}://{}/{}/{}{}".format(
+            self.scheme,
+            hostname,
+            quote(container_name),
+            quote(self.blob_name, safe='~'),
+            self._query_str)
+
+    @classmethod
+    def from_connection_string(
+            cls, conn_str,  # type: str
+            container,  # type: Union[str, ContainerProperties]
+            blob,  # type: Union[str, BlobProperties]
+            snapshot=None,  # type: Optional[str]
+            credential=None,  # type: Optional[Any]
+            **kwargs  # type: Any
+        ):
+        """
+        Create BlobClient from a Connection String.
+
+        :param str conn_str:
+            A connection string to an Azure Storage account.
+        :param container: The container for the blob. This can either be the name of the container,
+            or an instance of ContainerProperties
+        :type container: str or ~azure.storage.blob.models.ContainerProperties
+        :param blob: The blob with which to interact. This can either be the name of the blob,
+            or an instance of BlobProperties.
+        :type blob: str or ~azure.storage.blob.models.BlobProperties
+        :param str snapshot:
+            The optional blob snapshot on which to operate.
+        :param credential:
+            The credentials with which to authenticate. This is optional if the
+            account URL already has a SAS token, or the connection string already has shared
+            access key values. Credentials provided here will take precedence over those in the
+            connection string.
+        """
+        account_url, secondary, credential = parse_connection_str(conn_str, credential, 'blob')
+        if 'secondary_hostname' not in kwargs:
+            kwargs['secondary_hostname'] = secondary
+        return cls(
+            account_url, container=container, blob=blob, snapshot=snapshot, credential=credential, **kwargs)
+
+    async def upload_blob(  # pylint: disable=too-many-locals
+            self, data,  # type: Union[Iterable[AnyStr], IO[AnyStr]]
+            overwrite=False,  # type: bool
+            length=None,  # type: Optional[int]
+            metadata=None,  # type: Optional[Dict[str, str]]
+            content_settings=None,  # type: Optional[ContentSettings]
+            validate_content=False,  # type: Optional[bool]
+            lease=None,  # type: Optional[Union[LeaseClient, str]]
+            if_modified_since=None,  # type: Optional[datetime]
+            if_unmodified_since=None,  # type: Optional[datetime]
+            if_match=None,  # type: Optional[str]
+            if_none_match=None,  # type: Optional[str]
+            timeout=None,  # type: Optional[int]
+            max_connections=1,  # type: int
+            encoding='UTF-8', # type: str
+            **kwargs
+        ):
+        # type: (...) -> Any
+        """Creates a new block blob from a data source with automatic chunking.
+
+        Blocks are staged by up to max_connections concurrent requests. The data is read
+        in max_connections + 1 buffers of the block size, reused from block to block.
+
+        :param data: The blob data to upload.
+        :param bool overwrite: Whether the blob to be uploaded should overwrite the current data.
+            If True, upload_blob will silently overwrite the existing data. If set to False, the
+            operation will fail with ResourceExistsError.
+        :param int length:
+            Number of bytes to read from the stream. This is optional, but
+            should be supplied for optimal performance.
+        :param metadata:
+            Name-value pairs associated with the blob as metadata.
+        :type metadata: dict(str, str)
+        :param ~azure.storage.blob.models.ContentSettings content_settings:
+            ContentSettings object used to set blob properties.
+        :param bool validate_content:
+            If true, calculates an MD5 hash for each chunk of the blob. The storage
+            service checks the hash of the content that has arrived with the hash
+            that was sent.
+        :param ~azure.storage.blob.lease.LeaseClient lease:
+            If specified, upload_blob only succeeds if the
+            blob's lease is active and matches this ID.
+            Required if the blob has an active lease.
+        :param datetime if_modified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            Specify this header to perform the operation only
+            if the resource has been modified since the specified time.
+        :param datetime if_unmodified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            Specify this header to perform the operation only if
+            the resource has not been modified since the specified date/time.
+        :param str if_match:
+            An ETag value, or the wildcard character (*). Specify this header to perform
+            the operation only if the resource's ETag matches the value specified.
+        :param str if_none_match:
+            An ETag value, or the wildcard character (*). Specify this header
+            to perform the operation only if the resource's ETag does not match
+            the value specified.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. This method may make
+            multiple calls to the Azure service and the timeout will apply to
+            each call individually.
+        :param int max_connections:
+            Maximum number of blocks uploaded at the same time.
+        :param str encoding:
+            Defaults to UTF-8.
+        :returns: Blob-updated property dict (Etag and last modified)
+        :rtype: dict[str, Any]
+        """
+        if self.require_encryption and not self.key_encryption_key:
+            raise ValueError("Encryption required but no key was provided.")
+
+        if isinstance(data, six.text_type):
+            data = data.encode(encoding) # type: ignore
+        if length is None:
+            length = get_length(data)
+        if isinstance(data, bytes):
+            data = data[:length]
+
+        if isinstance(data, bytes):
+            stream = BytesIO(data)
+        elif hasattr(data, 'read'):
+            stream = data
+        elif hasattr(data, '__iter__'):
+            stream = IterStreamer(data, encoding=encoding)
+        else:
+            raise TypeError("Unsupported data type: {}".format(type(data)))
+
+        headers = kwargs.pop('headers', {})
+        headers.update(add_metadata_headers(metadata))
+        blob_headers = None
+        access_conditions = get_access_conditions(lease)
+        mod_conditions = get_modification_conditions(
+            if_modified_since, if_unmodified_since, if_match, if_none_match)
+        if content_settings:
+            blob_headers = BlobHTTPHeaders(
+                blob_cache_control=content_settings.cache_control,
+                blob_content_type=content_settings.content_type,
+                blob_content_md5=bytearray(content_settings.content_md5) if content_settings.content_md5 else None,
+                blob_content_encoding=content_settings.content_encoding,
+                blob_content_language=content_settings.content_language,
+                blob_content_disposition=content_settings.content_disposition
+            )
+        return await upload_block_blob(
+            self._client.block_blob,
+            stream,
+            length,
+            overwrite,
+            headers,
+            blob_headers,
+            access_conditions,
+            mod_conditions,
+            validate_content,
+            timeout,
+            max_connections,
+            self._config.blob_settings,
+            self.key_encryption_key,
+            **kwargs)
+
+    async def download_blob_to_stream(
+            self, stream,  # type: IO[bytes]
+            offset=None,  # type: Optional[int]
+            length=None,  # type: Optional[int]
+            validate_content=False,  # type: bool
+            lease=None,  # type: Union[LeaseClient, str]
+            if_modified_since=None,  # type: Optional[datetime]
+            if_unmodified_since=None,  # type: Optional[datetime]
+            if_match=None,  # type: Optional[str]
+            if_none_match=None,  # type: Optional[str]
+            timeout=None,  # type: Optional[int]
+            max_connections=1,  # type: int
+            **kwargs
+        ):
+        # type: (...) -> BlobProperties
+        """Downloads a blob to a stream with automatic chunking.
+
+        Up to max_connections ranges are downloaded at the same time, and written to the
+        stream in order, so the stream doesn't need to be seekable. A range is only requested
+        once the oldest one in flight is written, which bounds the memory used.
+
+        :param stream:
+            The stream to download to. This can be an open file-handle,
+            or any writable stream.
+        :param int offset:
+            Start of byte range to use for downloading a section of the blob.
+            Must be set if length is provided.
+        :param int length:
+            Number of bytes to read from the stream. This is optional, but
+            should be supplied for optimal performance.
+        :param bool validate_content:
+            If true, requests an MD5 hash for each chunk of the blob, and checks
+            it against the content received.
+        :param lease:
+            If specified, download_blob_to_stream only succeeds if the blob's lease is active
+            and matches this ID. Required if the blob has an active lease.
+        :type lease: ~azure.storage.blob.lease.LeaseClient or str
+        :param datetime if_modified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            Specify this header to perform the operation only
+            if the resource has been modified since the specified time.
+        :param datetime if_unmodified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            Specify this header to perform the operation only if
+            the resource has not been modified since the specified date/time.
+        :param str if_match:
+            An ETag value, or the wildcard character (*). Specify this header to perform
+            the operation only if the resource's ETag matches the value specified.
+        :param str if_none_match:
+            An ETag value, or the wildcard character (*). Specify this header
+            to perform the operation only if the resource's ETag does not match
+            the value specified.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. This method may make
+            multiple calls to the Azure service and the timeout will apply to
+            each call individually.
+        :param int max_connections:
+            Maximum number of ranges downloaded at the same time.
+        :returns: The properties of the downloaded blob.
+        :rtype: ~azure.storage.blob.models.BlobProperties
+        """
+        if self.require_encryption and not self.key_encryption_key:
+            raise ValueError("Encryption required but no key was provided.")
+        if length is not None and offset is None:
+            raise ValueError("Offset value must not be None is length is set.")
+
+        access_conditions = get_access_conditions(lease)
+        mod_conditions = get_modification_conditions(
+            if_modified_since, if_unmodified_since, if_match, if_none_match)
+        properties = await download_blob_to_stream(
+            self._client.blob,
+            stream,
+            offset,
+            length,
+            validate_content,
+            access_conditions,
+            mod_conditions,
+            timeout,
+            max_connections,
+            self._config.blob_settings,
+            self.require_encryption,
+            self.key_encryption_key,
+            self.key_resolver_function,
+            **kwargs)
+        properties.name = self.blob_name
+        properties.container = self.container_name
+        return properties
@@ -18,7 +18,6 @@ except ImportError:
 
 import six
 
-from ._shared.shared_access_signature import BlobSharedAccessSignature
 from ._shared.encryption import _generate_blob_encryption_data
 from ._shared.upload_chunking import IterStreamer
 from ._shared.utils import (
@@ -44,8 +43,11 @@ from ._blob_utils import (
     get_access_conditions,
     get_modification_conditions,
     get_sequence_conditions,
+    get_sas_factory,
     StorageStreamDownloader,
+    download_page_ranges_to_stream,
     upload_block_blob,
+    upload_block_blob_resumable,
     upload_page_blob,
     upload_append_blob)
 from .models import BlobType, BlobBlock
@@ -296,9 +298,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
         :return: A Shared Access Signature (sas) token.
         :rtype: str
         """
-        if not hasattr(self.credential, 'account_key') or not self.credential.account_key:
-            raise ValueError("No account SAS key available.")
-        sas = BlobSharedAccessSignature(self.credential.account_name, self.credential.account_key)
+        sas = get_sas_factory(self.credential, self._config.blob_settings)
         return sas.generate_blob(
             self.container_name,
             self.blob_name,
@@ -348,6 +348,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             maxsize_condition=None,  # type: Optional[int]
             max_connections=1,  # type: int
             encoding='UTF-8', # type: str
+            checkpoint=None,  # type: Optional[str]
             **kwargs
         ):
         # type: (...) -> Any
@@ -423,6 +424,13 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             64MB.
         :param str encoding:
             Defaults to UTF-8.
+        :param str checkpoint:
+            The path of a local journal file, to make the upload of a block blob resumable.
+            The staged blocks are recorded in the journal, and if an upload of the same data
+            fails, uploading it again with the same journal only stages the missing blocks.
+            The length must be known and the data seekable, and the journal is discarded
+            if the blob or the source file changed in between. It is removed once the
+            upload succeeds. Not supported with client-side encryption.
         :returns: Blob-updated property dict (Etag and last modified)
         :rtype: dict[str, Any]
 
@@ -472,6 +480,27 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
                 blob_content_language=content_settings.content_language,
                 blob_content_disposition=content_settings.content_disposition
             )
+        if checkpoint is not None:
+            if blob_type != BlobType.BlockBlob:
+                raise ValueError("Resumable uploads are only supported for block blobs.")
+            if self.require_encryption or (self.key_encryption_key is not None):
+                raise ValueError(_ERROR_UNSUPPORTED_METHOD_FOR_ENCRYPTION)
+            return upload_block_blob_resumable(
+                self._client,
+                '{0}/{1}'.format(self.container_name, self.blob_name),
+                stream,
+                length,
+                overwrite,
+                headers,
+                blob_headers,
+                access_conditions,
+                mod_conditions,
+                validate_content,
+                timeout,
+                max_connections,
+                self._config.blob_settings,
+                checkpoint,
+                **kwargs)
         if blob_type == BlobType.BlockBlob:
             return upload_block_blob(
                 self._client.block_blob,
@@ -539,6 +568,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             if_match=None,  # type: Optional[str]
             if_none_match=None,  # type: Optional[str]
             timeout=None,  # type: Optional[int]
+            checkpoint=None,  # type: Optional[str]
             **kwargs
         ):
         # type: (...) -> Iterable[bytes]
@@ -588,6 +618,12 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             The timeout parameter is expressed in seconds. This method may make
             multiple calls to the Azure service and the timeout will apply to
             each call individually.
+        :param str checkpoint:
+            The path of a local journal file, to make download_to_stream resumable.
+            The downloaded chunks are recorded in the journal, and if a download of
+            the same range fails, downloading it again to the same stream with the same
+            journal only gets the missing chunks. The journal is discarded if the blob
+            changed in between, and removed once the download succeeds.
         :returns: A iterable data generator (stream)
         :rtype: ~azure.storage.blob._blob_utils.StorageStreamDownloader
 
@@ -622,6 +658,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             require_encryption=self.require_encryption,
             key_encryption_key=self.key_encryption_key,
             key_resolver_function=self.key_resolver_function,
+            checkpoint=checkpoint,
             **kwargs)
 
     def delete_blob(
@@ -1339,9 +1376,13 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
         :param bool requires_sync:
             Enforces that the service will not return a response until the copy is complete.
         :param bool polling: A poller will be used for this operation. Defaults to True.
+        :param polling_scheduler:
+            Poll the operation from the threads of this scheduler, instead of a dedicated thread.
+        :type polling_scheduler: ~azure.core.polling.PollingScheduler
         :returns: A pollable object to check copy operation status (and abort).
         :rtype: :class:`~azure.storage.blob.polling.CopyStatusPoller`
         """
+        polling_scheduler = kwargs.pop('polling_scheduler', None)
         headers = kwargs.pop('headers', {})
         headers.update(add_metadata_headers(metadata))
         if source_lease:
@@ -1392,6 +1433,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             polling=polling,
             configuration=self._config,
             lease_access_conditions=destination_lease,
+            polling_scheduler=polling_scheduler,
             timeout=timeout)
         return poller
 
@@ -1585,6 +1627,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             Start of byte range to use for the block.
             Must be set if source length is provided.
         :param source_length: The size of the block in bytes.
+            Defaults to the rest of the source blob after source_offset.
         :param bytearray source_content_md5:
             Specify the md5 calculated for the range of
             bytes that must be read from the copy source.
@@ -1602,7 +1645,9 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
         access_conditions = get_access_conditions(lease)
         range_header = None
         if source_offset is not None:
-            range_header, _ = validate_and_format_range_headers(source_offset, source_length)
+            source_end = source_offset + source_length - 1 if source_length is not None else None
+            range_header, _ = validate_and_format_range_headers(
+                source_offset, source_end, end_range_required=False)
         try:
             self._client.block_blob.stage_block_from_url(
                 block_id,
@@ -1756,6 +1801,7 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
                 modified_access_conditions=mod_conditions,
                 cls=return_response_headers,
                 validate_content=validate_content,
+                headers=headers,
                 **kwargs)
         except StorageErrorException as error:
             process_storage_error(error)
@@ -1902,6 +1948,110 @@ class BlobClient(StorageAccountHostsMixin):  # pylint: disable=too-many-public-m
             clear_range = [{'start': b.start, 'end': b.end} for b in ranges.clear_range]
         return page_range, clear_range # type: ignore
 
+    def download_page_ranges_to_stream(
+            self, stream,  # type: IO[bytes]
+            previous_snapshot_diff=None,  # type: Optional[Union[str, Dict[str, Any]]]
+            max_connections=1,  # type: int
+            validate_content=False,  # type: bool
+            lease=None,  # type: Optional[Union[LeaseClient, str]]
+            if_modified_since=None,  # type: Optional[datetime]
+            if_unmodified_since=None,  # type: Optional[datetime]
+            if_match=None,  # type: Optional[str]
+            if_none_match=None,  # type: Optional[str]
+            timeout=None, # type: Optional[int]
+            **kwargs
+        ):
+        # type: (...) -> BlobProperties
+        """Downloads the valid pages of a page blob to a stream, skipping the empty ones.
+
+        Only the page ranges that hold data are downloaded, and each is written at its
+        offset from the current position of the stream. The stream is sized to the blob
+        first, so when it is a file, the pages that were never written are left as holes
+        of a sparse file. For disks that are mostly empty, this is much faster than
+        downloading the whole blob.
+
+        :param stream:
+            A seekable stream that can be truncated, such as a file opened in 'wb' mode.
+            Without previous_snapshot_diff, the content of the stream after its position
+            is replaced by the blob.
+        :param str previous_snapshot_diff:
+            A previous snapshot of the blob, to download incrementally. The stream must
+            hold the content of that snapshot, for example a file opened in 'r+b' mode:
+            only the pages that changed since are written, and the pages that were
+            cleared are zeroed.
+        :param int max_connections:
+            The number of parallel connections with which to download.
+        :param bool validate_content:
+            If true, the service sends an MD5 hash of each downloaded chunk, and the
+            content that has arrived is checked against it.
+        :param lease:
+            Required if the blob has an active lease. Value can be a LeaseClient object
+            or the lease ID as a string.
+        :type lease: ~azure.storage.blob.lease.LeaseClient or str
+        :param datetime if_modified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            If timezone is included, any non-UTC datetimes will be converted to UTC.
+            If a date is passed in without timezone info, it is assumed to be UTC.
+            Specify this header to perform the operation only
+            if the resource has been modified since the specified time.
+        :param datetime if_unmodified_since:
+            A DateTime value. Azure expects the date value passed in to be UTC.
+            If timezone is included, any non-UTC datetimes will be converted to UTC.
+            If a date is passed in without timezone info, it is assumed to be UTC.
+            Specify this header to perform the operation only if
+            the resource has not been modified since the specified date/time.
+        :param str if_match:
+            An ETag value, or the wildcard character (*). Specify this header to perform
+            the operation only if the resource's ETag matches the value specified.
+        :param str if_none_match:
+            An ETag value, or the wildcard character (*). Specify this header
+            to perform the operation only if the resource's ETag does not match
+            the value specified. Specify the wildcard character (*) to perform
+            the operation only if the resource does not exist, and fail the
+            operation if it does exist.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. This method may make
+            multiple calls to the Azure service and the timeout will apply to
+            each call individually.
+        :returns: The properties of the downloaded blob.
+        :rtype: ~azure.storage.blob.models.BlobProperties
+        """
+        if self.require_encryption or (self.key_encryption_key is not None):
+            raise ValueError(_ERROR_UNSUPPORTED_METHOD_FOR_ENCRYPTION)
+        properties = self.get_blob_properties(
+            lease=lease,
+            if_modified_since=if_modified_since,
+            if_unmodified_since=if_unmodified_since,
+            if_match=if_match,
+            if_none_match=if_none_match,
+            timeout=timeout,
+            **kwargs)
+        if properties.blob_type != BlobType.PageBlob:
+            raise ValueError("Only the pages of a page blob can be downloaded.")
+
+        # Lock on the etag, so that the page ranges and the pages are from the same version of the blob
+        etag = None if self.snapshot else properties.etag
+        page_ranges, clear_ranges = self.get_page_ranges(
+            lease=lease,
+            previous_snapshot_diff=previous_snapshot_diff,
+            if_match=etag,
+            timeout=timeout,
+            **kwargs)
+        download_page_ranges_to_stream(
+            self._client.blob,
+            stream,
+            properties.size,
+            page_ranges,
+            clear_ranges if previous_snapshot_diff else None,
+            validate_content,
+            get_access_conditions(lease),
+            get_modification_conditions(if_match=etag),
+            timeout,
+            max_connections,
+            self._config.blob_settings,
+            **kwargs)
+        return properties
+
     def set_sequence_number( # type: ignore
             self, sequence_number_action,  # type: Union[str, SequenceNumberAction]
             sequence_number=None,  # type: Optional[str]
@@ -14,7 +14,6 @@ try:
 except ImportError:
     from urlparse import urlparse # type: ignore
 
-from ._shared.shared_access_signature import SharedAccessSignature
 from ._shared.models import LocationMode, Services
 from ._shared.utils import (
     StorageAccountHostsMixin,
@@ -24,6 +23,7 @@ from ._shared.utils import (
     parse_query)
 from ._generated import AzureBlobStorage
 from ._generated.models import StorageErrorException, StorageServiceProperties
+from ._blob_utils import get_sas_factory
 from .container_client import ContainerClient
 from .blob_client import BlobClient
 from .models import ContainerProperties, ContainerPropertiesPaged
@@ -210,10 +210,7 @@ class BlobServiceClient(StorageAccountHostsMixin):
                 :dedent: 8
                 :caption: Generating a shared access signature.
         """
-        if not hasattr(self.credential, 'account_key') and not self.credential.account_key:
-            raise ValueError("No account SAS key available.")
-
-        sas = SharedAccessSignature(self.credential.account_name, self.credential.account_key)
+        sas = get_sas_factory(self.credential, self._config.blob_settings)
         return sas.generate_account(
             Services.BLOB, resource_types, permission, expiry, start=start, ip=ip, protocol=protocol) # type: ignore
 
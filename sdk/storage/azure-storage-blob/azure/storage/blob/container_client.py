@@ -6,7 +6,7 @@
 
 import functools
 from typing import (  # pylint: disable=unused-import
-    Union, Optional, Any, Iterable, AnyStr, Dict, List, Tuple, IO,
+    Union, Optional, Any, Iterable, AnyStr, Dict, List, Tuple, IO, Callable,
     TYPE_CHECKING
 )
 
@@ -18,7 +18,6 @@ except ImportError:
 
 import six
 
-from ._shared.shared_access_signature import BlobSharedAccessSignature
 from ._shared.utils import (
     StorageAccountHostsMixin,
     process_storage_error,
@@ -35,15 +34,21 @@ from ._generated.models import (
 from ._blob_utils import (
     get_access_conditions,
     get_modification_conditions,
+    get_sas_factory,
     deserialize_container_properties)
 from .models import ( # pylint: disable=unused-import
     ContainerProperties,
     BlobProperties,
     BlobPropertiesPaged,
     BlobType,
-    BlobPrefix)
+    BlobPrefix,
+    DirectorySyncResult,
+    BulkCopyResult)
 from .lease import LeaseClient
 from .blob_client import BlobClient
+from ._directory_sync import sync_directory_to_container, sync_container_to_directory
+from ._parallel_listing import PartitionedBlobListing
+from ._bulk_copy import BulkBlobCopy
 
 if TYPE_CHECKING:
     from azure.core.pipeline.transport import HttpTransport
@@ -261,9 +266,7 @@ class ContainerClient(StorageAccountHostsMixin):
                 :dedent: 12
                 :caption: Generating a sas token.
         """
-        if not hasattr(self.credential, 'account_key') and not self.credential.account_key:
-            raise ValueError("No account SAS key available.")
-        sas = BlobSharedAccessSignature(self.credential.account_name, self.credential.account_key)
+        sas = get_sas_factory(self.credential, self._config.blob_settings)
         return sas.generate_container(
             self.container_name,
             permission=permission,
@@ -698,6 +701,66 @@ class ContainerClient(StorageAccountHostsMixin):
             **kwargs)
         return BlobPropertiesPaged(command, prefix=name_starts_with, results_per_page=results_per_page, marker=marker)
 
+    def list_blobs_parallel(
+            self, name_starts_with=None,  # type: Optional[str]
+            include=None,  # type: Optional[Any]
+            delimiter="/",  # type: str
+            partition_depth=1,  # type: int
+            max_concurrency=8,  # type: int
+            ordered=False,  # type: bool
+            timeout=None,  # type: Optional[int]
+            **kwargs
+        ):
+        # type: (...) -> Iterable[BlobProperties]
+        """Returns a generator to list the blobs under the specified container,
+        with several listings in progress at the same time.
+
+        The blob names are split into shards by the virtual directories found when
+        listing the hierarchy of the container, down to partition_depth levels. The
+        shards are listed concurrently, each following its own continuation tokens,
+        so listing a large container scales with max_concurrency instead of the
+        latency of each page. This is only faster than list_blobs when the blobs
+        are spread over several virtual directories.
+
+        :param str name_starts_with:
+            Filters the results to return only blobs whose names
+            begin with the specified prefix.
+        :param list[str] include:
+            Specifies one or more additional datasets to include in the response.
+            Options include: 'snapshots', 'metadata', 'uncommittedblobs', 'copy', 'deleted'.
+        :param str delimiter:
+            The character or string separating the virtual directories in the blob names.
+        :param int partition_depth:
+            The number of levels of virtual directories that are split into shards.
+            The default value is 1, the directories at the top of the listing.
+        :param int max_concurrency:
+            The maximum number of list requests in progress at the same time.
+            The default value is 8.
+        :param bool ordered:
+            Whether to return the blobs sorted by name, like list_blobs. Otherwise,
+            they are returned as soon as they are listed. The default value is False.
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :returns: An iterable of BlobProperties.
+        :rtype: Iterable[~azure.storage.blob.models.BlobProperties]
+        """
+        if include and not isinstance(include, list):
+            include = [include]
+
+        results_per_page = kwargs.pop('results_per_page', None)
+        return iter(PartitionedBlobListing(
+            self._client.container,
+            self.container_name,
+            name_starts_with,
+            include,
+            delimiter,
+            partition_depth,
+            max_concurrency,
+            ordered,
+            results_per_page,
+            timeout,
+            **kwargs))
+
     def walk_blobs(
             self, name_starts_with=None, # type: Optional[str]
             include=None, # type: Optional[Any]
@@ -956,6 +1019,151 @@ class ContainerClient(StorageAccountHostsMixin):
             timeout=timeout,
             **kwargs)
 
+    def sync_from_directory(
+            self, source,  # type: str
+            prefix="",  # type: str
+            delete_extra=False,  # type: bool
+            compare_md5=False,  # type: bool
+            max_concurrency=8,  # type: int
+            timeout=None,  # type: Optional[int]
+            **kwargs
+        ):
+        # type: (...) -> DirectorySyncResult
+        """Uploads the files of a local directory that are missing or outdated in the container.
+
+        The blob of a file is named after the prefix and its path relative to the directory,
+        with '/' separators. The blobs under the prefix are listed once, and a file is uploaded
+        only if its blob doesn't exist, has another size, or was last modified before the file.
+        The uploads run in parallel while the blobs are being listed.
+
+        :param str source:
+            The path of the local directory.
+        :param str prefix:
+            The prefix of the blob names the directory is synced with, such as 'backups/'.
+            By default, the directory is synced with the whole container.
+        :param bool delete_extra:
+            Whether to delete the blobs under the prefix that have no file in the directory.
+            The default value is False.
+        :param bool compare_md5:
+            Whether to compare the content of the files with the Content-MD5 of their blob,
+            instead of their modification time. The MD5 of the uploaded files is stored in
+            their blob properties. This reads all the files with the same size as their blob.
+        :param int max_concurrency:
+            The maximum number of uploads and deletes in progress at the same time.
+            Each file is uploaded over a single connection. The default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. It applies to each call
+            to the service individually.
+        :returns: The uploaded and deleted blob names, and the errors of the operations that failed.
+        :rtype: ~azure.storage.blob.models.DirectorySyncResult
+        """
+        return sync_directory_to_container(
+            self, source, prefix, delete_extra, compare_md5, max_concurrency, timeout, **kwargs)
+
+    def sync_to_directory(
+            self, destination,  # type: str
+            prefix="",  # type: str
+            delete_extra=False,  # type: bool
+            compare_md5=False,  # type: bool
+            max_concurrency=8,  # type: int
+            timeout=None,  # type: Optional[int]
+            **kwargs
+        ):
+        # type: (...) -> DirectorySyncResult
+        """Downloads the blobs of the container that are missing or outdated in a local directory.
+
+        The file of a blob is at its name relative to the prefix, with '/' as the path
+        separator. A blob is downloaded only if its file doesn't exist, has another size,
+        or was last modified before the blob. The modification time of the downloaded files
+        is set to the last modified time of their blob. The downloads run in parallel while
+        the blobs are being listed.
+
+        :param str destination:
+            The path of the local directory. It is created if needed.
+        :param str prefix:
+            The prefix of the blob names the directory is synced with, such as 'backups/'.
+            By default, the directory is synced with the whole container.
+        :param bool delete_extra:
+            Whether to delete the files of the directory that have no blob under the prefix.
+            The default value is False.
+        :param bool compare_md5:
+            Whether to compare the content of the files with the Content-MD5 of their blob,
+            instead of their modification time, for the blobs that have one.
+        :param int max_concurrency:
+            The maximum number of downloads and deletes in progress at the same time.
+            Each blob is downloaded over a single connection. The default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. It applies to each call
+            to the service individually.
+        :returns: The downloaded blob names and deleted file paths, and the errors of the
+            operations that failed.
+        :rtype: ~azure.storage.blob.models.DirectorySyncResult
+        """
+        return sync_container_to_directory(
+            self, destination, prefix, delete_extra, compare_md5, max_concurrency, timeout, **kwargs)
+
+    def copy_blobs_from_container(
+            self, source,  # type: ContainerClient
+            name_starts_with=None,  # type: Optional[str]
+            max_concurrency=16,  # type: int
+            block_size=100 * 1024 * 1024,  # type: int
+            block_copy_threshold=256 * 1024 * 1024,  # type: int
+            polling_interval=None,  # type: Optional[float]
+            progress_callback=None,  # type: Optional[Callable[[BulkCopyResult], None]]
+            timeout=None,  # type: Optional[int]
+            **kwargs
+        ):
+        # type: (...) -> BulkCopyResult
+        """Copies the blobs of another container to this one, server-side.
+
+        The data is copied by the service and never goes through this machine. The copied
+        blobs keep their name, and overwrite the blobs of the same name in this container.
+        Each copy is locked on the version of the source blob found by the listing, so a
+        blob that is modified in the meantime fails to copy: the copies are started on the
+        condition of its ETag, and the blobs copied by blocks are checked against it once
+        their blocks are staged.
+
+        The block blobs larger than block_copy_threshold are copied by staging their blocks
+        from ranges of the source in parallel, then committing them with the properties and
+        metadata of the source. The other blobs are copied asynchronously by the service:
+        their copies are started, and the ones still pending are then polled all at once by
+        listing the blobs of this container, until they complete.
+
+        :param source:
+            The client of the source container. Its blobs are read by URL: if the source is
+            in another account and not public, its client must use a shared access signature.
+        :type source: ~azure.storage.blob.container_client.ContainerClient
+        :param str name_starts_with:
+            Copies only the blobs whose names begin with the specified prefix.
+        :param int max_concurrency:
+            The maximum number of requests in progress at the same time. It doesn't limit
+            the number of asynchronous copies that are pending in the service. The default
+            value is 16.
+        :param int block_size:
+            The size of the blocks that large blobs are copied by. The maximum is 100MB,
+            which is the default value.
+        :param int block_copy_threshold:
+            The size over which a block blob is copied by blocks. The default value is 256MB.
+        :param float polling_interval:
+            The number of seconds between two polls of the pending copies. Defaults to the
+            copy polling interval of the client configuration.
+        :param callable progress_callback:
+            A callback that is given the BulkCopyResult each time a blob is copied or fails.
+            It is called from the threads of the copies, one at a time.
+        :param int timeout:
+            The timeout parameter is expressed in seconds. It applies to each call
+            to the service individually.
+        :returns: The copied blob names, the errors of the copies that failed, and the
+            throughput of the copy.
+        :rtype: ~azure.storage.blob.models.BulkCopyResult
+        """
+        if polling_interval is None:
+            polling_interval = self._config.blob_settings.copy_polling_interval
+        bulk_copy = BulkBlobCopy(
+            self, source, max_concurrency, block_size, block_copy_threshold,
+            polling_interval, progress_callback, timeout, **kwargs)
+        return bulk_copy.run(name_starts_with)
+
     def get_blob_client(
             self, blob,  # type: Union[str, BlobProperties]
             snapshot=None  # type: str
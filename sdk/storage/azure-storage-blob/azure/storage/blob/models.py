@@ -6,8 +6,9 @@
 # pylint: disable=too-few-public-methods, too-many-instance-attributes
 # pylint: disable=super-init-not-called, too-many-lines
 
+import time
 from enum import Enum
-from typing import List, Any, TYPE_CHECKING # pylint: disable=unused-import
+from typing import List, Dict, Any, Optional, TYPE_CHECKING # pylint: disable=unused-import
 
 from azure.core.paging import Paged
 
@@ -810,6 +811,63 @@ class BlobBlock(DictMixin):
         return block
 
 
+class DirectorySyncResult(DictMixin):
+    """The outcome of syncing a local directory with a container.
+
+    :ivar list[str] transferred:
+        The names of the blobs that were uploaded or downloaded.
+    :ivar list[str] deleted:
+        The names of the blobs, or the paths of the local files, that were deleted
+        because they were not in the source.
+    :ivar int unchanged:
+        The number of files that were already up to date.
+    :ivar dict(str, Exception) failed:
+        The errors of the transfers or deletes that failed, by blob name or local path.
+        The other operations carry on when one of them fails.
+    """
+
+    def __init__(self):
+        self.transferred = []  # type: List[str]
+        self.deleted = []  # type: List[str]
+        self.unchanged = 0
+        self.failed = {}  # type: Dict[str, Exception]
+
+
+class BulkCopyResult(DictMixin):
+    """The progress and outcome of copying the blobs of a container.
+
+    :ivar list[str] copied:
+        The names of the blobs that were copied.
+    :ivar dict(str, Exception) failed:
+        The errors of the copies that failed, by blob name. The other copies carry
+        on when one of them fails.
+    :ivar int blobs_total:
+        The number of blobs listed in the source so far.
+    :ivar int bytes_total:
+        The size of the blobs listed in the source so far.
+    :ivar int bytes_copied:
+        The size of the blobs, and of the blocks of large blobs, copied so far.
+    :ivar float elapsed:
+        The duration of the copy in seconds, once it is complete.
+    """
+
+    def __init__(self):
+        self.copied = []  # type: List[str]
+        self.failed = {}  # type: Dict[str, Exception]
+        self.blobs_total = 0
+        self.bytes_total = 0
+        self.bytes_copied = 0
+        self.elapsed = None  # type: Optional[float]
+        self._started = time.time()
+
+    @property
+    def throughput(self):
+        # type: () -> float
+        """The number of bytes copied per second."""
+        elapsed = self.elapsed if self.elapsed is not None else time.time() - self._started
+        return self.bytes_copied / elapsed if elapsed > 0 else 0.0
+
+
 class PageRange(DictMixin):
     """Page Range for page blob.
 
@@ -26,8 +26,9 @@ class CopyStatusPoller(LROPoller):
         else:
             polling_interval = 2
         polling_method = CopyBlobPolling if polling else CopyBlob
+        scheduler = kwargs.pop('polling_scheduler', None)
         poller = polling_method(polling_interval, **kwargs)
-        super(CopyStatusPoller, self).__init__(client, copy_id, None, poller)
+        super(CopyStatusPoller, self).__init__(client, copy_id, None, poller, scheduler=scheduler)
 
     def copy_id(self):
         # type: () -> str
@@ -136,19 +137,37 @@ class CopyBlob(PollingMethod):
 
 class CopyBlobPolling(CopyBlob):
 
+    def _raise_if_failed(self):
+        if str(self.status()).lower() == 'aborted':
+            raise ValueError("Copy operation aborted.")
+        if str(self.status()).lower() == 'failed':
+            raise ValueError("Copy operation failed: {}".format(self.blob.copy.status_description))
+
     def run(self):
         # type: () -> None
         try:
             while not self.finished():
                 self._update_status()
                 time.sleep(self.polling_interval)
-            if str(self.status()).lower() == 'aborted':
-                raise ValueError("Copy operation aborted.")
-            if str(self.status()).lower() == 'failed':
-                raise ValueError("Copy operation failed: {}".format(self.blob.copy.status_description))
+            self._raise_if_failed()
+        except Exception as e:
+            logger.warning(str(e))
+            raise
+
+    def poll(self):
+        # type: () -> float
+        """Update the status of the copy once, for a PollingScheduler.
+
+        :returns: The delay in seconds before the next poll.
+        :rtype: float
+        """
+        try:
+            self._update_status()
+            self._raise_if_failed()
         except Exception as e:
             logger.warning(str(e))
             raise
+        return self.polling_interval
 
     def status(self):
         # type: () -> str
@@ -0,0 +1,46 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import base64
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from azure.storage.blob._shared.shared_access_signature import BlobSharedAccessSignature
+
+# Measures the number of blob SAS tokens generated per second, without a cache (cold),
+# and with a cache holding the tokens of every blob (warm). The expiries are a few
+# seconds apart, as when they are computed from the current time for each token, and
+# are bucketed to the granularity of the cache.
+
+ACCOUNT_NAME = 'account'
+ACCOUNT_KEY = base64.b64encode(os.urandom(64)).decode('utf-8')
+
+BLOBS = ['blob{}'.format(i) for i in range(100)]
+EXPIRY = datetime.utcnow() + timedelta(hours=1)
+ITERATIONS = 200
+
+
+def generate(factory):
+    for i, blob in enumerate(BLOBS):
+        factory.generate_blob(
+            'container', blob, permission='r', expiry=EXPIRY + timedelta(seconds=i % 10), protocol='https')
+
+
+def measure(name, factory):
+    generate(factory)
+    elapsed = min(timeit.repeat(lambda: generate(factory), number=ITERATIONS, repeat=3))
+    sys.stdout.write('{0}\t{1:.0f} per second\n'.format(name, ITERATIONS * len(BLOBS) / elapsed))
+
+
+def main():
+    measure('Cold', BlobSharedAccessSignature(ACCOUNT_NAME, ACCOUNT_KEY))
+    measure('Warm', BlobSharedAccessSignature(
+        ACCOUNT_NAME, ACCOUNT_KEY, cache_size=len(BLOBS), expiry_granularity=300))
+
+
+if __name__ == '__main__':
+    main()
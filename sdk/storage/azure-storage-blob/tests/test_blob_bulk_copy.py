@@ -0,0 +1,284 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+try:
+    from urllib.parse import urlparse, parse_qs, unquote
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+    from urllib2 import unquote  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError, ResourceModifiedError, ResourceNotFoundError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.blob import ContainerClient, NoRetry
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_BLOB = (
+    '<Blob><Name>{name}</Name><Properties><Last-Modified>Sun, 16 Jun 2019 22:45:39 GMT</Last-Modified>'
+    '<Etag>{etag}</Etag><Content-Length>{size}</Content-Length><Content-Type>{content_type}</Content-Type>'
+    '<BlobType>BlockBlob</BlobType>{copy}</Properties><Metadata>{metadata}</Metadata></Blob>')
+_COPY = '<CopyId>{}</CopyId><CopyStatus>{}</CopyStatus><CopyStatusDescription>{}</CopyStatusDescription>'
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class _Blob(object):
+
+    def __init__(self, content, content_type='application/octet-stream', metadata=None):
+        self.content = content
+        self.content_type = content_type
+        self.metadata = metadata or {}
+        self.etag = '"0x{}"'.format(id(self))
+        self.copy = None
+
+
+class _FakeAccounts(HttpTransport):
+    """Keeps the blobs of the containers of several accounts, and copies them server-side.
+
+    The copies of the blobs named 'slow*' are pending for two polls, and those named 'bad*' fail.
+    """
+
+    def __init__(self):
+        self.containers = {'source': {}, 'destination': {}}
+        self.blocks = {}
+        self.requests = []
+        self.polls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            with self._lock:
+                return self._handle(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _locate(self, url):
+        container, name = unquote(urlparse(url).path).lstrip('/').split('/', 1)
+        return self.containers[container], name
+
+    def _handle(self, request):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        if query.get('comp') == 'list':
+            return self._list(request, query)
+        container, name = self._locate(request.url)
+        self.requests.append((request.method, query.get('comp'), name))
+        if query.get('comp') == 'block':
+            source_container, source_name = self._locate(request.headers['x-ms-copy-source'])
+            start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-source-range']).groups()
+            self.blocks[(name, query['blockid'])] = source_container[source_name].content[int(start):int(end) + 1]
+            return _FakeResponse(request, 201)
+        if query.get('comp') == 'blocklist':
+            content = b''.join(self.blocks.pop((name, e.text)) for e in ET.fromstring(request.data))
+            blob = container[name] = _Blob(content, request.headers.get('x-ms-blob-content-type'))
+            blob.metadata = {k[len('x-ms-meta-'):]: v for k, v in request.headers.items() if k.startswith('x-ms-meta-')}
+            return _FakeResponse(request, 201, {'ETag': blob.etag})
+        if request.method == 'HEAD':
+            blob = container.get(name)
+            if blob is None:
+                return _FakeResponse(request, 404, {'x-ms-error-code': 'BlobNotFound'})
+            return _FakeResponse(request, 200, {
+                'ETag': blob.etag, 'Last-Modified': 'Sun, 16 Jun 2019 22:45:39 GMT', 'x-ms-blob-type': 'BlockBlob',
+                'Content-Length': str(len(blob.content)), 'Content-Type': blob.content_type})
+        if 'x-ms-copy-source' in request.headers:
+            source_container, source_name = self._locate(request.headers['x-ms-copy-source'])
+            source = source_container.get(source_name)
+            if source is None:
+                return _FakeResponse(request, 404, {'x-ms-error-code': 'BlobNotFound'})
+            if request.headers.get('x-ms-source-if-match') != source.etag:
+                return _FakeResponse(request, 412, {'x-ms-error-code': 'SourceConditionNotMet'})
+            blob = container[name] = _Blob(source.content, source.content_type, source.metadata)
+            status = 'pending' if name.startswith(('slow', 'bad')) else 'success'
+            blob.copy = ['copy-' + name, status, 0]
+            return _FakeResponse(request, 202, {'x-ms-copy-id': blob.copy[0], 'x-ms-copy-status': status})
+        raise ValueError(request.method)
+
+    def _list(self, request, query):
+        container = self.containers[urlparse(request.url).path.strip('/')]
+        include = query.get('include', '')
+        if 'copy' in include:
+            self.polls += 1
+        entries = []
+        for name in sorted(container):
+            if not name.startswith(query.get('prefix', '')):
+                continue
+            blob = container[name]
+            copy = ''
+            if 'copy' in include and blob.copy:
+                blob.copy[2] += 1
+                if blob.copy[1] == 'pending' and blob.copy[2] > 2:
+                    blob.copy[1] = 'failed' if name.startswith('bad') else 'success'
+                copy = _COPY.format(blob.copy[0], blob.copy[1], 'Source unavailable' if name.startswith('bad') else '')
+            metadata = ''.join('<{0}>{1}</{0}>'.format(k, v) for k, v in blob.metadata.items())
+            entries.append(_BLOB.format(
+                name=name, etag=blob.etag, size=len(blob.content), content_type=blob.content_type,
+                copy=copy, metadata=metadata))
+        body = '<?xml version="1.0" encoding="utf-8"?><EnumerationResults><Blobs>{}</Blobs>' \
+               '<NextMarker /></EnumerationResults>'.format(''.join(entries))
+        return _FakeResponse(request, 200, {'Content-Type': 'application/xml'}, body.encode('utf-8'))
+
+
+class StorageBlobBulkCopyTest(StorageTestCase):
+
+    def _create_clients(self, transport):
+        source = ContainerClient(
+            'https://source.blob.core.windows.net/source', transport=transport, retry_policy=NoRetry())
+        destination = ContainerClient(
+            'https://destination.blob.core.windows.net/destination', transport=transport, retry_policy=NoRetry())
+        return source, destination
+
+    def test_copy_blobs_from_container(self):
+        transport = _FakeAccounts()
+        source, destination = self._create_clients(transport)
+        for i in range(20):
+            transport.containers['source']['small{}'.format(i)] = _Blob(os.urandom(100))
+        transport.containers['source']['slow'] = _Blob(b'slow blob')
+        large = os.urandom(2500)
+        transport.containers['source']['large'] = _Blob(large, 'text/plain', {'owner': 'me'})
+        progress = []
+
+        result = destination.copy_blobs_from_container(
+            source,
+            max_concurrency=4,
+            block_size=1000,
+            block_copy_threshold=2048,
+            polling_interval=0,
+            progress_callback=lambda r: progress.append(len(r.copied)))
+
+        self.assertEqual(sorted(result.copied), sorted(transport.containers['source']))
+        self.assertEqual(result.failed, {})
+        self.assertEqual(result.blobs_total, 22)
+        self.assertEqual(result.bytes_total, 20 * 100 + 9 + 2500)
+        self.assertEqual(result.bytes_copied, result.bytes_total)
+        self.assertGreater(result.throughput, 0)
+        self.assertEqual(progress[-1], 22)
+        self.assertLessEqual(transport.max_in_flight, 4)
+        for name, blob in transport.containers['source'].items():
+            self.assertEqual(transport.containers['destination'][name].content, blob.content)
+
+        # The large blob is copied by blocks, with the properties of the source
+        copied = transport.containers['destination']['large']
+        self.assertEqual(copied.content_type, 'text/plain')
+        self.assertEqual(copied.metadata, {'owner': 'me'})
+        self.assertEqual(
+            [r[:2] for r in transport.requests if r[2] == 'large'],
+            [('PUT', 'block')] * 3 + [('HEAD', None), ('PUT', 'blocklist')])
+
+        # The pending copy is polled by listing the destination blobs
+        self.assertEqual(transport.polls, 3)
+
+    def test_copy_blobs_with_prefix_reports_failures(self):
+        transport = _FakeAccounts()
+        source, destination = self._create_clients(transport)
+        transport.containers['source']['data/good'] = _Blob(b'good')
+        transport.containers['source']['other'] = _Blob(b'other')
+        transport.containers['source']['bad'] = _Blob(b'bad')
+
+        result = destination.copy_blobs_from_container(source, name_starts_with='data/', polling_interval=0)
+
+        self.assertEqual(result.copied, ['data/good'])
+        self.assertEqual(sorted(transport.containers['destination']), ['data/good'])
+
+        result = destination.copy_blobs_from_container(source, name_starts_with='bad', polling_interval=0)
+
+        self.assertEqual(result.copied, [])
+        self.assertIsInstance(result.failed['bad'], HttpResponseError)
+        self.assertIn('Source unavailable', str(result.failed['bad']))
+
+    def test_copy_blobs_source_changed(self):
+        transport = _FakeAccounts()
+        source, destination = self._create_clients(transport)
+        transport.containers['source']['blob'] = _Blob(b'blob')
+        original = transport._list
+
+        def list_then_modify(request, query):
+            response = original(request, query)
+            transport.containers['source']['blob'] = _Blob(b'modified')
+            return response
+        transport._list = list_then_modify
+
+        result = destination.copy_blobs_from_container(source, polling_interval=0)
+
+        self.assertEqual(list(result.failed), ['blob'])
+        self.assertNotIn('blob', transport.containers['destination'])
+
+    def test_copy_blocks_source_changed(self):
+        transport = _FakeAccounts()
+        source, destination = self._create_clients(transport)
+        transport.containers['source']['large'] = _Blob(os.urandom(2500))
+        original = transport._handle
+
+        def modify_while_staging(request):
+            response = original(request)
+            if 'comp=block&' in request.url + '&':
+                transport.containers['source']['large'] = _Blob(os.urandom(2500))
+            return response
+        transport._handle = modify_while_staging
+
+        result = destination.copy_blobs_from_container(
+            source, block_size=1000, block_copy_threshold=2048, polling_interval=0)
+
+        self.assertIsInstance(result.failed['large'], ResourceModifiedError)
+        self.assertNotIn('large', transport.containers['destination'])
+
+    def test_copy_blobs_destination_deleted(self):
+        transport = _FakeAccounts()
+        source, destination = self._create_clients(transport)
+        transport.containers['source']['slow'] = _Blob(b'slow')
+        original = transport._list
+
+        def delete_on_poll(request, query):
+            if 'copy' in query.get('include', ''):
+                transport.containers['destination'].pop('slow', None)
+            return original(request, query)
+        transport._list = delete_on_poll
+
+        result = destination.copy_blobs_from_container(source, polling_interval=0)
+
+        self.assertIsInstance(result.failed['slow'], ResourceNotFoundError)
+
+# ------------------------------------------------------------------------------
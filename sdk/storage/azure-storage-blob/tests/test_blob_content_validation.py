@@ -0,0 +1,199 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+from io import BytesIO
+
+from requests.structures import CaseInsensitiveDict
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # type: ignore
+
+from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse, RewindableBody
+from azure.storage.blob import BlobClient, NoRetry
+from azure.storage.blob._shared.download_chunking import RollingContentMD5
+from azure.storage.blob._shared.policies import StorageContentValidation, encode_base64
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the response and the blob properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        # Several chunks, so that they are hashed as they are read
+        body = _StreamedBody([self._body[i:i + 100] for i in range(0, len(self._body), 100)])
+        body.response = self
+        return body
+
+
+class _FakeBlobService(HttpTransport):
+    """Serves one block blob with its stored MD5, and can corrupt the range that starts at an offset."""
+
+    def __init__(self, content, stored_md5=None):
+        self.content = content
+        self.stored_md5 = hashlib.md5(content).digest() if stored_md5 is None else stored_md5
+        self.corrupt_offset = None
+        self.slow_offset = None
+        self.range_md5 = []
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()
+        body = self.content[int(start):int(end) + 1]
+        headers = {
+            'Content-Range': 'bytes {}-{}/{}'.format(start, int(start) + len(body) - 1, len(self.content)),
+            'ETag': '"0x1"',
+            'x-ms-blob-type': 'BlockBlob',
+            'x-ms-blob-content-md5': encode_base64(self.stored_md5)}
+        range_md5 = request.headers.get('x-ms-range-get-content-md5') == 'true'
+        self.range_md5.append(range_md5)
+        if range_md5:
+            headers['Content-MD5'] = encode_base64(hashlib.md5(body).digest())
+        if int(start) == self.slow_offset:
+            time.sleep(0.5)
+        if int(start) == self.corrupt_offset:
+            body = b'\0' + body[1:]
+        return _FakeResponse(request, 206, headers, body)
+
+
+class StorageBlobContentValidationTest(StorageTestCase):
+
+    def _create_client(self, transport):
+        return BlobClient(
+            'https://account.blob.core.windows.net/container/blob',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_single_get_size=256,
+            max_chunk_get_size=256)
+
+    def test_download_validates_chunks_and_blob(self):
+        data = os.urandom(256 * 6 + 10)
+        transport = _FakeBlobService(data)
+        stream = BytesIO()
+
+        self._create_client(transport).download_blob(validate_content=True).download_to_stream(
+            stream, max_connections=3)
+
+        self.assertEqual(stream.getvalue(), data)
+        self.assertEqual(transport.range_md5, [True] * 7)
+
+    def test_download_slow_chunk_bounds_pending(self):
+        data = os.urandom(256 * 20)
+        transport = _FakeBlobService(data)
+        transport.slow_offset = 256
+        update = RollingContentMD5.update
+        pending = []
+
+        def tracking_update(md5, offset, chunk):
+            update(md5, offset, chunk)
+            pending.append(len(md5._pending))
+
+        stream = BytesIO()
+        with mock.patch.object(RollingContentMD5, 'update', tracking_update):
+            self._create_client(transport).download_blob(validate_content=True).download_to_stream(
+                stream, max_connections=2)
+
+        self.assertEqual(stream.getvalue(), data)
+        # The chunks after the slow one are downloaded ahead of it, but only within the window
+        self.assertGreater(max(pending), 0)
+        self.assertLessEqual(max(pending), 2 * 2)
+
+    def test_download_iter_validates_blob(self):
+        data = os.urandom(256 * 3)
+        transport = _FakeBlobService(data)
+
+        content = b''.join(self._create_client(transport).download_blob(validate_content=True))
+
+        self.assertEqual(content, data)
+
+    def test_download_chunk_md5_mismatch(self):
+        transport = _FakeBlobService(os.urandom(256 * 4))
+        transport.corrupt_offset = 512
+
+        with self.assertRaises(AzureError) as context:
+            self._create_client(transport).download_blob(validate_content=True).download_to_stream(
+                BytesIO(), max_connections=2)
+        self.assertIn('MD5 mismatch', str(context.exception))
+
+    def test_download_blob_md5_mismatch(self):
+        data = os.urandom(256 * 4)
+        transport = _FakeBlobService(data, hashlib.md5(b'other').digest())
+
+        with self.assertRaises(AzureError):
+            self._create_client(transport).download_blob(validate_content=True).download_to_stream(
+                BytesIO(), max_connections=2)
+        with self.assertRaises(AzureError):
+            b''.join(self._create_client(transport).download_blob(validate_content=True))
+
+        # The stored MD5 is only checked when the content is validated
+        stream = BytesIO()
+        self._create_client(transport).download_blob().download_to_stream(stream, max_connections=2)
+        self.assertEqual(stream.getvalue(), data)
+
+    def test_get_content_md5_in_place(self):
+        data = os.urandom(1000)
+        expected = hashlib.md5(data[100:]).digest()
+
+        body = RewindableBody(data, offset=100)
+        body.read(10)
+        body.seek(0)
+        self.assertEqual(StorageContentValidation.get_content_md5(body), expected)
+        self.assertEqual(body.tell(), 0)
+
+        with tempfile.TemporaryFile() as local:
+            local.write(data)
+            local.flush()
+            mapped = mmap.mmap(local.fileno(), 0)
+            try:
+                self.assertEqual(StorageContentValidation.get_content_md5(mapped), hashlib.md5(data).digest())
+                self.assertEqual(
+                    StorageContentValidation.get_content_md5(RewindableBody(mapped, offset=100)), expected)
+            finally:
+                mapped.close()
+
+            # A body over a file is read, then rewound
+            body = RewindableBody(local, offset=100)
+            self.assertEqual(StorageContentValidation.get_content_md5(body), expected)
+            self.assertEqual(body.tell(), 0)
+
+# ------------------------------------------------------------------------------
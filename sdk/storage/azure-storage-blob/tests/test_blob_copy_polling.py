@@ -0,0 +1,97 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import threading
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.core.polling import PollingScheduler, as_completed
+from azure.storage.blob import BlobClient, NoRetry
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', '0')
+        self.content_type = None
+
+    def body(self):
+        return b''
+
+
+class _FakeCopies(HttpTransport):
+    """Starts copies that are pending for two polls, those of the blobs named 'bad*' then fail."""
+
+    def __init__(self):
+        self.polls = {}
+        self.poll_threads = set()
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        name = request.url.split('?')[0].rsplit('/', 1)[1]
+        headers = {'ETag': '"0x1"', 'Last-Modified': 'Sun, 16 Jun 2019 22:45:39 GMT', 'x-ms-copy-id': 'copy-' + name}
+        if request.method == 'PUT':
+            headers['x-ms-copy-status'] = 'pending'
+            return _FakeResponse(request, 202, headers)
+        with self._lock:
+            self.polls[name] = self.polls.get(name, 0) + 1
+            self.poll_threads.add(threading.current_thread().name)
+            polls = self.polls[name]
+        headers['x-ms-blob-type'] = 'BlockBlob'
+        headers['x-ms-copy-status'] = 'pending' if polls < 3 else 'failed' if name.startswith('bad') else 'success'
+        return _FakeResponse(request, 200, headers)
+
+
+class StorageBlobCopyPollingTest(StorageTestCase):
+
+    def test_copy_polled_by_scheduler(self):
+        transport = _FakeCopies()
+        blobs = [BlobClient(
+            'https://account.blob.core.windows.net/container/blob{}?sv=2018-03-28&sig=signature'.format(i),
+            transport=transport,
+            retry_policy=NoRetry()) for i in range(10)]
+        bad = BlobClient(
+            'https://account.blob.core.windows.net/container/bad?sv=2018-03-28&sig=signature',
+            transport=transport,
+            retry_policy=NoRetry())
+        for client in blobs + [bad]:
+            client._config.blob_settings.copy_polling_interval = 0.01
+
+        with PollingScheduler(max_workers=2, coalesce_window=0.01) as scheduler:
+            pollers = [b.copy_blob_from_url('https://source/blob', polling_scheduler=scheduler) for b in blobs]
+            failing = bad.copy_blob_from_url('https://source/bad', polling_scheduler=scheduler)
+            completed = list(as_completed(pollers, timeout=10))
+
+            self.assertEqual(len(completed), 10)
+            for poller in pollers:
+                self.assertEqual(poller.result().copy.status, 'success')
+            with self.assertRaises(ValueError):
+                failing.result()
+        self.assertTrue(all(name.startswith('PollingScheduler') for name in transport.poll_threads))
+
+# ------------------------------------------------------------------------------
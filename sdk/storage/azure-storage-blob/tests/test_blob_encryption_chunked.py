@@ -0,0 +1,173 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.blob import BlobClient, NoRetry
+from azure.storage.blob._shared.utils import url_unquote
+from encryption_test_helper import KeyWrapper, KeyResolver
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _CountingKeyWrapper(KeyWrapper):
+
+    def __init__(self, kid='local:key1'):
+        KeyWrapper.__init__(self, kid)
+        self.unwrapped = 0
+
+    def unwrap_key(self, key, algorithm):
+        self.unwrapped += 1
+        return KeyWrapper.unwrap_key(self, key, algorithm)
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the response and the blob properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        body = _StreamedBody([self._body])
+        body.response = self
+        return body
+
+
+class _FakeBlobService(HttpTransport):
+    """Keeps one block blob and its encryption metadata in memory."""
+
+    def __init__(self):
+        self.blocks = {}
+        self.content = None
+        self.metadata = None
+        self.ranges = []
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        data = request.data
+        if hasattr(data, 'read'):
+            data = data.read()
+        if request.method == 'PUT' and 'comp=block&' in request.url + '&':
+            block_id = url_unquote(re.search('blockid=([^&]*)', request.url).group(1))
+            self.blocks[block_id] = data
+            return _FakeResponse(request, 201)
+        if request.method == 'PUT':
+            if 'comp=blocklist' in request.url:
+                data = b''.join(self.blocks[e.text] for e in ET.fromstring(data))
+            self.content = data
+            self.metadata = request.headers.get('x-ms-meta-encryptiondata')
+            return _FakeResponse(request, 201, {'ETag': '"0x1"'})
+        if request.method == 'GET':
+            start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()
+            self.ranges.append((int(start), int(end)))
+            body = self.content[int(start):int(end) + 1]
+            return _FakeResponse(request, 206, {
+                'Content-Range': 'bytes {}-{}/{}'.format(start, int(start) + len(body) - 1, len(self.content)),
+                'ETag': '"0x1"',
+                'x-ms-blob-type': 'BlockBlob',
+                'x-ms-meta-encryptiondata': self.metadata}, body)
+        raise ValueError(request.method)
+
+
+class StorageBlobEncryptionChunkedTest(StorageTestCase):
+
+    def _create_client(self, transport, **kwargs):
+        return BlobClient(
+            'https://account.blob.core.windows.net/container/blob',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_single_put_size=1024,
+            max_block_size=256,
+            max_single_get_size=256,
+            max_chunk_get_size=256,
+            **kwargs)
+
+    def test_download_encrypted_blob_chunks(self):
+        transport = _FakeBlobService()
+        kek = _CountingKeyWrapper()
+        client = self._create_client(transport, key_encryption_key=kek, require_encryption=True)
+        data = os.urandom(256 * 10 + 10)
+        client.upload_blob(BytesIO(data))
+        stream = BytesIO()
+
+        client.download_blob().download_to_stream(stream, max_connections=3)
+
+        self.assertEqual(len(transport.content), 256 * 10 + 16)
+        self.assertEqual(stream.getvalue(), data)
+        # Each chunk starts with the last block of the previous one, its IV
+        self.assertEqual(transport.ranges[1], (240, 511))
+        self.assertEqual(kek.unwrapped, 1)
+
+    def test_download_encrypted_blob_range_over_chunks(self):
+        transport = _FakeBlobService()
+        kek = _CountingKeyWrapper()
+        client = self._create_client(transport, key_encryption_key=kek)
+        data = os.urandom(256 * 6)
+        client.upload_blob(BytesIO(data))
+
+        content = client.download_blob(offset=100, length=1200).content_as_bytes()
+
+        self.assertEqual(content, data[100:1201])
+        self.assertEqual(kek.unwrapped, 1)
+
+    def test_download_encrypted_blob_from_offset(self):
+        transport = _FakeBlobService()
+        client = self._create_client(transport, key_encryption_key=KeyWrapper())
+        data = os.urandom(256 * 4 + 7)
+        client.upload_blob(BytesIO(data))
+        stream = BytesIO()
+
+        client.download_blob(offset=300).download_to_stream(stream, max_connections=2)
+
+        self.assertEqual(stream.getvalue(), data[300:])
+
+    def test_download_encrypted_blob_chunks_with_resolver(self):
+        transport = _FakeBlobService()
+        kek = _CountingKeyWrapper('local:key2')
+        resolver = KeyResolver()
+        resolver.put_key(kek)
+        self._create_client(transport, key_encryption_key=kek).upload_blob(BytesIO(os.urandom(256 * 4)))
+        client = self._create_client(transport, key_resolver_function=resolver.resolve_key)
+        stream = BytesIO()
+
+        client.download_blob().download_to_stream(stream, max_connections=2)
+
+        self.assertEqual(len(stream.getvalue()), 256 * 4)
+        self.assertEqual(kek.unwrapped, 1)
+
+# ------------------------------------------------------------------------------
@@ -0,0 +1,181 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import threading
+import time
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.blob import ContainerClient, NoRetry
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_BLOB = (
+    '<Blob><Name>{}</Name><Properties><Last-Modified>Sun, 16 Jun 2019 22:45:39 GMT</Last-Modified>'
+    '<Etag>0x1</Etag><Content-Length>1</Content-Length><BlobType>BlockBlob</BlobType></Properties></Blob>')
+_PREFIX = '<BlobPrefix><Name>{}</Name></BlobPrefix>'
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict({'Content-Type': 'application/xml', 'Content-Length': str(len(body))})
+        self.content_type = ['application/xml']
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class _FakeListingService(HttpTransport):
+    """Lists a set of blob names by pages, and counts the requests in flight."""
+
+    def __init__(self, names, page_size):
+        self.names = sorted(names)
+        self.page_size = page_size
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_prefix = None
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            return self._handle(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _handle(self, request):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        prefix = query.get('prefix', '')
+        if self.fail_prefix is not None and prefix == self.fail_prefix:
+            return _FakeResponse(request, 500)
+        delimiter = query.get('delimiter')
+        entries = []
+        for name in self.names:
+            if not name.startswith(prefix):
+                continue
+            rest = name[len(prefix):]
+            if delimiter and delimiter in rest:
+                sub_prefix = prefix + rest[:rest.index(delimiter) + len(delimiter)]
+                if not entries or entries[-1] != (sub_prefix, True):
+                    entries.append((sub_prefix, True))
+            else:
+                entries.append((name, False))
+        start = int(query.get('marker', 0))
+        page = entries[start:start + self.page_size]
+        next_marker = str(start + self.page_size) if start + self.page_size < len(entries) else ''
+        body = '<?xml version="1.0" encoding="utf-8"?><EnumerationResults ContainerName="container"><Blobs>{}</Blobs>' \
+               '<NextMarker>{}</NextMarker></EnumerationResults>'.format(
+                   ''.join((_PREFIX if is_prefix else _BLOB).format(name) for name, is_prefix in page), next_marker)
+        return _FakeResponse(request, 200, body.encode('utf-8'))
+
+
+class StorageBlobListParallelTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageBlobListParallelTest, self).setUp()
+        self.names = ['top{}'.format(i) for i in range(5)]
+        for directory in range(10):
+            for sub in range(3):
+                self.names.extend('dir{}/sub{}/blob{}'.format(directory, sub, i) for i in range(4))
+            self.names.append('dir{}/file'.format(directory))
+            self.names.append('dir{}.txt'.format(directory))
+
+    def _create_client(self, transport):
+        return ContainerClient(
+            'https://account.blob.core.windows.net/container', transport=transport, retry_policy=NoRetry())
+
+    def test_list_blobs_parallel_unordered(self):
+        transport = _FakeListingService(self.names, 4)
+        client = self._create_client(transport)
+
+        blobs = list(client.list_blobs_parallel(max_concurrency=4))
+
+        self.assertEqual(sorted(b.name for b in blobs), sorted(self.names))
+        self.assertEqual(len(blobs), len(self.names))
+        self.assertEqual(blobs[0].container, 'container')
+        self.assertEqual(transport.max_in_flight, 4)
+
+    def test_list_blobs_parallel_ordered(self):
+        transport = _FakeListingService(self.names, 3)
+        client = self._create_client(transport)
+
+        names = [b.name for b in client.list_blobs_parallel(partition_depth=2, max_concurrency=3, ordered=True)]
+
+        self.assertEqual(names, sorted(self.names))
+        self.assertLessEqual(transport.max_in_flight, 3)
+        self.assertGreater(transport.max_in_flight, 1)
+
+    def test_list_blobs_parallel_with_prefix(self):
+        transport = _FakeListingService(self.names, 5)
+        client = self._create_client(transport)
+
+        names = [b.name for b in client.list_blobs_parallel(name_starts_with='dir3/', ordered=True)]
+
+        self.assertEqual(names, sorted(n for n in self.names if n.startswith('dir3/')))
+
+    def test_list_blobs_parallel_single_connection(self):
+        transport = _FakeListingService(self.names, 2)
+        client = self._create_client(transport)
+
+        names = [b.name for b in client.list_blobs_parallel(partition_depth=3, max_concurrency=1, ordered=True)]
+
+        self.assertEqual(names, sorted(self.names))
+        self.assertEqual(transport.max_in_flight, 1)
+
+    def test_list_blobs_parallel_raises_shard_error(self):
+        transport = _FakeListingService(self.names, 4)
+        transport.fail_prefix = 'dir5/'
+        client = self._create_client(transport)
+
+        with self.assertRaises(HttpResponseError):
+            list(client.list_blobs_parallel(max_concurrency=4))
+
+    def test_list_blobs_parallel_stops_early(self):
+        transport = _FakeListingService(self.names, 1)
+        client = self._create_client(transport)
+
+        blobs = client.list_blobs_parallel(max_concurrency=2, ordered=True)
+        self.assertEqual(next(blobs).name, 'dir0.txt')
+        blobs.close()
+        time.sleep(0.1)
+        requests = transport.requests
+        time.sleep(0.1)
+
+        self.assertEqual(transport.requests, requests)
+
+# ------------------------------------------------------------------------------
@@ -0,0 +1,140 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import base64
+from datetime import datetime, timedelta
+try:
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs  # type: ignore
+
+from azure.storage.blob import ContainerClient, BlobServiceClient, BlobPermissions
+from azure.storage.blob._shared.shared_access_signature import BlobSharedAccessSignature
+from azure.storage.blob._shared.utils import _sign_string
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_ACCOUNT_KEY = base64.b64encode(b'account key').decode('utf-8')
+_EXPIRY = datetime(2019, 6, 16, 22, 45, 39)
+
+
+def _count_signatures(factory):
+    # Signs one token, so that the signing key of the factory is created
+    factory.generate_container('warmup', permission='r', expiry=_EXPIRY)
+    signing_key = factory._signing_key
+    sign = signing_key.sign
+    signed = []
+
+    def counting_sign(string_to_sign):
+        signed.append(string_to_sign)
+        return sign(string_to_sign)
+
+    signing_key.sign = counting_sign
+    return signed
+
+
+class StorageBlobSasCacheTest(StorageTestCase):
+
+    def test_generate_blob_signature(self):
+        factory = BlobSharedAccessSignature('account', _ACCOUNT_KEY)
+
+        token = factory.generate_blob(
+            'container', 'blob', permission='rw', expiry=_EXPIRY, protocol='https', content_type='text/plain')
+
+        query = dict((k, v[0]) for k, v in parse_qs(token).items())
+        string_to_sign = '\n'.join([
+            'rw', '', '2019-06-16T22:45:39Z', '/blob/account/container/blob', '', '', 'https', factory.x_ms_version,
+            '', '', '', '', 'text/plain'])
+        self.assertEqual(query['sig'], _sign_string(_ACCOUNT_KEY, string_to_sign))
+        self.assertEqual(query['se'], '2019-06-16T22:45:39Z')
+
+    def test_cached_tokens(self):
+        factory = BlobSharedAccessSignature('account', _ACCOUNT_KEY, cache_size=2)
+        uncached = BlobSharedAccessSignature('account', _ACCOUNT_KEY)
+        signed = _count_signatures(factory)
+
+        first = factory.generate_blob('container', 'first', permission='r', expiry=_EXPIRY)
+        self.assertEqual(factory.generate_blob('container', 'first', permission='r', expiry=_EXPIRY), first)
+        self.assertEqual(uncached.generate_blob('container', 'first', permission='r', expiry=_EXPIRY), first)
+        self.assertEqual(len(signed), 1)
+
+        # Another resource, or other parameters, are another token
+        factory.generate_container('first', permission='r', expiry=_EXPIRY)
+        factory.generate_blob('container', 'first', permission='rw', expiry=_EXPIRY)
+        self.assertEqual(len(signed), 3)
+
+        # The least recently used token was evicted
+        self.assertEqual(factory.generate_blob('container', 'first', permission='r', expiry=_EXPIRY), first)
+        self.assertEqual(len(signed), 4)
+
+    def test_expiry_granularity(self):
+        factory = BlobSharedAccessSignature('account', _ACCOUNT_KEY, cache_size=10, expiry_granularity=300)
+        signed = _count_signatures(factory)
+
+        first = factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY)
+        second = factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY + timedelta(seconds=20))
+        third = factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY + timedelta(seconds=300))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertEqual(len(signed), 2)
+        # The expiry is rounded up, never before the requested one
+        self.assertEqual(parse_qs(first)['se'], ['2019-06-16T22:50:00Z'])
+        self.assertEqual(parse_qs(third)['se'], ['2019-06-16T22:55:00Z'])
+        # The expiries given as strings are kept
+        token = factory.generate_blob('container', 'blob', permission='r', expiry='2019-06-16T22:45:39Z')
+        self.assertEqual(parse_qs(token)['se'], ['2019-06-16T22:45:39Z'])
+
+    def test_account_key_changed(self):
+        factory = BlobSharedAccessSignature('account', _ACCOUNT_KEY, cache_size=10)
+        first = factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY)
+
+        factory.account_key = base64.b64encode(b'other key').decode('utf-8')
+        second = factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            second, BlobSharedAccessSignature('account', factory.account_key).generate_blob(
+                'container', 'blob', permission='r', expiry=_EXPIRY))
+
+    def test_clients_share_factory(self):
+        service = BlobServiceClient(
+            'https://account.blob.core.windows.net',
+            credential={'account_name': 'account', 'account_key': _ACCOUNT_KEY},
+            sas_cache_size=100)
+        container = service.get_container_client('container')
+        factory = BlobSharedAccessSignature('account', _ACCOUNT_KEY)
+
+        token = container.get_blob_client('blob').generate_shared_access_signature(
+            permission=BlobPermissions.READ, expiry=_EXPIRY)
+        signed = _count_signatures(service._config.blob_settings.sas_factory)
+        cached = container.get_blob_client('blob').generate_shared_access_signature(
+            permission=BlobPermissions.READ, expiry=_EXPIRY)
+
+        self.assertEqual(token, factory.generate_blob('container', 'blob', permission='r', expiry=_EXPIRY))
+        self.assertEqual(cached, token)
+        self.assertEqual(signed, [])
+        self.assertEqual(
+            container.generate_shared_access_signature(permission='r', expiry=_EXPIRY),
+            factory.generate_container('container', permission='r', expiry=_EXPIRY))
+        self.assertEqual(
+            service.generate_shared_access_signature('o', 'r', _EXPIRY),
+            factory.generate_account('b', 'o', 'r', _EXPIRY))
+
+    def test_no_account_key(self):
+        container = ContainerClient(
+            'https://account.blob.core.windows.net/container?sv=2018-03-28&sig=signature')
+
+        with self.assertRaises(ValueError):
+            container.generate_shared_access_signature(permission='r', expiry=_EXPIRY)
+
+# ------------------------------------------------------------------------------
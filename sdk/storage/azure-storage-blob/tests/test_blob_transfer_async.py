@@ -0,0 +1,322 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import asyncio
+import base64
+import hashlib
+import os
+import re
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import AsyncHttpTransport, AsyncHttpResponse
+from azure.storage.blob import NoRetry
+from azure.storage.blob.aio import BlobClient
+from azure.storage.blob._shared.upload_chunking_async import BufferPool
+from azure.storage.blob._shared.policies import encode_base64
+from encryption_test_helper import KeyWrapper
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _FakeResponse(AsyncHttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = self.headers.get('Content-Type')
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        async def chunks():
+            for i in range(0, len(self._body), 100):
+                yield self._body[i:i + 100]
+        return chunks()
+
+
+class _FakeBlobService(AsyncHttpTransport):
+    """Keeps one block blob in memory, and counts the requests in flight."""
+
+    def __init__(self, content=b''):
+        self.blocks = {}
+        self.content = content
+        self.etag = '"0x1"'
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.if_match = set()
+        self.metadata = {}
+        self.stored_md5 = None
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send(self, request, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Give the other transfers a chance to start
+            await asyncio.sleep(0.01)
+            return self._handle(request)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def _handle(self, request):
+        data = request.data
+        if hasattr(data, 'read'):
+            data = bytes(data.read())
+        if request.method == 'PUT' and 'comp=block&' in request.url + '&':
+            block_id = re.search('blockid=([^&]*)', request.url).group(1)
+            self.blocks[block_id] = data
+            return _FakeResponse(request, 201)
+        if request.method == 'PUT' and 'comp=blocklist' in request.url:
+            ids = [e.text for e in ET.fromstring(data)]
+            # The block ids are the base64 encoded offsets of the blocks
+            assert all(re.match(r'\d{32}$', base64.b64decode(i).decode('utf-8')) for i in ids)
+            from azure.storage.blob._shared.utils import url_quote
+            self.content = b''.join(self.blocks[url_quote(i)] for i in ids)
+            self.metadata = {k: v for k, v in request.headers.items() if k.startswith('x-ms-meta-')}
+            return _FakeResponse(request, 201, {'ETag': self.etag})
+        if request.method == 'PUT':
+            self.content = data
+            self.metadata = {k: v for k, v in request.headers.items() if k.startswith('x-ms-meta-')}
+            return _FakeResponse(request, 201, {'ETag': self.etag})
+        if request.method == 'GET':
+            self.if_match.add(request.headers.get('If-Match'))
+            start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()
+            body = self.content[int(start):int(end) + 1]
+            headers = {
+                'Content-Range': 'bytes {}-{}/{}'.format(start, int(start) + len(body) - 1, len(self.content)),
+                'ETag': self.etag,
+                'x-ms-blob-type': 'BlockBlob'}
+            headers.update(self.metadata)
+            if request.headers.get('x-ms-range-get-content-md5') == 'true':
+                headers['Content-MD5'] = encode_base64(hashlib.md5(body).digest())
+            if self.stored_md5:
+                headers['x-ms-blob-content-md5'] = encode_base64(self.stored_md5)
+            return _FakeResponse(request, 206, headers, body)
+        raise ValueError(request.method)
+
+
+class _CountingKeyWrapper(KeyWrapper):
+
+    def __init__(self):
+        KeyWrapper.__init__(self)
+        self.unwrapped = 0
+
+    def unwrap_key(self, key, algorithm):
+        self.unwrapped += 1
+        return KeyWrapper.unwrap_key(self, key, algorithm)
+
+
+class _TrackedStream(BytesIO):
+    """Checks that reading the source doesn't get ahead of the uploads."""
+
+    def __init__(self, data, transport, limit):
+        super(_TrackedStream, self).__init__(data)
+        self.transport = transport
+        self.limit = limit
+        self.reads = 0
+
+    def readinto(self, b):
+        self.reads += 1
+        assert self.reads - self.transport.completed <= self.limit
+        return super(_TrackedStream, self).readinto(b)
+
+
+class StorageBlobTransferAsyncTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageBlobTransferAsyncTest, self).setUp()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        return super(StorageBlobTransferAsyncTest, self).tearDown()
+
+    def _create_client(self, transport):
+        return BlobClient(
+            'https://account.blob.core.windows.net/container/blob',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_single_put_size=1024,
+            max_block_size=256,
+            max_single_get_size=256,
+            max_chunk_get_size=256)
+
+    def test_upload_blob_chunks_concurrently(self):
+        transport = _FakeBlobService()
+        data = os.urandom(256 * 20 + 10)
+        stream = _TrackedStream(data, transport, 5)
+        client = self._create_client(transport)
+
+        self.loop.run_until_complete(client.upload_blob(stream, max_connections=4))
+
+        self.assertEqual(transport.content, data)
+        self.assertEqual(len(transport.blocks), 21)
+        self.assertEqual(transport.max_in_flight, 4)
+
+    def test_upload_blob_unknown_length(self):
+        transport = _FakeBlobService()
+        data = os.urandom(256 * 8)
+        client = self._create_client(transport)
+
+        self.loop.run_until_complete(client.upload_blob(iter([data[:1000], data[1000:]]), max_connections=2))
+
+        self.assertEqual(transport.content, data)
+
+    def test_upload_blob_single_put(self):
+        transport = _FakeBlobService()
+        client = self._create_client(transport)
+
+        self.loop.run_until_complete(client.upload_blob(b'small blob'))
+
+        self.assertEqual(transport.content, b'small blob')
+        self.assertEqual(transport.blocks, {})
+
+    def test_download_blob_chunks_concurrently(self):
+        data = os.urandom(256 * 20 + 10)
+        transport = _FakeBlobService(data)
+        client = self._create_client(transport)
+        stream = BytesIO()
+
+        properties = self.loop.run_until_complete(client.download_blob_to_stream(stream, max_connections=3))
+
+        self.assertEqual(stream.getvalue(), data)
+        self.assertEqual(properties.size, len(data))
+        self.assertEqual(properties.name, 'blob')
+        self.assertEqual(transport.max_in_flight, 3)
+        # The chunks are locked on the ETag of the first response
+        self.assertEqual(transport.if_match, {None, '"0x1"'})
+
+    def test_download_blob_range(self):
+        data = os.urandom(1000)
+        transport = _FakeBlobService(data)
+        client = self._create_client(transport)
+        stream = BytesIO()
+
+        properties = self.loop.run_until_complete(
+            client.download_blob_to_stream(stream, offset=100, length=899, max_connections=2))
+
+        self.assertEqual(stream.getvalue(), data[100:900])
+        self.assertEqual(properties.size, 800)
+
+    def test_download_blob_validate_content(self):
+        data = os.urandom(256 * 6 + 10)
+        transport = _FakeBlobService(data)
+        transport.stored_md5 = hashlib.md5(data).digest()
+        client = self._create_client(transport)
+        stream = BytesIO()
+
+        self.loop.run_until_complete(
+            client.download_blob_to_stream(stream, validate_content=True, max_connections=3))
+
+        self.assertEqual(stream.getvalue(), data)
+
+        transport.stored_md5 = hashlib.md5(b'other').digest()
+        with self.assertRaises(AzureError):
+            self.loop.run_until_complete(
+                client.download_blob_to_stream(BytesIO(), validate_content=True, max_connections=3))
+
+        # A range is only checked against the MD5 of its chunks
+        stream = BytesIO()
+        self.loop.run_until_complete(
+            client.download_blob_to_stream(stream, offset=100, length=899, validate_content=True))
+        self.assertEqual(stream.getvalue(), data[100:900])
+
+    def test_encrypted_blob_chunks(self):
+        transport = _FakeBlobService()
+        kek = _CountingKeyWrapper()
+        data = os.urandom(256 * 20 + 10)
+        client = self._create_client(transport)
+        client.key_encryption_key = kek
+        client.require_encryption = True
+
+        self.loop.run_until_complete(client.upload_blob(_TrackedStream(data, transport, 5), max_connections=4))
+
+        self.assertEqual(len(transport.content), 256 * 20 + 16)
+        self.assertNotEqual(transport.content[:256], data[:256])
+        self.assertIn('x-ms-meta-encryptiondata', transport.metadata)
+        self.assertEqual(transport.max_in_flight, 4)
+
+        stream = BytesIO()
+        self.loop.run_until_complete(client.download_blob_to_stream(stream, max_connections=3))
+
+        self.assertEqual(stream.getvalue(), data)
+        self.assertEqual(kek.unwrapped, 1)
+
+    def test_encrypted_blob_unknown_length(self):
+        transport = _FakeBlobService()
+        data = os.urandom(256 * 8)
+        client = self._create_client(transport)
+        client.key_encryption_key = KeyWrapper()
+
+        self.loop.run_until_complete(client.upload_blob(iter([data[:1000], data[1000:]]), max_connections=2))
+        stream = BytesIO()
+        self.loop.run_until_complete(client.download_blob_to_stream(stream, max_connections=2))
+
+        # The padding is a block of its own
+        self.assertEqual(len(transport.content), 256 * 8 + 16)
+        self.assertEqual(stream.getvalue(), data)
+
+    def test_encrypted_blob_single_put_and_range(self):
+        transport = _FakeBlobService()
+        data = os.urandom(1000)
+        client = self._create_client(transport)
+        client.key_encryption_key = KeyWrapper()
+
+        self.loop.run_until_complete(client.upload_blob(data))
+        stream = BytesIO()
+        properties = self.loop.run_until_complete(
+            client.download_blob_to_stream(stream, offset=100, length=899, max_connections=2))
+
+        self.assertEqual(transport.blocks, {})
+        self.assertEqual(len(transport.content), 1008)
+        self.assertEqual(stream.getvalue(), data[100:900])
+        self.assertEqual(properties.size, 800)
+
+        stream = BytesIO()
+        self.loop.run_until_complete(client.download_blob_to_stream(stream, offset=300, max_connections=2))
+
+        self.assertEqual(stream.getvalue(), data[300:])
+
+    def test_buffer_pool_reuses_buffers(self):
+        async def use_pool():
+            pool = BufferPool(2, 16)
+            first = await pool.acquire()
+            second = await pool.acquire()
+            waiting = asyncio.ensure_future(pool.acquire())
+            await asyncio.sleep(0)
+            self.assertFalse(waiting.done())
+            pool.release(first)
+            self.assertIs(await waiting, first)
+            pool.release(second)
+
+        self.loop.run_until_complete(use_pool())
+
+# ------------------------------------------------------------------------------
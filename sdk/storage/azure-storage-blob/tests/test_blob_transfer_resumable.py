@@ -0,0 +1,223 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import os
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.blob import BlobClient, NoRetry
+from azure.storage.blob._shared.utils import url_unquote
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the blob properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        return _StreamedBody([self._body])
+
+
+class _FakeBlobService(HttpTransport):
+    """Keeps one block blob in memory, and fails the requests chosen by the test."""
+
+    def __init__(self, content=None):
+        self.content = content
+        self.etag = '"0x1"'
+        self.uncommitted = {}
+        self.staged = []
+        self.ranges = []
+        self.fail = lambda request: False
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        if self.fail(request):
+            return _FakeResponse(request, 500)
+        return self._handle(request)
+
+    def _handle(self, request):
+        data = request.data
+        if hasattr(data, 'read'):
+            data = data.read()
+        if request.method == 'HEAD':
+            if self.content is None:
+                return _FakeResponse(request, 404)
+            return _FakeResponse(request, 200, {
+                'ETag': self.etag, 'x-ms-blob-type': 'BlockBlob', 'Content-Length': str(len(self.content))})
+        if request.method == 'PUT' and 'comp=block&' in request.url + '&':
+            block_id = url_unquote(re.search('blockid=([^&]*)', request.url).group(1))
+            self.uncommitted[block_id] = data
+            self.staged.append(block_id)
+            return _FakeResponse(request, 201)
+        if request.method == 'GET' and 'comp=blocklist' in request.url:
+            blocks = ''.join('<Block><Name>{}</Name><Size>{}</Size></Block>'.format(i, len(b))
+                             for i, b in self.uncommitted.items())
+            body = '<?xml version="1.0" encoding="utf-8"?><BlockList><CommittedBlocks />' \
+                   '<UncommittedBlocks>{}</UncommittedBlocks></BlockList>'.format(blocks)
+            return _FakeResponse(request, 200, {'Content-Type': 'application/xml'}, body.encode('utf-8'))
+        if request.method == 'PUT' and 'comp=blocklist' in request.url:
+            ids = [e.text for e in ET.fromstring(data)]
+            self.content = b''.join(self.uncommitted[i] for i in ids)
+            self.uncommitted = {}
+            self.etag = '"0x2"'
+            return _FakeResponse(request, 201, {'ETag': self.etag})
+        if request.method == 'GET':
+            start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()
+            self.ranges.append(int(start))
+            body = self.content[int(start):int(end) + 1]
+            return _FakeResponse(request, 206, {
+                'Content-Range': 'bytes {}-{}/{}'.format(start, int(start) + len(body) - 1, len(self.content)),
+                'ETag': self.etag,
+                'x-ms-blob-type': 'BlockBlob'}, body)
+        raise ValueError(request.method)
+
+
+class StorageBlobTransferResumableTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageBlobTransferResumableTest, self).setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.temp_dir, 'transfer.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        return super(StorageBlobTransferResumableTest, self).tearDown()
+
+    def _create_client(self, transport):
+        return BlobClient(
+            'https://account.blob.core.windows.net/container/blob',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_single_put_size=1024,
+            max_block_size=256,
+            max_single_get_size=256,
+            max_chunk_get_size=256)
+
+    def test_upload_blob_resumes_missing_blocks(self):
+        transport = _FakeBlobService()
+        client = self._create_client(transport)
+        data = os.urandom(256 * 10 + 10)
+        transport.fail = lambda request: len(transport.staged) == 6
+
+        with self.assertRaises(HttpResponseError):
+            client.upload_blob(BytesIO(data), checkpoint=self.checkpoint)
+        self.assertTrue(os.path.exists(self.checkpoint))
+        self.assertIsNone(transport.content)
+
+        transport.fail = lambda request: False
+        transport.staged = []
+        client.upload_blob(BytesIO(data), checkpoint=self.checkpoint)
+
+        self.assertEqual(transport.content, data)
+        self.assertEqual(len(transport.staged), 5)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_upload_blob_restarts_if_blob_changed(self):
+        transport = _FakeBlobService()
+        client = self._create_client(transport)
+        data = os.urandom(256 * 4)
+        transport.fail = lambda request: len(transport.staged) == 2
+
+        with self.assertRaises(HttpResponseError):
+            client.upload_blob(BytesIO(data), checkpoint=self.checkpoint)
+
+        # Another writer committed the blob, which discarded the staged blocks
+        transport.content = b'other'
+        transport.etag = '"0x9"'
+        transport.uncommitted = {}
+        transport.fail = lambda request: False
+        transport.staged = []
+        client.upload_blob(BytesIO(data), overwrite=True, checkpoint=self.checkpoint)
+
+        self.assertEqual(transport.content, data)
+        self.assertEqual(len(transport.staged), 4)
+
+    def test_upload_blob_resumable_requires_length(self):
+        client = self._create_client(_FakeBlobService())
+
+        with self.assertRaises(ValueError):
+            client.upload_blob(iter([b'abc']), checkpoint=self.checkpoint)
+
+    def test_download_blob_resumes_missing_chunks(self):
+        data = os.urandom(256 * 10 + 10)
+        transport = _FakeBlobService(data)
+        client = self._create_client(transport)
+        stream = BytesIO()
+        transport.fail = lambda request: request.method == 'GET' and len(transport.ranges) == 5
+
+        with self.assertRaises(HttpResponseError):
+            client.download_blob(checkpoint=self.checkpoint).download_to_stream(stream)
+        self.assertTrue(os.path.exists(self.checkpoint))
+
+        transport.fail = lambda request: False
+        transport.ranges = []
+        stream.seek(0)
+        properties = client.download_blob(checkpoint=self.checkpoint).download_to_stream(stream, max_connections=2)
+
+        self.assertEqual(stream.getvalue(), data)
+        self.assertEqual(properties.size, len(data))
+        # The first chunk, then the chunks after the failure
+        self.assertEqual(sorted(transport.ranges), [0] + list(range(256 * 5, len(data), 256)))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_download_blob_restarts_if_blob_changed(self):
+        data = os.urandom(256 * 4)
+        transport = _FakeBlobService(data)
+        client = self._create_client(transport)
+        stream = BytesIO()
+        transport.fail = lambda request: request.method == 'GET' and len(transport.ranges) == 2
+
+        with self.assertRaises(HttpResponseError):
+            client.download_blob(checkpoint=self.checkpoint).download_to_stream(stream)
+
+        data = os.urandom(256 * 4)
+        transport.content = data
+        transport.etag = '"0x9"'
+        transport.fail = lambda request: False
+        transport.ranges = []
+        stream.seek(0)
+        client.download_blob(checkpoint=self.checkpoint).download_to_stream(stream)
+
+        self.assertEqual(stream.getvalue(), data)
+        self.assertEqual(len(transport.ranges), 4)
+
+# ------------------------------------------------------------------------------
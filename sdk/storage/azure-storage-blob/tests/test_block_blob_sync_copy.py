@@ -6,13 +6,17 @@
 import pytest
 
 from datetime import datetime, timedelta
+from requests.structures import CaseInsensitiveDict
+
 from azure.core import HttpResponseError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
 from azure.storage.blob import (
     BlobServiceClient,
     ContainerClient,
     BlobClient,
     StorageErrorCode,
-    BlobPermissions
+    BlobPermissions,
+    NoRetry
 )
 from azure.storage.blob._shared.policies import StorageContentValidation
 from testcase import (
@@ -26,6 +30,40 @@ SOURCE_BLOB_SIZE = 8 * 1024
 
 # ------------------------------------------------------------------------------
 
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = 201
+        self.reason = 'Created'
+        self.headers = CaseInsensitiveDict({'Content-Length': '0'})
+        self.content_type = None
+
+    def body(self):
+        return b''
+
+
+class _RecordingTransport(HttpTransport):
+    """Records the source range of the blocks staged from a URL."""
+
+    def __init__(self):
+        self.source_ranges = []
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        self.source_ranges.append(request.headers.get('x-ms-source-range'))
+        return _FakeResponse(request)
+
+
 class StorageBlockBlobTest(StorageTestCase):
 
     def setUp(self):
@@ -80,12 +118,12 @@ class StorageBlockBlobTest(StorageTestCase):
             block_id=1,
             source_url=self.source_blob_url,
             source_offset=0,
-            source_length=4 * 1024 - 1)
+            source_length=4 * 1024)
         dest_blob.stage_block_from_url(
             block_id=2,
             source_url=self.source_blob_url,
             source_offset=4 * 1024,
-            source_length=8 * 1024)
+            source_length=4 * 1024)
 
         # Assert blocks
         committed, uncommitted = dest_blob.get_block_list('all')
@@ -152,3 +190,22 @@ class StorageBlockBlobTest(StorageTestCase):
         # Verify content
         content = dest_blob.download_blob().content_as_bytes()
         self.assertEqual(self.source_blob_data, content)
+
+    def test_stage_block_from_url_source_range(self):
+        transport = _RecordingTransport()
+        dest_blob = BlobClient(
+            'https://account.blob.core.windows.net/container/blob?sv=2018-03-28&sig=signature',
+            transport=transport,
+            retry_policy=NoRetry())
+
+        dest_blob.stage_block_from_url(1, 'https://source/blob', source_offset=0, source_length=4 * 1024)
+        dest_blob.stage_block_from_url(2, 'https://source/blob', source_offset=4 * 1024, source_length=1)
+        dest_blob.stage_block_from_url(3, 'https://source/blob', source_offset=4 * 1024)
+        dest_blob.stage_block_from_url(4, 'https://source/blob')
+
+        # source_length is the size of the block, the end of the range is inclusive
+        self.assertEqual(transport.source_ranges, ['bytes=0-4095', 'bytes=4096-4096', 'bytes=4096-', None])
+        with self.assertRaises(ValueError):
+            dest_blob.stage_block_from_url(5, 'https://source/blob', source_length=1)
+
+# ------------------------------------------------------------------------------
@@ -0,0 +1,209 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from azure.core.exceptions import ResourceModifiedError
+from azure.storage.blob import BlobProperties, ContentSettings
+from azure.storage.blob._directory_sync import sync_directory_to_container, sync_container_to_directory
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+
+class _FakeBlob(object):
+
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+
+    def download_blob(self, if_match=None, timeout=None):
+        if if_match != self.container.etags.get(self.name):
+            raise ResourceModifiedError()
+        return self
+
+    def download_to_stream(self, stream):
+        self.container.track()
+        stream.write(self.container.content[self.name])
+
+
+class _FakeContainer(object):
+    """Keeps blobs in memory, and tracks the operations in progress."""
+
+    def __init__(self):
+        self.blobs = {}
+        self.content = {}
+        self.etags = {}
+        self.operations = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def track(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+
+    def put(self, name, data, last_modified=None, content_md5=None):
+        blob = BlobProperties()
+        blob.name = name
+        blob.size = len(data)
+        blob.etag = '"{}"'.format(len(self.operations))
+        blob.last_modified = last_modified or datetime.utcnow()
+        blob.content_settings = ContentSettings(content_md5=content_md5)
+        self.blobs[name] = blob
+        self.content[name] = data
+        self.etags[name] = blob.etag
+
+    def list_blobs(self, name_starts_with=None, timeout=None):
+        for name in sorted(self.blobs):
+            if name.startswith(name_starts_with or ''):
+                yield self.blobs[name]
+
+    def upload_blob(self, name, data, overwrite=False, content_settings=None, timeout=None):
+        self.track()
+        self.operations.append(('upload', name))
+        self.put(name, data.read(), content_md5=content_settings.content_md5 if content_settings else None)
+
+    def delete_blob(self, name, timeout=None):
+        self.operations.append(('delete', name))
+        del self.blobs[name]
+
+    def get_blob_client(self, name):
+        self.operations.append(('download', name))
+        return _FakeBlob(self, name)
+
+
+class StorageDirectorySyncTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageDirectorySyncTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return super(StorageDirectorySyncTest, self).tearDown()
+
+    def _write(self, relative, data, mtime=None):
+        path = os.path.join(self.directory, *relative.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as local:
+            local.write(data)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def _read(self, relative):
+        with open(os.path.join(self.directory, *relative.split('/')), 'rb') as local:
+            return local.read()
+
+    def test_sync_directory_uploads_changed_files(self):
+        container = _FakeContainer()
+        an_hour_ago = time.time() - 3600
+        self._write('same.txt', b'same', an_hour_ago)
+        self._write('sub/resized.txt', b'longer')
+        self._write('sub/new.txt', b'new')
+        self._write('newer.txt', b'abcd')
+        container.put('backup/same.txt', b'same')
+        container.put('backup/sub/resized.txt', b'short')
+        container.put('backup/newer.txt', b'dcba', last_modified=datetime.utcnow() - timedelta(hours=2))
+        container.put('backup/extra.txt', b'extra')
+        container.put('other/file.txt', b'other')
+
+        result = sync_directory_to_container(container, self.directory, 'backup/', True, False, 4, None)
+
+        self.assertEqual(
+            sorted(result.transferred), ['backup/newer.txt', 'backup/sub/new.txt', 'backup/sub/resized.txt'])
+        self.assertEqual(result.deleted, ['backup/extra.txt'])
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(result.failed, {})
+        self.assertEqual(container.content['backup/sub/resized.txt'], b'longer')
+        self.assertEqual(container.content['backup/newer.txt'], b'abcd')
+        self.assertEqual(sorted(container.blobs), [
+            'backup/newer.txt', 'backup/same.txt', 'backup/sub/new.txt', 'backup/sub/resized.txt', 'other/file.txt'])
+
+    def test_sync_directory_compares_md5(self):
+        container = _FakeContainer()
+        self._write('same.txt', b'same')
+        self._write('changed.txt', b'new!')
+        container.put(
+            'same.txt', b'same', last_modified=datetime(2000, 1, 1), content_md5=hashlib.md5(b'same').digest())
+        container.put('changed.txt', b'old!', content_md5=hashlib.md5(b'old!').digest())
+
+        result = sync_directory_to_container(container, self.directory, '', False, True, 2, None)
+
+        self.assertEqual(result.transferred, ['changed.txt'])
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(container.blobs['changed.txt'].content_settings.content_md5, hashlib.md5(b'new!').digest())
+
+    def test_sync_directory_concurrency_is_capped(self):
+        container = _FakeContainer()
+        for i in range(20):
+            self._write('file{}.txt'.format(i), b'data')
+
+        result = sync_directory_to_container(container, self.directory, '', False, False, 3, None)
+
+        self.assertEqual(len(result.transferred), 20)
+        self.assertEqual(container.max_in_flight, 3)
+
+    def test_sync_container_downloads_changed_blobs(self):
+        container = _FakeContainer()
+        container.put('data/same.txt', b'same', last_modified=datetime(2019, 1, 1))
+        container.put('data/sub/new.txt', b'new')
+        container.put('data/updated.txt', b'updated')
+        container.put('data/folder/', b'')
+        container.put('data/../escape.txt', b'escape')
+        self._write('same.txt', b'same', time.time())
+        self._write('updated.txt', b'outdate', time.time() - 3600 * 24 * 365 * 10)
+        self._write('extra.txt', b'extra')
+
+        result = sync_container_to_directory(container, self.directory, 'data/', True, False, 4, None)
+
+        self.assertEqual(sorted(result.transferred), ['data/sub/new.txt', 'data/updated.txt'])
+        self.assertEqual(result.deleted, [os.path.join(self.directory, 'extra.txt')])
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(list(result.failed), ['data/../escape.txt'])
+        self.assertEqual(self._read('sub/new.txt'), b'new')
+        self.assertEqual(self._read('updated.txt'), b'updated')
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'extra.txt')))
+
+        # The downloaded files get the time of their blob, so they are up to date
+        container.operations = []
+        result = sync_container_to_directory(container, self.directory, 'data/', True, False, 4, None)
+
+        self.assertEqual(result.transferred, [])
+        self.assertEqual(result.unchanged, 3)
+        self.assertEqual(container.operations, [])
+
+    def test_sync_container_reports_failures(self):
+        container = _FakeContainer()
+        container.put('a.txt', b'a')
+        container.put('b.txt', b'b')
+        # Modified after the listing
+        container.etags['a.txt'] = '"modified"'
+
+        result = sync_container_to_directory(container, self.directory, '', False, False, 2, None)
+
+        self.assertEqual(result.transferred, ['b.txt'])
+        self.assertEqual(list(result.failed), ['a.txt'])
+        self.assertIsInstance(result.failed['a.txt'], ResourceModifiedError)
+
+# ------------------------------------------------------------------------------
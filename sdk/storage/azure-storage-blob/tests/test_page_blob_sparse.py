@@ -0,0 +1,269 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.blob import BlobClient, BlobType, NoRetry
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_PAGE = 512
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the response and the blob properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        body = _StreamedBody([self._body])
+        body.response = self
+        return body
+
+
+def _page_list(pages, clear_pages=()):
+    def ranges(page_set, tag):
+        xml = ''
+        for page in sorted(page_set):
+            if page - _PAGE not in page_set:
+                end = page
+                while end + _PAGE in page_set:
+                    end += _PAGE
+                xml += '<{0}><Start>{1}</Start><End>{2}</End></{0}>'.format(tag, page, end + _PAGE - 1)
+        return xml
+    return '<?xml version="1.0" encoding="utf-8"?><PageList>{}{}</PageList>'.format(
+        ranges(pages, 'PageRange'), ranges(clear_pages, 'ClearRange')).encode('utf-8')
+
+
+class _FakePageBlobService(HttpTransport):
+    """Keeps one page blob and its snapshots in memory, with the offsets of its valid pages."""
+
+    def __init__(self):
+        self.content = bytearray()
+        self.pages = set()
+        self.snapshots = {}
+        self.written = []
+        self.downloaded = []
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, offset, data):
+        self.content[offset:offset + len(data)] = data
+        self.pages.update(range(offset, offset + len(data), _PAGE))
+
+    def snapshot(self, name):
+        self.snapshots[name] = (bytes(self.content), set(self.pages))
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            return self._handle(request)
+
+    def _handle(self, request):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        headers = {'ETag': '"0x1"', 'x-ms-blob-type': 'PageBlob'}
+        if request.method == 'PUT' and query.get('comp') == 'page':
+            start, end = [int(i) for i in re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()]
+            data = request.data.read() if hasattr(request.data, 'read') else request.data
+            self.written.append((start, end))
+            self.write(start, data)
+            return _FakeResponse(request, 201, headers)
+        if request.method == 'PUT':
+            self.content = bytearray(int(request.headers['x-ms-blob-content-length']))
+            self.pages = set()
+            return _FakeResponse(request, 201, headers)
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(self.content))
+            return _FakeResponse(request, 200, headers)
+        if request.method == 'GET' and query.get('comp') == 'pagelist':
+            headers['Content-Type'] = 'application/xml'
+            if 'prevsnapshot' in query:
+                content, pages = self.snapshots[query['prevsnapshot']]
+                changed = set(p for p in self.pages if self.content[p:p + _PAGE] != content[p:p + _PAGE])
+                return _FakeResponse(request, 200, headers, _page_list(changed, pages - self.pages))
+            return _FakeResponse(request, 200, headers, _page_list(self.pages))
+        if request.method == 'GET':
+            start, end = re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()
+            self.downloaded.append((int(start), int(end)))
+            body = bytes(self.content[int(start):int(end) + 1])
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, int(start) + len(body) - 1, len(self.content))
+            return _FakeResponse(request, 206, headers, body)
+        raise ValueError(request.method)
+
+
+class _CountingFile(io.FileIO):
+
+    def __init__(self, *args):
+        super(_CountingFile, self).__init__(*args)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super(_CountingFile, self).read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class StoragePageBlobSparseTest(StorageTestCase):
+
+    def setUp(self):
+        super(StoragePageBlobSparseTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'disk.vhd')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return super(StoragePageBlobSparseTest, self).tearDown()
+
+    def _create_client(self, transport):
+        return BlobClient(
+            'https://account.blob.core.windows.net/container/disk.vhd',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_page_size=8 * 1024,
+            max_chunk_get_size=2 * 1024)
+
+    def _write_sparse_file(self, size, extents):
+        with open(self.path, 'wb') as local:
+            local.truncate(size)
+            for offset, data in extents:
+                local.seek(offset)
+                local.write(data)
+
+    def test_upload_sparse_file_reads_data_only(self):
+        size = 4 * 1024 * 1024
+        extents = [(8192, os.urandom(100)), (1024 * 1024 + 300, os.urandom(5000)), (size - 4096, os.urandom(4096))]
+        self._write_sparse_file(size, extents)
+        transport = _FakePageBlobService()
+
+        with _CountingFile(self.path, 'r') as source:
+            self._create_client(transport).upload_blob(
+                source, blob_type=BlobType.PageBlob, length=size, max_connections=2)
+            self.assertLess(source.bytes_read, 64 * 1024)
+
+        with open(self.path, 'rb') as local:
+            self.assertEqual(bytes(transport.content), local.read())
+        for start, end in transport.written:
+            self.assertEqual(start % _PAGE, 0)
+            self.assertEqual((end + 1) % _PAGE, 0)
+
+    def test_upload_skips_empty_chunks(self):
+        data = b'\x00' * 8192 + os.urandom(1024) + b'\x00' * 8192 * 2
+        transport = _FakePageBlobService()
+
+        self._create_client(transport).upload_blob(BytesIO(data), blob_type=BlobType.PageBlob)
+
+        self.assertEqual(transport.written, [(8192, 8192 * 2 - 1)])
+        self.assertEqual(bytes(transport.content), data)
+
+    def test_download_page_ranges_to_sparse_file(self):
+        transport = _FakePageBlobService()
+        transport.content = bytearray(8 * 1024 * 1024)
+        transport.write(0, os.urandom(_PAGE))
+        transport.write(3 * 1024 * 1024, os.urandom(5 * 1024))
+        transport.write(8 * 1024 * 1024 - _PAGE, os.urandom(_PAGE))
+
+        with open(self.path, 'wb') as local:
+            local.write(b'previous content')
+            local.seek(0)
+            properties = self._create_client(transport).download_page_ranges_to_stream(local, max_connections=3)
+            self.assertEqual(local.tell(), 8 * 1024 * 1024)
+
+        self.assertEqual(properties.size, 8 * 1024 * 1024)
+        with open(self.path, 'rb') as local:
+            self.assertEqual(local.read(), bytes(transport.content))
+        self.assertEqual(sum(end - start + 1 for start, end in transport.downloaded), 6 * 1024)
+        self.assertLessEqual(max(end - start + 1 for start, end in transport.downloaded), 2 * 1024)
+        if hasattr(os, 'SEEK_DATA'):
+            with open(self.path, 'rb') as local:
+                # The empty pages in between were not written
+                self.assertEqual(os.lseek(local.fileno(), 64 * 1024, os.SEEK_DATA), 3 * 1024 * 1024)
+
+    def test_download_page_ranges_incremental(self):
+        transport = _FakePageBlobService()
+        transport.content = bytearray(64 * 1024)
+        transport.write(0, os.urandom(4096))
+        transport.write(32 * 1024, os.urandom(4096))
+        transport.snapshot('2019-06-01T00:00:00.0000000Z')
+        stream = BytesIO(bytes(transport.content))
+
+        transport.write(_PAGE, os.urandom(_PAGE))
+        transport.write(48 * 1024, os.urandom(1024))
+        # Cleared since the snapshot
+        transport.content[32 * 1024:36 * 1024] = bytes(4096)
+        transport.pages -= set(range(32 * 1024, 36 * 1024, _PAGE))
+        transport.downloaded = []
+
+        self._create_client(transport).download_page_ranges_to_stream(
+            stream, previous_snapshot_diff='2019-06-01T00:00:00.0000000Z')
+
+        self.assertEqual(stream.getvalue(), bytes(transport.content))
+        self.assertEqual(transport.downloaded, [(_PAGE, 2 * _PAGE - 1), (48 * 1024, 49 * 1024 - 1)])
+
+    def test_download_page_ranges_to_memory(self):
+        transport = _FakePageBlobService()
+        transport.content = bytearray(16 * 1024)
+        transport.write(4096, os.urandom(_PAGE))
+        stream = BytesIO()
+
+        self._create_client(transport).download_page_ranges_to_stream(stream)
+
+        self.assertEqual(stream.getvalue(), bytes(transport.content))
+
+    def test_download_page_ranges_block_blob(self):
+        transport = _FakePageBlobService()
+        client = self._create_client(transport)
+        client.upload_blob(b'', blob_type=BlobType.PageBlob)
+        original = transport._handle
+
+        def block_blob(request):
+            response = original(request)
+            response.headers['x-ms-blob-type'] = 'BlockBlob'
+            return response
+        transport._handle = block_blob
+
+        with self.assertRaises(ValueError):
+            client.download_page_ranges_to_stream(BytesIO())
+
+# ------------------------------------------------------------------------------
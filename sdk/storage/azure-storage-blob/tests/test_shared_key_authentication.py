@@ -0,0 +1,109 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import base64
+import hashlib
+import hmac
+import threading
+
+from azure.core.exceptions import ClientAuthenticationError
+from azure.core.pipeline import PipelineRequest, PipelineContext
+from azure.core.pipeline.transport import HttpRequest
+from azure.storage.blob._shared.authentication import SharedKeyCredentialPolicy
+
+from testcase import (
+    StorageTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_ACCOUNT_KEY = base64.b64encode(b'account key').decode('utf-8')
+
+
+def _signature(account_key, string_to_sign):
+    digest = hmac.HMAC(base64.b64decode(account_key), string_to_sign.encode('utf-8'), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('utf-8')
+
+
+def _create_request(method='PUT', url='https://account.blob.core.windows.net/container/blob', headers=None):
+    request = HttpRequest(method, url, headers=headers)
+    return PipelineRequest(request, PipelineContext(None))
+
+
+class StorageSharedKeyAuthenticationTest(StorageTestCase):
+
+    def test_string_to_sign(self):
+        policy = SharedKeyCredentialPolicy('account', _ACCOUNT_KEY)
+        request = _create_request(
+            url='https://account.blob.core.windows.net/container/blob%20name?comp=block&blockid=YWJj%3D&timeout=',
+            headers={
+                'Content-Length': '0',
+                'Content-Type': 'text/plain',
+                'If-Match': '"0x8D"',
+                'User-Agent': 'test',
+                'x-ms-version': '2018-03-28',
+                'x-ms-meta-Key': 'value',
+                'x-ms-date': 'Sun, 16 Jun 2019 22:45:39 GMT',
+                'x-ms-empty': '',
+            })
+
+        policy.on_request(request)
+
+        string_to_sign = (
+            'PUT\n'
+            '\n\n\n\ntext/plain\n\n\n"0x8D"\n\n\n\n'
+            'x-ms-date:Sun, 16 Jun 2019 22:45:39 GMT\nx-ms-empty:\nx-ms-meta-key:value\nx-ms-version:2018-03-28\n'
+            '/account/container/blob%20name\nblockid:YWJj=\ncomp:block\ntimeout:')
+        self.assertEqual(
+            request.http_request.headers['Authorization'],
+            'SharedKey account:' + _signature(_ACCOUNT_KEY, string_to_sign))
+
+    def test_account_key_changed(self):
+        policy = SharedKeyCredentialPolicy('account', _ACCOUNT_KEY)
+        first = _create_request(method='GET')
+        policy.on_request(first)
+
+        policy.account_key = base64.b64encode(b'other key').decode('utf-8')
+        second = _create_request(method='GET')
+        policy.on_request(second)
+
+        string_to_sign = 'GET\n' + '\n' * 11 + '/account/container/blob'
+        self.assertEqual(
+            second.http_request.headers['Authorization'],
+            'SharedKey account:' + _signature(policy.account_key, string_to_sign))
+        self.assertNotEqual(first.http_request.headers['Authorization'], second.http_request.headers['Authorization'])
+
+    def test_invalid_account_key(self):
+        policy = SharedKeyCredentialPolicy('account', 'dummy_account_key')
+
+        with self.assertRaises(ClientAuthenticationError):
+            policy.on_request(_create_request())
+
+    def test_signing_concurrently(self):
+        policy = SharedKeyCredentialPolicy('account', _ACCOUNT_KEY)
+        signatures = {}
+
+        def sign(index):
+            for i in range(200):
+                path = 'https://account.blob.core.windows.net/container/blob{}-{}'.format(index, i)
+                request = _create_request(method='GET', url=path)
+                policy.on_request(request)
+                signatures[path] = request.http_request.headers['Authorization']
+
+        threads = [threading.Thread(target=sign, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(signatures), 800)
+        for path, authorization in signatures.items():
+            string_to_sign = 'GET\n' + '\n' * 11 + '/account' + path[len('https://account.blob.core.windows.net'):]
+            self.assertEqual(authorization, 'SharedKey account:' + _signature(_ACCOUNT_KEY, string_to_sign))
+
+# ------------------------------------------------------------------------------
@@ -9,8 +9,10 @@
 import pytest
 
 import os
+import tempfile
 
-from azure.storage.blob._shared.upload_chunking import _SubStream
+from azure.storage.blob._shared.upload_chunking import (
+    _SubStream, upload_blob_substream_blocks, BlockBlobChunkUploader)
 from threading import Lock
 from io import (BytesIO, SEEK_SET)
 
@@ -21,6 +23,19 @@ from testcase import (
 # ------------------------------------------------------------------------------
 
 
+class _BlockRecorder(object):
+
+    def __init__(self):
+        self.blocks = {}
+        self.body_types = set()
+
+    def stage_block(self, block_id, length, body, **kwargs):
+        self.body_types.add(type(body).__name__)
+        data = body.read(length)
+        assert len(data) == length
+        self.blocks[block_id] = bytes(data)
+
+
 class StorageBlobUploadChunkingTest(StorageTestCase):
 
     # this is a white box test that's designed to make sure _Substream behaves properly
@@ -112,3 +127,41 @@ class StorageBlobUploadChunkingTest(StorageTestCase):
         finally:
             wrapped_stream.close()
             substream.close()
+
+    def _upload_substream_blocks(self, stream, blob_size, max_connections):
+        recorder = _BlockRecorder()
+        block_ids = upload_blob_substream_blocks(
+            blob_service=recorder,
+            blob_size=blob_size,
+            block_size=1024,
+            stream=stream,
+            max_connections=max_connections,
+            validate_content=False,
+            access_conditions=None,
+            uploader_class=BlockBlobChunkUploader,
+            modified_access_conditions=None)
+        return recorder, b''.join(recorder.blocks[i] for i in block_ids)
+
+    def test_substream_blocks_from_file_are_memory_mapped(self):
+        data = os.urandom(10 * 1024 + 100)
+        temp_file = tempfile.NamedTemporaryFile(delete=False)
+        try:
+            temp_file.write(data)
+            temp_file.close()
+            with open(temp_file.name, 'rb') as stream:
+                stream.seek(50)
+                recorder, uploaded = self._upload_substream_blocks(stream, len(data) - 100, 4)
+        finally:
+            os.remove(temp_file.name)
+
+        self.assertEqual(uploaded, data[50:-50])
+        self.assertEqual(len(recorder.blocks), 10)
+        self.assertEqual(recorder.body_types, {'RewindableBody'})
+
+    def test_substream_blocks_from_stream_are_not_memory_mapped(self):
+        data = os.urandom(10 * 1024 + 100)
+
+        recorder, uploaded = self._upload_substream_blocks(BytesIO(data), len(data), 1)
+
+        self.assertEqual(uploaded, data)
+        self.assertEqual(recorder.body_types, {'_SubStream'})
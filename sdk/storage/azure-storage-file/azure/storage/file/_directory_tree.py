@@ -0,0 +1,172 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import collections
+import os
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+
+def _join(path, name):
+    return path + '/' + name if path else name
+
+
+class DirectoryTree(object):
+    """Runs the operations on a directory tree in a pool of max_concurrency threads.
+
+    The listings of the directories and the operations on their entries share the
+    pool, so that max_concurrency caps the requests in flight for the whole tree.
+    The directories are listed breadth-first, as many at a time as there are threads,
+    and at most twice as many operations as threads are queued: the listing of a tree
+    with millions of files doesn't get ahead of the operations on them.
+
+    The first error stops the submissions, and is raised once the running operations
+    are done.
+    """
+
+    def __init__(self, client, max_concurrency, timeout, **kwargs):
+        import concurrent.futures
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1.")
+        self._client = client
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._request_options = kwargs
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_concurrency)
+        self._running = set()  # type: set
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        import concurrent.futures
+        try:
+            concurrent.futures.wait(self._running)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _reap(self, futures):
+        for future in futures:
+            self._running.discard(future)
+            future.result()
+
+    def submit(self, operation, *args):
+        import concurrent.futures
+        while len(self._running) >= self._max_concurrency * 2:
+            done, _ = concurrent.futures.wait(self._running, return_when=concurrent.futures.FIRST_COMPLETED)
+            self._reap(done)
+        future = self._executor.submit(operation, *args)
+        self._running.add(future)
+        return future
+
+    def wait(self, futures=None):
+        """Wait for the given operations, or for all of them, and raise the first error."""
+        import concurrent.futures
+        done, _ = concurrent.futures.wait(self._running if futures is None else futures)
+        self._reap(done)
+
+    def _list_directory(self, path):
+        client = self._client.get_subdirectory_client(path) if path else self._client
+        directories, files = [], []
+        for item in client.list_directories_and_files(timeout=self._timeout, **self._request_options):
+            if item['is_directory']:
+                directories.append(item['name'])
+            else:
+                files.append(item)
+        return directories, files
+
+    def walk(self):
+        """Yield the (path, directory names, files) of each directory of the tree, breadth-first."""
+        import concurrent.futures
+        pending = collections.deque([''])
+        listing = {}  # type: dict
+        try:
+            while pending or listing:
+                while pending and len(listing) < self._max_concurrency:
+                    path = pending.popleft()
+                    listing[self._executor.submit(self._list_directory, path)] = path
+                done, _ = concurrent.futures.wait(listing, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    path = listing.pop(future)
+                    directories, files = future.result()
+                    pending.extend(_join(path, name) for name in directories)
+                    yield path, directories, files
+        finally:
+            concurrent.futures.wait(listing)
+
+    def _delete_file(self, path):
+        try:
+            self._client.get_file_client(path).delete_file(timeout=self._timeout, **self._request_options)
+        except ResourceNotFoundError:
+            pass
+
+    def _delete_directory(self, path):
+        client = self._client.get_subdirectory_client(path) if path else self._client
+        try:
+            client.delete_directory(timeout=self._timeout, **self._request_options)
+        except ResourceNotFoundError:
+            pass
+
+    def delete(self):
+        levels = collections.defaultdict(list)  # type: dict
+        for path, _, files in self.walk():
+            levels[path.count('/') + 1 if path else 0].append(path)
+            for item in files:
+                self.submit(self._delete_file, _join(path, item['name']))
+        self.wait()
+        # A directory can only be deleted once it is empty: the deepest ones go first
+        for depth in sorted(levels, reverse=True):
+            for path in levels[depth]:
+                if path or self._client.directory_path:
+                    self.submit(self._delete_directory, path)
+            self.wait()
+
+    def _create_directory(self, path):
+        client = self._client.get_subdirectory_client(path) if path else self._client
+        try:
+            client.create_directory(timeout=self._timeout, **self._request_options)
+        except ResourceExistsError:
+            pass
+
+    def _upload_file(self, source, path):
+        with open(source, 'rb') as data:
+            self._client.get_file_client(path).upload_file(
+                data, length=os.fstat(data.fileno()).st_size, timeout=self._timeout, **self._request_options)
+
+    def upload(self, source):
+        level = ['']
+        while level:
+            # The directories of a level are created before their files and subdirectories
+            if self._client.directory_path or level != ['']:
+                self.wait([self.submit(self._create_directory, path) for path in level])
+            next_level = []
+            for path in level:
+                local_directory = os.path.join(source, *path.split('/'))
+                for name in sorted(os.listdir(local_directory)):
+                    local_path = os.path.join(local_directory, name)
+                    if os.path.isdir(local_path):
+                        next_level.append(_join(path, name))
+                    else:
+                        self.submit(self._upload_file, local_path, _join(path, name))
+            level = next_level
+        self.wait()
+
+    def _download_file(self, path, destination):
+        with open(destination, 'wb') as stream:
+            self._client.get_file_client(path).download_file(
+                timeout=self._timeout, **self._request_options).download_to_stream(stream)
+
+    def download(self, destination):
+        for path, _, files in self.walk():
+            local_directory = os.path.join(destination, *path.split('/'))
+            if not os.path.isdir(local_directory):
+                os.makedirs(local_directory)
+            for item in files:
+                self.submit(self._download_file, _join(path, item['name']), os.path.join(local_directory, item['name']))
+        self.wait()
@@ -4,19 +4,26 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import bisect
+import os
 import sys
-from io import BytesIO
+import threading
+from io import BytesIO, UnsupportedOperation
+
+import six
+
+from azure.core.exceptions import ResourceNotFoundError
 
 from .models import ShareProperties, DirectoryProperties, FileProperties
 from ._generated.models import StorageErrorException
 from ._shared.utils import process_storage_error, parse_length_from_content_range
-from ._shared.upload_chunking import upload_file_chunks
 from ._shared.download_chunking import (
     validate_and_format_range_headers,
     process_range_and_offset,
     process_content,
     ParallelFileChunkDownloader,
     SequentialFileChunkDownloader)
+from ._transfer_journal import TransferJournal
 
 
 def deserialize_metadata(response, obj, headers):  # pylint: disable=unused-argument
@@ -62,6 +69,132 @@ def deserialize_file_stream(response, obj, headers):
     return response.location_mode, obj
 
 
+def process_in_parallel(process, items, max_connections):
+    """Call process on each item, in a pool of max_connections threads.
+
+    Unlike executor.map, the items are submitted as the threads free up, so that a
+    multi-GB transfer doesn't queue a task per range upfront, and the first error
+    stops the submissions. It is raised once the running tasks are done.
+    """
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_connections) as executor:
+        running = set()  # type: set
+        try:
+            for item in items:
+                if len(running) >= max_connections * 2:
+                    done, running = concurrent.futures.wait(
+                        running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                running.add(executor.submit(process, item))
+        finally:
+            done, _ = concurrent.futures.wait(running)
+        for future in done:
+            future.result()
+
+
+def _describe_source(stream):
+    """Identify the version of a local file, so that a resumed upload doesn't mix two versions."""
+    try:
+        file_stat = os.fstat(stream.fileno())
+        return [file_stat.st_size, file_stat.st_mtime]
+    except (AttributeError, EnvironmentError, UnsupportedOperation, ValueError):
+        return None
+
+
+def _is_range_written(valid_ranges, start, end):
+    # The valid ranges returned by the service are sorted and don't overlap
+    index = bisect.bisect_right([r['start'] for r in valid_ranges], start) - 1
+    return index >= 0 and valid_ranges[index]['end'] >= end
+
+
+class _FileRangeUploader(object):  # pylint: disable=too-many-instance-attributes
+    """Uploads a stream to a new file, range by range.
+
+    The ranges of zeros are skipped rather than uploaded: a new file reads as zeros until
+    its ranges are written, so that sparse data, like a disk image, only transfers and
+    stores its allocated ranges.
+    """
+
+    def __init__(self, client, stream, size, range_size, validate_content, timeout, journal, **kwargs):
+        self.client = client
+        self.stream = stream
+        self.size = size
+        self.range_size = range_size
+        self.validate_content = validate_content
+        self.timeout = timeout
+        self.journal = journal
+        self.request_options = kwargs
+        self.stream_start = None
+        self.stream_lock = threading.Lock()
+        self.progress_total = 0
+        self.progress_lock = threading.Lock()
+
+    def _read_range(self, offset, length):
+        with self.stream_lock:
+            if self.stream_start is not None:
+                self.stream.seek(self.stream_start + offset)
+            data = self.stream.read(length)
+        if isinstance(data, six.text_type):
+            data = data.encode('UTF-8')
+        return data
+
+    def _update_progress(self, length):
+        with self.progress_lock:
+            self.progress_total += length
+            return self.progress_total - length
+
+    def upload_range(self, offset):
+        data = self._read_range(offset, min(self.range_size, self.size - offset))
+        if data and data.count(b'\x00') != len(data):
+            self.client.upload_range(
+                data,
+                offset,
+                offset + len(data) - 1,
+                validate_content=self.validate_content,
+                timeout=self.timeout,
+                data_stream_total=self.size,
+                upload_stream_current=self._update_progress(len(data)),
+                **self.request_options)
+        else:
+            self._update_progress(len(data))
+        if self.journal is not None:
+            self.journal.record(offset)
+        return 'bytes={0}-{1}'.format(offset, offset + len(data) - 1)
+
+    def upload(self, offsets, max_connections):
+        if max_connections > 1 or self.journal is not None:
+            try:
+                self.stream_start = self.stream.tell()
+            except (AttributeError, UnsupportedOperation):
+                raise ValueError("The data should be a seekable stream for a parallel or resumable upload.")
+        if max_connections > 1:
+            process_in_parallel(self.upload_range, offsets, max_connections)
+        else:
+            for offset in offsets:
+                self.upload_range(offset)
+
+
+def _get_resumable_ranges(client, journal, size, timeout, **kwargs):
+    """The offsets of the ranges uploaded by the interrupted upload recorded in the journal.
+
+    They are only trusted if the file still has the size it was created with, and the
+    ranges still hold data. A range of zeros isn't written, so it is checked again.
+    """
+    if not journal.completed:
+        return None
+    try:
+        properties = client.get_file_properties(timeout=timeout, **kwargs)
+    except ResourceNotFoundError:
+        return None
+    if properties.size != size:
+        return None
+    valid_ranges = client.get_ranges(timeout=timeout, **kwargs)
+    range_size = journal.header['range_size']
+    return set(offset for offset in journal.completed
+               if _is_range_written(valid_ranges, offset, min(offset + range_size, size) - 1))
+
+
 def upload_file_helper(
         client,
         stream,
@@ -72,29 +205,55 @@ def upload_file_helper(
         timeout,
         max_connections,
         file_settings,
+        checkpoint=None,
         **kwargs):
     try:
         if size is None or size < 0:
             raise ValueError("A content size must be specified for a File.")
-        response = client.create_file(
-            size,
-            content_settings=content_settings,
-            metadata=metadata,
-            timeout=timeout,
-            **kwargs
-        )
-        if size == 0:
-            return response
-
-        return upload_file_chunks(
-            file_service=client,
-            file_size=size,
-            block_size=file_settings.max_range_size,
-            stream=stream,
-            max_connections=max_connections,
-            validate_content=validate_content,
-            timeout=timeout,
-            **kwargs)
+        range_size = file_settings.max_range_size
+        journal = None
+        uploaded = None
+        if checkpoint is not None:
+            try:
+                stream_start = stream.tell()
+            except (AttributeError, UnsupportedOperation):
+                raise ValueError("The data should be a seekable stream for a resumable upload.")
+            journal = TransferJournal(checkpoint, {
+                'operation': 'upload',
+                'file': client.share_name + '/' + '/'.join(client.file_path),
+                'source': _describe_source(stream),
+                'offset': stream_start,
+                'length': size,
+                'range_size': range_size,
+            })
+        try:
+            if journal is not None:
+                journal.open()
+                uploaded = _get_resumable_ranges(client, journal, size, timeout, **kwargs)
+            if uploaded is None:
+                response = client.create_file(
+                    size,
+                    content_settings=content_settings,
+                    metadata=metadata,
+                    timeout=timeout,
+                    **kwargs
+                )
+                if size == 0:
+                    if journal is not None:
+                        journal.delete()
+                    return response
+                uploaded = set()
+
+            offsets = range(0, size, range_size)
+            uploader = _FileRangeUploader(
+                client, stream, size, range_size, validate_content, timeout, journal, **kwargs)
+            uploader.upload((o for o in offsets if o not in uploaded), max_connections)
+            if journal is not None:
+                journal.delete()
+            return ['bytes={0}-{1}'.format(o, min(o + range_size, size) - 1) for o in offsets]
+        finally:
+            if journal is not None:
+                journal.close()
     except StorageErrorException as error:
         process_storage_error(error)
 
@@ -108,7 +267,7 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
 
     def __init__(
             self, share, file_name, file_path, service, config, offset,
-            length, validate_content, timeout, **kwargs):
+            length, validate_content, timeout, checkpoint=None, **kwargs):
         self.service = service
 
         self.config = config
@@ -116,6 +275,7 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         self.length = length
         self.timeout = timeout
         self.validate_content = validate_content
+        self.checkpoint = checkpoint
         self.request_options = kwargs
         self.location_mode = None
         self._download_complete = False
@@ -291,12 +451,14 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         :param stream:
             The stream to download to. This can be an open file-handle,
             or any writable stream. The stream must be seekable if the download
-            uses more than one parallel connection.
+            uses more than one parallel connection, or is resumable. To resume a
+            download, the stream must hold the data written by the interrupted one,
+            for example a file opened in 'r+b' mode.
         :returns: The properties of the downloaded file.
         :rtype: ~azure.storage.file.models.FileProperties
         """
-        # the stream must be seekable if parallel download is required
-        if max_connections > 1:
+        # the stream must be seekable if parallel or resumable download is required
+        if max_connections > 1 or self.checkpoint is not None:
             error_message = "Target stream handle must be seekable."
             if sys.version_info >= (3,) and not stream.seekable():
                 raise ValueError(error_message)
@@ -319,6 +481,8 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
         if content is not None:
             stream.write(content)
         if self._download_complete:
+            if self.checkpoint is not None:
+                TransferJournal(self.checkpoint, None).delete()
             return self.properties
 
         end_file = self.file_size
@@ -326,7 +490,9 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
             # Use the length unless it is over the end of the file
             end_file = min(self.file_size, self.length + 1)
 
-        downloader_class = ParallelFileChunkDownloader if max_connections > 1 else SequentialFileChunkDownloader
+        # Chunks are written at their offset when some of them are skipped
+        downloader_class = ParallelFileChunkDownloader \
+            if max_connections > 1 or self.checkpoint is not None else SequentialFileChunkDownloader
         downloader = downloader_class(
             file_service=self.service,
             download_size=self.download_size,
@@ -341,12 +507,36 @@ class StorageStreamDownloader(object):  # pylint: disable=too-many-instance-attr
             cls=deserialize_file_stream,
             **self.request_options)
 
-        if max_connections > 1:
-            import concurrent.futures
-            executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-            list(executor.map(downloader.process_chunk, downloader.get_chunk_offsets()))
+        if self.checkpoint is not None:
+            self._download_chunks_resumable(downloader, max_connections)
+        elif max_connections > 1:
+            process_in_parallel(downloader.process_chunk, downloader.get_chunk_offsets(), max_connections)
         else:
             for chunk in downloader.get_chunk_offsets():
                 downloader.process_chunk(chunk)
 
         return self.properties
+
+    def _download_chunks_resumable(self, downloader, max_connections):
+        # The ranges of a file can't be locked on its ETag: a download is only resumed
+        # if the file still has the ETag it had when the download started
+        header = {
+            'operation': 'download',
+            'file': '{0}/{1}'.format(self.properties.share, self.properties.path),
+            'etag': self.properties.etag,
+            'offset': self.offset,
+            'length': self.length,
+            'chunk_size': self.config.max_chunk_get_size,
+        }
+        with TransferJournal(self.checkpoint, header) as journal:
+            def process_chunk(chunk_start):
+                downloader.process_chunk(chunk_start)
+                journal.record(chunk_start)
+
+            chunks = (c for c in downloader.get_chunk_offsets() if c not in journal.completed)
+            if max_connections > 1:
+                process_in_parallel(process_chunk, chunks, max_connections)
+            else:
+                for chunk in chunks:
+                    process_chunk(chunk)
+            journal.delete()
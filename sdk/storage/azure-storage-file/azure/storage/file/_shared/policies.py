@@ -6,6 +6,7 @@
 
 import base64
 import hashlib
+import mmap
 import re
 import random
 from time import time
@@ -37,7 +38,13 @@ from azure.core.pipeline.policies import (
     NetworkTraceLoggingPolicy,
     HTTPPolicy)
 from azure.core.pipeline.policies.base import RequestHistory
-from azure.core.exceptions import AzureError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import RewindableBody
+from azure.core.exceptions import (
+    AzureError,
+    RetryBudgetExceededError,
+    ServiceRequestError,
+    ServiceResponseError
+)
 
 from ..version import VERSION
 from .models import LocationMode
@@ -331,6 +338,7 @@ class StorageContentValidation(SansIOHTTPPolicy):
     This will overwrite any headers already defined in the request.
     """
     header_name = 'Content-MD5'
+    read_size = 4 * 1024 * 1024
 
     def __init__(self, **kwargs):  # pylint: disable=unused-argument
         super(StorageContentValidation, self).__init__()
@@ -338,7 +346,7 @@ class StorageContentValidation(SansIOHTTPPolicy):
     @staticmethod
     def get_content_md5(data):
         md5 = hashlib.md5()
-        if isinstance(data, bytes):
+        if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)):
             md5.update(data)
         elif hasattr(data, 'read'):
             pos = 0
@@ -346,8 +354,13 @@ class StorageContentValidation(SansIOHTTPPolicy):
                 pos = data.tell()
             except:  # pylint: disable=bare-except
                 pass
-            for chunk in iter(lambda: data.read(4096), b""):
-                md5.update(chunk)
+            # A body over a buffer or a memory map is hashed in place rather than read again
+            buffer = data.getbuffer() if isinstance(data, RewindableBody) else None
+            if buffer is not None:
+                md5.update(buffer)
+            else:
+                for chunk in iter(lambda: data.read(StorageContentValidation.read_size), b""):
+                    md5.update(chunk)
             try:
                 data.seek(pos, SEEK_SET)
             except (AttributeError, IOError):
@@ -528,6 +541,9 @@ class StorageRetryPolicy(HTTPPolicy):
 
                         continue
                 break
+            except RetryBudgetExceededError:  # pylint:disable=try-except-raise
+                # a rate limit policy refused to send a retry, so don't retry it
+                raise
             except AzureError as err:
                 retries_remaining = self.increment(
                     retry_settings, request=request.http_request, error=err)
@@ -6,7 +6,7 @@
 
 import functools
 from typing import ( # pylint: disable=unused-import
-    Optional, Union, Any, Dict, TYPE_CHECKING
+    Optional, Union, Any, Dict, Iterable, List, Tuple, TYPE_CHECKING
 )
 try:
     from urllib.parse import urlparse, quote, unquote
@@ -32,6 +32,7 @@ from ._shared.utils import (
     parse_connection_str)
 
 from ._share_utils import deserialize_directory_properties
+from ._directory_tree import DirectoryTree
 from .polling import CloseHandles
 
 if TYPE_CHECKING:
@@ -206,7 +207,9 @@ class DirectoryClient(StorageAccountHostsMixin):
                 :dedent: 12
                 :caption: Gets the subdirectory client.
         """
-        directory_path = self.directory_path.rstrip('/') + "/" + directory_name
+        directory_path = directory_name
+        if self.directory_path:
+            directory_path = self.directory_path.rstrip('/') + "/" + directory_name
         return DirectoryClient(
             self.url, directory_path=directory_path, snapshot=self.snapshot, credential=self.credential,
             _hosts=self._hosts, _configuration=self._config, _pipeline=self._pipeline,
@@ -348,9 +351,13 @@ class DirectoryClient(StorageAccountHostsMixin):
             its files, its subdirectories and their files. Default value is False.
         :param int timeout:
             The timeout parameter is expressed in seconds.
+        :param polling_scheduler:
+            Poll the operation from the threads of this scheduler, instead of a dedicated thread.
+        :type polling_scheduler: ~azure.core.polling.PollingScheduler
         :returns: A long-running poller to get operation status.
         :rtype: ~azure.core.polling.LROPoller
         """
+        polling_scheduler = kwargs.pop('polling_scheduler', None)
         try:
             handle_id = handle.id # type: ignore
         except AttributeError:
@@ -373,7 +380,8 @@ class DirectoryClient(StorageAccountHostsMixin):
             command,
             start_close,
             None,
-            polling_method)
+            polling_method,
+            scheduler=polling_scheduler)
 
     def get_directory_properties(self, timeout=None, **kwargs):
         # type: (Optional[int], Any) -> DirectoryProperties
@@ -568,3 +576,80 @@ class DirectoryClient(StorageAccountHostsMixin):
         """
         file_client = self.get_file_client(file_name)
         file_client.delete_file(timeout, **kwargs)
+
+    def walk(self, max_concurrency=8, timeout=None, **kwargs):
+        # type: (int, Optional[int], Any) -> Iterable[Tuple[str, List[str], List[Dict[str, Any]]]]
+        """Lists the directory tree under the directory, breadth-first.
+
+        Like os.walk, a tuple is yielded for the directory and each of its subdirectories,
+        with the path of the directory relative to this one ('' for this one), the names
+        of its subdirectories, and its files as listed by `list_directories_and_files`.
+        The directories are listed breadth-first, up to max_concurrency at a time, and
+        yielded as their listing completes: a directory is yielded after its parent, but
+        a large directory may be yielded after the subdirectories of a smaller one.
+
+        :param int max_concurrency:
+            The maximum number of requests in flight. Default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :returns: A generator of (path, directory names, files) tuples.
+        """
+        with DirectoryTree(self, max_concurrency, timeout, **kwargs) as tree:
+            for entry in tree.walk():
+                yield entry
+
+    def delete_tree(self, max_concurrency=8, timeout=None, **kwargs):
+        # type: (int, Optional[int], Any) -> None
+        """Deletes the directory, with its files and subdirectories.
+
+        The files are deleted as the tree is listed, then the subdirectories, the
+        deepest first. The root directory of a share is emptied, but not deleted.
+        The entries already deleted by another client are skipped.
+
+        :param int max_concurrency:
+            The maximum number of requests in flight. Default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :rtype: None
+        """
+        with DirectoryTree(self, max_concurrency, timeout, **kwargs) as tree:
+            tree.delete()
+
+    def upload_tree(self, source, max_concurrency=8, timeout=None, **kwargs):
+        # type: (str, int, Optional[int], Any) -> None
+        """Uploads a local directory tree to the directory.
+
+        The directory and its subdirectories are created if they don't exist, the parent
+        of the directory must exist. The files of the local tree are uploaded, replacing
+        the existing ones. Each file is
+        uploaded over one connection: the files are uploaded concurrently.
+
+        :param str source:
+            The path of the local directory to upload.
+        :param int max_concurrency:
+            The maximum number of requests in flight. Default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :rtype: None
+        """
+        with DirectoryTree(self, max_concurrency, timeout, **kwargs) as tree:
+            tree.upload(source)
+
+    def download_tree(self, destination, max_concurrency=8, timeout=None, **kwargs):
+        # type: (str, int, Optional[int], Any) -> None
+        """Downloads the directory tree to a local directory.
+
+        The local directories are created if they don't exist, and the local files
+        are replaced. Each file is downloaded over one connection: the files are
+        downloaded concurrently, as the tree is listed.
+
+        :param str destination:
+            The path of the local directory to download to.
+        :param int max_concurrency:
+            The maximum number of requests in flight. Default value is 8.
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :rtype: None
+        """
+        with DirectoryTree(self, max_concurrency, timeout, **kwargs) as tree:
+            tree.download(destination)
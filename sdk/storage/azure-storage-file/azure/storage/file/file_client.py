@@ -346,11 +346,16 @@ class FileClient(StorageAccountHostsMixin):
             max_connections=1,  # type: Optional[int]
             timeout=None, # type: Optional[int]
             encoding='UTF-8',  # type: str
+            checkpoint=None,  # type: Optional[str]
             **kwargs # type: Any
         ):
         # type: (...) -> Dict[str, Any]
         """Uploads a new file.
 
+        The file is uploaded in ranges of up to max_range_size, by up to max_connections
+        threads. The ranges of zeros are skipped, since a new file reads as zeros until it is
+        written, so a sparse source only transfers its data.
+
         :param Any data:
             Content of the file.
         :param int length:
@@ -373,6 +378,13 @@ class FileClient(StorageAccountHostsMixin):
             The timeout parameter is expressed in seconds.
         :param str encoding:
             Defaults to UTF-8.
+        :param str checkpoint:
+            The path of a local journal file, to make the upload resumable. The uploaded
+            ranges are recorded in the journal, and if an upload of the same data fails,
+            uploading it again with the same journal only uploads the missing ranges, the
+            others being checked against the valid ranges of the file. The data must be
+            seekable, and the journal is discarded if the source file changed in between.
+            It is removed once the upload succeeds.
         :returns: File-updated property dict (Etag and last modified).
         :rtype: dict(str, Any)
 
@@ -412,6 +424,7 @@ class FileClient(StorageAccountHostsMixin):
             timeout,
             max_connections,
             self._config.data_settings,
+            checkpoint=checkpoint,
             **kwargs)
 
     def copy_file_from_url(
@@ -431,6 +444,9 @@ class FileClient(StorageAccountHostsMixin):
         :type metadata: dict(str, str)
         :param int timeout:
             The timeout parameter is expressed in seconds.
+        :param polling_scheduler:
+            Poll the operation from the threads of this scheduler, instead of a dedicated thread.
+        :type polling_scheduler: ~azure.core.polling.PollingScheduler
         :returns: Polling object in order to wait on or abort the operation
         :rtype: ~azure.storage.file.polling.CopyStatusPoller
 
@@ -442,6 +458,7 @@ class FileClient(StorageAccountHostsMixin):
                 :dedent: 12
                 :caption: Copy a file from a URL
         """
+        polling_scheduler = kwargs.pop('polling_scheduler', None)
         headers = kwargs.pop('headers', {})
         headers.update(add_metadata_headers(metadata))
 
@@ -459,6 +476,7 @@ class FileClient(StorageAccountHostsMixin):
         poller = CopyStatusPoller(
             self, start_copy,
             configuration=self._config,
+            polling_scheduler=polling_scheduler,
             timeout=timeout)
         return poller
 
@@ -467,6 +485,7 @@ class FileClient(StorageAccountHostsMixin):
             length=None,  # type: Optional[int]
             validate_content=False,  # type: bool
             timeout=None,  # type: Optional[int]
+            checkpoint=None,  # type: Optional[str]
             **kwargs
         ):
         # type: (...) -> Iterable[bytes]
@@ -489,6 +508,12 @@ class FileClient(StorageAccountHostsMixin):
             entire blocks, and doing so defeats the purpose of the memory-efficient algorithm.
         :param int timeout:
             The timeout parameter is expressed in seconds.
+        :param str checkpoint:
+            The path of a local journal file, to make download_to_stream resumable.
+            The downloaded chunks are recorded in the journal, and if a download of
+            the same range fails, downloading it again to the same stream with the same
+            journal only gets the missing chunks. The journal is discarded if the file
+            changed in between, and removed once the download succeeds.
         :returns: A iterable data generator (stream)
 
         Example:
@@ -514,6 +539,7 @@ class FileClient(StorageAccountHostsMixin):
             length=length,
             validate_content=validate_content,
             timeout=timeout,
+            checkpoint=checkpoint,
             **kwargs)
 
     def delete_file(self, timeout=None, **kwargs):
@@ -818,9 +844,13 @@ class FileClient(StorageAccountHostsMixin):
         :type handle: str or ~azure.storage.file.models.Handle
         :param int timeout:
             The timeout parameter is expressed in seconds.
+        :param polling_scheduler:
+            Poll the operation from the threads of this scheduler, instead of a dedicated thread.
+        :type polling_scheduler: ~azure.core.polling.PollingScheduler
         :returns: A long-running poller to get operation status.
         :rtype: ~azure.core.polling.LROPoller
         """
+        polling_scheduler = kwargs.pop('polling_scheduler', None)
         try:
             handle_id = handle.id # type: ignore
         except AttributeError:
@@ -842,4 +872,5 @@ class FileClient(StorageAccountHostsMixin):
             command,
             start_close,
             None,
-            polling_method)
+            polling_method,
+            scheduler=polling_scheduler)
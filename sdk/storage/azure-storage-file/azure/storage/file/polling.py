@@ -25,8 +25,9 @@ class CopyStatusPoller(LROPoller):
         else:
             polling_interval = 2
         polling_method = CopyFilePolling if polling else CopyFile
+        scheduler = kwargs.pop('polling_scheduler', None)
         poller = polling_method(polling_interval, **kwargs)
-        super(CopyStatusPoller, self).__init__(client, copy_id, None, poller)
+        super(CopyStatusPoller, self).__init__(client, copy_id, None, poller, scheduler=scheduler)
 
     def copy_id(self):
         # type: () -> str
@@ -133,19 +134,37 @@ class CopyFile(PollingMethod):
 
 class CopyFilePolling(CopyFile):
 
+    def _raise_if_failed(self):
+        if str(self.status()).lower() == 'aborted':
+            raise ValueError("Copy operation aborted.")
+        if str(self.status()).lower() == 'failed':
+            raise ValueError("Copy operation failed: {}".format(self.file.copy.status_description))
+
     def run(self):
         # type: () -> None
         try:
             while not self.finished():
                 self._update_status()
                 time.sleep(self.polling_interval)
-            if str(self.status()).lower() == 'aborted':
-                raise ValueError("Copy operation aborted.")
-            if str(self.status()).lower() == 'failed':
-                raise ValueError("Copy operation failed: {}".format(self.file.copy.status_description))
+            self._raise_if_failed()
+        except Exception as e:
+            logger.warning(str(e))
+            raise
+
+    def poll(self):
+        # type: () -> float
+        """Update the status of the copy once, for a PollingScheduler.
+
+        :returns: The delay in seconds before the next poll.
+        :rtype: float
+        """
+        try:
+            self._update_status()
+            self._raise_if_failed()
         except Exception as e:
             logger.warning(str(e))
             raise
+        return self.polling_interval
 
     def status(self):
         # type: () -> str
@@ -197,6 +216,20 @@ class CloseHandles(PollingMethod):
             logger.warning(str(e))
             raise
 
+    def poll(self):
+        # type: () -> float
+        """Close the next batch of handles, for a PollingScheduler.
+
+        :returns: The delay in seconds before the next poll.
+        :rtype: float
+        """
+        try:
+            self._update_status()
+        except Exception as e:
+            logger.warning(str(e))
+            raise
+        return self.polling_interval
+
     def status(self):
         self._update_status()
         return self.handles_closed
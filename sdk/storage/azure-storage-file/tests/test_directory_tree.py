@@ -0,0 +1,264 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+try:
+    from urllib.parse import urlparse, parse_qs, unquote
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+    from urllib2 import unquote  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.file import DirectoryClient, NoRetry
+
+from filetestcase import (
+    FileTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_PAGE_SIZE = 3
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the response and the file properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        body = _StreamedBody([self._body])
+        body.response = self
+        return body
+
+
+class _FakeShare(HttpTransport):
+    """Keeps the directories and files of one share in memory, and counts the requests in flight."""
+
+    def __init__(self):
+        self.directories = set([''])
+        self.files = {}
+        self.requests = []
+        self.fail = lambda method, path: False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def add(self, path, data=b'data'):
+        parts = path.split('/')
+        for i in range(1, len(parts)):
+            self.directories.add('/'.join(parts[:i]))
+        self.files[path] = bytearray(data)
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.005)
+            with self._lock:
+                return self._handle(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _children(self, path):
+        prefix = path + '/' if path else ''
+        directories = sorted(d[len(prefix):] for d in self.directories
+                             if d and d.startswith(prefix) and '/' not in d[len(prefix):])
+        files = sorted((f[len(prefix):], len(data)) for f, data in self.files.items()
+                       if f.startswith(prefix) and '/' not in f[len(prefix):])
+        return directories, files
+
+    def _list(self, request, path, query):
+        directories, files = self._children(path)
+        entries = [('Directory', name, None) for name in directories] + [('File', n, s) for n, s in files]
+        start = int(query.get('marker', 0))
+        page = entries[start:start + _PAGE_SIZE]
+        next_marker = str(start + _PAGE_SIZE) if start + _PAGE_SIZE < len(entries) else ''
+        xml = ''
+        for kind, name, size in page:
+            properties = '<Properties />' if size is None else \
+                '<Properties><Content-Length>{}</Content-Length></Properties>'.format(size)
+            xml += '<{0}><Name>{1}</Name>{2}</{0}>'.format(kind, name, properties)
+        body = (
+            '<?xml version="1.0" encoding="utf-8"?><EnumerationResults ServiceEndpoint="https://account.file'
+            '.core.windows.net/" ShareName="share" DirectoryPath="{}"><Entries>{}</Entries>'
+            '<NextMarker>{}</NextMarker></EnumerationResults>').format(path, xml, next_marker)
+        return _FakeResponse(request, 200, {'Content-Type': 'application/xml'}, body.encode('utf-8'))
+
+    def _error(self, request, status_code, code):
+        return _FakeResponse(request, status_code, {'x-ms-error-code': code})
+
+    def _handle(self, request):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        path = unquote(urlparse(request.url).path).strip('/').partition('/')[2].strip('/')
+        self.requests.append((request.method, path, query.get('restype') or query.get('comp')))
+        if self.fail(request.method, path):
+            return self._error(request, 500, 'InternalError')
+        parent = path.rpartition('/')[0]
+        headers = {'ETag': '"0x1"', 'Last-Modified': 'Sun, 16 Jun 2019 22:45:39 GMT'}
+        if query.get('restype') == 'directory':
+            if query.get('comp') == 'list':
+                if path not in self.directories:
+                    return self._error(request, 404, 'ResourceNotFound')
+                return self._list(request, path, query)
+            if request.method == 'PUT':
+                if path in self.directories:
+                    return self._error(request, 409, 'ResourceAlreadyExists')
+                if parent not in self.directories:
+                    return self._error(request, 404, 'ParentNotFound')
+                self.directories.add(path)
+                return _FakeResponse(request, 201, headers)
+            if path not in self.directories:
+                return self._error(request, 404, 'ResourceNotFound')
+            if any(self._children(path)):
+                return self._error(request, 409, 'DirectoryNotEmpty')
+            self.directories.remove(path)
+            return _FakeResponse(request, 202)
+        if request.method == 'PUT' and query.get('comp') == 'range':
+            start, end = [int(i) for i in re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()]
+            data = request.data.read() if hasattr(request.data, 'read') else request.data
+            self.files[path][start:end + 1] = data
+            return _FakeResponse(request, 201, headers)
+        if request.method == 'PUT':
+            if parent not in self.directories:
+                return self._error(request, 404, 'ParentNotFound')
+            self.files[path] = bytearray(int(request.headers['x-ms-content-length']))
+            return _FakeResponse(request, 201, headers)
+        if path not in self.files:
+            return self._error(request, 404, 'ResourceNotFound')
+        if request.method == 'DELETE':
+            del self.files[path]
+            return _FakeResponse(request, 202)
+        content = self.files[path]
+        start, end = [int(i) for i in re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()]
+        body = bytes(content[start:end + 1])
+        headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, start + len(body) - 1, len(content))
+        return _FakeResponse(request, 206, headers, body)
+
+
+class StorageDirectoryTreeTest(FileTestCase):
+
+    def setUp(self):
+        super(StorageDirectoryTreeTest, self).setUp()
+        self.local = tempfile.mkdtemp()
+        self.transport = _FakeShare()
+        for path in ['top', 'a/one', 'a/two', 'a/b/three', 'a/b/c/four', 'a/b/c/five', 'd/six', 'e/f/g/seven']:
+            self.transport.add(path, path.encode('utf-8'))
+        for i in range(20):
+            self.transport.add('many/file{}'.format(i))
+        self.transport.directories.add('empty')
+
+    def tearDown(self):
+        shutil.rmtree(self.local)
+        return super(StorageDirectoryTreeTest, self).tearDown()
+
+    def _create_client(self, directory_path=''):
+        return DirectoryClient(
+            'https://account.file.core.windows.net/share?sv=2018-03-28&sig=signature',
+            directory_path=directory_path,
+            transport=self.transport,
+            retry_policy=NoRetry())
+
+    def test_walk(self):
+        walked = list(self._create_client().walk(max_concurrency=3))
+
+        paths = [path for path, _, _ in walked]
+        self.assertEqual(sorted(paths), sorted(self.transport.directories))
+        # A directory comes after its parent
+        for path in paths[1:]:
+            self.assertLess(paths.index(path.rpartition('/')[0]), paths.index(path))
+        entries = dict((path, (directories, files)) for path, directories, files in walked)
+        self.assertEqual(entries['a'][0], ['b'])
+        self.assertEqual(sorted(f['name'] for f in entries['a'][1]), ['one', 'two'])
+        self.assertEqual(len(entries['many'][1]), 20)
+        self.assertEqual(sum(f['size'] for _, _, files in walked for f in files),
+                         sum(len(data) for data in self.transport.files.values()))
+        self.assertLessEqual(self.transport.max_in_flight, 3)
+
+    def test_walk_subdirectory(self):
+        walked = list(self._create_client('a').walk())
+
+        self.assertEqual(sorted(path for path, _, _ in walked), ['', 'b', 'b/c'])
+        self.assertEqual(sorted(f['name'] for f in dict((p, f) for p, _, f in walked)['b/c']), ['five', 'four'])
+
+    def test_delete_tree(self):
+        self._create_client('a').delete_tree(max_concurrency=4)
+
+        self.assertTrue(all(not d.startswith('a') for d in self.transport.directories))
+        self.assertTrue(all(not f.startswith('a/') for f in self.transport.files))
+        self.assertIn('d/six', self.transport.files)
+        self.assertLessEqual(self.transport.max_in_flight, 4)
+
+    def test_delete_tree_share_root(self):
+        self._create_client().delete_tree(max_concurrency=4)
+
+        self.assertEqual(self.transport.directories, set(['']))
+        self.assertEqual(self.transport.files, {})
+
+    def test_delete_tree_failure(self):
+        self.transport.fail = lambda method, path: method == 'DELETE' and path == 'a/b/three'
+
+        with self.assertRaises(HttpResponseError):
+            self._create_client().delete_tree(max_concurrency=4)
+
+        # The directories aren't deleted once a file couldn't be
+        self.assertIn('a/b/three', self.transport.files)
+        self.assertNotIn(('DELETE', 'a/b', 'directory'), self.transport.requests)
+
+    def test_download_and_upload_tree(self):
+        self._create_client().download_tree(self.local, max_concurrency=4)
+
+        with open(os.path.join(self.local, 'a', 'b', 'c', 'four'), 'rb') as stream:
+            self.assertEqual(stream.read(), b'a/b/c/four')
+        self.assertTrue(os.path.isdir(os.path.join(self.local, 'empty')))
+        self.assertEqual(len(os.listdir(os.path.join(self.local, 'many'))), 20)
+        self.assertLessEqual(self.transport.max_in_flight, 4)
+
+        self._create_client('copy').upload_tree(self.local, max_concurrency=4)
+
+        for path, data in list(self.transport.files.items()):
+            if not path.startswith('copy/'):
+                self.assertEqual(self.transport.files['copy/' + path], data)
+        self.assertIn('copy/empty', self.transport.directories)
+
+        with self.assertRaises(ResourceNotFoundError):
+            self._create_client('missing/copy').upload_tree(self.local)
+        self.assertLessEqual(self.transport.max_in_flight, 4)
+
+# ------------------------------------------------------------------------------
@@ -0,0 +1,295 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from io import BytesIO
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import HttpTransport, HttpResponse
+from azure.storage.file import FileClient, NoRetry
+from azure.storage.file._share_utils import process_in_parallel
+
+from filetestcase import (
+    FileTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_RANGE = 1024
+
+
+class _StreamedBody(list):
+    """The downloaded chunks, which the response and the file properties get attached to."""
+
+
+class _FakeResponse(HttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+    def stream_download(self, pipeline):
+        body = _StreamedBody([self._body])
+        body.response = self
+        return body
+
+
+class _FakeFileService(HttpTransport):
+    """Keeps one file in memory, with its written 512-byte pages, and can fail a request."""
+
+    def __init__(self):
+        self.content = None
+        self.pages = set()
+        self.etag = 0
+        self.created = 0
+        self.uploaded = []
+        self.downloaded = []
+        self.fail = lambda request: False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.005)
+            with self._lock:
+                if self.fail(request):
+                    return _FakeResponse(request, 500, {'x-ms-error-code': 'InternalError'})
+                return self._handle(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _headers(self):
+        return {'ETag': '"0x{}"'.format(self.etag), 'Last-Modified': 'Sun, 16 Jun 2019 22:45:39 GMT'}
+
+    def _ranges(self):
+        xml = ''
+        for page in sorted(self.pages):
+            if page - 512 not in self.pages:
+                end = page
+                while end + 512 in self.pages:
+                    end += 512
+                xml += '<Range><Start>{}</Start><End>{}</End></Range>'.format(page, end + 511)
+        return '<?xml version="1.0" encoding="utf-8"?><Ranges>{}</Ranges>'.format(xml).encode('utf-8')
+
+    def _handle(self, request):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        if request.method == 'PUT' and query.get('comp') == 'range':
+            start, end = [int(i) for i in re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()]
+            data = request.data.read() if hasattr(request.data, 'read') else request.data
+            self.content[start:end + 1] = data
+            self.pages.update(range(start, end + 1, 512))
+            self.uploaded.append(start)
+            self.etag += 1
+            return _FakeResponse(request, 201, self._headers())
+        if request.method == 'PUT':
+            self.content = bytearray(int(request.headers['x-ms-content-length']))
+            self.pages = set()
+            self.created += 1
+            self.etag += 1
+            return _FakeResponse(request, 201, self._headers())
+        if self.content is None:
+            return _FakeResponse(request, 404, {'x-ms-error-code': 'ResourceNotFound'})
+        headers = self._headers()
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(self.content))
+            headers['x-ms-type'] = 'File'
+            return _FakeResponse(request, 200, headers)
+        if query.get('comp') == 'rangelist':
+            headers['Content-Type'] = 'application/xml'
+            headers['x-ms-content-length'] = str(len(self.content))
+            return _FakeResponse(request, 200, headers, self._ranges())
+        start, end = [int(i) for i in re.match(r'bytes=(\d+)-(\d+)', request.headers['x-ms-range']).groups()]
+        body = bytes(self.content[start:end + 1])
+        self.downloaded.append(start)
+        headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, start + len(body) - 1, len(self.content))
+        return _FakeResponse(request, 206, headers, body)
+
+
+class StorageFileTransferParallelTest(FileTestCase):
+
+    def setUp(self):
+        super(StorageFileTransferParallelTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.directory, 'transfer.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return super(StorageFileTransferParallelTest, self).tearDown()
+
+    def _create_client(self, transport):
+        return FileClient(
+            'https://account.file.core.windows.net/share/dir/file?sv=2018-03-28&sig=signature',
+            transport=transport,
+            retry_policy=NoRetry(),
+            max_range_size=_RANGE,
+            max_single_get_size=_RANGE,
+            max_chunk_get_size=_RANGE)
+
+    def test_upload_file_parallel_skips_zero_ranges(self):
+        transport = _FakeFileService()
+        data = os.urandom(_RANGE * 10 + 100) + b'\x00' * _RANGE * 5 + os.urandom(300)
+
+        ranges = self._create_client(transport).upload_file(BytesIO(data), max_connections=3)
+
+        self.assertEqual(bytes(transport.content), data)
+        self.assertEqual(len(ranges), 16)
+        self.assertEqual(ranges[-1], 'bytes={}-{}'.format(_RANGE * 15, len(data) - 1))
+        # The ranges only holding zeros weren't uploaded
+        self.assertEqual(sorted(transport.uploaded), [i * _RANGE for i in range(11)] + [_RANGE * 15])
+        self.assertEqual(transport.max_in_flight, 3)
+
+    def test_upload_file_sequential_non_seekable(self):
+        transport = _FakeFileService()
+        data = os.urandom(_RANGE * 3 + 7)
+
+        self._create_client(transport).upload_file(iter([data[:1000], data[1000:]]), length=len(data))
+
+        self.assertEqual(bytes(transport.content), data)
+        self.assertEqual(transport.uploaded, [0, _RANGE, _RANGE * 2, _RANGE * 3])
+
+    def test_upload_file_resumes_from_checkpoint(self):
+        transport = _FakeFileService()
+        data = os.urandom(_RANGE * 12)
+        client = self._create_client(transport)
+        transport.fail = lambda request: len(transport.uploaded) >= 7 and 'comp=range' in request.url
+
+        with self.assertRaises(HttpResponseError):
+            client.upload_file(BytesIO(data), max_connections=2, checkpoint=self.checkpoint)
+        uploaded = set(transport.uploaded)
+        self.assertTrue(os.path.exists(self.checkpoint))
+
+        # A range cleared since is uploaded again
+        cleared = min(uploaded)
+        transport.pages -= set(range(cleared, cleared + _RANGE, 512))
+        transport.uploaded = []
+        transport.fail = lambda request: False
+        client.upload_file(BytesIO(data), max_connections=2, checkpoint=self.checkpoint)
+
+        self.assertEqual(bytes(transport.content), data)
+        self.assertEqual(transport.created, 1)
+        self.assertEqual(
+            sorted(transport.uploaded),
+            sorted(set(range(0, len(data), _RANGE)) - uploaded | {cleared}))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_upload_file_checkpoint_for_other_file(self):
+        transport = _FakeFileService()
+        data = os.urandom(_RANGE * 4)
+        client = self._create_client(transport)
+        transport.fail = lambda request: len(transport.uploaded) >= 2 and 'comp=range' in request.url
+        with self.assertRaises(HttpResponseError):
+            client.upload_file(BytesIO(data), checkpoint=self.checkpoint)
+
+        # The file was recreated with another size in between
+        transport.content = bytearray(10)
+        transport.uploaded = []
+        transport.fail = lambda request: False
+        client.upload_file(BytesIO(data), checkpoint=self.checkpoint)
+
+        self.assertEqual(bytes(transport.content), data)
+        self.assertEqual(transport.created, 2)
+        self.assertEqual(transport.uploaded, [0, _RANGE, _RANGE * 2, _RANGE * 3])
+
+    def test_download_file_resumes_from_checkpoint(self):
+        transport = _FakeFileService()
+        data = os.urandom(_RANGE * 10 + 10)
+        client = self._create_client(transport)
+        client.upload_file(data)
+        path = os.path.join(self.directory, 'file')
+        transport.fail = lambda request: len(transport.downloaded) >= 6 and request.method == 'GET'
+
+        with open(path, 'wb') as stream:
+            with self.assertRaises(HttpResponseError):
+                client.download_file(checkpoint=self.checkpoint).download_to_stream(stream, max_connections=2)
+        downloaded = len(transport.downloaded)
+
+        transport.downloaded = []
+        transport.fail = lambda request: False
+        with open(path, 'r+b') as stream:
+            client.download_file(checkpoint=self.checkpoint).download_to_stream(stream, max_connections=2)
+
+        with open(path, 'rb') as stream:
+            self.assertEqual(stream.read(), data)
+        # The first range is always downloaded again, with the properties of the file
+        self.assertEqual(len(transport.downloaded), 11 - downloaded + 1)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_download_file_checkpoint_for_other_version(self):
+        transport = _FakeFileService()
+        client = self._create_client(transport)
+        client.upload_file(os.urandom(_RANGE * 4))
+        transport.fail = lambda request: len(transport.downloaded) >= 2 and request.method == 'GET'
+        with self.assertRaises(HttpResponseError):
+            client.download_file(checkpoint=self.checkpoint).download_to_stream(BytesIO())
+
+        # The file changed in between, so the journal is discarded
+        data = os.urandom(_RANGE * 4)
+        client.upload_file(data)
+        transport.fail = lambda request: False
+        stream = BytesIO()
+        client.download_file(checkpoint=self.checkpoint).download_to_stream(stream)
+
+        self.assertEqual(stream.getvalue(), data)
+
+    def test_process_in_parallel_bounded(self):
+        consumed = []
+        processed = []
+        lock = threading.Lock()
+
+        def items():
+            for i in range(1000):
+                consumed.append(i)
+                yield i
+
+        def process(item):
+            time.sleep(0.001)
+            with lock:
+                # The items aren't all queued upfront
+                self.assertLessEqual(len(consumed) - len(processed), 2 * 4 + 1)
+                processed.append(item)
+            if item == 100:
+                raise ValueError('failed')
+
+        with self.assertRaises(ValueError):
+            process_in_parallel(process, items(), 4)
+        self.assertLess(len(consumed), 200)
+
+# ------------------------------------------------------------------------------
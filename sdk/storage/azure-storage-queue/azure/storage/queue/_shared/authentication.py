@@ -43,19 +43,6 @@ def _decode_base64_to_text(data):
     return decoded_bytes.decode('utf-8')
 
 
-def _sign_string(key, string_to_sign, key_is_base64=True):
-    if key_is_base64:
-        key = _decode_base64_to_bytes(key)
-    else:
-        if isinstance(key, _unicode_type):
-            key = key.encode('utf-8')
-    if isinstance(string_to_sign, _unicode_type):
-        string_to_sign = string_to_sign.encode('utf-8')
-    signed_hmac_sha256 = hmac.HMAC(key, string_to_sign, hashlib.sha256)
-    digest = signed_hmac_sha256.digest()
-    encoded_digest = _encode_base64(digest)
-    return encoded_digest
-
 # wraps a given exception with the desired exception type
 def _wrap_exception(ex, desired_type):
     msg = ""
@@ -79,53 +66,74 @@ class AzureSigningError(ClientAuthenticationError):
     """
 
 
+# The standard headers in the string to sign, in order. 'byte_range' is never set, it keeps
+# the line of the Range header empty, like the headers that aren't set on the request.
+_SIGNED_HEADERS = (
+    'content-encoding', 'content-language', 'content-length',
+    'content-md5', 'content-type', 'date', 'if-modified-since',
+    'if-match', 'if-none-match', 'if-unmodified-since', 'byte_range'
+)
+
+
 # pylint: disable=no-self-use
 class SharedKeyCredentialPolicy(SansIOHTTPPolicy):
+    """Signs the requests with the account key.
+
+    The key is decoded, and its HMAC state computed, once: each request is signed with
+    a copy of that state. The account key can be changed on the credential, the cached
+    state is then computed again from the new key.
+    """
 
     def __init__(self, account_name, account_key):
         self.account_name = account_name
         self.account_key = account_key
+        self._signing_key = None
+        self._signing_hmac = None
         super(SharedKeyCredentialPolicy, self).__init__()
 
-    def _get_headers(self, request, headers_to_sign):
-        headers = dict((name.lower(), value) for name, value in request.http_request.headers.items() if value)
-        if 'content-length' in headers and headers['content-length'] == '0':
-            del headers['content-length']
-        return '\n'.join(headers.get(x, '') for x in headers_to_sign) + '\n'
-
-    def _get_verb(self, request):
-        return request.http_request.method + '\n'
-
-    def _get_canonicalized_resource(self, request):
-        uri_path = urlparse(request.http_request.url).path
-        return '/' + self.account_name + uri_path
-
-    def _get_canonicalized_headers(self, request):
-        string_to_sign = ''
+    def _get_signing_hmac(self):
+        account_key = self.account_key
+        if self._signing_hmac is None or account_key != self._signing_key:
+            signing_hmac = hmac.HMAC(_decode_base64_to_bytes(account_key), digestmod=hashlib.sha256)
+            # Assigned together, for the other threads signing with the same policy
+            self._signing_key, self._signing_hmac = account_key, signing_hmac
+            return signing_hmac
+        return self._signing_hmac
+
+    def _get_string_to_sign(self, request):
+        http_request = request.http_request
+        # The headers are read in one pass, for both the standard and the x-ms- headers
+        headers = {}
         x_ms_headers = []
-        for name, value in request.http_request.headers.items():
+        for name, value in http_request.headers.items():
             if name.startswith('x-ms-'):
-                x_ms_headers.append((name.lower(), value))
+                if value is not None:
+                    x_ms_headers.append((name.lower(), value))
+            elif value:
+                headers[name.lower()] = value
+        if headers.get('content-length') == '0':
+            del headers['content-length']
+
+        parts = [http_request.method, '\n']
+        for name in _SIGNED_HEADERS:
+            parts.append(headers.get(name, ''))
+            parts.append('\n')
         x_ms_headers.sort()
         for name, value in x_ms_headers:
+            parts.extend((name, ':', value, '\n'))
+        parts.extend(('/', self.account_name, urlparse(http_request.url).path))
+        for name, value in sorted(http_request.query.items()):
             if value is not None:
-                string_to_sign += ''.join([name, ':', value, '\n'])
-        return string_to_sign
-
-    def _get_canonicalized_resource_query(self, request):
-        sorted_queries = [(name, value) for name, value in request.http_request.query.items()]
-        sorted_queries.sort()
-
-        string_to_sign = ''
-        for name, value in sorted_queries:
-            if value is not None:
-                string_to_sign += '\n' + name.lower() + ':' + unquote(value)
-
-        return string_to_sign
+                parts.extend(('\n', name.lower(), ':', unquote(value)))
+        return ''.join(parts)
 
     def _add_authorization_header(self, request, string_to_sign):
         try:
-            signature = _sign_string(self.account_key, string_to_sign)
+            if isinstance(string_to_sign, _unicode_type):
+                string_to_sign = string_to_sign.encode('utf-8')
+            signed_hmac_sha256 = self._get_signing_hmac().copy()
+            signed_hmac_sha256.update(string_to_sign)
+            signature = _encode_base64(signed_hmac_sha256.digest())
             auth_string = 'SharedKey ' + self.account_name + ':' + signature
             request.http_request.headers['Authorization'] = auth_string
         except Exception as ex:
@@ -134,19 +142,6 @@ class SharedKeyCredentialPolicy(SansIOHTTPPolicy):
             raise _wrap_exception(ex, AzureSigningError)
 
     def on_request(self, request, **kwargs):
-        string_to_sign = \
-            self._get_verb(request) + \
-            self._get_headers(
-                request,
-                [
-                    'content-encoding', 'content-language', 'content-length',
-                    'content-md5', 'content-type', 'date', 'if-modified-since',
-                    'if-match', 'if-none-match', 'if-unmodified-since', 'byte_range'
-                ]
-            ) + \
-            self._get_canonicalized_headers(request) + \
-            self._get_canonicalized_resource(request) + \
-            self._get_canonicalized_resource_query(request)
-
+        string_to_sign = self._get_string_to_sign(request)
         self._add_authorization_header(request, string_to_sign)
         #logger.debug("String_to_sign=%s", string_to_sign)
@@ -349,11 +349,28 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     if response is None:
         raise ValueError("Response cannot be None.")
     content = b"".join(list(response))
+    return _decrypt_blob_content(
+        require_encryption, key_encryption_key, key_resolver, content, response.response.headers,
+        start_offset, end_offset)
+
+
+def _decrypt_blob_content(require_encryption, key_encryption_key, key_resolver,
+                          content, headers, start_offset, end_offset):
+    '''
+    Decrypts the content of a blob range, given the headers of the response it was downloaded by.
+
+    :param bytes content:
+        The encrypted content, from a 16 byte block boundary.
+    :param dict headers:
+        The response headers, which give the encryption metadata and the range of the content.
+    :return: The decrypted content, without the offsets.
+    :rtype: bytes
+    '''
     if not content:
         return content
 
     try:
-        encryption_data = _dict_to_encryption_data(loads(response.response.headers['x-ms-meta-encryptiondata']))
+        encryption_data = _dict_to_encryption_data(loads(headers['x-ms-meta-encryptiondata']))
     except:  # pylint: disable=bare-except
         if require_encryption:
             raise ValueError(_ERROR_DATA_NOT_ENCRYPTED)
@@ -363,12 +380,12 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     if encryption_data.encryption_agent.encryption_algorithm != _EncryptionAlgorithm.AES_CBC_256:
         raise ValueError(_ERROR_UNSUPPORTED_ENCRYPTION_ALGORITHM)
 
-    blob_type = response.response.headers['x-ms-blob-type']
+    blob_type = headers['x-ms-blob-type']
 
     iv = None
     unpad = False
-    if 'content-range' in response.response.headers:
-        content_range = response.response.headers['content-range']
+    if 'content-range' in headers:
+        content_range = headers['content-range']
         # Format: 'bytes x-y/size'
 
         # Ignore the word 'bytes'
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import logging
+from typing import TYPE_CHECKING
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy
+from azure.core.exceptions import AzureError, RetryBudgetExceededError
+
+from .policies import is_retry
+
+if TYPE_CHECKING:
+    from azure.core.pipeline import PipelineRequest, PipelineResponse
+    from .policies import StorageRetryPolicy
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncStorageResponseHook(AsyncHTTPPolicy):
+
+    def __init__(self, **kwargs):  # pylint: disable=unused-argument
+        self._response_callback = kwargs.get('raw_response_hook')
+        super(AsyncStorageResponseHook, self).__init__()
+
+    async def send(self, request):
+        # type: (PipelineRequest) -> PipelineResponse
+        data_stream_total = request.context.get('data_stream_total') or \
+            request.context.options.pop('data_stream_total', None)
+        download_stream_current = request.context.get('download_stream_current') or \
+            request.context.options.pop('download_stream_current', None)
+        upload_stream_current = request.context.get('upload_stream_current') or \
+            request.context.options.pop('upload_stream_current', None)
+        response_callback = request.context.get('response_callback') or \
+            request.context.options.pop('raw_response_hook', self._response_callback)
+
+        response = await self.next.send(request)
+        will_retry = is_retry(response, request.context.options.get('mode'))
+        if not will_retry and download_stream_current is not None:
+            download_stream_current += int(response.http_response.headers.get('Content-Length', 0))
+            if data_stream_total is None:
+                content_range = response.http_response.headers.get('Content-Range')
+                if content_range:
+                    data_stream_total = int(content_range.split(' ', 1)[1].split('/', 1)[1])
+                else:
+                    data_stream_total = download_stream_current
+        elif not will_retry and upload_stream_current is not None:
+            upload_stream_current += int(response.http_request.headers.get('Content-Length', 0))
+        for pipeline_obj in [request, response]:
+            pipeline_obj.context['data_stream_total'] = data_stream_total
+            pipeline_obj.context['download_stream_current'] = download_stream_current
+            pipeline_obj.context['upload_stream_current'] = upload_stream_current
+        if response_callback:
+            response_callback(response)
+            request.context['response_callback'] = response_callback
+        return response
+
+
+class AsyncStorageRetryPolicy(AsyncHTTPPolicy):
+    """
+    Runs a storage retry policy in an async pipeline.
+
+    The retry settings, the back-off and the secondary location handling are those of the
+    wrapped ExponentialRetry, LinearRetry or NoRetry policy: only the wait is asynchronous.
+
+    :param retry_policy: The storage retry policy to follow.
+    :type retry_policy: ~azure.storage.queue._shared.policies.StorageRetryPolicy
+    """
+
+    def __init__(self, retry_policy):
+        # type: (StorageRetryPolicy) -> None
+        self.retry_policy = retry_policy
+        super(AsyncStorageRetryPolicy, self).__init__()
+
+    async def sleep(self, settings, transport):
+        backoff = self.retry_policy.get_backoff_time(settings)
+        if not backoff or backoff < 0:
+            return
+        await transport.sleep(backoff)
+
+    async def send(self, request):
+        retries_remaining = True
+        response = None
+        retry_settings = self.retry_policy.configure_retries(request)
+        while retries_remaining:
+            try:
+                response = await self.next.send(request)
+                if is_retry(response, retry_settings['mode']):
+                    retries_remaining = self.retry_policy.increment(
+                        retry_settings,
+                        request=request.http_request,
+                        response=response.http_response)
+                    if retries_remaining:
+                        await self.sleep(retry_settings, request.context.transport)
+                        continue
+                break
+            except RetryBudgetExceededError:  # pylint:disable=try-except-raise
+                # a rate limit policy refused to send a retry, so don't retry it
+                raise
+            except AzureError as err:
+                retries_remaining = self.retry_policy.increment(
+                    retry_settings, request=request.http_request, error=err)
+                if retries_remaining:
+                    await self.sleep(retry_settings, request.context.transport)
+                    continue
+                raise err
+        if retry_settings['history']:
+            response.context['history'] = retry_settings['history']
+        response.http_response.location_mode = retry_settings['mode']
+        return response
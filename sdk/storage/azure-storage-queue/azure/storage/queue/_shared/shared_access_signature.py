@@ -4,11 +4,16 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import calendar
+import hashlib
+import hmac
 import sys
-from datetime import date
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
 
 from .constants import X_MS_VERSION
-from .utils import _sign_string, url_quote, _QueryStringConstants
+from .utils import _decode_base64_to_bytes, encode_base64, url_quote, _QueryStringConstants
 
 
 if sys.version_info < (3,):
@@ -25,15 +30,64 @@ def _to_utc_datetime(value):
     return value.strftime('%Y-%m-%dT%H:%M:%SZ')
 
 
+def _round_up_expiry(expiry, granularity):
+    # Rounded up, so that the token is valid until at least the requested expiry
+    seconds = calendar.timegm(expiry.utctimetuple()) + (1 if expiry.microsecond else 0)
+    return datetime.utcfromtimestamp(-(-seconds // granularity) * granularity)
+
+
+class _TokenCache(object):
+    """The most recently used tokens, by their parameters."""
+
+    def __init__(self, size):
+        self._size = size
+        self._tokens = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            token = self._tokens.pop(key, None)
+            if token is not None:
+                self._tokens[key] = token
+            return token
+
+    def add(self, key, token):
+        with self._lock:
+            self._tokens[key] = token
+            if len(self._tokens) > self._size:
+                self._tokens.popitem(last=False)
+
+
+class _SigningKey(object):
+    """An account key, decoded once with its HMAC state, and the tokens signed with it."""
+
+    def __init__(self, account_key, cache_size):
+        self.account_key = account_key
+        self._hmac = hmac.HMAC(_decode_base64_to_bytes(account_key), digestmod=hashlib.sha256)
+        self.tokens = _TokenCache(cache_size) if cache_size else None
+
+    def sign(self, string_to_sign):
+        if not isinstance(string_to_sign, bytes):
+            string_to_sign = string_to_sign.encode('utf-8')
+        signed_hmac_sha256 = self._hmac.copy()
+        signed_hmac_sha256.update(string_to_sign)
+        return encode_base64(signed_hmac_sha256.digest())
+
+
 class SharedAccessSignature(object):
     '''
     Provides a factory for creating account access
     signature tokens with an account name and account key. Users can either
     use the factory or can construct the appropriate service and use the
     generate_*_shared_access_signature method directly.
+
+    The account key is decoded, and its HMAC state computed, once per factory. The
+    factory can also keep the tokens it generated, by resource and parameters, so
+    that generating the same token again is a lookup.
     '''
 
-    def __init__(self, account_name, account_key, x_ms_version=X_MS_VERSION):
+    def __init__(self, account_name, account_key, x_ms_version=X_MS_VERSION,
+                 cache_size=0, expiry_granularity=None):
         '''
         :param str account_name:
             The storage account name used to generate the shared access signatures.
@@ -41,10 +95,43 @@ class SharedAccessSignature(object):
             The access key to generate the shares access signatures.
         :param str x_ms_version:
             The service version used to generate the shared access signatures.
+        :param int cache_size:
+            The number of tokens kept, the least recently used being evicted.
+            By default, tokens aren't kept.
+        :param int expiry_granularity:
+            If set, an expiry given as a datetime is rounded up to a multiple of
+            this number of seconds, so that the tokens requested with expiries in
+            the same interval are the same token, found in the cache. The tokens
+            may then be valid for up to this number of seconds longer than requested.
         '''
         self.account_name = account_name
         self.account_key = account_key
         self.x_ms_version = x_ms_version
+        self.cache_size = cache_size
+        self.expiry_granularity = expiry_granularity
+        self._signing_key = None
+
+    def _get_expiry(self, expiry):
+        if self.expiry_granularity and isinstance(expiry, datetime):
+            return _round_up_expiry(expiry, self.expiry_granularity)
+        return expiry
+
+    def _get_token(self, sas, add_signature, *resource):
+        # Computed again if the account key is changed on the factory
+        signing_key = self._signing_key
+        if signing_key is None or signing_key.account_key != self.account_key:
+            signing_key = self._signing_key = _SigningKey(self.account_key, self.cache_size)
+        if signing_key.tokens is None:
+            add_signature(self.account_name, signing_key, *resource)
+            return sas.get_token()
+        # A token only depends on the account, the resource and the parameters
+        cache_key = (self.account_name, resource, tuple(sorted(sas.query_dict.items())))
+        token = signing_key.tokens.get(cache_key)
+        if token is None:
+            add_signature(self.account_name, signing_key, *resource)
+            token = sas.get_token()
+            signing_key.tokens.add(cache_key, token)
+        return token
 
     def generate_account(self, services, resource_types, permission, expiry, start=None,
                          ip=None, protocol=None):
@@ -90,11 +177,10 @@ class SharedAccessSignature(object):
             is https,http. See :class:`~azure.storage.common.models.Protocol` for possible values.
         '''
         sas = _SharedAccessHelper()
-        sas.add_base(permission, expiry, start, ip, protocol, self.x_ms_version)
+        sas.add_base(permission, self._get_expiry(expiry), start, ip, protocol, self.x_ms_version)
         sas.add_account(services, resource_types)
-        sas.add_account_signature(self.account_name, self.account_key)
 
-        return sas.get_token()
+        return self._get_token(sas, sas.add_account_signature)
 
 
 class _SharedAccessHelper(object):
@@ -140,7 +226,7 @@ class _SharedAccessHelper(object):
         self._add_query(_QueryStringConstants.SIGNED_CONTENT_LANGUAGE, content_language)
         self._add_query(_QueryStringConstants.SIGNED_CONTENT_TYPE, content_type)
 
-    def add_resource_signature(self, account_name, account_key, service, path):
+    def add_resource_signature(self, account_name, signing_key, service, path):
         def get_value_to_append(query):
             return_value = self.query_dict.get(query) or ''
             return return_value + '\n'
@@ -174,10 +260,9 @@ class _SharedAccessHelper(object):
         if string_to_sign[-1] == '\n':
             string_to_sign = string_to_sign[:-1]
 
-        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE,
-                        _sign_string(account_key, string_to_sign))
+        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE, signing_key.sign(string_to_sign))
 
-    def add_account_signature(self, account_name, account_key):
+    def add_account_signature(self, account_name, signing_key):
         def get_value_to_append(query):
             return_value = self.query_dict.get(query) or ''
             return return_value + '\n'
@@ -193,8 +278,7 @@ class _SharedAccessHelper(object):
              get_value_to_append(_QueryStringConstants.SIGNED_PROTOCOL) +
              get_value_to_append(_QueryStringConstants.SIGNED_VERSION))
 
-        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE,
-                        _sign_string(account_key, string_to_sign))
+        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE, signing_key.sign(string_to_sign))
 
     def get_token(self):
         return '&'.join(['{0}={1}'.format(n, url_quote(v)) for n, v in self.query_dict.items() if v is not None])
@@ -208,14 +292,22 @@ class BlobSharedAccessSignature(SharedAccessSignature):
     generate_*_shared_access_signature method directly.
     '''
 
-    def __init__(self, account_name, account_key):
+    def __init__(self, account_name, account_key, cache_size=0, expiry_granularity=None):
         '''
         :param str account_name:
             The storage account name used to generate the shared access signatures.
         :param str account_key:
             The access key to generate the shares access signatures.
+        :param int cache_size:
+            The number of tokens kept, the least recently used being evicted.
+            By default, tokens aren't kept.
+        :param int expiry_granularity:
+            If set, an expiry given as a datetime is rounded up to a multiple of
+            this number of seconds, so that more tokens are found in the cache.
         '''
-        super(BlobSharedAccessSignature, self).__init__(account_name, account_key, x_ms_version=X_MS_VERSION)
+        super(BlobSharedAccessSignature, self).__init__(
+            account_name, account_key, x_ms_version=X_MS_VERSION,
+            cache_size=cache_size, expiry_granularity=expiry_granularity)
 
     def generate_blob(self, container_name, blob_name, permission=None,
                       expiry=None, start=None, policy_id=None, ip=None, protocol=None,
@@ -284,15 +376,13 @@ class BlobSharedAccessSignature(SharedAccessSignature):
         resource_path = container_name + '/' + blob_name
 
         sas = _SharedAccessHelper()
-        sas.add_base(permission, expiry, start, ip, protocol, self.x_ms_version)
+        sas.add_base(permission, self._get_expiry(expiry), start, ip, protocol, self.x_ms_version)
         sas.add_id(policy_id)
         sas.add_resource('b')
         sas.add_override_response_headers(cache_control, content_disposition,
                                           content_encoding, content_language,
                                           content_type)
-        sas.add_resource_signature(self.account_name, self.account_key, 'blob', resource_path)
-
-        return sas.get_token()
+        return self._get_token(sas, sas.add_resource_signature, 'blob', resource_path)
 
     def generate_container(self, container_name, permission=None, expiry=None,
                            start=None, policy_id=None, ip=None, protocol=None,
@@ -357,15 +447,13 @@ class BlobSharedAccessSignature(SharedAccessSignature):
             using this shared access signature.
         '''
         sas = _SharedAccessHelper()
-        sas.add_base(permission, expiry, start, ip, protocol, self.x_ms_version)
+        sas.add_base(permission, self._get_expiry(expiry), start, ip, protocol, self.x_ms_version)
         sas.add_id(policy_id)
         sas.add_resource('c')
         sas.add_override_response_headers(cache_control, content_disposition,
                                           content_encoding, content_language,
                                           content_type)
-        sas.add_resource_signature(self.account_name, self.account_key, 'blob', container_name)
-
-        return sas.get_token()
+        return self._get_token(sas, sas.add_resource_signature, 'blob', container_name)
 
 
 class QueueSharedAccessSignature(SharedAccessSignature):
@@ -376,14 +464,22 @@ class QueueSharedAccessSignature(SharedAccessSignature):
     generate_*_shared_access_signature method directly.
     '''
 
-    def __init__(self, account_name, account_key):
+    def __init__(self, account_name, account_key, cache_size=0, expiry_granularity=None):
         '''
         :param str account_name:
             The storage account name used to generate the shared access signatures.
         :param str account_key:
             The access key to generate the shares access signatures.
+        :param int cache_size:
+            The number of tokens kept, the least recently used being evicted.
+            By default, tokens aren't kept.
+        :param int expiry_granularity:
+            If set, an expiry given as a datetime is rounded up to a multiple of
+            this number of seconds, so that more tokens are found in the cache.
         '''
-        super(QueueSharedAccessSignature, self).__init__(account_name, account_key, x_ms_version=X_MS_VERSION)
+        super(QueueSharedAccessSignature, self).__init__(
+            account_name, account_key, x_ms_version=X_MS_VERSION,
+            cache_size=cache_size, expiry_granularity=expiry_granularity)
 
     def generate_queue(self, queue_name, permission=None,
                        expiry=None, start=None, policy_id=None,
@@ -429,16 +525,14 @@ class QueueSharedAccessSignature(SharedAccessSignature):
             is https,http. See :class:`~azure.storage.common.models.Protocol` for possible values.
         '''
         sas = _QueueSharedAccessHelper()
-        sas.add_base(permission, expiry, start, ip, protocol, self.x_ms_version)
+        sas.add_base(permission, self._get_expiry(expiry), start, ip, protocol, self.x_ms_version)
         sas.add_id(policy_id)
-        sas.add_resource_signature(self.account_name, self.account_key, queue_name)
-
-        return sas.get_token()
+        return self._get_token(sas, sas.add_resource_signature, queue_name)
 
 
 class _QueueSharedAccessHelper(_SharedAccessHelper):
 
-    def add_resource_signature(self, account_name, account_key, path):  # pylint: disable=arguments-differ
+    def add_resource_signature(self, account_name, signing_key, path):  # pylint: disable=arguments-differ
         def get_value_to_append(query):
             return_value = self.query_dict.get(query) or ''
             return return_value + '\n'
@@ -464,5 +558,4 @@ class _QueueSharedAccessHelper(_SharedAccessHelper):
         if string_to_sign[-1] == '\n':
             string_to_sign = string_to_sign[:-1]
 
-        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE,
-                        _sign_string(account_key, string_to_sign))
+        self._add_query(_QueryStringConstants.SIGNED_SIGNATURE, signing_key.sign(string_to_sign))
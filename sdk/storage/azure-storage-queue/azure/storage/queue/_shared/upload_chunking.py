@@ -540,7 +540,5 @@ class IterStreamer(object):
         except StopIteration:
             pass
 
-        if count > size:
-            self.leftover = data[size:]
-
+        self.leftover = data[size:]
         return data[:size]
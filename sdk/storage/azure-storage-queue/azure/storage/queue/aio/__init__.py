@@ -0,0 +1,13 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+from .queue_client_async import QueueClient
+from .queue_consumer_async import QueueMessageConsumer
+
+__all__ = [
+    'QueueClient',
+    'QueueMessageConsumer',
+]
@@ -0,0 +1,427 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+from typing import (  # pylint: disable=unused-import
+    Union, Optional, Any, Dict, List,
+    TYPE_CHECKING)
+try:
+    from urllib.parse import urlparse, quote, unquote
+except ImportError:
+    from urlparse import urlparse # type: ignore
+    from urllib2 import quote, unquote # type: ignore
+
+import six
+
+from .._shared.utils import (
+    add_metadata_headers,
+    process_storage_error,
+    return_response_headers,
+    parse_query,
+    parse_connection_str
+)
+from .._shared.utils_async import AsyncStorageAccountHostsMixin
+from .._queue_utils import (
+    TextXMLEncodePolicy,
+    TextXMLDecodePolicy,
+    deserialize_queue_properties,
+    deserialize_queue_creation)
+from .._generated.aio import AzureQueueStorage
+from .._generated.models import StorageErrorException
+from .._generated.models import QueueMessage as GenQueueMessage
+
+from ..models import QueueMessage
+
+if TYPE_CHECKING:
+    from ..models import QueueProperties
+
+
+class QueueClient(AsyncStorageAccountHostsMixin):
+    """An asynchronous client to interact with a specific Queue.
+
+    All the requests of the client go through the aiohttp session of its transport, so that
+    many receive, update and delete calls can be in flight at once from a single thread. To
+    process the messages of a queue concurrently, see
+    :class:`~azure.storage.queue.aio.QueueMessageConsumer`.
+
+    :param str queue_url: The full URI to the queue. This can also be a URL to the storage
+        account, in which case the queue must also be specified.
+    :param queue: The queue. If specified, this value will override
+        a queue value specified in the queue URL.
+    :type queue: str or ~azure.storage.queue.models.QueueProperties
+    :param credential:
+        The credentials with which to authenticate. This is optional if the
+        account URL already has a SAS token. The value can be a SAS token string, and account
+        shared access key, or an instance of an async TokenCredentials class from azure.identity.
+
+    **Keyword arguments:**
+
+    *transport (~azure.core.pipeline.transport.AsyncHttpTransport)* - The async transport,
+    an AioHttpTransport by default. Clients given the same transport share its session and connection pool.
+    """
+    def __init__(
+            self, queue_url,  # type: str
+            queue=None,  # type: Optional[Union[QueueProperties, str]]
+            credential=None,  # type: Optional[Any]
+            **kwargs  # type: Any
+        ):
+        # type: (...) -> None
+        try:
+            if not queue_url.lower().startswith('http'):
+                queue_url = "https://" + queue_url
+        except AttributeError:
+            raise ValueError("Queue URL must be a string.")
+        parsed_url = urlparse(queue_url.rstrip('/'))
+        if not parsed_url.path and not queue:
+            raise ValueError("Please specify a queue name.")
+        if not parsed_url.netloc:
+            raise ValueError("Invalid URL: {}".format(parsed_url))
+
+        path_queue = ""
+        if parsed_url.path:
+            path_queue = parsed_url.path.lstrip('/').partition('/')[0]
+        _, sas_token = parse_query(parsed_url.query)
+        if not sas_token and not credential:
+            raise ValueError("You need to provide either a SAS token or an account key to authenticate.")
+        try:
+            self.queue_name = queue.name # type: ignore
+        except AttributeError:
+            self.queue_name = queue or unquote(path_queue)
+        self._query_str, credential = self._format_query_string(sas_token, credential)
+        super(QueueClient, self).__init__(parsed_url, 'queue', credential, **kwargs)
+
+        self._config.message_encode_policy = kwargs.get('message_encode_policy') or TextXMLEncodePolicy()
+        self._config.message_decode_policy = kwargs.get('message_decode_policy') or TextXMLDecodePolicy()
+        self._client = AzureQueueStorage(self.url, pipeline=self._pipeline)
+
+    def _format_url(self, hostname):
+        queue_name = self.queue_name
+        if isinstance(queue_name, six.text_type):
+            queue_name = queue_name.encode('UTF-8')
+        return "{}://{}/{}{}".format(
+            self.scheme,
+            hostname,
+            quote(queue_name),
+            self._query_str)
+
+    @classmethod
+    def from_connection_string(
+            cls, conn_str,  # type: str
+            queue,  # type: Union[str, QueueProperties]
+            credential=None,  # type: Any
+            **kwargs  # type: Any
+        ):
+        # type: (...) -> QueueClient
+        """Create QueueClient from a Connection String.
+
+        :param str conn_str:
+            A connection string to an Azure Storage account.
+        :param queue: The queue. This can either be the name of the queue,
+            or an instance of QueueProperties.
+        :type queue: str or ~azure.storage.queue.models.QueueProperties
+        :param credential:
+            The credentials with which to authenticate. This is optional if the
+            account URL already has a SAS token, or the connection string already has shared
+            access key values.
+        """
+        account_url, secondary, credential = parse_connection_str(
+            conn_str, credential, 'queue')
+        if 'secondary_hostname' not in kwargs:
+            kwargs['secondary_hostname'] = secondary
+        return cls(account_url, queue=queue, credential=credential, **kwargs) # type: ignore
+
+    async def create_queue(self, metadata=None, timeout=None, **kwargs):
+        # type: (Optional[Dict[str, Any]], Optional[int], Optional[Any]) -> None
+        """Creates a new queue in the storage account.
+
+        If a queue with the same name already exists, the operation fails.
+
+        :param metadata:
+            A dict containing name-value pairs to associate with the queue as
+            metadata.
+        :type metadata: dict(str, str)
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :rtype: None
+        """
+        headers = kwargs.pop('headers', {})
+        headers.update(add_metadata_headers(metadata)) # type: ignore
+        try:
+            return await self._client.queue.create( # type: ignore
+                metadata=metadata,
+                timeout=timeout,
+                headers=headers,
+                cls=deserialize_queue_creation,
+                **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    async def delete_queue(self, timeout=None, **kwargs):
+        # type: (Optional[int], Optional[Any]) -> None
+        """Deletes the specified queue and any messages it contains.
+
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :rtype: None
+        """
+        try:
+            await self._client.queue.delete(timeout=timeout, **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    async def get_queue_properties(self, timeout=None, **kwargs):
+        # type: (Optional[int], Optional[Any]) -> QueueProperties
+        """Returns all user-defined metadata for the specified queue.
+
+        :param int timeout:
+            The timeout parameter is expressed in seconds.
+        :return: Properties for the specified queue, with its approximate message count.
+        :rtype: ~azure.storage.queue.models.QueueProperties
+        """
+        try:
+            response = await self._client.queue.get_properties(
+                timeout=timeout,
+                cls=deserialize_queue_properties,
+                **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+        response.name = self.queue_name
+        return response # type: ignore
+
+    async def enqueue_message( # type: ignore
+            self, content, # type: Any
+            visibility_timeout=None, # type: Optional[int]
+            time_to_live=None, # type: Optional[int]
+            timeout=None, # type: Optional[int]
+            **kwargs  # type: Optional[Any]
+        ):
+        # type: (...) -> QueueMessage
+        """Adds a new message to the back of the message queue.
+
+        If the key-encryption-key field is set on the local service object, this method will
+        encrypt the content before uploading.
+
+        :param obj content:
+            Message content. Allowed type is determined by the encode_function
+            set on the service. Default is str. The encoded message can be up to
+            64KB in size.
+        :param int visibility_timeout:
+            If not specified, the default value is 0. Specifies the
+            new visibility timeout value, in seconds, relative to server time.
+        :param int time_to_live:
+            Specifies the time-to-live interval for the message, in
+            seconds. The time-to-live may be any positive number or -1 for infinity. If this
+            parameter is omitted, the default time-to-live is 7 days.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :return:
+            A :class:`~azure.storage.queue.models.QueueMessage` object.
+            This object is also populated with the content although it is not
+            returned from the service.
+        :rtype: ~azure.storage.queue.models.QueueMessage
+        """
+        self._config.message_encode_policy.configure(
+            self.require_encryption,
+            self.key_encryption_key,
+            self.key_resolver_function)
+        content = self._config.message_encode_policy(content)
+        new_message = GenQueueMessage(message_text=content)
+
+        try:
+            enqueued = await self._client.messages.enqueue(
+                queue_message=new_message,
+                visibilitytimeout=visibility_timeout,
+                message_time_to_live=time_to_live,
+                timeout=timeout,
+                **kwargs)
+            queue_message = QueueMessage(content=new_message.message_text)
+            queue_message.id = enqueued[0].message_id
+            queue_message.insertion_time = enqueued[0].insertion_time
+            queue_message.expiration_time = enqueued[0].expiration_time
+            queue_message.pop_receipt = enqueued[0].pop_receipt
+            queue_message.time_next_visible = enqueued[0].time_next_visible
+            return queue_message
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    async def receive_messages(self, messages_per_page=None, visibility_timeout=None, timeout=None, **kwargs):
+        # type: (Optional[int], Optional[int], Optional[int], Optional[Any]) -> List[QueueMessage]
+        """Removes one or more messages from the front of the queue.
+
+        Unlike the sync client, which returns an iterator dequeuing pages until the
+        queue is empty, this makes a single call: it returns the messages visible at
+        that time, up to messages_per_page of them, and an empty list when there are none.
+
+        If the key-encryption-key or resolver field is set on the local service object, the
+        messages will be decrypted before being returned.
+
+        :param int messages_per_page:
+            A nonzero integer value that specifies the number of
+            messages to retrieve from the queue, up to a maximum of 32. By default,
+            a single message is retrieved from the queue with this operation.
+        :param int visibility_timeout:
+            Specifies the new visibility timeout value, in seconds, relative to server
+            time. The messages are invisible to the other consumers until then.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :return: The dequeued messages.
+        :rtype: list(:class:`~azure.storage.queue.models.QueueMessage`)
+        """
+        self._config.message_decode_policy.configure(
+            self.require_encryption,
+            self.key_encryption_key,
+            self.key_resolver_function)
+        try:
+            messages = await self._client.messages.dequeue(
+                number_of_messages=messages_per_page,
+                visibilitytimeout=visibility_timeout,
+                timeout=timeout,
+                cls=self._config.message_decode_policy,
+                **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+        return [QueueMessage._from_generated(m) for m in messages]  # pylint: disable=protected-access
+
+    async def update_message(self, message, visibility_timeout=None, pop_receipt=None, # type: ignore
+                             content=None, timeout=None, **kwargs):
+        # type: (Any, int, Optional[str], Optional[Any], Optional[int], Any) -> QueueMessage
+        """Updates the visibility timeout of a message. You can also use this
+        operation to update the contents of a message.
+
+        :param str message:
+            The message object or id identifying the message to update.
+        :param int visibility_timeout:
+            Specifies the new visibility timeout value, in seconds,
+            relative to server time.
+        :param str pop_receipt:
+            A valid pop receipt value returned from an earlier call
+            to the :func:`~receive_messages` or :func:`~update_message` operation.
+        :param obj content:
+            Message content. Allowed type is determined by the encode_function
+            set on the service. Default is str.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :return:
+            A :class:`~azure.storage.queue.models.QueueMessage` object, with the new
+            pop receipt of the message.
+        :rtype: ~azure.storage.queue.models.QueueMessage
+        """
+        try:
+            message_id = message.id
+            message_text = content or message.content
+            receipt = pop_receipt or message.pop_receipt
+            insertion_time = message.insertion_time
+            expiration_time = message.expiration_time
+            dequeue_count = message.dequeue_count
+        except AttributeError:
+            message_id = message
+            message_text = content
+            receipt = pop_receipt
+            insertion_time = None
+            expiration_time = None
+            dequeue_count = None
+
+        if receipt is None:
+            raise ValueError("pop_receipt must be present")
+        if message_text is not None:
+            self._config.message_encode_policy.configure(
+                self.require_encryption,
+                self.key_encryption_key,
+                self.key_resolver_function)
+            message_text = self._config.message_encode_policy(message_text)
+            updated = GenQueueMessage(message_text=message_text)
+        else:
+            updated = None # type: ignore
+        try:
+            response = await self._client.message_id.update(
+                queue_message=updated,
+                visibilitytimeout=visibility_timeout or 0,
+                timeout=timeout,
+                pop_receipt=receipt,
+                cls=return_response_headers,
+                queue_message_id=message_id,
+                **kwargs)
+            new_message = QueueMessage(content=message_text)
+            new_message.id = message_id
+            new_message.insertion_time = insertion_time
+            new_message.expiration_time = expiration_time
+            new_message.dequeue_count = dequeue_count
+            new_message.pop_receipt = response['popreceipt']
+            new_message.time_next_visible = response['time_next_visible']
+            return new_message
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    async def peek_messages(self, max_messages=None, timeout=None, **kwargs): # type: ignore
+        # type: (Optional[int], Optional[int], Optional[Any]) -> List[QueueMessage]
+        """Retrieves one or more messages from the front of the queue, but does
+        not alter the visibility of the message.
+
+        :param int max_messages:
+            A nonzero integer value that specifies the number of
+            messages to peek from the queue, up to a maximum of 32.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        :return: The peeked messages, without pop receipts.
+        :rtype: list(:class:`~azure.storage.queue.models.QueueMessage`)
+        """
+        if max_messages and not 1 <= max_messages <= 32:
+            raise ValueError("Number of messages to peek should be between 1 and 32")
+        self._config.message_decode_policy.configure(
+            self.require_encryption,
+            self.key_encryption_key,
+            self.key_resolver_function)
+        try:
+            messages = await self._client.messages.peek(
+                number_of_messages=max_messages,
+                timeout=timeout,
+                cls=self._config.message_decode_policy,
+                **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+        return [QueueMessage._from_generated(m) for m in messages]  # pylint: disable=protected-access
+
+    async def clear_messages(self, timeout=None, **kwargs):
+        # type: (Optional[int], Optional[Any]) -> None
+        """Deletes all messages from the specified queue.
+
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        """
+        try:
+            await self._client.messages.clear(timeout=timeout, **kwargs)
+        except StorageErrorException as error:
+            process_storage_error(error)
+
+    async def delete_message(self, message, pop_receipt=None, timeout=None, **kwargs):
+        # type: (Any, Optional[str], Optional[int], Any) -> None
+        """Deletes the specified message.
+
+        :param str message:
+            The message object or id identifying the message to delete.
+        :param str pop_receipt:
+            A valid pop receipt value returned from an earlier call
+            to the :func:`~receive_messages` or :func:`~update_message`.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        """
+        try:
+            message_id = message.id
+            receipt = pop_receipt or message.pop_receipt
+        except AttributeError:
+            message_id = message
+            receipt = pop_receipt
+
+        if receipt is None:
+            raise ValueError("pop_receipt must be present")
+        try:
+            await self._client.message_id.delete(
+                pop_receipt=receipt,
+                timeout=timeout,
+                queue_message_id=message_id,
+                **kwargs
+            )
+        except StorageErrorException as error:
+            process_storage_error(error)
@@ -0,0 +1,209 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import asyncio
+import logging
+from typing import (  # pylint: disable=unused-import
+    Any, Awaitable, Callable, Optional, Set,
+    TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from ..models import QueueMessage
+    from .queue_client_async import QueueClient
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class QueueMessageConsumer(object):  # pylint: disable=too-many-instance-attributes
+    """Processes the messages of a queue concurrently, with handler coroutines.
+
+    Several receive calls are kept in flight, each dequeuing up to messages_per_page
+    messages, and each message is dispatched to its own handler coroutine as soon as it
+    is received. While a handler runs, the visibility timeout of its message is extended,
+    so that a slow handler doesn't see its message received again by another consumer.
+    Once the handler returns, the message is deleted, without holding up the receivers.
+
+    If a handler raises, the message isn't deleted: it becomes visible again once its
+    visibility timeout expires, and is received again.
+
+    The queue service returns immediately when the queue is empty: a receiver then waits
+    for polling_interval, doubled after each empty receive up to max_polling_interval.
+
+    :param queue_client: The client of the queue to consume.
+    :type queue_client: ~azure.storage.queue.aio.QueueClient
+    :param handler: The coroutine function called with each received
+        :class:`~azure.storage.queue.models.QueueMessage`.
+    :param int receivers: The number of receive calls in flight. Default value is 4.
+    :param int messages_per_page: The maximum number of messages dequeued per call, up to 32.
+        Default value is 32.
+    :param int visibility_timeout: The visibility timeout of the received messages, in seconds.
+        It is extended every half of it while the message is processed. Default value is 30.
+    :param int max_messages_in_flight: The maximum number of messages received but not yet
+        deleted. The receivers wait while it is reached. By default, receivers * messages_per_page.
+    :param float polling_interval: The wait after an empty receive, in seconds. Default value is 1.
+    :param float max_polling_interval: The longest wait between receives while the queue is empty,
+        in seconds. Default value is 30.
+    :param error_handler: A callable called with the message and the error, when a handler
+        raises or its message can't be deleted.
+    :ivar int processed: The number of messages processed and deleted.
+    :ivar int failed: The number of messages whose handler raised or which couldn't be deleted.
+    """
+
+    def __init__(
+            self, queue_client,  # type: QueueClient
+            handler,  # type: Callable[[QueueMessage], Awaitable[Any]]
+            receivers=4,  # type: int
+            messages_per_page=32,  # type: int
+            visibility_timeout=30,  # type: int
+            max_messages_in_flight=None,  # type: Optional[int]
+            polling_interval=1,  # type: float
+            max_polling_interval=30,  # type: float
+            error_handler=None  # type: Optional[Callable[[QueueMessage, Exception], None]]
+        ):
+        # type: (...) -> None
+        if not 1 <= messages_per_page <= 32:
+            raise ValueError("messages_per_page should be between 1 and 32")
+        if receivers < 1:
+            raise ValueError("At least one receiver is required")
+        self._client = queue_client
+        self._handler = handler
+        self._receivers = receivers
+        self._messages_per_page = messages_per_page
+        self._visibility_timeout = visibility_timeout
+        self._max_in_flight = max_messages_in_flight or receivers * messages_per_page
+        self._polling_interval = polling_interval
+        self._max_polling_interval = max_polling_interval
+        self._error_handler = error_handler
+        self._in_flight = 0
+        self._capacity = None  # type: Optional[asyncio.Condition]
+        self._stopping = None  # type: Optional[asyncio.Event]
+        self._processing = set()  # type: Set[asyncio.Future]
+        self.processed = 0
+        self.failed = 0
+
+    async def run(self, until_empty=False):
+        # type: (bool) -> None
+        """Receives and processes messages until :func:`~stop` is called.
+
+        The messages already received are processed before it returns. If receiving
+        fails, once the retry policy of the client gives up, the other receivers are
+        cancelled and the error is raised once the received messages are processed.
+
+        :param bool until_empty:
+            Whether each receiver stops when the queue has no visible messages,
+            rather than waiting for more.
+        """
+        # Created here to be bound to the running loop
+        self._capacity = asyncio.Condition()
+        self._stopping = asyncio.Event()
+        receivers = [asyncio.ensure_future(self._receive(until_empty)) for _ in range(self._receivers)]
+        try:
+            await asyncio.gather(*receivers)
+        finally:
+            for receiver in receivers:
+                receiver.cancel()
+            await asyncio.wait(receivers)
+            while self._processing:
+                await asyncio.wait(list(self._processing))
+
+    def stop(self):
+        # type: () -> None
+        """Stops receiving messages. The running :func:`~run` returns once the
+        messages already received are processed.
+        """
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _reserve(self):
+        # Waits for room for at least one message, and reserves up to a page
+        async with self._capacity:
+            await self._capacity.wait_for(lambda: self._in_flight < self._max_in_flight)
+            count = min(self._messages_per_page, self._max_in_flight - self._in_flight)
+            self._in_flight += count
+            return count
+
+    async def _release(self, count):
+        async with self._capacity:
+            self._in_flight -= count
+            self._capacity.notify_all()
+
+    async def _receive(self, until_empty):
+        interval = self._polling_interval
+        while not self._stopping.is_set():
+            count = await self._reserve()
+            messages = []  # type: list
+            try:
+                if not self._stopping.is_set():
+                    messages = await self._client.receive_messages(
+                        messages_per_page=count,
+                        visibility_timeout=self._visibility_timeout)
+            finally:
+                await self._release(count - len(messages))
+            for message in messages:
+                task = asyncio.ensure_future(self._process(message))
+                self._processing.add(task)
+                task.add_done_callback(self._processing.discard)
+            if messages:
+                interval = self._polling_interval
+                continue
+            if until_empty:
+                return
+            try:
+                await asyncio.wait_for(self._stopping.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            interval = min(interval * 2, self._max_polling_interval)
+
+    async def _process(self, message):
+        try:
+            done = asyncio.Event()
+            extension = asyncio.ensure_future(self._extend_visibility(message, done))
+            try:
+                await self._handler(message)
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.warning("Failed to process the message %s: %s", message.id, error)
+                self._failed(message, error)
+                return
+            finally:
+                # An update in flight is awaited, so that the delete has the latest pop receipt
+                done.set()
+                await extension
+            try:
+                await self._client.delete_message(message)
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.warning("Failed to delete the message %s: %s", message.id, error)
+                self._failed(message, error)
+                return
+            self.processed += 1
+        finally:
+            await self._release(1)
+
+    async def _extend_visibility(self, message, done):
+        while True:
+            try:
+                await asyncio.wait_for(done.wait(), self._visibility_timeout / 2.0)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                # Without content, the message text isn't sent again
+                updated = await self._client.update_message(
+                    message.id,
+                    pop_receipt=message.pop_receipt,
+                    visibility_timeout=self._visibility_timeout)
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.warning(
+                    "Failed to extend the visibility timeout of the message %s, "
+                    "it may be received again: %s", message.id, error)
+                return
+            message.pop_receipt = updated.pop_receipt
+            message.time_next_visible = updated.time_next_visible
+
+    def _failed(self, message, error):
+        self.failed += 1
+        if self._error_handler is not None:
+            self._error_handler(message, error)
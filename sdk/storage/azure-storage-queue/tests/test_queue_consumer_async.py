@@ -0,0 +1,284 @@
+# coding: utf-8
+
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import asyncio
+import itertools
+import time
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+try:
+    from urllib.parse import urlparse, parse_qs, unquote
+except ImportError:
+    from urlparse import urlparse, parse_qs  # type: ignore
+    from urllib2 import unquote  # type: ignore
+
+from requests.structures import CaseInsensitiveDict
+
+from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import AsyncHttpTransport, AsyncHttpResponse
+from azure.storage.queue import NoRetry
+from azure.storage.queue.aio import QueueClient, QueueMessageConsumer
+
+from queuetestcase import (
+    QueueTestCase,
+)
+
+# ------------------------------------------------------------------------------
+
+_MESSAGE = (
+    '<QueueMessage><MessageId>{id}</MessageId><InsertionTime>{date}</InsertionTime>'
+    '<ExpirationTime>{date}</ExpirationTime><PopReceipt>{receipt}</PopReceipt>'
+    '<TimeNextVisible>{date}</TimeNextVisible><DequeueCount>{count}</DequeueCount>'
+    '<MessageText>{text}</MessageText></QueueMessage>')
+
+
+class _FakeResponse(AsyncHttpResponse):
+
+    def __init__(self, request, status_code, headers=None, body=b''):
+        super(_FakeResponse, self).__init__(request, None)
+        self.status_code = status_code
+        self.reason = 'OK' if status_code < 400 else 'Error'
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Content-Length', str(len(body)))
+        self.content_type = [self.headers['Content-Type']] if 'Content-Type' in self.headers else None
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class _Message(object):
+
+    def __init__(self, message_id, text):
+        self.id = message_id
+        self.text = text
+        self.receipt = None
+        self.visible_at = 0
+        self.dequeue_count = 0
+
+
+class _FakeQueueService(AsyncHttpTransport):
+    """Keeps the messages of one queue in memory, and counts the requests in flight."""
+
+    def __init__(self):
+        self.messages = {}
+        self.requests = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self._ids = itertools.count()
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def add(self, text):
+        message = _Message(str(next(self._ids)), text)
+        self.messages[message.id] = message
+        return message
+
+    async def send(self, request, **kwargs):
+        query = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        operation = request.method if 'peekonly' not in query else 'PEEK'
+        self.requests.append((operation, query))
+        self.in_flight[operation] = self.in_flight.get(operation, 0) + 1
+        self.max_in_flight[operation] = max(self.max_in_flight.get(operation, 0), self.in_flight[operation])
+        try:
+            await asyncio.sleep(0.01)
+            return self._handle(request, operation, query)
+        finally:
+            self.in_flight[operation] -= 1
+
+    def _list(self, request, messages, status_code=200):
+        body = '<?xml version="1.0" encoding="utf-8"?><QueueMessagesList>{}</QueueMessagesList>'.format(
+            ''.join(_MESSAGE.format(
+                id=m.id, date=formatdate(usegmt=True), receipt=m.receipt, count=m.dequeue_count, text=m.text)
+                    for m in messages))
+        return _FakeResponse(request, status_code, {'Content-Type': 'application/xml'}, body.encode('utf-8'))
+
+    def _handle(self, request, operation, query):
+        path = unquote(urlparse(request.url).path).strip('/').split('/')
+        now = time.time()
+        if operation == 'POST':
+            message = self.add(ET.fromstring(request.data).find('MessageText').text)
+            message.receipt = 'receipt-{}'.format(message.id)
+            return self._list(request, [message], 201)
+        if operation == 'PEEK':
+            visible = [m for m in self.messages.values() if m.visible_at <= now]
+            return self._list(request, visible[:int(query.get('numofmessages', 1))])
+        if operation == 'GET':
+            visible = [m for m in self.messages.values() if m.visible_at <= now]
+            visible = visible[:int(query.get('numofmessages', 1))]
+            for message in visible:
+                message.dequeue_count += 1
+                message.receipt = 'receipt-{}-{}'.format(message.id, message.dequeue_count)
+                message.visible_at = now + int(query.get('visibilitytimeout', 30))
+            return self._list(request, visible)
+        message = self.messages.get(path[-1])
+        if message is None or message.receipt != query.get('popreceipt'):
+            return _FakeResponse(request, 404, {'x-ms-error-code': 'MessageNotFound'})
+        if operation == 'PUT':
+            message.receipt += '+'
+            message.visible_at = now + int(query['visibilitytimeout'])
+            return _FakeResponse(request, 204, {
+                'x-ms-popreceipt': message.receipt,
+                'x-ms-time-next-visible': formatdate(message.visible_at, usegmt=True)})
+        if operation == 'DELETE':
+            del self.messages[message.id]
+            return _FakeResponse(request, 204)
+        raise ValueError(operation)
+
+
+class StorageQueueConsumerAsyncTest(QueueTestCase):
+
+    def setUp(self):
+        super(StorageQueueConsumerAsyncTest, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        self.transport = _FakeQueueService()
+        self.client = QueueClient(
+            'https://account.queue.core.windows.net/queue?sv=2018-03-28&sig=signature',
+            transport=self.transport,
+            retry_policy=NoRetry())
+
+    def tearDown(self):
+        self.loop.close()
+        return super(StorageQueueConsumerAsyncTest, self).tearDown()
+
+    def test_message_operations(self):
+        client = self.client
+
+        async def operations():
+            enqueued = await client.enqueue_message(u'message1')
+            await client.enqueue_message(u'message2')
+            peeked = await client.peek_messages(max_messages=32)
+            received = await client.receive_messages(messages_per_page=32, visibility_timeout=10)
+            empty = await client.receive_messages()
+            updated = await client.update_message(received[0], visibility_timeout=0, content=u'updated')
+            await client.delete_message(received[1])
+            return enqueued, peeked, received, empty, updated
+
+        enqueued, peeked, received, empty, updated = self.loop.run_until_complete(operations())
+
+        self.assertEqual(enqueued.content, u'message1')
+        self.assertEqual([m.content for m in peeked], [u'message1', u'message2'])
+        self.assertEqual([m.content for m in received], [u'message1', u'message2'])
+        self.assertEqual(received[0].dequeue_count, 1)
+        self.assertEqual(empty, [])
+        self.assertEqual(updated.content, u'updated')
+        self.assertEqual(updated.pop_receipt, self.transport.messages[enqueued.id].receipt)
+        self.assertEqual(list(self.transport.messages), [enqueued.id])
+
+        with self.assertRaises(HttpResponseError):
+            self.loop.run_until_complete(client.delete_message(received[1]))
+
+    def test_consumer_processes_messages_concurrently(self):
+        for i in range(100):
+            self.transport.add(u'message{}'.format(i))
+        handled = []
+        running = [0, 0]
+
+        async def handler(message):
+            running[0] += 1
+            running[1] = max(running)
+            await asyncio.sleep(0.02)
+            handled.append(message.content)
+            running[0] -= 1
+
+        consumer = QueueMessageConsumer(self.client, handler, receivers=3, messages_per_page=8)
+        self.loop.run_until_complete(consumer.run(until_empty=True))
+
+        self.assertEqual(sorted(handled), sorted(u'message{}'.format(i) for i in range(100)))
+        self.assertEqual(consumer.processed, 100)
+        self.assertEqual(consumer.failed, 0)
+        self.assertEqual(self.transport.messages, {})
+        self.assertEqual(self.transport.max_in_flight['GET'], 3)
+        self.assertLessEqual(running[1], 24)
+        self.assertGreater(self.transport.max_in_flight['DELETE'], 1)
+        pages = [int(q['numofmessages']) for op, q in self.transport.requests if op == 'GET']
+        self.assertEqual(max(pages), 8)
+
+    def test_consumer_limits_messages_in_flight(self):
+        for i in range(20):
+            self.transport.add(u'message{}'.format(i))
+        running = [0, 0]
+
+        async def handler(message):
+            running[0] += 1
+            running[1] = max(running)
+            await asyncio.sleep(0.02)
+            running[0] -= 1
+
+        consumer = QueueMessageConsumer(self.client, handler, receivers=2, max_messages_in_flight=5)
+        self.loop.run_until_complete(consumer.run(until_empty=True))
+
+        self.assertEqual(consumer.processed, 20)
+        self.assertLessEqual(running[1], 5)
+        self.assertTrue(all(int(q['numofmessages']) <= 5 for op, q in self.transport.requests if op == 'GET'))
+
+    def test_consumer_extends_visibility(self):
+        message = self.transport.add(u'slow')
+
+        async def handler(received):
+            await asyncio.sleep(1.3)
+
+        consumer = QueueMessageConsumer(self.client, handler, receivers=2, visibility_timeout=1)
+        self.loop.run_until_complete(consumer.run(until_empty=True))
+
+        # The message wasn't received again, and was deleted with its latest pop receipt
+        self.assertEqual(message.dequeue_count, 1)
+        self.assertEqual([op for op, _ in self.transport.requests].count('PUT'), 2)
+        self.assertEqual(self.transport.messages, {})
+        self.assertEqual(consumer.processed, 1)
+
+    def test_consumer_handler_failure(self):
+        self.transport.add(u'good')
+        bad = self.transport.add(u'bad')
+        errors = []
+
+        async def handler(message):
+            if message.content == u'bad':
+                raise ValueError('bad message')
+
+        consumer = QueueMessageConsumer(
+            self.client, handler, error_handler=lambda message, error: errors.append((message.content, error)))
+        self.loop.run_until_complete(consumer.run(until_empty=True))
+
+        self.assertEqual(consumer.processed, 1)
+        self.assertEqual(consumer.failed, 1)
+        self.assertEqual(errors[0][0], u'bad')
+        self.assertIsInstance(errors[0][1], ValueError)
+        # The failed message is received again once its visibility timeout expires
+        self.assertEqual(list(self.transport.messages), [bad.id])
+
+    def test_consumer_stop(self):
+        handled = []
+
+        async def handler(message):
+            handled.append(message.content)
+            consumer.stop()
+
+        async def run():
+            task = asyncio.ensure_future(consumer.run())
+            await asyncio.sleep(0.1)
+            self.transport.add(u'late')
+            await asyncio.wait_for(task, 5)
+
+        consumer = QueueMessageConsumer(
+            self.client, handler, receivers=2, polling_interval=0.01, max_polling_interval=0.04)
+        self.loop.run_until_complete(run())
+
+        self.assertEqual(handled, [u'late'])
+        self.assertEqual(self.transport.messages, {})
+        # The receivers backed off while the queue was empty
+        self.assertLess(len(self.transport.requests), 20)
+
+# ------------------------------------------------------------------------------